@@ -0,0 +1,20 @@
+"""add_invoice_pdfStored
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# pre/post deployment: pre
+# revision identifiers, used by Alembic.
+revision = "5c9f1b2a7d3e"
+down_revision = "0272ad68e89d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("invoice", sa.Column("pdfStored", sa.Boolean(), server_default=sa.text("true"), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("invoice", "pdfStored")
@@ -0,0 +1,146 @@
+"""add_deposit_spent_amounts
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from pcapi import settings
+
+
+# pre/post deployment: pre
+# revision identifiers, used by Alembic.
+revision = "8e1d4c6f2b7a"
+down_revision = "5c9f1b2a7d3e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("deposit", sa.Column("spentAmount", sa.Numeric(10, 2), server_default="0", nullable=False))
+    op.add_column("deposit", sa.Column("usedSpentAmount", sa.Numeric(10, 2), server_default="0", nullable=False))
+
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION update_deposit_spent_amounts()
+    RETURNS TRIGGER AS $$
+    BEGIN
+    IF TG_OP != 'INSERT' AND OLD."depositId" IS NOT NULL AND OLD.status != 'CANCELLED' THEN
+        UPDATE deposit SET
+            "spentAmount" = "spentAmount" - OLD.amount * OLD.quantity,
+            "usedSpentAmount" = "usedSpentAmount" - CASE
+                WHEN OLD.status IN ('USED', 'REIMBURSED')
+                THEN OLD.amount * OLD.quantity
+                ELSE 0
+            END
+        WHERE id = OLD."depositId";
+    END IF;
+
+    IF TG_OP != 'DELETE' AND NEW."depositId" IS NOT NULL AND NEW.status != 'CANCELLED' THEN
+        UPDATE deposit SET
+            "spentAmount" = "spentAmount" + NEW.amount * NEW.quantity,
+            "usedSpentAmount" = "usedSpentAmount" + CASE
+                WHEN NEW.status IN ('USED', 'REIMBURSED')
+                THEN NEW.amount * NEW.quantity
+                ELSE 0
+            END
+        WHERE id = NEW."depositId";
+    END IF;
+
+    RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS booking_deposit_spent_amounts ON booking;
+    CREATE TRIGGER booking_deposit_spent_amounts
+    AFTER INSERT
+    OR UPDATE OF quantity, amount, status, "depositId"
+    OR DELETE
+    ON booking
+    FOR EACH ROW EXECUTE PROCEDURE update_deposit_spent_amounts();
+    """
+    )
+
+    # `CREATE TRIGGER` locks the booking table against writes until
+    # the end of the transaction: no booking can be counted twice or
+    # missed by the backfill below.
+    op.execute("""SET SESSION statement_timeout = '900s'""")
+    op.execute(
+        """
+    UPDATE deposit
+    SET
+        "spentAmount" = spent."spentAmount",
+        "usedSpentAmount" = spent."usedSpentAmount"
+    FROM (
+        SELECT
+            "depositId",
+            SUM(amount * quantity) AS "spentAmount",
+            SUM(CASE WHEN status IN ('USED', 'REIMBURSED') THEN amount * quantity ELSE 0 END) AS "usedSpentAmount"
+        FROM booking
+        WHERE "depositId" IS NOT NULL AND status != 'CANCELLED'
+        GROUP BY "depositId"
+    ) AS spent
+    WHERE deposit.id = spent."depositId"
+    """
+    )
+    op.execute(f"""SET SESSION statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT}""")
+
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION public.get_deposit_balance (deposit_id bigint, only_used_bookings boolean)
+        RETURNS numeric
+        AS $$
+    DECLARE
+        deposit_amount bigint;
+        spent_amount numeric;
+    BEGIN
+        SELECT
+            CASE WHEN "expirationDate" > now() THEN amount ELSE 0 END,
+            CASE WHEN only_used_bookings THEN "usedSpentAmount" ELSE "spentAmount" END
+        INTO deposit_amount, spent_amount
+        FROM deposit
+        WHERE id = deposit_id;
+
+        IF deposit_amount IS NULL
+        THEN RAISE EXCEPTION 'the deposit was not found';
+        END IF;
+
+        RETURN
+            deposit_amount - spent_amount;
+        END;
+    $$
+    LANGUAGE plpgsql;
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION public.get_deposit_balance(deposit_id bigint, only_used_bookings boolean) RETURNS numeric
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        deposit_amount bigint := (SELECT CASE WHEN "expirationDate" > now() THEN amount ELSE 0 END amount FROM deposit WHERE id = deposit_id);
+        sum_bookings numeric;
+    BEGIN
+        IF deposit_amount IS NULL
+        THEN RAISE EXCEPTION 'the deposit was not found';
+        END IF;
+
+        SELECT
+            COALESCE(SUM(amount * quantity), 0) INTO sum_bookings
+        FROM
+            booking
+        WHERE
+            booking."depositId" = deposit_id
+            AND NOT booking.status = 'CANCELLED'
+            AND (NOT only_used_bookings OR booking.status in ('USED', 'REIMBURSED'));
+        RETURN
+            deposit_amount - sum_bookings;
+        END;
+    $$;
+    """
+    )
+    op.execute("DROP TRIGGER IF EXISTS booking_deposit_spent_amounts ON booking")
+    op.execute("DROP FUNCTION IF EXISTS update_deposit_spent_amounts")
+    op.drop_column("deposit", "usedSpentAmount")
+    op.drop_column("deposit", "spentAmount")
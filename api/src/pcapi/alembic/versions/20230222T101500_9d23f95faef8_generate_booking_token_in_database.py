@@ -0,0 +1,54 @@
+"""generate_booking_token_in_database
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# pre/post deployment: pre
+# revision identifiers, used by Alembic.
+revision = "9d23f95faef8"
+down_revision = "8e1d4c6f2b7a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION generate_booking_token()
+    RETURNS varchar AS $$
+    DECLARE
+        -- Same alphabet as `pcapi.utils.token.ALPHABET`
+        alphabet CONSTANT text := 'ABCDEFGHJKLMNPQRSTUVWXYZ234567';
+        random_bytes bytea;
+        random_byte int;
+        candidate text;
+    BEGIN
+        FOR attempt IN 1..100 LOOP
+            candidate := '';
+            WHILE length(candidate) < 6 LOOP
+                random_bytes := gen_random_bytes(8);
+                FOR i IN 0..7 LOOP
+                    random_byte := get_byte(random_bytes, i);
+                    -- Bytes from 240 (the largest multiple of 30 below 256)
+                    -- are discarded, so that all characters are equally likely.
+                    IF random_byte < 240 AND length(candidate) < 6 THEN
+                        candidate := candidate || substr(alphabet, 1 + random_byte % 30, 1);
+                    END IF;
+                END LOOP;
+            END LOOP;
+            IF NOT EXISTS (SELECT 1 FROM booking WHERE token = candidate) THEN
+                RETURN candidate;
+            END IF;
+        END LOOP;
+        RAISE EXCEPTION 'Could not generate new booking token';
+    END;
+    $$ LANGUAGE plpgsql;
+    """
+    )
+    op.alter_column("booking", "token", server_default=sa.text("generate_booking_token()"))
+
+
+def downgrade() -> None:
+    op.alter_column("booking", "token", server_default=None)
+    op.execute("DROP FUNCTION IF EXISTS generate_booking_token")
@@ -0,0 +1,80 @@
+"""add_user_search_name
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from pcapi import settings
+
+
+# pre/post deployment: pre
+# revision identifiers, used by Alembic.
+revision = "30af9438108d"
+down_revision = "9d23f95faef8"
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    op.add_column("user", sa.Column("searchName", sa.Text(), nullable=True))
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION update_user_search_name()
+    RETURNS TRIGGER AS $$
+    BEGIN
+      NEW."searchName" := lower(unaccent(concat_ws(' ', NEW."firstName", NEW."lastName")));
+      RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS user_search_name ON "user";
+
+    CREATE TRIGGER user_search_name
+    BEFORE INSERT OR UPDATE OF "firstName", "lastName"
+    ON "user"
+    FOR EACH ROW
+    EXECUTE PROCEDURE update_user_search_name()
+    """
+    )
+    op.execute("COMMIT")
+
+    # Users are updated by batches, so that rows are not locked for too
+    # long (e.g. when users log in). Users that are created or renamed
+    # in the meantime are handled by the trigger.
+    max_id = op.get_bind().execute(sa.text('SELECT max(id) FROM "user"')).scalar() or 0
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        op.execute(
+            f"""
+        UPDATE "user"
+        SET "searchName" = lower(unaccent(concat_ws(' ', "firstName", "lastName")))
+        WHERE id >= {start} AND id < {start + BATCH_SIZE} AND "searchName" IS NULL
+        """
+        )
+        op.execute("COMMIT")
+
+    op.execute("""SET SESSION statement_timeout = '900s'""")
+    op.execute(
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_trgm_search_name
+        ON "user"
+        USING gin ("searchName" public.gin_trgm_ops)
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_reversed_email
+        ON "user" (reverse(email) text_pattern_ops)
+        """
+    )
+    op.execute(f"""SET SESSION statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT}""")
+
+
+def downgrade() -> None:
+    op.execute("COMMIT")
+    op.execute("""DROP INDEX CONCURRENTLY IF EXISTS "ix_user_reversed_email" """)
+    op.execute("""DROP INDEX CONCURRENTLY IF EXISTS "idx_user_trgm_search_name" """)
+    op.execute('DROP TRIGGER IF EXISTS user_search_name ON "user"')
+    op.execute("DROP FUNCTION IF EXISTS update_user_search_name")
+    op.drop_column("user", "searchName")
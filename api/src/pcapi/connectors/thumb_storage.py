@@ -1,10 +1,22 @@
+import concurrent.futures
+import dataclasses
+import hashlib
+import logging
+import multiprocessing
+import typing
+
+from flask import current_app
+from redis import exceptions as redis_exceptions
+
 from pcapi import settings
 from pcapi.core import object_storage
 from pcapi.models.has_thumb_mixin import HasThumbMixin
 from pcapi.utils.image_conversion import CropParams
 from pcapi.utils.image_conversion import ImageRatio
-from pcapi.utils.image_conversion import process_original_image
-from pcapi.utils.image_conversion import standardize_image
+from pcapi.utils.image_conversion import process_thumb
+
+
+logger = logging.getLogger(__name__)
 
 
 def create_thumb(
@@ -15,10 +27,7 @@ def create_thumb(
     ratio: ImageRatio = ImageRatio.PORTRAIT,
     keep_ratio: bool = False,
 ) -> None:
-    if keep_ratio:
-        image_as_bytes = process_original_image(image_as_bytes)
-    else:
-        image_as_bytes = standardize_image(image_as_bytes, ratio=ratio, crop_params=crop_params)
+    image_as_bytes = process_thumb(image_as_bytes, crop_params, ratio, keep_ratio)
     model_with_thumb.thumbCount += 1
     object_storage.store_public_object(
         folder=settings.THUMBS_FOLDER_NAME,
@@ -33,7 +42,179 @@ def remove_thumb(
     storage_id_suffix: str,
     ignore_thumb_count: bool = False,
 ) -> None:
-    object_storage.delete_public_object(
-        folder="thumbs",
-        object_id=model_with_thumb.get_thumb_storage_id(storage_id_suffix, ignore_thumb_count),
-    )
+    object_id = model_with_thumb.get_thumb_storage_id(storage_id_suffix, ignore_thumb_count)
+    object_storage.delete_public_object(folder="thumbs", object_id=object_id)
+    # Otherwise, `ThumbPipeline` would not upload the same image again.
+    _delete_stored_source_hash(object_id)
+
+
+class ThumbPipeline:
+    """Standardize thumbs in a pool of processes and upload them in
+    batches, so that callers (e.g. provider synchronizations) do not
+    block on each thumb.
+
+    `add()` increments the `thumbCount` of the model right away, as
+    `create_thumb()` does. `flush()` must be called before models are
+    saved: it waits for pending thumbs, uploads them and returns the
+    models whose thumb could not be stored (their `thumbCount` is
+    restored).
+
+    Source images are identified by a hash of their content. Identical
+    images are standardized only once, and an image is not uploaded
+    again if the target object already holds it.
+    """
+
+    def __init__(self, max_workers: int | None = None, batch_size: int | None = None) -> None:
+        self.max_workers = settings.THUMBS_PROCESSING_WORKERS if max_workers is None else max_workers
+        self.batch_size = batch_size or settings.THUMBS_UPLOAD_BATCH_SIZE
+        self._executor: concurrent.futures.ProcessPoolExecutor | None = None
+        # Standardized images of the current batch, by source hash
+        self._processed: dict[str, concurrent.futures.Future] = {}
+        self._pending: list[_PendingThumb] = []
+        self._failed: list[HasThumbMixin] = []
+
+    def __enter__(self) -> "ThumbPipeline":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def add(
+        self,
+        model_with_thumb: HasThumbMixin,
+        image_as_bytes: bytes,
+        crop_params: CropParams | None = None,
+        ratio: ImageRatio = ImageRatio.PORTRAIT,
+        keep_ratio: bool = False,
+    ) -> bool:
+        """Add a new thumb to `model_with_thumb`.
+
+        Return False if the thumb is not uploaded because the target
+        object already holds the same image.
+        """
+        if model_with_thumb.id is None:
+            raise ValueError("Trying to add a thumb to an unsaved object")
+        source_hash = _get_source_hash(image_as_bytes, crop_params, ratio, keep_ratio)
+        model_with_thumb.thumbCount = (model_with_thumb.thumbCount or 0) + 1
+        object_id = model_with_thumb.get_thumb_storage_id()
+        if _get_stored_source_hash(object_id) == source_hash:
+            return False
+
+        if source_hash not in self._processed:
+            self._processed[source_hash] = self._submit(image_as_bytes, crop_params, ratio, keep_ratio)
+        self._pending.append(_PendingThumb(model_with_thumb, object_id, source_hash, self._processed[source_hash]))
+        if len(self._pending) >= self.batch_size:
+            self._upload_pending()
+        return True
+
+    def flush(self) -> list[HasThumbMixin]:
+        """Upload all pending thumbs and return the models whose thumb
+        could not be stored since the last call.
+        """
+        self._upload_pending()
+        failed, self._failed = self._failed, []
+        return failed
+
+    def close(self) -> None:
+        if self._executor:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _submit(
+        self, image_as_bytes: bytes, crop_params: CropParams | None, ratio: ImageRatio, keep_ratio: bool
+    ) -> concurrent.futures.Future:
+        if not self.max_workers:
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            try:
+                future.set_result(process_thumb(image_as_bytes, crop_params, ratio, keep_ratio))
+            except Exception as exc:  # pylint: disable=broad-except
+                future.set_exception(exc)
+            return future
+        if not self._executor:
+            # Do not fork: the calling process holds database and
+            # Redis connections that must not be shared.
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor.submit(process_thumb, image_as_bytes, crop_params, ratio, keep_ratio)
+
+    def _upload_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        self._processed = {}
+        if not pending:
+            return
+
+        to_upload = []
+        for thumb in pending:
+            try:
+                thumb.future.result()
+            except Exception:  # pylint: disable=broad-except
+                logger.info("Could not standardize thumb", extra={"object_id": thumb.object_id}, exc_info=True)
+                self._fail(thumb)
+            else:
+                to_upload.append(thumb)
+
+        try:
+            object_storage.store_public_objects(
+                object_storage.PublicObject(
+                    folder=settings.THUMBS_FOLDER_NAME,
+                    object_id=thumb.object_id,
+                    blob=thumb.future.result(),
+                    content_type="image/jpeg",
+                )
+                for thumb in to_upload
+            )
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not upload thumbs", extra={"count": len(to_upload)})
+            for thumb in to_upload:
+                self._fail(thumb)
+            return
+        _set_stored_source_hashes({thumb.object_id: thumb.source_hash for thumb in to_upload})
+
+    def _fail(self, thumb: "_PendingThumb") -> None:
+        thumb.model.thumbCount -= 1
+        self._failed.append(thumb.model)
+
+
+@dataclasses.dataclass
+class _PendingThumb:
+    model: HasThumbMixin
+    object_id: str
+    source_hash: str
+    future: concurrent.futures.Future
+
+
+def _get_source_hash(image_as_bytes: bytes, crop_params: CropParams | None, ratio: ImageRatio, keep_ratio: bool) -> str:
+    hash_ = hashlib.sha256(image_as_bytes)
+    hash_.update(repr((crop_params, ratio, keep_ratio)).encode())
+    return hash_.hexdigest()
+
+
+def _get_source_hash_key(object_id: str) -> str:
+    return f"thumbs:source_hash:{settings.THUMBS_FOLDER_NAME}/{object_id}"
+
+
+def _get_stored_source_hash(object_id: str) -> str | None:
+    try:
+        return current_app.redis_client.get(_get_source_hash_key(object_id))  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.warning("Could not get thumb source hash", extra={"object_id": object_id}, exc_info=True)
+        return None
+
+
+def _delete_stored_source_hash(object_id: str) -> None:
+    try:
+        current_app.redis_client.delete(_get_source_hash_key(object_id))  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.warning("Could not delete thumb source hash", extra={"object_id": object_id}, exc_info=True)
+
+
+def _set_stored_source_hashes(source_hashes: dict[str, str]) -> None:
+    try:
+        pipeline = current_app.redis_client.pipeline()  # type: ignore [attr-defined]
+        for object_id, source_hash in source_hashes.items():
+            pipeline.set(_get_source_hash_key(object_id), source_hash, ex=settings.THUMBS_SOURCE_HASH_TTL)
+        pipeline.execute()
+    except redis_exceptions.RedisError:
+        logger.warning("Could not save thumb source hashes", exc_info=True)
@@ -1,18 +1,24 @@
 import datetime
 import logging
+import pathlib
+import secrets
+import tempfile
 import typing
 
 import pytz
 import sentry_sdk
 import sqlalchemy as sa
 
+from pcapi import settings
+from pcapi.core import object_storage
 from pcapi.core import search
 from pcapi.core.bookings import constants
 from pcapi.core.bookings.models import Booking
 from pcapi.core.bookings.models import BookingCancellationReasons
 from pcapi.core.bookings.models import BookingStatus
+from pcapi.core.bookings.models import BookingStatusFilter
 from pcapi.core.bookings.models import ExternalBooking
-from pcapi.core.bookings.repository import generate_booking_token
+import pcapi.core.bookings.repository as bookings_repository
 from pcapi.core.educational import utils as educational_utils
 from pcapi.core.educational.models import CollectiveBooking
 from pcapi.core.educational.models import CollectiveBookingStatus
@@ -24,7 +30,11 @@ import pcapi.core.finance.api as finance_api
 import pcapi.core.finance.exceptions as finance_exceptions
 import pcapi.core.finance.models as finance_models
 import pcapi.core.finance.repository as finance_repository
+from pcapi.core.logging import log_elapsed
 import pcapi.core.mails.transactional as transactional_mails
+from pcapi.core.object_storage.backends.base import BaseBackend
+from pcapi.core.object_storage.backends.gcp import GCPBackend
+from pcapi.core.object_storage.backends.local import LocalBackend
 from pcapi.core.offers import repository as offers_repository
 import pcapi.core.offers.models as offers_models
 from pcapi.core.offers.models import Stock
@@ -37,12 +47,14 @@ from pcapi.models import feature
 from pcapi.models.feature import FeatureToggle
 from pcapi.repository import repository
 from pcapi.repository import transaction
+from pcapi.routes.serialization.bookings_recap_serialize import OfferType
 import pcapi.utils.cinema_providers as cinema_providers_utils
 from pcapi.workers import push_notification_job
 from pcapi.workers import user_emails_job
 
 from . import constants
 from . import exceptions
+from . import tasks as bookings_tasks
 from . import validation
 from .exceptions import BookingIsAlreadyCancelled
 from .exceptions import BookingIsAlreadyUsed
@@ -50,6 +62,8 @@ from .exceptions import BookingIsAlreadyUsed
 
 logger = logging.getLogger(__name__)
 
+EXCEL_EXPORTS_FOLDER = "bookings_exports"
+
 QR_CODE_PASS_CULTURE_VERSION = "v3"
 
 
@@ -102,7 +116,6 @@ def book_offer(
             stockId=stock.id,
             amount=stock.price,
             quantity=quantity,
-            token=generate_booking_token(),
             venueId=stock.offer.venueId,
             offererId=stock.offer.venue.managingOffererId,
             status=BookingStatus.CONFIRMED,
@@ -146,6 +159,7 @@ def book_offer(
     if not transactional_mails.send_individual_booking_confirmation_email_to_beneficiary(booking):
         logger.warning("Could not send booking=%s confirmation email to beneficiary", booking.id)
 
+    search.last_30_days_bookings_counter.add_bookings([(stock.offerId, booking.dateCreated)])
     search.async_index_offer_ids([stock.offerId])
 
     update_external_user(booking.user)
@@ -221,6 +235,7 @@ def _cancel_booking(
 
     update_external_user(booking.user)
     update_external_pro(booking.venue.bookingEmail)
+    search.last_30_days_bookings_counter.remove_bookings([(booking.stock.offerId, booking.dateCreated)])
     search.async_index_offer_ids([booking.stock.offerId])
     return True
 
@@ -340,8 +355,9 @@ def mark_as_used_with_uncancelling(booking: Booking) -> None:
     # a rollback if we raise a validation exception.
     # Since I lock the stock, I really want to make sure the lock is
     # removed ASAP.
+    was_cancelled = booking.status == BookingStatus.CANCELLED
     with transaction():
-        if booking.status == BookingStatus.CANCELLED:
+        if was_cancelled:
             booking.uncancel_booking_set_used()
             stock = offers_repository.get_and_lock_stock(stock_id=booking.stockId)
             stock.dnBookedQuantity += booking.quantity
@@ -350,6 +366,9 @@ def mark_as_used_with_uncancelling(booking: Booking) -> None:
     db.session.commit()
     logger.info("Booking was uncancelled and marked as used", extra={"bookingId": booking.id})
 
+    if was_cancelled:
+        search.last_30_days_bookings_counter.add_bookings([(booking.stock.offerId, booking.dateCreated)])
+
     update_external_user(booking.user)
 
 
@@ -532,3 +551,56 @@ def archive_old_activation_code_bookings() -> None:
             "archivedBookings": number_updated,
         },
     )
+
+
+def send_excel_export(
+    user: User,
+    booking_period: tuple[datetime.date, datetime.date] | None = None,
+    status_filter: BookingStatusFilter | None = BookingStatusFilter.BOOKED,
+    event_date: datetime.datetime | None = None,
+    venue_id: int | None = None,
+    offer_type: OfferType | None = None,
+) -> None:
+    """Generate an Excel export of bookings, store it and send a link to
+    download it to the user.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = pathlib.Path(tmp_dir) / "export.xlsx"
+        with log_elapsed(logger, "Generated Excel export of bookings", extra={"user": user.id}):
+            bookings_repository.write_excel_export(
+                str(path),
+                user,
+                booking_period=booking_period,
+                status_filter=status_filter,
+                event_date=event_date,
+                venue_id=venue_id,
+                offer_type=offer_type,
+            )
+        object_id = f"{secrets.token_urlsafe(32)}.xlsx"
+        backend = _get_excel_exports_backend()
+        backend.store_public_object(
+            folder=EXCEL_EXPORTS_FOLDER,
+            object_id=object_id,
+            blob=path.read_bytes(),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    bookings_tasks.delete_excel_export_task.delay(bookings_tasks.DeleteExcelExportRequest(object_id=object_id))
+    export_url = backend.get_signed_url(
+        EXCEL_EXPORTS_FOLDER, object_id, expiration=datetime.timedelta(seconds=settings.BOOKINGS_EXCEL_EXPORT_TTL)
+    )
+    transactional_mails.send_bookings_export_to_pro_email(user, export_url)
+
+
+def delete_excel_export(object_id: str) -> None:
+    _get_excel_exports_backend().delete_public_object(EXCEL_EXPORTS_FOLDER, object_id)
+
+
+def _get_excel_exports_backend() -> BaseBackend:
+    # Exports contain personal data: they must not be stored in the
+    # public bucket used by `object_storage.store_public_object`.
+    if settings.OBJECT_STORAGE_PROVIDER == object_storage.LOCAL_FILE_STORAGE:
+        return LocalBackend()
+    if not settings.GCP_BOOKINGS_EXPORTS_BUCKET_NAME:
+        raise RuntimeError("GCP_BOOKINGS_EXPORTS_BUCKET_NAME must be set to store bookings exports")
+    return GCPBackend(bucket_name=settings.GCP_BOOKINGS_EXPORTS_BUCKET_NAME)
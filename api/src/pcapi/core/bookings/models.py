@@ -21,6 +21,7 @@ from sqlalchemy import case
 from sqlalchemy import event
 from sqlalchemy import exists
 from sqlalchemy import select
+from sqlalchemy import text
 import sqlalchemy.exc as sa_exc
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped
@@ -101,7 +102,10 @@ class Booking(PcObject, Base, Model):
 
     quantity: int = Column(Integer, nullable=False, default=1)
 
-    token: str = Column(String(6), unique=True, nullable=False)
+    # The token is generated by the database on insert (see
+    # `Booking.generate_token_ddl`), so that no round trip is needed to
+    # find an unused token while the stock and user rows are locked.
+    token: str = Column(String(6), unique=True, nullable=False, server_default=text("generate_booking_token()"))
 
     userId = Column(BigInteger, ForeignKey("user.id"), index=True, nullable=True)
 
@@ -311,28 +315,60 @@ class Booking(PcObject, Base, Model):
             return None
 
 
+Booking.generate_token_ddl = """
+    CREATE OR REPLACE FUNCTION generate_booking_token()
+    RETURNS varchar AS $$
+    DECLARE
+        -- Same alphabet as `pcapi.utils.token.ALPHABET`
+        alphabet CONSTANT text := 'ABCDEFGHJKLMNPQRSTUVWXYZ234567';
+        random_bytes bytea;
+        random_byte int;
+        candidate text;
+    BEGIN
+        FOR attempt IN 1..100 LOOP
+            candidate := '';
+            WHILE length(candidate) < 6 LOOP
+                random_bytes := gen_random_bytes(8);
+                FOR i IN 0..7 LOOP
+                    random_byte := get_byte(random_bytes, i);
+                    -- Bytes from 240 (the largest multiple of 30 below 256)
+                    -- are discarded, so that all characters are equally likely.
+                    IF random_byte < 240 AND length(candidate) < 6 THEN
+                        candidate := candidate || substr(alphabet, 1 + random_byte % 30, 1);
+                    END IF;
+                END LOOP;
+            END LOOP;
+            IF NOT EXISTS (SELECT 1 FROM booking WHERE token = candidate) THEN
+                RETURN candidate;
+            END IF;
+        END LOOP;
+        RAISE EXCEPTION 'Could not generate new booking token';
+    END;
+    $$ LANGUAGE plpgsql;
+    """
+event.listen(Booking.__table__, "before_create", DDL(Booking.generate_token_ddl))
+
 Booking.trig_ddl = f"""
     CREATE OR REPLACE FUNCTION public.get_deposit_balance (deposit_id bigint, only_used_bookings boolean)
         RETURNS numeric
         AS $$
     DECLARE
-        deposit_amount bigint := (SELECT CASE WHEN "expirationDate" > now() THEN amount ELSE 0 END amount FROM deposit WHERE id = deposit_id);
-        sum_bookings numeric;
+        deposit_amount bigint;
+        spent_amount numeric;
     BEGIN
+        SELECT
+            CASE WHEN "expirationDate" > now() THEN amount ELSE 0 END,
+            CASE WHEN only_used_bookings THEN "usedSpentAmount" ELSE "spentAmount" END
+        INTO deposit_amount, spent_amount
+        FROM deposit
+        WHERE id = deposit_id;
+
         IF deposit_amount IS NULL
         THEN RAISE EXCEPTION 'the deposit was not found';
         END IF;
 
-        SELECT
-            COALESCE(SUM(amount * quantity), 0) INTO sum_bookings
-        FROM
-            booking
-        WHERE
-            booking."depositId" = deposit_id
-            AND NOT booking.status = '{BookingStatus.CANCELLED.value}'
-            AND (NOT only_used_bookings OR booking.status in ('USED', 'REIMBURSED'));
         RETURN
-            deposit_amount - sum_bookings;
+            deposit_amount - spent_amount;
         END;
     $$
     LANGUAGE plpgsql;
@@ -395,6 +431,47 @@ Booking.trig_ddl = f"""
     END;
     $$ LANGUAGE plpgsql;
 
+    CREATE OR REPLACE FUNCTION update_deposit_spent_amounts()
+    RETURNS TRIGGER AS $$
+    BEGIN
+    IF TG_OP != 'INSERT' AND OLD."depositId" IS NOT NULL AND OLD.status != '{BookingStatus.CANCELLED.value}' THEN
+        UPDATE deposit SET
+            "spentAmount" = "spentAmount" - OLD.amount * OLD.quantity,
+            "usedSpentAmount" = "usedSpentAmount" - CASE
+                WHEN OLD.status IN ('{BookingStatus.USED.value}', '{BookingStatus.REIMBURSED.value}')
+                THEN OLD.amount * OLD.quantity
+                ELSE 0
+            END
+        WHERE id = OLD."depositId";
+    END IF;
+
+    IF TG_OP != 'DELETE' AND NEW."depositId" IS NOT NULL AND NEW.status != '{BookingStatus.CANCELLED.value}' THEN
+        UPDATE deposit SET
+            "spentAmount" = "spentAmount" + NEW.amount * NEW.quantity,
+            "usedSpentAmount" = "usedSpentAmount" + CASE
+                WHEN NEW.status IN ('{BookingStatus.USED.value}', '{BookingStatus.REIMBURSED.value}')
+                THEN NEW.amount * NEW.quantity
+                ELSE 0
+            END
+        WHERE id = NEW."depositId";
+    END IF;
+
+    RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    -- Triggers of the same event are fired in alphabetical order: this
+    -- one must be fired before `booking_update`, which reads the
+    -- amounts through `get_deposit_balance()`. Updating the deposit
+    -- row also serializes concurrent bookings of the same deposit.
+    DROP TRIGGER IF EXISTS booking_deposit_spent_amounts ON booking;
+    CREATE TRIGGER booking_deposit_spent_amounts
+    AFTER INSERT
+    OR UPDATE OF quantity, amount, status, "depositId"
+    OR DELETE
+    ON booking
+    FOR EACH ROW EXECUTE PROCEDURE update_deposit_spent_amounts();
+
     DROP TRIGGER IF EXISTS booking_update ON booking;
     CREATE CONSTRAINT TRIGGER booking_update
     AFTER INSERT
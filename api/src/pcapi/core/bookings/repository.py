@@ -1,3 +1,4 @@
+import codecs
 import csv
 from datetime import date
 from datetime import datetime
@@ -17,11 +18,13 @@ from sqlalchemy import Date
 from sqlalchemy import case
 from sqlalchemy import cast
 from sqlalchemy import func
+from sqlalchemy import literal_column
 from sqlalchemy import or_
 from sqlalchemy import text
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.sql.elements import Case
 from sqlalchemy.sql.elements import not_
 from sqlalchemy.sql.functions import coalesce
 import xlsxwriter
@@ -50,10 +53,10 @@ from pcapi.models import db
 from pcapi.models.api_errors import ResourceNotFoundError
 from pcapi.routes.serialization.bookings_recap_serialize import OfferType
 from pcapi.utils.email import sanitize_email
-from pcapi.utils.token import random_token
 
 
 DUO_QUANTITY = 2
+EXPORT_CHUNK_SIZE = 1000
 
 
 BOOKING_STATUS_LABELS = {
@@ -161,10 +164,6 @@ def find_not_cancelled_bookings_by_stock(stock: Stock) -> list[Booking]:
     return Booking.query.filter(Booking.stockId == stock.id, Booking.status != BookingStatus.CANCELLED).all()
 
 
-def token_exists(token: str) -> bool:
-    return db.session.query(Booking.query.filter_by(token=token.upper()).exists()).scalar()
-
-
 def find_used_by_token(token: str) -> Booking:
     return Booking.query.filter(
         Booking.token == token.upper(),
@@ -226,14 +225,6 @@ def find_soon_to_be_expiring_individual_bookings_ordered_by_user(given_date: dat
     )
 
 
-def generate_booking_token() -> str:
-    for _i in range(100):
-        token = random_token()
-        if not token_exists(token):
-            return token
-    raise ValueError("Could not generate new booking token")
-
-
 def find_user_ids_with_expired_individual_bookings(expired_on: date = None) -> List[int]:
     expired_on = expired_on or date.today()
     return [
@@ -378,6 +369,64 @@ def get_export(
     offer_type: OfferType | None = None,
     export_type: BookingExportType | None = BookingExportType.CSV,
 ) -> str | bytes:
+    bookings_query = _get_export_query(user, booking_period, status_filter, event_date, venue_id, offer_type)
+    if export_type == BookingExportType.EXCEL:
+        return _serialize_excel_report(bookings_query)
+    return _serialize_csv_report(bookings_query)
+
+
+def stream_csv_export(
+    user: User,
+    booking_period: tuple[date, date] | None = None,
+    status_filter: BookingStatusFilter | None = BookingStatusFilter.BOOKED,
+    event_date: datetime | None = None,
+    venue_id: int | None = None,
+    offer_type: OfferType | None = None,
+) -> typing.Iterator[bytes]:
+    """Yield the CSV export as UTF-8 encoded chunks (with a BOM, for
+    Excel), as bookings are fetched from the database.
+    """
+    bookings_query = _get_export_query(user, booking_period, status_filter, event_date, venue_id, offer_type)
+    yield codecs.BOM_UTF8
+    for chunk in _generate_csv_report(bookings_query):
+        yield chunk.encode("utf-8")
+
+
+def write_excel_export(
+    output: str | typing.BinaryIO,
+    user: User,
+    booking_period: tuple[date, date] | None = None,
+    status_filter: BookingStatusFilter | None = BookingStatusFilter.BOOKED,
+    event_date: datetime | None = None,
+    venue_id: int | None = None,
+    offer_type: OfferType | None = None,
+) -> None:
+    """Write the Excel export to a file, without keeping all rows in
+    memory.
+    """
+    bookings_query = _get_export_query(user, booking_period, status_filter, event_date, venue_id, offer_type)
+    _write_excel_report(bookings_query, output, constant_memory=True)
+
+
+def get_export_bookings_count(
+    user: User,
+    booking_period: tuple[date, date] | None = None,
+    status_filter: BookingStatusFilter | None = BookingStatusFilter.BOOKED,
+    event_date: datetime | None = None,
+    venue_id: int | None = None,
+    offer_type: OfferType | None = None,
+) -> int:
+    return _get_filtered_bookings_count(user, booking_period, status_filter, event_date, venue_id, offer_type)
+
+
+def _get_export_query(
+    user: User,
+    booking_period: tuple[date, date] | None,
+    status_filter: BookingStatusFilter | None,
+    event_date: datetime | None,
+    venue_id: int | None,
+    offer_type: OfferType | None,
+) -> BaseQuery:
     bookings_query = _get_filtered_booking_report(
         pro_user=user,
         period=booking_period,  # type: ignore [arg-type]
@@ -386,10 +435,18 @@ def get_export(
         venue_id=venue_id,
         offer_type=offer_type,
     )
-    bookings_query = _duplicate_booking_when_quantity_is_two(bookings_query)
-    if export_type == BookingExportType.EXCEL:
-        return _serialize_excel_report(bookings_query)
-    return _serialize_csv_report(bookings_query)
+    bookings = _duplicate_booking_when_quantity_is_two(bookings_query).subquery()
+    # Dates are converted to the timezone of the venue by the database,
+    # which is much faster than doing it for each row in Python.
+    return db.session.query(
+        bookings,
+        _format_datetime_in_timezone(bookings.c.stockBeginningDatetime, bookings.c.venueTimezone).label(
+            "localStockBeginningDatetime"
+        ),
+        _format_datetime_in_timezone(bookings.c.bookedAt, bookings.c.venueTimezone).label("localBookedAt"),
+        _format_datetime_in_timezone(bookings.c.usedAt, bookings.c.venueTimezone).label("localUsedAt"),
+        _format_datetime_in_timezone(bookings.c.reimbursedAt, bookings.c.venueTimezone).label("localReimbursedAt"),
+    )
 
 
 # FIXME (Gautier, 03-25-2022): also used in collective_booking. SHould we move it to core or some other place?
@@ -397,6 +454,26 @@ def field_to_venue_timezone(field: InstrumentedAttribute) -> cast:
     return cast(func.timezone(Venue.timezone, func.timezone("UTC", field)), Date)
 
 
+def _format_datetime_in_timezone(utc_datetime: Column, timezone: Column) -> Case:
+    """Format a UTC datetime in the given timezone as `str()` does for
+    timezone-aware datetimes (e.g. "2023-01-01 10:00:00+01:00").
+    """
+    local_datetime = func.timezone(timezone, func.timezone("UTC", utc_datetime))
+    utc_offset = local_datetime - utc_datetime
+    null_offset = literal_column("INTERVAL '0'")
+    return case(
+        (utc_datetime.is_(None), None),
+        else_=func.concat(
+            func.to_char(local_datetime, "YYYY-MM-DD HH24:MI:SS"),
+            case(
+                (func.date_trunc("second", utc_datetime) == utc_datetime, ""), else_=func.to_char(utc_datetime, ".US")
+            ),
+            case((utc_offset < null_offset, "-"), else_="+"),
+            func.to_char(case((utc_offset < null_offset, -utc_offset), else_=utc_offset), "HH24:MI"),
+        ),
+    )
+
+
 def _get_filtered_bookings_query(
     pro_user: User,
     period: tuple[date, date] | None = None,
@@ -481,9 +558,8 @@ def _get_filtered_booking_report(
         )
         .with_entities(
             Venue.common_name.label("venueName"),  # type: ignore[attr-defined]
-            Venue.departementCode.label("venueDepartmentCode"),
-            Offerer.postalCode.label("offererPostalCode"),
             Offer.name.label("offerName"),
+            Venue.timezone.label("venueTimezone"),
             Stock.beginningDatetime.label("stockBeginningDatetime"),
             Stock.offerId,
             Offer.extraData["isbn"].label("isbn"),
@@ -492,17 +568,16 @@ def _get_filtered_booking_report(
             User.email.label("beneficiaryEmail"),
             User.phoneNumber.label("beneficiaryPhoneNumber"),  # type: ignore[attr-defined]
             Booking.id,
-            Booking.token,
-            Booking.priceCategoryLabel,
-            Booking.amount,
+            Booking.token.label("token"),
+            Booking.priceCategoryLabel.label("priceCategoryLabel"),
+            Booking.amount.label("amount"),
             Booking.quantity,
-            Booking.status,
+            Booking.status.label("status"),
             Booking.dateCreated.label("bookedAt"),
             Booking.dateUsed.label("usedAt"),
             Booking.reimbursementDate.label("reimbursedAt"),
-            Booking.cancellationDate.label("cancelledAt"),
             Booking.isExternal.label("isExternal"),  # type: ignore [attr-defined]
-            Booking.isConfirmed,
+            Booking.isConfirmed.label("isConfirmed"),
             # `get_batch` function needs a field called exactly `id` to work,
             # the label prevents SA from using a bad (prefixed) label for this field
             Booking.id.label("id"),
@@ -628,22 +703,22 @@ def _get_booking_status(status: BookingStatus, is_confirmed: bool) -> str:
     return BOOKING_STATUS_LABELS[status]
 
 
-def _serialize_csv_report(query: BaseQuery) -> str:
+def _generate_csv_report(query: BaseQuery) -> typing.Iterator[str]:
     output = StringIO()
     writer = csv.writer(output, dialect=csv.excel, delimiter=";", quoting=csv.QUOTE_NONNUMERIC)
     writer.writerow(BOOKING_EXPORT_HEADER)
-    for booking in query.yield_per(1000):
+    for index, booking in enumerate(query.yield_per(EXPORT_CHUNK_SIZE), 1):
         writer.writerow(
             (
                 booking.venueName,
                 booking.offerName,
-                convert_booking_dates_utc_to_venue_timezone(booking.stockBeginningDatetime, booking),
+                booking.localStockBeginningDatetime,
                 booking.isbn,
                 f"{booking.beneficiaryLastName} {booking.beneficiaryFirstName}",
                 booking.beneficiaryEmail,
                 booking.beneficiaryPhoneNumber,
-                convert_booking_dates_utc_to_venue_timezone(booking.bookedAt, booking),
-                convert_booking_dates_utc_to_venue_timezone(booking.usedAt, booking),
+                booking.localBookedAt,
+                booking.localUsedAt,
                 booking_recap_utils.get_booking_token(
                     booking.token,
                     booking.status,
@@ -653,18 +728,27 @@ def _serialize_csv_report(query: BaseQuery) -> str:
                 booking.priceCategoryLabel or "",
                 booking.amount,
                 _get_booking_status(booking.status, booking.isConfirmed),
-                convert_booking_dates_utc_to_venue_timezone(booking.reimbursedAt, booking),
+                booking.localReimbursedAt,
                 # This method is still used in the old Payment model
                 serialize_offer_type_educational_or_individual(offer_is_educational=False),
             )
         )
+        if index % EXPORT_CHUNK_SIZE == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
 
-    return output.getvalue()
+    yield output.getvalue()
 
 
-def _serialize_excel_report(query: BaseQuery) -> bytes:
-    output = BytesIO()
-    workbook = xlsxwriter.Workbook(output)
+def _serialize_csv_report(query: BaseQuery) -> str:
+    return "".join(_generate_csv_report(query))
+
+
+def _write_excel_report(query: BaseQuery, output: str | typing.BinaryIO, constant_memory: bool = False) -> None:
+    # In constant memory mode, rows are flushed to a temporary file as
+    # soon as the next one is written.
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": constant_memory})
 
     bold = workbook.add_format({"bold": 1})
     currency_format = workbook.add_format({"num_format": "###0.00[$€-fr-FR]"})
@@ -677,18 +761,16 @@ def _serialize_excel_report(query: BaseQuery) -> bytes:
         worksheet.write(row, col_num, title, bold)
         worksheet.set_column(col_num, col_num, col_width)
     row = 1
-    for booking in query.yield_per(1000):
+    for booking in query.yield_per(EXPORT_CHUNK_SIZE):
         worksheet.write(row, 0, booking.venueName)
         worksheet.write(row, 1, booking.offerName)
-        worksheet.write(
-            row, 2, str(convert_booking_dates_utc_to_venue_timezone(booking.stockBeginningDatetime, booking))
-        )
+        worksheet.write(row, 2, str(booking.localStockBeginningDatetime))
         worksheet.write(row, 3, booking.isbn)
         worksheet.write(row, 4, f"{booking.beneficiaryLastName} {booking.beneficiaryFirstName}")
         worksheet.write(row, 5, booking.beneficiaryEmail)
         worksheet.write(row, 6, booking.beneficiaryPhoneNumber)
-        worksheet.write(row, 7, str(convert_booking_dates_utc_to_venue_timezone(booking.bookedAt, booking)))
-        worksheet.write(row, 8, str(convert_booking_dates_utc_to_venue_timezone(booking.usedAt, booking)))
+        worksheet.write(row, 7, str(booking.localBookedAt))
+        worksheet.write(row, 8, str(booking.localUsedAt))
         worksheet.write(
             row,
             9,
@@ -702,11 +784,16 @@ def _serialize_excel_report(query: BaseQuery) -> bytes:
         worksheet.write(row, 10, booking.priceCategoryLabel)
         worksheet.write(row, 11, booking.amount, currency_format)
         worksheet.write(row, 12, _get_booking_status(booking.status, booking.isConfirmed))
-        worksheet.write(row, 13, str(convert_booking_dates_utc_to_venue_timezone(booking.reimbursedAt, booking)))
+        worksheet.write(row, 13, str(booking.localReimbursedAt))
         worksheet.write(row, 14, serialize_offer_type_educational_or_individual(offer_is_educational=False))
         row += 1
 
     workbook.close()
+
+
+def _serialize_excel_report(query: BaseQuery) -> bytes:
+    output = BytesIO()
+    _write_excel_report(query, output)
     return output.getvalue()
 
 
@@ -0,0 +1,14 @@
+from pcapi import settings
+from pcapi.routes.serialization import BaseModel
+from pcapi.tasks.decorator import task
+
+from . import api
+
+
+class DeleteExcelExportRequest(BaseModel):
+    object_id: str
+
+
+@task(settings.GCP_BOOKINGS_EXPORTS_QUEUE_NAME, "/bookings/delete_excel_export", delayed_seconds=settings.BOOKINGS_EXCEL_EXPORT_TTL)  # type: ignore [arg-type]
+def delete_excel_export_task(payload: DeleteExcelExportRequest) -> None:
+    api.delete_excel_export(payload.object_id)
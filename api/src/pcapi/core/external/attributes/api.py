@@ -1,14 +1,26 @@
 from collections import defaultdict
+from datetime import date
 from datetime import datetime
 from decimal import Decimal
+import logging
 from operator import attrgetter
+import time
+from typing import Iterable
 from typing import List
 
+from flask import current_app
+from flask_sqlalchemy import BaseQuery
+import redis
+import sqlalchemy as sa
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
 
+from pcapi import settings
 from pcapi.core.bookings import models as bookings_models
 from pcapi.core.bookings import repository as bookings_repository
 from pcapi.core.categories import categories
+from pcapi.core.external import batch
+from pcapi.core.external import sendinblue
 from pcapi.core.external.attributes import models
 from pcapi.core.external.batch import update_user_attributes as update_batch_user
 from pcapi.core.external.sendinblue import update_contact_attributes as update_sendinblue_user
@@ -18,24 +30,146 @@ from pcapi.core.offers import models as offers_models
 from pcapi.core.users import models as users_models
 from pcapi.core.users import repository as users_repository
 from pcapi.models import db
+from pcapi.models.feature import FeatureToggle
+from pcapi.notifications.push import update_users_attributes as update_batch_users
+from pcapi.notifications.push.backends.batch import UserUpdateData
 
 
+logger = logging.getLogger(__name__)
+
 # make sure values are in [a-z0-9_] (no uppercase characters, no '-')
 TRACKED_PRODUCT_IDS = {3084625: "brut_x"}
 
+REDIS_EXTERNAL_USER_UPDATES_QUEUE = "external:users:updates"
+REDIS_EXTERNAL_USER_UPDATES_STATS = "external:users:updates:stats"
+EXTERNAL_USER_UPDATES_DEBOUNCE_DELAY = 60  # seconds
+EXTERNAL_USER_UPDATES_BATCH_SIZE = 1000
+
+
+def _get_redis() -> redis.Redis:
+    return current_app.redis_client  # type: ignore [attr-defined]
+
 
 def update_external_user(user: users_models.User, skip_batch: bool = False, skip_sendinblue: bool = False) -> None:
     if user.has_pro_role:
         update_external_pro(user.email)
+    elif not skip_batch and not skip_sendinblue and FeatureToggle.ENABLE_EXTERNAL_USER_UPDATES_QUEUE.is_active():
+        enqueue_external_user_update(user)
     else:
-        user_attributes = get_user_attributes(user)
+        _update_external_user(user, skip_batch=skip_batch, skip_sendinblue=skip_sendinblue)
+
+
+def _update_external_user(user: users_models.User, skip_batch: bool = False, skip_sendinblue: bool = False) -> None:
+    user_attributes = get_user_attributes(user)
+
+    update_batch = user.has_enabled_push_notifications()
+    if not skip_batch and update_batch:
+        update_batch_user(user.id, user_attributes)
+
+    if not skip_sendinblue:
+        update_sendinblue_user(user.email, user_attributes)
+
+
+def enqueue_external_user_update(user: users_models.User) -> None:
+    """Schedule the update of the attributes of a user in Batch and
+    Sendinblue.
+
+    Updates are not sent right away: a user stays in the queue during
+    `EXTERNAL_USER_UPDATES_DEBOUNCE_DELAY` seconds, so that successive
+    updates of the same user are coalesced into one. See
+    `update_external_users_in_queue()`.
+    """
+    redis_client = _get_redis()
+    try:
+        queued = redis_client.zadd(REDIS_EXTERNAL_USER_UPDATES_QUEUE, {user.id: time.time()}, nx=True)
+        redis_client.hincrby(REDIS_EXTERNAL_USER_UPDATES_STATS, "queued" if queued else "coalesced", 1)
+    except redis.exceptions.RedisError:
+        if settings.IS_RUNNING_TESTS:
+            raise
+        logger.exception("Could not enqueue external user update", extra={"user": user.id})
+        _update_external_user(user)
+
+
+def _pop_external_user_updates(max_enqueue_time: float, count: int) -> list[int]:
+    def pop(pipeline: redis.client.Pipeline) -> list[str]:
+        user_ids = pipeline.zrangebyscore(
+            REDIS_EXTERNAL_USER_UPDATES_QUEUE, "-inf", max_enqueue_time, start=0, num=count
+        )
+        pipeline.multi()
+        if user_ids:
+            pipeline.zrem(REDIS_EXTERNAL_USER_UPDATES_QUEUE, *user_ids)
+        return user_ids
+
+    # Watch the queue, in case a user is enqueued again at the same time.
+    user_ids = _get_redis().transaction(pop, REDIS_EXTERNAL_USER_UPDATES_QUEUE, value_from_callable=True)
+    return [int(user_id) for user_id in user_ids]
+
+
+def update_external_users_in_queue(
+    batch_size: int = EXTERNAL_USER_UPDATES_BATCH_SIZE,
+    debounce_delay: int = EXTERNAL_USER_UPDATES_DEBOUNCE_DELAY,
+) -> None:
+    """Update, in bulk, the attributes of users that have been in the
+    queue for more than `debounce_delay` seconds.
+    """
+    redis_client = _get_redis()
+    max_enqueue_time = time.time() - debounce_delay
+    processed = 0
+    while user_ids := _pop_external_user_updates(max_enqueue_time, batch_size):
+        try:
+            _update_external_users(user_ids)
+        except Exception:
+            # Put users back in the queue, they will be processed by the next run.
+            redis_client.zadd(REDIS_EXTERNAL_USER_UPDATES_QUEUE, {user_id: 0 for user_id in user_ids}, nx=True)
+            raise
+        processed += len(user_ids)
+        redis_client.hincrby(REDIS_EXTERNAL_USER_UPDATES_STATS, "processed", len(user_ids))
+        db.session.expunge_all()
+
+    stats = redis_client.hgetall(REDIS_EXTERNAL_USER_UPDATES_STATS)
+    logger.info(
+        "Updated external users from queue",
+        extra={
+            "processed": processed,
+            "remaining": redis_client.zcard(REDIS_EXTERNAL_USER_UPDATES_QUEUE),
+            # Cumulative counters, since the queue has been created.
+            "total_queued": int(stats.get("queued", 0)),
+            "total_coalesced": int(stats.get("coalesced", 0)),
+            "total_processed": int(stats.get("processed", 0)),
+        },
+    )
 
-        update_batch = user.has_enabled_push_notifications()
-        if not skip_batch and update_batch:
-            update_batch_user(user.id, user_attributes)
 
-        if not skip_sendinblue:
-            update_sendinblue_user(user.email, user_attributes)
+def _update_external_users(user_ids: list[int]) -> None:
+    users = users_models.User.query.filter(users_models.User.id.in_(user_ids)).all()
+    young_users = []
+    for user in users:
+        if user.has_pro_role:
+            update_external_pro(user.email)
+        else:
+            young_users.append(user)
+    users_attributes = get_bulk_user_attributes(young_users)
+
+    batch_users_data = [
+        UserUpdateData(user_id=str(user.id), attributes=batch.format_user_attributes(users_attributes[user.id]))
+        for user in young_users
+        if user.has_enabled_push_notifications() and not users_attributes[user.id].is_pro
+    ]
+    if batch_users_data:
+        update_batch_users(batch_users_data, can_be_asynchronously_retried=True)
+
+    # Contacts are blacklisted (or not) for a whole import: send
+    # subscribed and unsubscribed users in distinct imports.
+    for email_blacklist in (False, True):
+        sendinblue_users_data = [
+            sendinblue.SendinblueUserUpdateData(
+                email=user.email, attributes=sendinblue.format_user_attributes(users_attributes[user.id])
+            )
+            for user in young_users
+            if (not users_attributes[user.id].marketing_email_subscription) == email_blacklist
+        ]
+        if sendinblue_users_data:
+            sendinblue.import_contacts_in_sendinblue(sendinblue_users_data, email_blacklist=email_blacklist)
 
 
 def update_external_pro(email: str | None) -> None:
@@ -154,9 +288,6 @@ def get_pro_attributes(email: str) -> models.ProAttributes:
 
 
 def get_user_attributes(user: users_models.User) -> models.UserAttributes:
-    from pcapi.core.fraud import api as fraud_api
-    from pcapi.core.users.api import get_domains_credit
-
     is_pro_user = (
         user.has_pro_role
         or db.session.query(offerers_models.UserOfferer.query.filter_by(userId=user.id).exists()).scalar()
@@ -167,15 +298,112 @@ def get_user_attributes(user: users_models.User) -> models.UserAttributes:
         if not is_pro_user
         else None
     )
+    return _build_user_attributes(
+        user,
+        is_pro_user=is_pro_user,
+        user_bookings=user_bookings,
+        last_favorite_creation_date=last_favorite.dateCreated if last_favorite else None,  # type: ignore [attr-defined]
+        # Call only once to limit to one get_wallet_balance query
+        has_remaining_credit=user.has_remaining_credit,
+    )
+
+
+def get_bulk_user_attributes(users: Iterable[users_models.User]) -> dict[int, models.UserAttributes]:
+    """Return the attributes of many users, indexed by user id.
+
+    The result is the same as calling `get_user_attributes()` on each
+    user, but data is fetched with a fixed number of queries for the
+    whole list (instead of a handful of queries for each user). The
+    subscription state (`has_completed_id_check`) is still computed
+    user by user, from preloaded fraud checks.
+    """
+    user_ids = [user.id for user in users]
+    if not user_ids:
+        return {}
+
+    # Reload users to fetch, in one query per relationship, all the
+    # relationships that are used to compute attributes.
+    users = (
+        users_models.User.query.filter(users_models.User.id.in_(user_ids))
+        .options(
+            selectinload(users_models.User.deposits),  # type: ignore [attr-defined]
+            selectinload(users_models.User.beneficiaryFraudChecks),  # type: ignore [attr-defined]
+            selectinload(users_models.User.beneficiaryFraudReviews),  # type: ignore [attr-defined]
+            selectinload(users_models.User.action_history),  # type: ignore [attr-defined]
+        )
+        .all()
+    )
+
+    pro_user_ids = {user.id for user in users if user.has_pro_role}
+    pro_user_ids |= set(
+        db.session.execute(
+            sa.select(offerers_models.UserOfferer.userId)
+            .where(offerers_models.UserOfferer.userId.in_(user_ids))
+            .distinct()
+        ).scalars()
+    )
+    young_user_ids = [user_id for user_id in user_ids if user_id not in pro_user_ids]
+
+    bookings_by_user: dict[int, list[bookings_models.Booking]] = defaultdict(list)
+    last_favorite_creation_dates: dict[int, datetime] = {}
+    if young_user_ids:
+        for booking in _get_bookings_query(bookings_models.Booking.userId.in_(young_user_ids)):
+            bookings_by_user[booking.userId].append(booking)
+        last_favorite_creation_dates = dict(
+            db.session.execute(  # type: ignore [arg-type]
+                sa.select(users_models.Favorite.userId, users_models.Favorite.dateCreated)
+                .where(users_models.Favorite.userId.in_(young_user_ids))
+                .distinct(users_models.Favorite.userId)
+                .order_by(users_models.Favorite.userId, users_models.Favorite.id.desc())
+            ).all()
+        )
+
+    # Same conditions as `User.has_remaining_credit`, with all wallet
+    # balances computed in a single query.
+    today = datetime.combine(date.today(), datetime.min.time())
+    users_with_unexpired_deposit = [
+        user.id
+        for user in users
+        if user.deposit is not None and (user.deposit.expirationDate is None or user.deposit.expirationDate > today)
+    ]
+    wallet_balances: dict[int, Decimal] = {}
+    if users_with_unexpired_deposit:
+        wallet_balances = dict(
+            db.session.execute(  # type: ignore [arg-type]
+                sa.select(users_models.User.id, sa.func.get_wallet_balance(users_models.User.id, False)).where(
+                    users_models.User.id.in_(users_with_unexpired_deposit)
+                )
+            ).all()
+        )
+
+    return {
+        user.id: _build_user_attributes(
+            user,
+            is_pro_user=user.id in pro_user_ids,
+            user_bookings=bookings_by_user.get(user.id, []),
+            last_favorite_creation_date=last_favorite_creation_dates.get(user.id),
+            has_remaining_credit=max(0, wallet_balances.get(user.id, 0)) > 0,
+        )
+        for user in users
+    }
+
+
+def _build_user_attributes(
+    user: users_models.User,
+    is_pro_user: bool,
+    user_bookings: list[bookings_models.Booking],
+    last_favorite_creation_date: datetime | None,
+    has_remaining_credit: bool,
+) -> models.UserAttributes:
+    from pcapi.core.fraud import api as fraud_api
+    from pcapi.core.users.api import get_domains_credit
+
     domains_credit = get_domains_credit(user, user_bookings) if not is_pro_user else None
     bookings_attributes = get_bookings_categories_and_subcategories(user_bookings)
     booking_venues_count = len({booking.venueId for booking in user_bookings})
 
     amount_spent_2022, first_booked_offer_2022, last_booked_offer_2022 = get_booking_attributes_2022(user_bookings)
 
-    # Call only once to limit to one get_wallet_balance query
-    has_remaining_credit = user.has_remaining_credit
-
     # A user becomes a former beneficiary only after the last credit is expired or spent or can no longer be claimed
     is_former_beneficiary = (user.has_beneficiary_role and not has_remaining_credit) or (
         user.has_underage_beneficiary_role and user.eligibility is None
@@ -207,7 +435,7 @@ def get_user_attributes(user: users_models.User) -> models.UserAttributes:
         is_phone_validated=user.is_phone_validated,  # type: ignore [arg-type]
         is_pro=is_pro_user,  # type: ignore [arg-type]
         last_booking_date=user_bookings[0].dateCreated if user_bookings else None,
-        last_favorite_creation_date=last_favorite.dateCreated if last_favorite else None,  # type: ignore [attr-defined]
+        last_favorite_creation_date=last_favorite_creation_date,
         last_name=user.lastName,
         last_visit_date=user.lastConnectionDate,
         marketing_email_subscription=user.get_notification_subscriptions().marketing_email,
@@ -321,6 +549,10 @@ def get_booking_attributes_2022(
 
 
 def get_user_bookings(user: users_models.User) -> List[bookings_models.Booking]:
+    return _get_bookings_query(bookings_models.Booking.userId == user.id).all()
+
+
+def _get_bookings_query(user_filter: sa.sql.ColumnElement) -> BaseQuery:
     return (
         bookings_models.Booking.query.options(
             joinedload(bookings_models.Booking.venue).load_only(offerers_models.Venue.isVirtual)
@@ -337,9 +569,8 @@ def get_user_bookings(user: users_models.User) -> List[bookings_models.Booking]:
             )
         )
         .filter(
-            bookings_models.Booking.userId == user.id,
+            user_filter,
             bookings_models.Booking.status != bookings_models.BookingStatus.CANCELLED,
         )
         .order_by(db.desc(bookings_models.Booking.dateCreated))
-        .all()
     )
@@ -7,13 +7,14 @@ import click
 
 from pcapi.core.external import batch
 from pcapi.core.external import sendinblue
-from pcapi.core.external.attributes.api import get_user_attributes
-from pcapi.core.external.attributes.api import get_user_or_pro_attributes
+from pcapi.core.external.attributes.api import get_bulk_user_attributes
+from pcapi.core.external.attributes.api import get_pro_attributes
 from pcapi.core.users.models import User
 from pcapi.models import db
 from pcapi.notifications.push import update_users_attributes
 from pcapi.notifications.push.backends.batch import UserUpdateData
 from pcapi.utils.blueprint import Blueprint
+import pcapi.utils.db as db_utils
 
 
 blueprint = Blueprint(__name__, __name__)
@@ -21,8 +22,9 @@ blueprint = Blueprint(__name__, __name__)
 
 def format_batch_users(users: list[User]) -> list[UserUpdateData]:
     res = []
+    users_attributes = get_bulk_user_attributes(users)
     for user in users:
-        attributes = batch.format_user_attributes(get_user_attributes(user))
+        attributes = batch.format_user_attributes(users_attributes[user.id])
         res.append(UserUpdateData(user_id=str(user.id), attributes=attributes))
     print(f"{len(res)} users formatted for batch...")
     return res
@@ -30,8 +32,11 @@ def format_batch_users(users: list[User]) -> list[UserUpdateData]:
 
 def format_sendinblue_users(users: list[User]) -> list[sendinblue.SendinblueUserUpdateData]:
     res = []
+    users_attributes = get_bulk_user_attributes([user for user in users if not user.has_pro_role])
     for user in users:
-        attributes = sendinblue.format_user_attributes(get_user_or_pro_attributes(user))
+        attributes = sendinblue.format_user_attributes(
+            get_pro_attributes(user.email) if user.has_pro_role else users_attributes[user.id]
+        )
         res.append(sendinblue.SendinblueUserUpdateData(email=user.email, attributes=attributes))
     print(f"{len(res)} users formatted for sendinblue...")
     return res
@@ -63,8 +68,18 @@ def _run_iteration(min_user_id: int, max_user_id: int, synchronize_batch: bool,
     print(f"{len(chunk)} users updated")
 
 
+def _run_iteration_in_worker(
+    min_user_id: int, max_user_id: int, synchronize_batch: bool, synchronize_sendinblue: bool
+) -> None:
+    try:
+        _run_iteration(min_user_id, max_user_id, synchronize_batch, synchronize_sendinblue)
+    finally:
+        # Ensure that script is not killed in production environment because of memory usage.
+        db.session.remove()
+
+
 def update_sendinblue_batch_loop(
-    chunk_size: int, min_id: int, max_id: int, sync_sendinblue: bool, sync_batch: bool
+    chunk_size: int, min_id: int, max_id: int, sync_sendinblue: bool, sync_batch: bool, processes: int = 1
 ) -> None:
     if not sync_sendinblue and not sync_batch:
         print("====================================================================")
@@ -77,10 +92,16 @@ def update_sendinblue_batch_loop(
     if not max_id:
         max_id = User.query.order_by(User.id.desc()).first().id
 
-    try:
-        for current_max_id in range(max_id, min_id, -chunk_size):
-            current_min_id = max(current_max_id - chunk_size + 1, min_id)
+    ranges = [
+        (max(current_max_id - chunk_size + 1, min_id), current_max_id)
+        for current_max_id in range(max_id, min_id, -chunk_size)
+    ]
+    if processes > 1:
+        _run_iterations_in_pool(ranges, sync_sendinblue, sync_batch, processes)
+        return
 
+    try:
+        for current_min_id, current_max_id in ranges:
             _run_iteration(current_min_id, current_max_id, sync_batch, sync_sendinblue)
 
             # Ensure that script is not killed in production environment because of memory usage.
@@ -91,11 +112,37 @@ def update_sendinblue_batch_loop(
         print("Completed.")
 
 
+def _run_iterations_in_pool(
+    ranges: list[tuple[int, int]], sync_sendinblue: bool, sync_batch: bool, processes: int
+) -> None:
+    # Each range is processed in a child process. Results are consumed
+    # in the order of ranges, so that the script can be resumed from
+    # the first range that has not been completed (some of the
+    # following ranges may be processed again).
+    with db_utils.get_process_pool_executor(processes) as executor:
+        futures = [
+            executor.submit(_run_iteration_in_worker, current_min_id, current_max_id, sync_batch, sync_sendinblue)
+            for current_min_id, current_max_id in ranges
+        ]
+        try:
+            for future, (_, current_max_id) in zip(futures, ranges):
+                future.result()
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            print(f"===> Manually stopped, process can be resumed with --max-id={current_max_id}")
+            return
+    print("Completed.")
+
+
 @blueprint.cli.command("update_sendinblue_batch")
 @click.option("--chunk-size", type=int, default=500, help="number of users to update in one query")
 @click.option("--min-id", type=int, default=0, help="minimum user id")
 @click.option("--max-id", type=int, default=0, help="maximum user id")
 @click.option("--sync-sendinblue", is_flag=True, default=False, help="synchronize Sendinblue")
 @click.option("--sync-batch", is_flag=True, default=False, help="synchronize Batch")
-def update_sendinblue_batch(chunk_size: int, min_id: int, max_id: int, sync_sendinblue: bool, sync_batch: bool) -> None:
-    update_sendinblue_batch_loop(chunk_size, min_id, max_id, sync_sendinblue, sync_batch)
+@click.option("--processes", type=int, default=1, help="number of processes that update chunks in parallel")
+def update_sendinblue_batch(
+    chunk_size: int, min_id: int, max_id: int, sync_sendinblue: bool, sync_batch: bool, processes: int
+) -> None:
+    update_sendinblue_batch_loop(chunk_size, min_id, max_id, sync_sendinblue, sync_batch, processes)
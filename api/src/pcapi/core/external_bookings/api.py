@@ -1,3 +1,11 @@
+import json
+import logging
+import time
+import typing
+
+from flask import current_app
+from redis import exceptions as redis_exceptions
+
 from pcapi import settings
 from pcapi.core.external_bookings.boost.client import BoostClientAPI
 from pcapi.core.external_bookings.cds.client import CineDigitalServiceAPI
@@ -6,15 +14,114 @@ import pcapi.core.providers.models as providers_models
 import pcapi.core.providers.repository as providers_repository
 
 
+logger = logging.getLogger(__name__)
+
+REMAINING_PLACES_CACHE_KEY = "api:external_bookings:remaining_places:{}"
+REMAINING_PLACES_POLL_INTERVAL = 0.05  # seconds
+
+
 def get_shows_stock(venue_id: int, shows_id: list[int]) -> dict[int, int]:
-    client = _get_external_bookings_client_api(venue_id)
-    return client.get_shows_remaining_places(shows_id)
+    def fetch() -> dict[int, int]:
+        client = _get_external_bookings_client_api(venue_id)
+        assert isinstance(client, CineDigitalServiceAPI)
+        return client.get_all_shows_remaining_places()
+
+    remaining_places = _get_remaining_places_snapshot(f"venue:{venue_id}", fetch)
+    return {show_id: places for show_id, places in remaining_places.items() if show_id in shows_id}
 
 
 def get_boost_movie_stocks(venue_id: int, movie_id: int) -> dict[int, int]:
-    client = _get_external_bookings_client_api(venue_id)
-    assert isinstance(client, BoostClientAPI)
-    return client.get_film_showtimes_stocks(movie_id)
+    def fetch() -> dict[int, int]:
+        client = _get_external_bookings_client_api(venue_id)
+        assert isinstance(client, BoostClientAPI)
+        return client.get_film_showtimes_stocks(movie_id)
+
+    return _get_remaining_places_snapshot(f"venue:{venue_id}:film:{movie_id}", fetch)
+
+
+def _get_remaining_places_snapshot(snapshot_id: str, fetch: typing.Callable[[], dict[int, int]]) -> dict[int, int]:
+    """Return remaining places of shows (by show id), from a snapshot
+    that is shared by all API processes for a few seconds.
+
+    Only one process fetches the snapshot from the cinema provider
+    API at a time: others wait for it to be stored in Redis, or take
+    over if the fetch fails.
+    """
+    start = time.perf_counter()
+    key = REMAINING_PLACES_CACHE_KEY.format(snapshot_id)
+    lock_key = f"{key}:lock"
+    ttl = settings.EXTERNAL_BOOKINGS_REMAINING_PLACES_CACHE_TTL
+    deadline = start + settings.EXTERNAL_BOOKINGS_REMAINING_PLACES_LOCK_TIMEOUT
+
+    if not ttl:
+        cache_status = "disabled"
+        snapshot = fetch()
+    else:
+        cache_status = "hit"
+        snapshot = _read_remaining_places_snapshot(key)
+    while snapshot is None:
+        locked = _acquire_remaining_places_lock(lock_key)
+        if locked or time.perf_counter() > deadline:
+            cache_status = "miss"
+            try:
+                snapshot = fetch()
+            finally:
+                if locked:
+                    _release_remaining_places_lock(lock_key)
+            _store_remaining_places_snapshot(key, snapshot, ttl)
+            break
+        # Another process is fetching the same snapshot.
+        cache_status = "shared"
+        time.sleep(REMAINING_PLACES_POLL_INTERVAL)
+        snapshot = _read_remaining_places_snapshot(key)
+
+    logger.info(
+        "Got remaining places of cinema shows",
+        extra={
+            "snapshot": snapshot_id,
+            "cache": cache_status,
+            "duration": time.perf_counter() - start,
+        },
+    )
+    return snapshot
+
+
+def _read_remaining_places_snapshot(key: str) -> dict[int, int] | None:
+    try:
+        data = current_app.redis_client.get(key)  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.warning("Could not read remaining places snapshot", extra={"key": key}, exc_info=True)
+        return None
+    if data is None:
+        return None
+    return {int(show_id): places for show_id, places in json.loads(data).items()}
+
+
+def _store_remaining_places_snapshot(key: str, snapshot: dict[int, int], ttl: int) -> None:
+    try:
+        current_app.redis_client.set(key, json.dumps(snapshot), ex=ttl)  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.warning("Could not store remaining places snapshot", extra={"key": key}, exc_info=True)
+
+
+def _acquire_remaining_places_lock(lock_key: str) -> bool:
+    try:
+        return bool(
+            current_app.redis_client.set(  # type: ignore [attr-defined]
+                lock_key, "1", nx=True, ex=settings.EXTERNAL_BOOKINGS_REMAINING_PLACES_LOCK_TIMEOUT
+            )
+        )
+    except redis_exceptions.RedisError:
+        # Fetch the snapshot ourselves rather than waiting for nothing.
+        logger.warning("Could not acquire remaining places lock", extra={"key": lock_key}, exc_info=True)
+        return True
+
+
+def _release_remaining_places_lock(lock_key: str) -> None:
+    try:
+        current_app.redis_client.delete(lock_key)  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.warning("Could not release remaining places lock", extra={"key": lock_key}, exc_info=True)
 
 
 def cancel_booking(venue_id: int, barcodes: list[str]) -> None:
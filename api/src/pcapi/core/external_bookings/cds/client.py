@@ -4,6 +4,7 @@ from operator import attrgetter
 
 from pydantic.tools import parse_obj_as
 
+from pcapi import settings
 from pcapi.connectors.cine_digital_service import ResourceCDS
 from pcapi.connectors.cine_digital_service import get_movie_poster_from_api
 from pcapi.connectors.cine_digital_service import get_resource
@@ -15,6 +16,7 @@ import pcapi.core.external_bookings.cds.exceptions as cds_exceptions
 import pcapi.core.external_bookings.models as external_bookings_models
 from pcapi.core.external_bookings.models import ExternalBookingsClientAPI
 from pcapi.core.external_bookings.models import Ticket
+from pcapi.utils.cache import get_from_cache
 
 
 CDS_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
@@ -31,11 +33,23 @@ class CineDigitalServiceAPI(ExternalBookingsClientAPI):
         super()
 
     def get_internet_sale_gauge_active(self) -> bool:
+        # This is a setting of the cinema that seldom changes, whereas
+        # the whole list of cinemas of the account must be downloaded
+        # to get it.
+        cached_value = get_from_cache(
+            retriever=self._get_internet_sale_gauge_active_from_api,
+            key_template="api:cds:internet_sale_gauge_active:%(account_id)s:%(cinema_id)s",
+            key_args={"account_id": self.account_id, "cinema_id": self.cinema_id},
+            expire=settings.CDS_INTERNET_SALE_GAUGE_CACHE_TTL,
+        )
+        return cached_value == "1"
+
+    def _get_internet_sale_gauge_active_from_api(self) -> str:
         data = get_resource(self.api_url, self.account_id, self.token, ResourceCDS.CINEMAS)
         cinemas = parse_obj_as(list[cds_serializers.CinemaCDS], data)
         for cinema in cinemas:
             if cinema.id == self.cinema_id:
-                return cinema.is_internet_sale_gauge_active
+                return "1" if cinema.is_internet_sale_gauge_active else "0"
         raise cds_exceptions.CineDigitalServiceAPIException(
             f"Cinema internet_sale_gauge_active not found in Cine Digital Service API "
             f"for cinemaId={self.cinema_id} & url={self.api_url}"
@@ -49,11 +63,15 @@ class CineDigitalServiceAPI(ExternalBookingsClientAPI):
         return show.remaining_place
 
     def get_shows_remaining_places(self, show_ids: list[int]) -> dict[int, int]:
+        remaining_places = self.get_all_shows_remaining_places()
+        return {show_id: places for show_id, places in remaining_places.items() if show_id in show_ids}
+
+    def get_all_shows_remaining_places(self) -> dict[int, int]:
         data = get_resource(self.api_url, self.account_id, self.token, ResourceCDS.SHOWS)
         shows = parse_obj_as(list[cds_serializers.ShowCDS], data)
         if self.get_internet_sale_gauge_active():
-            return {show.id: show.internet_remaining_place for show in shows if show.id in show_ids}
-        return {show.id: show.remaining_place for show in shows if show.id in show_ids}
+            return {show.id: show.internet_remaining_place for show in shows}
+        return {show.id: show.remaining_place for show in shows}
 
     def get_shows(self) -> list[cds_serializers.ShowCDS]:
         data = get_resource(self.api_url, self.account_id, self.token, ResourceCDS.SHOWS)
@@ -27,12 +27,14 @@ few more criteria, see `price_bookings()` and
 """
 
 from collections import defaultdict
+import concurrent.futures
 import csv
 import datetime
 import decimal
 import itertools
 import logging
 import math
+import os
 import pathlib
 import secrets
 import tempfile
@@ -111,14 +113,21 @@ _PRICE_BOOKINGS_ORDER_CLAUSE = (
 
 PRICE_BOOKINGS_BATCH_SIZE = 100
 CASHFLOW_BATCH_LABEL_PREFIX = "VIR"
+INVOICE_PDF_MAX_ATTEMPTS = 3
 
 
 def price_bookings(
     min_date: datetime.datetime = MIN_DATE_TO_PRICE,
     batch_size: int = PRICE_BOOKINGS_BATCH_SIZE,
+    by_pricing_point: bool = False,
 ) -> None:
     """Price bookings that have been recently marked as used.
 
+    By default, bookings are priced one at a time. If
+    ``by_pricing_point`` is set, bookings of each batch are grouped
+    by pricing point and priced together (see
+    `_price_bookings_of_pricing_point()`).
+
     This function is normally called by a cron job.
     """
     # The upper bound on `dateUsed` avoids selecting a very recent
@@ -129,6 +138,7 @@ def price_bookings(
     window = (min_date, threshold)
 
     errored_pricing_point_ids = set()
+    rule_finder = reimbursement.CustomRuleFinder()
 
     # This is a quick hack to avoid fetching all bookings at once,
     # resulting in a very large session that is updated on each
@@ -175,6 +185,8 @@ def price_bookings(
                 last_booking = booking
             else:
                 last_collective_booking = booking
+            if by_pricing_point:
+                continue
             try:
                 pricing_point_id = _get_pricing_point_link(booking).pricingPointId
                 if pricing_point_id in errored_pricing_point_ids:
@@ -184,7 +196,7 @@ def price_bookings(
                     "pricing_point": pricing_point_id,
                 }
                 with log_elapsed(logger, "Priced booking", extra):
-                    price_booking(booking)
+                    price_booking(booking, rule_finder)
             except Exception as exc:  # pylint: disable=broad-except
                 errored_pricing_point_ids.add(pricing_point_id)
                 logger.info(
@@ -199,6 +211,8 @@ def price_bookings(
                         "exc": str(exc),
                     },
                 )
+        if by_pricing_point:
+            _price_bookings_by_pricing_point(bookings, errored_pricing_point_ids, rule_finder)
         loops -= 1
         # Keep last booking in the session, we'll need it when calling
         # `_get_loop_query()` for the next loop.
@@ -362,6 +376,7 @@ def get_non_cancelled_pricing_from_booking(
 
 def price_booking(
     booking: bookings_models.Booking | educational_models.CollectiveBooking,
+    rule_finder: reimbursement.CustomRuleFinder | None = None,
 ) -> models.Pricing | None:
     # Handle bookings that were used when we fetched them in `price_bookings()`
     # but have been marked as unused since then.
@@ -408,13 +423,158 @@ def price_booking(
 
         _delete_dependent_pricings(booking, "Deleted pricings priced too early")
 
-        pricing = _price_booking(booking)
+        pricing = _price_booking(booking, rule_finder)
         db.session.add(pricing)
 
         db.session.commit()
     return pricing
 
 
+def _price_bookings_by_pricing_point(
+    bookings: list[bookings_models.Booking | educational_models.CollectiveBooking],
+    errored_pricing_point_ids: set[int],
+    rule_finder: reimbursement.CustomRuleFinder,
+) -> None:
+    bookings_by_pricing_point: dict[
+        int, list[bookings_models.Booking | educational_models.CollectiveBooking]
+    ] = defaultdict(list)
+    for booking in bookings:
+        try:
+            pricing_point_id = _get_pricing_point_link(booking).pricingPointId
+        except ValueError as exc:
+            logger.exception("Could not price booking", extra={"booking": booking.id, "exc": str(exc)})
+            continue
+        if pricing_point_id not in errored_pricing_point_ids:
+            bookings_by_pricing_point[pricing_point_id].append(booking)
+
+    for pricing_point_id, pricing_point_bookings in bookings_by_pricing_point.items():
+        extra = {
+            "bookings": len(pricing_point_bookings),
+            "pricing_point": pricing_point_id,
+        }
+        try:
+            with log_elapsed(logger, "Priced bookings of pricing point", extra):
+                _price_bookings_of_pricing_point(pricing_point_id, pricing_point_bookings, rule_finder)
+        except Exception as exc:  # pylint: disable=broad-except
+            errored_pricing_point_ids.add(pricing_point_id)
+            logger.info(
+                "Ignoring further bookings from pricing point",
+                extra={"pricing_point": pricing_point_id},
+            )
+            logger.exception(
+                "Could not price bookings of pricing point",
+                extra={
+                    "bookings": [booking.id for booking in pricing_point_bookings],
+                    "pricing_point": pricing_point_id,
+                    "exc": str(exc),
+                },
+            )
+
+
+def _price_bookings_of_pricing_point(
+    pricing_point_id: int,
+    bookings: list[bookings_models.Booking | educational_models.CollectiveBooking],
+    rule_finder: reimbursement.CustomRuleFinder,
+) -> list[models.Pricing]:
+    """Price bookings of a pricing point, in the given order, which
+    must be the order used by `price_bookings()`.
+
+    This produces the same pricings as calling `price_booking()` on
+    each booking, but the pricing point is locked only once, the
+    revenue is fetched once (per year) and then carried forward in
+    memory, and pricings are inserted in bulk. Either all bookings
+    are priced, or none is.
+    """
+    with transaction():
+        lock_pricing_point(pricing_point_id)
+
+        # Same checks as in `price_booking()`, now that we have
+        # acquired the lock.
+        booking_ids = [b.id for b in bookings if isinstance(b, bookings_models.Booking)]
+        collective_booking_ids = [b.id for b in bookings if isinstance(b, educational_models.CollectiveBooking)]
+        reloaded = {
+            (type(booking), booking.id): booking
+            for booking in itertools.chain(
+                reload_bookings_for_pricing(booking_ids),
+                reload_collective_bookings_for_pricing(collective_booking_ids),
+            )
+        }
+        already_priced = {
+            tuple(row)
+            for row in db.session.query(models.Pricing.bookingId, models.Pricing.collectiveBookingId).filter(
+                models.Pricing.bookingId.in_(booking_ids)
+                | models.Pricing.collectiveBookingId.in_(collective_booking_ids),
+                models.Pricing.status != models.PricingStatus.CANCELLED,
+            )
+        }
+        to_price = []
+        for booking in bookings:
+            booking = reloaded.get((type(booking), booking.id))  # type: ignore [assignment]
+            if not booking:
+                continue
+            if isinstance(booking, educational_models.CollectiveBooking):
+                if booking.status is not educational_models.CollectiveBookingStatus.USED:
+                    continue
+                if (None, booking.id) in already_priced:
+                    continue
+            else:
+                if booking.status is not bookings_models.BookingStatus.USED:
+                    continue
+                if (booking.id, None) in already_priced:
+                    continue
+            if _get_pricing_point_link(booking).pricingPointId != pricing_point_id:
+                continue
+            to_price.append(booking)
+
+        # Pricings that depend on a booking also depend on the first
+        # booking of the same year that we are about to price. Hence
+        # we only need to delete dependent pricings of the latter.
+        first_bookings: dict[tuple[datetime.datetime, datetime.datetime], bookings_models.Booking] = {}
+        for booking in to_price:
+            if isinstance(booking, bookings_models.Booking):
+                assert booking.dateUsed  # helps mypy
+                first_bookings.setdefault(_get_revenue_period(booking.dateUsed), booking)
+        for booking in first_bookings.values():
+            _delete_dependent_pricings(booking, "Deleted pricings priced too early")
+
+        rule_finder.prefetch(booking for booking in to_price if isinstance(booking, bookings_models.Booking))
+        revenues: dict[tuple[datetime.datetime, datetime.datetime], int] = {}
+        pricings = []
+        for booking in to_price:
+            assert booking.dateUsed  # helps mypy
+            revenue_period = _get_revenue_period(booking.dateUsed)
+            if revenue_period not in revenues:
+                revenues[revenue_period] = _get_current_revenue(pricing_point_id, revenue_period)
+            pricing = _price_booking(booking, rule_finder, current_revenue=revenues[revenue_period])
+            revenues[revenue_period] = pricing.revenue
+            pricings.append(pricing)
+
+        _bulk_insert_pricings(pricings)
+        db.session.commit()
+    return pricings
+
+
+def _bulk_insert_pricings(pricings: list[models.Pricing]) -> None:
+    if not pricings:
+        return
+    # Fetch identifiers beforehand, so that we can bulk insert pricing
+    # lines too. Identifiers follow the order of `pricings`, as if
+    # they had been inserted one by one.
+    pricing_ids = sorted(
+        db.session.execute(
+            sqla.select(sqla.func.nextval("pricing_id_seq")).select_from(sqla.func.generate_series(1, len(pricings)))
+        ).scalars()
+    )
+    lines = []
+    for pricing_id, pricing in zip(pricing_ids, pricings):
+        pricing.id = pricing_id
+        for line in pricing.lines:
+            line.pricingId = pricing_id
+            lines.append(line)
+    db.session.bulk_save_objects(pricings)
+    db.session.bulk_save_objects(lines)
+
+
 def _get_revenue_period(value_date: datetime.datetime) -> typing.Tuple[datetime.datetime, datetime.datetime]:
     """Return a datetime (year) period for the given value date, i.e. the
     first and last seconds of the year of the ``value_date``.
@@ -445,15 +605,28 @@ def _get_pricing_point_id_and_current_revenue(
     assert booking.dateUsed is not None  # helps mypy for `_get_revenue_period()`
     pricing_point_id = _get_pricing_point_link(booking).pricingPointId
     revenue_period = _get_revenue_period(booking.dateUsed)
+    current_revenue = _get_current_revenue(pricing_point_id, revenue_period, excluded_booking_id=booking.id)
+    return pricing_point_id, current_revenue
+
+
+def _get_current_revenue(
+    pricing_point_id: int,
+    revenue_period: typing.Tuple[datetime.datetime, datetime.datetime],
+    excluded_booking_id: int | None = None,
+) -> int:
+    """Return the revenue of the pricing point over the requested
+    period, in eurocents.
+    """
     # Collective bookings must not be included in revenue.
+    query = bookings_models.Booking.query.join(models.Pricing)
+    if excluded_booking_id:
+        # This filter is not strictly necessary, because this function
+        # is called when the booking is being priced (so there is no
+        # Pricing yet).
+        query = query.filter(models.Pricing.bookingId != excluded_booking_id)
     current_revenue = (
-        bookings_models.Booking.query.join(models.Pricing)
-        .filter(
+        query.filter(
             models.Pricing.pricingPointId == pricing_point_id,
-            # The following filter is not strictly necessary, because
-            # this function is called when the booking is being priced
-            # (so there is no Pricing yet).
-            models.Pricing.bookingId != booking.id,
             models.Pricing.valueDate.between(*revenue_period),
             models.Pricing.status.notin_(
                 (
@@ -465,19 +638,30 @@ def _get_pricing_point_id_and_current_revenue(
         .with_entities(sqla.func.sum(bookings_models.Booking.amount * bookings_models.Booking.quantity))
         .scalar()
     )
-    return pricing_point_id, utils.to_eurocents(current_revenue or 0)
+    return utils.to_eurocents(current_revenue or 0)
 
 
 def _price_booking(
     booking: bookings_models.Booking | educational_models.CollectiveBooking,
+    rule_finder: reimbursement.CustomRuleFinder | None = None,
+    current_revenue: int | None = None,
 ) -> models.Pricing:
-    pricing_point_id, current_revenue = _get_pricing_point_id_and_current_revenue(booking)
+    """Build the pricing of a booking.
+
+    ``rule_finder`` and ``current_revenue`` (the revenue of the
+    pricing point, NOT including the booking) are fetched from the
+    database if they are not given.
+    """
+    if current_revenue is None:
+        pricing_point_id, current_revenue = _get_pricing_point_id_and_current_revenue(booking)
+    else:
+        pricing_point_id = _get_pricing_point_link(booking).pricingPointId
     new_revenue = current_revenue
     is_booking_collective = isinstance(booking, educational_models.CollectiveBooking)
     # Collective bookings must not be included in revenue.
     if not is_booking_collective:
         new_revenue += utils.to_eurocents(booking.total_amount)
-    rule_finder = reimbursement.CustomRuleFinder()
+    rule_finder = rule_finder or reimbursement.CustomRuleFinder()
     # FIXME (dbaty, 2021-11-10): `revenue` here is in eurocents but
     # `get_reimbursement_rule` expects euros. Clean that once the
     # old payment code has been removed and the function accepts
@@ -805,70 +989,76 @@ def _generate_cashflows(batch: models.CashflowBatch) -> None:
     # Store now otherwise SQLAlchemy will make a SELECT to fetch the
     # id again after each COMMIT.
     batch_id = batch.id
+    cutoff = batch.cutoff
     logger.info("Started to generate cashflows for batch %d", batch_id)
-    filters = (
-        models.Pricing.status == models.PricingStatus.VALIDATED,
-        models.Pricing.valueDate < batch.cutoff,
-        # We should not have any validated pricing with a cashflow,
-        # this is a safety belt.
-        models.CashflowPricing.pricingId.is_(None),
-        # Bookings can now be priced even if BankInformation is not ACCEPTED,
-        # but to generate cashflows we definitely need it.
-        models.BankInformation.status == models.BankInformationStatus.ACCEPTED,
-        # Even if a booking is marked as used prematurely, we should
-        # wait for the event to happen.
-        sqla.or_(
-            sqla.and_(
-                models.Pricing.bookingId.isnot(None),
-                sqla.or_(
-                    offers_models.Stock.beginningDatetime.is_(None),
-                    offers_models.Stock.beginningDatetime < batch.cutoff,
-                ),
-            ),
-            sqla.and_(
-                models.Pricing.collectiveBookingId.isnot(None),
-                educational_models.CollectiveStock.beginningDatetime < batch.cutoff,
+    start = time.perf_counter()
+
+    # Check integrity by looking for bookings whose amount has been
+    # changed after they have been priced. Reimbursement points with
+    # such bookings are left aside.
+    diff = sqla.select(
+        offerers_models.VenueReimbursementPointLink.reimbursementPointId,
+        models.Pricing.id,
+    )
+    diff = _join_pricings_to_process(diff, cutoff).join(
+        models.PricingLine,
+        sqla.and_(
+            models.PricingLine.pricingId == models.Pricing.id,
+            models.PricingLine.category == models.PricingLineCategory.OFFERER_REVENUE,
+        ),
+    )
+    diff = diff.where(
+        models.PricingLine.amount
+        != -100
+        * sqla.case(
+            (
+                bookings_models.Booking.id.isnot(None),
+                bookings_models.Booking.amount * bookings_models.Booking.quantity,
             ),
+            else_=educational_models.CollectiveStock.price,
         ),
     )
-
-    def _mark_as_processed(pricings: sqla_orm.Query) -> None:
-        pricings_to_update = models.Pricing.query.filter(
-            models.Pricing.id.in_(pricings.with_entities(models.Pricing.id))
-        )
-        pricings_to_update.update(
-            {"status": models.PricingStatus.PROCESSED},
-            synchronize_session=False,
+    errored_pricings_by_point: defaultdict[int, set[int]] = defaultdict(set)
+    for reimbursement_point_id, pricing_id in db.session.execute(diff):
+        errored_pricings_by_point[reimbursement_point_id].add(pricing_id)
+    for reimbursement_point_id, pricing_ids in errored_pricings_by_point.items():
+        logger.error(
+            "Found integrity error on booking prices vs. pricing lines",
+            extra={
+                "pricing_lines": pricing_ids,
+                "reimbursement_point": reimbursement_point_id,
+            },
         )
+    excluded_point_ids = set(errored_pricings_by_point)
 
-    reimbursement_point_infos = (
-        models.Pricing.query.filter(*filters)
-        .outerjoin(models.Pricing.booking)
-        .outerjoin(models.Pricing.collectiveBooking)
-        .outerjoin(bookings_models.Booking.stock)
-        .outerjoin(educational_models.CollectiveBooking.collectiveStock)
-        .join(
-            offerers_models.VenueReimbursementPointLink,
-            offerers_models.VenueReimbursementPointLink.venueId == models.Pricing.venueId,
-        )
-        .filter(offerers_models.VenueReimbursementPointLink.timespan.contains(batch.cutoff))
-        .join(
-            models.BankInformation,
-            models.BankInformation.venueId == offerers_models.VenueReimbursementPointLink.reimbursementPointId,
-        )
-        .outerjoin(models.CashflowPricing)
-        .with_entities(
-            offerers_models.VenueReimbursementPointLink.reimbursementPointId,
-            models.BankInformation.id,
-            sqla_func.array_agg(models.Pricing.venueId.distinct()),
+    # Generate all cashflows at once. If it fails, fall back to one
+    # reimbursement point at a time, so that a failure on one of them
+    # does not prevent the others from being paid.
+    try:
+        with transaction():
+            statement = _get_cashflows_generation_statement(batch_id, cutoff, excluded_point_ids=excluded_point_ids)
+            processed = db.session.execute(statement).rowcount
+    except Exception:  # pylint: disable=broad-except
+        if settings.IS_RUNNING_TESTS:
+            raise
+        logger.exception(
+            "Could not generate cashflows of batch %d at once, falling back to one reimbursement point at a time",
+            batch_id,
+            extra={"batch": batch_id},
         )
-        .group_by(
-            offerers_models.VenueReimbursementPointLink.reimbursementPointId,
-            models.BankInformation.id,
+    else:
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "Generated cashflows",
+            extra={"batch": batch_id, "processed_pricings": processed, "elapsed": elapsed},
         )
-    )
+        return
 
-    for reimbursement_point_id, bank_account_id, venue_ids in reimbursement_point_infos:
+    reimbursement_point_ids = _join_pricings_to_process(
+        sqla.select(offerers_models.VenueReimbursementPointLink.reimbursementPointId).distinct(),
+        cutoff,
+    ).where(offerers_models.VenueReimbursementPointLink.reimbursementPointId.not_in(excluded_point_ids))
+    for (reimbursement_point_id,) in db.session.execute(reimbursement_point_ids).all():
         log_extra = {
             "batch": batch_id,
             "reimbursement_point": reimbursement_point_id,
@@ -877,83 +1067,13 @@ def _generate_cashflows(batch: models.CashflowBatch) -> None:
         logger.info("Generating cashflow", extra=log_extra)
         try:
             with transaction():
-                pricings = (
-                    models.Pricing.query.outerjoin(models.Pricing.booking)
-                    .outerjoin(bookings_models.Booking.stock)
-                    .outerjoin(models.Pricing.collectiveBooking)
-                    .outerjoin(educational_models.CollectiveBooking.collectiveStock)
-                    .join(
-                        models.BankInformation,
-                        models.BankInformation.venueId == reimbursement_point_id,
-                    )
-                    .outerjoin(models.CashflowPricing)
-                    .filter(
-                        models.Pricing.venueId.in_(venue_ids),
-                        *filters,
-                    )
-                )
-
-                # Check integrity by looking for bookings whose amount
-                # has been changed after they have been priced.
-                diff = (
-                    pricings.join(models.Pricing.lines)
-                    .filter(
-                        models.PricingLine.category == models.PricingLineCategory.OFFERER_REVENUE,
-                        models.PricingLine.amount
-                        != -100
-                        * sqla.case(
-                            (
-                                bookings_models.Booking.id.isnot(None),
-                                bookings_models.Booking.amount * bookings_models.Booking.quantity,
-                            ),
-                            else_=educational_models.CollectiveStock.price,
-                        ),
-                    )
-                    .with_entities(models.Pricing.id)
-                )
-                diff = {_pricing_id for _pricing_id, in diff.all()}
-                if diff:
-                    logger.error(
-                        "Found integrity error on booking prices vs. pricing lines",
-                        extra={
-                            "pricing_lines": diff,
-                            "reimbursement_point": reimbursement_point_id,
-                        },
-                    )
-                    continue
-
-                total = pricings.with_entities(sqla.func.sum(models.Pricing.amount)).scalar()
-                if not total:
-                    # Mark as `PROCESSED` even if there is no cashflow, so
-                    # that we will not process these pricings again.
-                    _mark_as_processed(pricings)
-                    continue
-                cashflow = models.Cashflow(
-                    batchId=batch_id,
-                    reimbursementPointId=reimbursement_point_id,
-                    bankAccountId=bank_account_id,
-                    status=models.CashflowStatus.PENDING,
-                    amount=total,
+                statement = _get_cashflows_generation_statement(
+                    batch_id, cutoff, reimbursement_point_id=reimbursement_point_id
                 )
-                db.session.add(cashflow)
-                links = [
-                    models.CashflowPricing(
-                        cashflowId=cashflow.id,
-                        pricingId=pricing.id,
-                    )
-                    for pricing in pricings
-                ]
-                # Mark as `PROCESSED` now (and not before), otherwise the
-                # `pricings` query above will be empty since it
-                # filters on `VALIDATED` pricings.
-                _mark_as_processed(pricings)
-                db.session.bulk_save_objects(links)
-                db.session.commit()
-                elapsed = time.perf_counter() - start
-                logger.info("Generated cashflow", extra=log_extra | {"elapsed": elapsed})
+                db.session.execute(statement)
+            elapsed = time.perf_counter() - start
+            logger.info("Generated cashflow", extra=log_extra | {"elapsed": elapsed})
         except Exception:  # pylint: disable=broad-except
-            if settings.IS_RUNNING_TESTS:
-                raise
             logger.exception(
                 "Could not generate cashflow for reimbursement point %d",
                 reimbursement_point_id,
@@ -961,6 +1081,135 @@ def _generate_cashflows(batch: models.CashflowBatch) -> None:
             )
 
 
+def _join_pricings_to_process(query: sqla.sql.Select, cutoff: datetime.datetime) -> sqla.sql.Select:
+    """Add joins and filters to ``query`` to select pricings that must
+    be included in a cashflow, along with their reimbursement point
+    and its bank information.
+    """
+    return (
+        query.select_from(models.Pricing)
+        .outerjoin(bookings_models.Booking, models.Pricing.bookingId == bookings_models.Booking.id)
+        .outerjoin(offers_models.Stock, bookings_models.Booking.stockId == offers_models.Stock.id)
+        .outerjoin(
+            educational_models.CollectiveBooking,
+            models.Pricing.collectiveBookingId == educational_models.CollectiveBooking.id,
+        )
+        .outerjoin(
+            educational_models.CollectiveStock,
+            educational_models.CollectiveBooking.collectiveStockId == educational_models.CollectiveStock.id,
+        )
+        .join(
+            offerers_models.VenueReimbursementPointLink,
+            sqla.and_(
+                offerers_models.VenueReimbursementPointLink.venueId == models.Pricing.venueId,
+                offerers_models.VenueReimbursementPointLink.timespan.contains(cutoff),
+            ),
+        )
+        .join(
+            models.BankInformation,
+            models.BankInformation.venueId == offerers_models.VenueReimbursementPointLink.reimbursementPointId,
+        )
+        .outerjoin(models.CashflowPricing, models.CashflowPricing.pricingId == models.Pricing.id)
+        .where(
+            models.Pricing.status == models.PricingStatus.VALIDATED,
+            models.Pricing.valueDate < cutoff,
+            # We should not have any validated pricing with a cashflow,
+            # this is a safety belt.
+            models.CashflowPricing.pricingId.is_(None),
+            # Bookings can now be priced even if BankInformation is not ACCEPTED,
+            # but to generate cashflows we definitely need it.
+            models.BankInformation.status == models.BankInformationStatus.ACCEPTED,
+            # Even if a booking is marked as used prematurely, we should
+            # wait for the event to happen.
+            sqla.or_(
+                sqla.and_(
+                    models.Pricing.bookingId.isnot(None),
+                    sqla.or_(
+                        offers_models.Stock.beginningDatetime.is_(None),
+                        offers_models.Stock.beginningDatetime < cutoff,
+                    ),
+                ),
+                sqla.and_(
+                    models.Pricing.collectiveBookingId.isnot(None),
+                    educational_models.CollectiveStock.beginningDatetime < cutoff,
+                ),
+            ),
+        )
+    )
+
+
+def _get_cashflows_generation_statement(
+    batch_id: int,
+    cutoff: datetime.datetime,
+    reimbursement_point_id: int | None = None,
+    excluded_point_ids: typing.Collection[int] = (),
+) -> sqla.sql.Update:
+    """Return a single statement that creates a cashflow for each
+    reimbursement point for which there is money to transfer, links
+    it to its pricings and marks them as processed.
+
+    Pricings are marked as `PROCESSED` even if there is no cashflow
+    (because their total is zero), so that we will not process these
+    pricings again.
+
+    All parts of the statement see the same snapshot of the database:
+    the amount of each cashflow is thus always the sum of the pricings
+    that are linked to it.
+    """
+    point_id_column = offerers_models.VenueReimbursementPointLink.reimbursementPointId
+    pricings = _join_pricings_to_process(
+        sqla.select(
+            models.Pricing.id.label("pricing_id"),
+            models.Pricing.amount.label("amount"),
+            point_id_column.label("reimbursement_point_id"),
+            models.BankInformation.id.label("bank_account_id"),
+        ),
+        cutoff,
+    )
+    if reimbursement_point_id is not None:
+        pricings = pricings.where(point_id_column == reimbursement_point_id)
+    if excluded_point_ids:
+        pricings = pricings.where(point_id_column.not_in(excluded_point_ids))
+    pricings = pricings.cte("pricings")
+
+    total = sqla.func.sum(pricings.c.amount)
+    cashflows = (
+        sqla.insert(models.Cashflow)
+        .from_select(
+            ["batchId", "reimbursementPointId", "bankAccountId", "status", "amount"],
+            sqla.select(
+                sqla.literal(batch_id, sqla.BigInteger),
+                pricings.c.reimbursement_point_id,
+                pricings.c.bank_account_id,
+                sqla.literal(models.CashflowStatus.PENDING, models.Cashflow.status.type),
+                total,
+            )
+            .group_by(pricings.c.reimbursement_point_id, pricings.c.bank_account_id)
+            .having(total != 0),
+        )
+        .returning(models.Cashflow.id, models.Cashflow.reimbursementPointId)
+        .cte("cashflows")
+    )
+    links = (
+        sqla.insert(models.CashflowPricing)
+        .from_select(
+            ["cashflowId", "pricingId"],
+            sqla.select(cashflows.c.id, pricings.c.pricing_id).join(
+                cashflows, cashflows.c.reimbursementPointId == pricings.c.reimbursement_point_id
+            ),
+        )
+        .cte("links")
+    )
+    return (
+        sqla.update(models.Pricing)
+        .where(models.Pricing.id.in_(sqla.select(pricings.c.pricing_id)))
+        .values(status=models.PricingStatus.PROCESSED)
+        .add_cte(cashflows)
+        .add_cte(links)
+        .execution_options(synchronize_session=False)
+    )
+
+
 def generate_payment_files(batch_id: int) -> None:
     """Generate all payment files that are related to the requested
     CashflowBatch and mark all related Cashflow as ``UNDER_REVIEW``.
@@ -1293,8 +1542,18 @@ def _filter_invoiceable_cashflows(query: BaseQuery) -> BaseQuery:
     )
 
 
-def generate_invoices() -> None:
-    """Generate (and store) all invoices."""
+def generate_invoices(pdf_workers: int | None = None) -> None:
+    """Generate (and store) all invoices.
+
+    By default, each invoice is generated, rendered as PDF, stored and
+    sent within its own transaction, one after another.
+
+    If ``pdf_workers`` is given, all invoices are generated and
+    committed first. Their PDF files are then rendered, stored and
+    sent by a pool of ``pdf_workers`` processes (or as many processes
+    as CPUs if ``pdf_workers`` is 0). Invoices whose PDF could not be
+    stored by a previous run are processed as well.
+    """
     rows = _filter_invoiceable_cashflows(
         db.session.query(
             models.Cashflow.reimbursementPointId.label("reimbursement_point_id"),
@@ -1306,11 +1565,20 @@ def generate_invoices() -> None:
         try:
             with transaction():
                 extra = {"reimbursement_point_id": row.reimbursement_point_id}
-                with log_elapsed(logger, "Generated and sent invoice", extra):
-                    generate_and_store_invoice(
-                        reimbursement_point_id=row.reimbursement_point_id,
-                        cashflow_ids=row.cashflow_ids,
-                    )
+                if pdf_workers is None:
+                    with log_elapsed(logger, "Generated and sent invoice", extra):
+                        generate_and_store_invoice(
+                            reimbursement_point_id=row.reimbursement_point_id,
+                            cashflow_ids=row.cashflow_ids,
+                        )
+                else:
+                    with log_elapsed(logger, "Generated invoice model instance", extra):
+                        invoice = _generate_invoice(
+                            reimbursement_point_id=row.reimbursement_point_id,
+                            cashflow_ids=row.cashflow_ids,
+                        )
+                        if invoice:
+                            invoice.pdfStored = False
         except Exception as exc:  # pylint: disable=broad-except
             if settings.IS_RUNNING_TESTS:
                 raise
@@ -1322,6 +1590,8 @@ def generate_invoices() -> None:
                     "exc": str(exc),
                 },
             )
+    if pdf_workers is not None:
+        store_pending_invoice_pdfs(workers=pdf_workers or os.cpu_count() or 1)
     with log_elapsed(logger, "Generated CSV invoices file"):
         path = generate_invoice_file(datetime.date.today())
     batch_id = models.CashflowBatch.query.order_by(models.CashflowBatch.cutoff.desc()).first().id
@@ -1330,6 +1600,93 @@ def generate_invoices() -> None:
         _upload_files_to_google_drive(drive_folder_name, [path])
 
 
+def store_pending_invoice_pdfs(workers: int = 1) -> None:
+    """Render, store and send the PDF of all invoices that do not have
+    one yet.
+
+    Rendering is CPU-bound: if ``workers`` is greater than 1, invoices
+    are processed by a pool of processes.
+    """
+    invoice_ids = [
+        invoice_id
+        for invoice_id, in models.Invoice.query.filter(models.Invoice.pdfStored.is_(False))
+        .with_entities(models.Invoice.id)
+        .order_by(models.Invoice.id)
+    ]
+    if not invoice_ids:
+        return
+    logger.info("Generating PDF invoices", extra={"invoices": len(invoice_ids), "workers": workers})
+
+    if workers == 1:
+        results: typing.Iterable[tuple[int, bool]] = (
+            (invoice_id, _generate_and_store_invoice_pdf(invoice_id)) for invoice_id in invoice_ids
+        )
+        _log_invoice_pdfs_progress(results, total=len(invoice_ids))
+        return
+
+    with db_utils.get_process_pool_executor(workers) as executor:
+        futures = {
+            executor.submit(_generate_and_store_invoice_pdf, invoice_id): invoice_id for invoice_id in invoice_ids
+        }
+        results = ((futures[future], future.result()) for future in concurrent.futures.as_completed(futures))
+        _log_invoice_pdfs_progress(results, total=len(invoice_ids))
+
+
+def _log_invoice_pdfs_progress(results: typing.Iterable[tuple[int, bool]], total: int) -> None:
+    failed = 0
+    for done, (invoice_id, success) in enumerate(results, 1):
+        failed += not success
+        logger.info(
+            "Processed PDF invoice",
+            extra={"invoice": invoice_id, "success": success, "done": done, "total": total},
+        )
+    if failed:
+        logger.error(
+            "Could not generate some PDF invoices, run the command again to retry",
+            extra={"failed": failed, "total": total},
+        )
+
+
+def _generate_and_store_invoice_pdf(invoice_id: int) -> bool:
+    """Render, store and send the PDF of an invoice. Return whether
+    the PDF has been stored.
+    """
+    log_extra = {"invoice": invoice_id}
+    for attempt in range(1, INVOICE_PDF_MAX_ATTEMPTS + 1):
+        try:
+            invoice = models.Invoice.query.filter_by(id=invoice_id).one()
+            if invoice.pdfStored:
+                # Processed by another instance of the command in the meantime.
+                return True
+            with log_elapsed(logger, "Generated invoice HTML", log_extra):
+                invoice_html = _generate_invoice_html(invoice)
+            with log_elapsed(logger, "Generated and stored PDF invoice", log_extra):
+                _store_invoice_pdf(invoice_storage_id=invoice.storage_object_id, invoice_html=invoice_html)
+            invoice.pdfStored = True
+            db.session.commit()
+            break
+        except Exception:  # pylint: disable=broad-except
+            db.session.rollback()
+            if settings.IS_RUNNING_TESTS:
+                raise
+            if attempt == INVOICE_PDF_MAX_ATTEMPTS:
+                logger.exception("Could not generate PDF invoice", extra=log_extra | {"attempt": attempt})
+                return False
+            logger.warning(
+                "Could not generate PDF invoice, will retry", extra=log_extra | {"attempt": attempt}, exc_info=True
+            )
+            time.sleep(attempt)
+
+    try:
+        with log_elapsed(logger, "Sent invoice", log_extra):
+            transactional_mails.send_invoice_available_to_pro_email(invoice)
+    except Exception:  # pylint: disable=broad-except
+        if settings.IS_RUNNING_TESTS:
+            raise
+        logger.exception("Could not send invoice", extra=log_extra)
+    return True
+
+
 def generate_invoice_file(invoice_date: datetime.date) -> pathlib.Path:
     header = [
         "Identifiant du point de remboursement",
@@ -1784,8 +2141,8 @@ def merge_cashflow_batches(
         db.session.commit()
 
 
-def reload_booking_for_pricing(booking_id: int) -> bookings_models.Booking:
-    query = bookings_models.Booking.query.filter_by(id=booking_id).options(
+def _get_bookings_for_pricing_query() -> BaseQuery:
+    return bookings_models.Booking.query.options(
         sqla_orm.joinedload(bookings_models.Booking.stock, innerjoin=True).joinedload(
             offers_models.Stock.offer, innerjoin=True
         ),
@@ -1793,11 +2150,20 @@ def reload_booking_for_pricing(booking_id: int) -> bookings_models.Booking:
         .joinedload(offerers_models.Venue.pricing_point_links, innerjoin=True)
         .joinedload(offerers_models.VenuePricingPointLink.venue, innerjoin=True),
     )
-    return query.one()
 
 
-def reload_collective_booking_for_pricing(booking_id: int) -> educational_models.CollectiveBooking:
-    query = educational_models.CollectiveBooking.query.filter_by(id=booking_id).options(
+def reload_booking_for_pricing(booking_id: int) -> bookings_models.Booking:
+    return _get_bookings_for_pricing_query().filter_by(id=booking_id).one()
+
+
+def reload_bookings_for_pricing(booking_ids: list[int]) -> list[bookings_models.Booking]:
+    if not booking_ids:
+        return []
+    return _get_bookings_for_pricing_query().filter(bookings_models.Booking.id.in_(booking_ids)).all()
+
+
+def _get_collective_bookings_for_pricing_query() -> BaseQuery:
+    return educational_models.CollectiveBooking.query.options(
         sqla_orm.joinedload(educational_models.CollectiveBooking.collectiveStock, innerjoin=True).joinedload(
             educational_models.CollectiveStock.collectiveOffer, innerjoin=True
         ),
@@ -1805,7 +2171,20 @@ def reload_collective_booking_for_pricing(booking_id: int) -> educational_models
         .joinedload(offerers_models.Venue.pricing_point_links, innerjoin=True)
         .joinedload(offerers_models.VenuePricingPointLink.venue, innerjoin=True),
     )
-    return query.one()
+
+
+def reload_collective_booking_for_pricing(booking_id: int) -> educational_models.CollectiveBooking:
+    return _get_collective_bookings_for_pricing_query().filter_by(id=booking_id).one()
+
+
+def reload_collective_bookings_for_pricing(booking_ids: list[int]) -> list[educational_models.CollectiveBooking]:
+    if not booking_ids:
+        return []
+    return (
+        _get_collective_bookings_for_pricing_query()
+        .filter(educational_models.CollectiveBooking.id.in_(booking_ids))
+        .all()
+    )
 
 
 def create_offerer_reimbursement_rule(
@@ -1971,3 +2350,102 @@ def create_deposit(
     )
 
     return deposit
+
+
+def _get_deposit_spent_amounts_mismatch_query(deposit_ids: typing.Iterable[int] | None = None) -> sqla.sql.Select:
+    booking_total = bookings_models.Booking.amount * bookings_models.Booking.quantity
+    expected = (
+        sqla.select(
+            bookings_models.Booking.depositId,
+            sqla.func.sum(booking_total).label("spent_amount"),
+            sqla.func.sum(
+                sqla.case(
+                    (
+                        bookings_models.Booking.status.in_(
+                            (bookings_models.BookingStatus.USED, bookings_models.BookingStatus.REIMBURSED)
+                        ),
+                        booking_total,
+                    ),
+                    else_=0,
+                )
+            ).label("used_spent_amount"),
+        )
+        .where(
+            bookings_models.Booking.depositId.isnot(None),
+            bookings_models.Booking.status != bookings_models.BookingStatus.CANCELLED,
+        )
+        .group_by(bookings_models.Booking.depositId)
+    )
+    if deposit_ids is not None:
+        expected = expected.where(bookings_models.Booking.depositId.in_(deposit_ids))
+    expected = expected.subquery()
+    expected_spent_amount = sqla.func.coalesce(expected.c.spent_amount, 0)
+    expected_used_spent_amount = sqla.func.coalesce(expected.c.used_spent_amount, 0)
+    query = (
+        sqla.select(
+            models.Deposit.id.label("deposit_id"),
+            models.Deposit.spentAmount.label("spent_amount"),
+            models.Deposit.usedSpentAmount.label("used_spent_amount"),
+            expected_spent_amount.label("expected_spent_amount"),
+            expected_used_spent_amount.label("expected_used_spent_amount"),
+        )
+        .outerjoin(expected, expected.c.depositId == models.Deposit.id)
+        .where(
+            sqla.or_(
+                models.Deposit.spentAmount != expected_spent_amount,
+                models.Deposit.usedSpentAmount != expected_used_spent_amount,
+            )
+        )
+        .order_by(models.Deposit.id)
+    )
+    if deposit_ids is not None:
+        query = query.where(models.Deposit.id.in_(deposit_ids))
+    return query
+
+
+def check_deposit_spent_amounts(fix: bool = False) -> list[sqla.engine.Row]:
+    """Compare the spent amounts of deposits, which are maintained by
+    a trigger on bookings, with the sums of their bookings.
+
+    Return inconsistent deposits. If `fix` is set, their spent amounts
+    are overwritten with the sums of their bookings.
+    """
+    mismatches = db.session.execute(_get_deposit_spent_amounts_mismatch_query()).all()
+    if mismatches:
+        logger.warning(
+            "Found inconsistent deposit spent amounts",
+            extra={"count": len(mismatches), "deposits": [row.deposit_id for row in mismatches[:100]]},
+        )
+    if not fix:
+        return mismatches
+
+    for row in mismatches:
+        with transaction():
+            # Lock the deposit: bookings of this deposit cannot be
+            # created or updated (see the trigger) until it is fixed.
+            db.session.execute(
+                sqla.select(models.Deposit.id).where(models.Deposit.id == row.deposit_id).with_for_update()
+            )
+            mismatch = db.session.execute(_get_deposit_spent_amounts_mismatch_query([row.deposit_id])).one_or_none()
+            if not mismatch:
+                continue
+            db.session.execute(
+                sqla.update(models.Deposit)
+                .where(models.Deposit.id == row.deposit_id)
+                .values(
+                    spentAmount=mismatch.expected_spent_amount,
+                    usedSpentAmount=mismatch.expected_used_spent_amount,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        logger.info(
+            "Fixed deposit spent amounts",
+            extra={
+                "deposit": row.deposit_id,
+                "spent_amount": str(mismatch.spent_amount),
+                "expected_spent_amount": str(mismatch.expected_spent_amount),
+                "used_spent_amount": str(mismatch.used_spent_amount),
+                "expected_used_spent_amount": str(mismatch.expected_used_spent_amount),
+            },
+        )
+    return mismatches
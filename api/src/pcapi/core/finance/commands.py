@@ -22,11 +22,20 @@ logger = logging.getLogger(__name__)
 
 
 @blueprint.cli.command("price_bookings")
+@click.option(
+    "--by-pricing-point",
+    help="Price bookings of each pricing point together instead of one at a time",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--batch-size", help="Number of bookings per batch", type=int, default=finance_api.PRICE_BOOKINGS_BATCH_SIZE
+)
 @cron_decorators.log_cron_with_transaction
 @cron_decorators.cron_require_feature(FeatureToggle.PRICE_BOOKINGS)
-def price_bookings() -> None:
+def price_bookings(by_pricing_point: bool, batch_size: int) -> None:
     """Price bookings that have been recently marked as used."""
-    finance_api.price_bookings()
+    finance_api.price_bookings(batch_size=batch_size, by_pricing_point=by_pricing_point)
 
 
 @blueprint.cli.command("generate_cashflows_and_payment_files")
@@ -43,12 +52,35 @@ def generate_cashflows_and_payment_files(override_feature_flag: bool) -> None:
 
 
 @blueprint.cli.command("generate_invoices")
-def generate_invoices() -> None:
+@click.option(
+    "--pdf-workers",
+    help=(
+        "Commit all invoices first, then generate PDF files in a pool of N processes (0: one process per CPU). "
+        "Invoices whose PDF file has not been stored by a previous run are processed too."
+    ),
+    type=int,
+    default=None,
+)
+def generate_invoices(pdf_workers: int | None) -> None:
     """Generate (and store) all invoices.
 
     This command can be run multiple times.
     """
-    finance_api.generate_invoices()
+    finance_api.generate_invoices(pdf_workers=pdf_workers)
+
+
+@blueprint.cli.command("check_deposit_spent_amounts")
+@click.option("--fix", help="Overwrite inconsistent spent amounts", is_flag=True, default=False)
+def check_deposit_spent_amounts(fix: bool) -> None:
+    """Compare deposit spent amounts with the sums of their bookings."""
+    mismatches = finance_api.check_deposit_spent_amounts(fix=fix)
+    for row in mismatches:
+        print(
+            f"Deposit {row.deposit_id}: "
+            f"spent {row.spent_amount} (expected {row.expected_spent_amount}), "
+            f"used {row.used_spent_amount} (expected {row.expected_used_spent_amount})"
+        )
+    print(f"{len(mismatches)} inconsistent deposit(s){' fixed' if fix else ''}")
 
 
 @blueprint.cli.command("add_custom_offer_reimbursement_rule")
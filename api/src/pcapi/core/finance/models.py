@@ -59,6 +59,13 @@ class Deposit(PcObject, Base, Model):
 
     version: int = sqla.Column(sqla.SmallInteger, nullable=False)
 
+    # Sum of the amounts of non-cancelled bookings (and of used or
+    # reimbursed bookings only). Maintained by a trigger on the
+    # `booking` table (see `Booking.trig_ddl`), they should not be
+    # written by the application.
+    spentAmount: decimal.Decimal = sqla.Column(sqla.Numeric(10, 2), nullable=False, server_default="0")
+    usedSpentAmount: decimal.Decimal = sqla.Column(sqla.Numeric(10, 2), nullable=False, server_default="0")
+
     type: DepositType = sqla.Column(
         sqla.Enum(DepositType, native_enum=False, create_constraint=False),
         nullable=False,
@@ -689,6 +696,10 @@ class Invoice(Base, Model):
     # See the note about `amount` at the beginning of this module.
     amount: int = sqla.Column(sqla.Integer, nullable=False)
     token: str = sqla.Column(sqla.Text, unique=True, nullable=False)
+    # False if the PDF has not been generated and stored yet. Invoices
+    # are created with `pdfStored=False` when PDF files are generated
+    # in a separate step (see `api.generate_invoices()`).
+    pdfStored: bool = sqla.Column(sqla.Boolean, nullable=False, server_default=sqla.sql.expression.true(), default=True)
     lines: list[InvoiceLine] = sqla_orm.relationship("InvoiceLine", back_populates="invoice")
     cashflows: list[Cashflow] = sqla_orm.relationship(
         "Cashflow", secondary="invoice_cashflow", back_populates="invoices"
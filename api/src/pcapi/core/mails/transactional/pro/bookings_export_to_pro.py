@@ -0,0 +1,27 @@
+import html
+
+from pcapi import settings
+from pcapi.core import mails
+from pcapi.core.mails import models
+import pcapi.core.users.models as users_models
+
+
+def get_bookings_export_to_pro_email_data(export_url: str) -> models.TransactionalWithoutTemplateEmailData:
+    export_url = html.escape(export_url)
+    validity_hours = settings.BOOKINGS_EXCEL_EXPORT_TTL // 3600
+    return models.TransactionalWithoutTemplateEmailData(
+        subject="Votre export de réservations est disponible",
+        html_content=(
+            "<html><head></head><body>"
+            "<div><div>Bonjour,</div>"
+            "<div>L'export de vos réservations que vous avez demandé est disponible.</div>"
+            f"<div>Vous pouvez le télécharger ici : <a href='{export_url}'>{export_url}</a></div>"
+            f"<div>Ce lien est valable {validity_hours} heures.</div>"
+            "</div></body></html>"
+        ),
+    )
+
+
+def send_bookings_export_to_pro_email(user: users_models.User, export_url: str) -> bool:
+    data = get_bookings_export_to_pro_email_data(export_url)
+    return mails.send(recipients=[user.email], data=data)
@@ -1,6 +1,20 @@
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+import typing
+
 from pcapi import settings
+from pcapi.core.logging import log_elapsed
 from pcapi.utils.module_loading import import_string
 
+from . import metrics
+from .backends.base import BaseBackend
+
+
+logger = logging.getLogger(__name__)
+
 
 GCP = "GCP"
 GCP_ALTERNATE = "GCP_ALTERNATE"
@@ -42,13 +56,118 @@ def _check_backend_setting() -> None:
 _check_backend_setting()
 
 
+class PublicObject(typing.NamedTuple):
+    folder: str
+    object_id: str
+    blob: bytes
+    content_type: str
+
+
+_backend_instances: dict[str, BaseBackend] = {}
+_backend_instances_lock = threading.Lock()
+
+
+def _get_backend_instance(backend_path: str) -> BaseBackend:
+    """Return the backend instance of the current process for
+    `backend_path`. Backends are long-lived so that they can reuse
+    their HTTP sessions and credentials.
+    """
+    with _backend_instances_lock:
+        if backend_path not in _backend_instances:
+            _backend_instances[backend_path] = import_string(backend_path)()
+        return _backend_instances[backend_path]
+
+
+_executor: concurrent.futures.ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the executor of the current process that writes single
+    objects to all backends. It is long-lived so that its threads, and
+    the HTTP clients that backends keep per thread, are reused. Threads
+    are not inherited by forked processes, hence the check on the pid.
+    """
+    global _executor, _executor_pid  # pylint: disable=global-statement
+    pid = os.getpid()
+    with _executor_lock:
+        if _executor is None or _executor_pid != pid:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(BACKENDS_MAPPING), thread_name_prefix="object_storage"
+            )
+            _executor_pid = pid
+        return _executor
+
+
+def _store_in_backend(backend_path: str, obj: PublicObject) -> None:
+    backend = _get_backend_instance(backend_path)
+    start = time.perf_counter()
+    backend.store_public_object(obj.folder, obj.object_id, obj.blob, obj.content_type)
+    metrics.observe_upload_latency(backend.__class__.__name__, time.perf_counter() - start)
+
+
+def _run_concurrently(
+    executor: concurrent.futures.ThreadPoolExecutor,
+    func: typing.Callable[..., None],
+    args_iterator: typing.Iterator[tuple],
+    max_pending: int,
+) -> None:
+    """Call `func` with each item of `args_iterator` in `executor`.
+
+    At most `max_pending` calls are submitted at a time, so that the
+    iterator is consumed lazily (and blobs are not all held in memory).
+    If a call fails, no new call is submitted and the first error is
+    raised once pending calls have finished.
+    """
+    pending: set[concurrent.futures.Future] = set()
+    error = None
+    for args in args_iterator:
+        pending.add(executor.submit(func, *args))
+        if len(pending) < max_pending:
+            continue
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        error = next((f.exception() for f in done if f.exception()), None)
+        if error:
+            break
+    done, _ = concurrent.futures.wait(pending)
+    error = error or next((f.exception() for f in done if f.exception()), None)
+    if error:
+        raise error
+
+
 def store_public_object(folder: str, object_id: str, blob: bytes, content_type: str) -> None:
-    for backend_path in _get_backends():
-        backend = import_string(backend_path)
-        backend().store_public_object(folder, object_id, blob, content_type)
+    obj = PublicObject(folder, object_id, blob, content_type)
+    backend_paths = _get_backends()
+    if len(backend_paths) == 1:
+        _store_in_backend(backend_paths.pop(), obj)
+        return
+    # Write to all backends in parallel.
+    _run_concurrently(
+        _get_executor(),
+        _store_in_backend,
+        ((backend_path, obj) for backend_path in backend_paths),
+        max_pending=len(backend_paths),
+    )
+
+
+def store_public_objects(objects: typing.Iterable[PublicObject], max_workers: int | None = None) -> None:
+    """Upload many objects concurrently, to all configured backends.
+
+    `objects` may be a generator: it is consumed as uploads complete.
+    """
+    max_workers = max_workers or settings.OBJECT_STORAGE_MAX_WORKERS
+    backend_paths = _get_backends()
+    uploads = ((backend_path, obj) for obj in objects for backend_path in backend_paths)
+    with log_elapsed(logger, "Stored public objects in object storage"):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            _run_concurrently(executor, _store_in_backend, uploads, max_pending=2 * max_workers)
+    logger.info(
+        "Object storage upload latencies",
+        extra={"histograms": metrics.get_upload_latency_histograms()},
+    )
 
 
 def delete_public_object(folder: str, object_id: str) -> None:
     for backend_path in _get_backends():
-        backend = import_string(backend_path)
-        backend().delete_public_object(folder, object_id)
+        _get_backend_instance(backend_path).delete_public_object(folder, object_id)
@@ -1,6 +1,15 @@
+import datetime
+
+
 class BaseBackend:
     def store_public_object(self, folder: str, object_id: str, blob: bytes, content_type: str) -> None:
         raise NotImplementedError()
 
     def delete_public_object(self, folder: str, object_id: str) -> None:
         raise NotImplementedError()
+
+    def get_signed_url(self, folder: str, object_id: str, expiration: datetime.timedelta) -> str:
+        """Return a URL that gives read access to a (possibly private)
+        object until `expiration` has elapsed.
+        """
+        raise NotImplementedError()
@@ -1,4 +1,7 @@
+import datetime
 import logging
+import os
+import threading
 
 from google.cloud.exceptions import NotFound
 from google.cloud.storage import Client
@@ -37,10 +40,26 @@ class GCPBackend(BaseBackend):
         self.project_id = project_id or self.bucket_credentials.get("project_id")
         self.bucket_name = bucket_name or self.default_bucket_name
 
+        self._credentials: Credentials | None = None
+        self._credentials_lock = threading.Lock()
+        # The storage client (and its HTTP session) is reused by all
+        # calls of a thread. It is not shared between threads, nor
+        # with forked processes, because HTTP sessions cannot be.
+        self._local = threading.local()
+
+    def _get_credentials(self) -> Credentials:
+        with self._credentials_lock:
+            if self._credentials is None:
+                self._credentials = Credentials.from_service_account_info(self.bucket_credentials)
+            return self._credentials
+
     def get_gcp_storage_client_bucket(self) -> Bucket:
-        credentials = Credentials.from_service_account_info(self.bucket_credentials)
-        storage_client = Client(credentials=credentials, project=self.project_id)
-        return storage_client.bucket(self.bucket_name)
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            storage_client = Client(credentials=self._get_credentials(), project=self.project_id)
+            self._local.bucket = storage_client.bucket(self.bucket_name)
+            self._local.pid = pid
+        return self._local.bucket
 
     def store_public_object(self, folder: str, object_id: str, blob: bytes, content_type: str) -> None:
         storage_path = folder + "/" + object_id
@@ -85,6 +104,13 @@ class GCPBackend(BaseBackend):
             )
             raise exc
 
+    def get_signed_url(self, folder: str, object_id: str, expiration: datetime.timedelta) -> str:
+        storage_path = folder + "/" + object_id
+        bucket = self.get_gcp_storage_client_bucket()
+        # Signing is done locally with the service account credentials:
+        # no request is sent to GCP.
+        return bucket.blob(storage_path).generate_signed_url(version="v4", expiration=expiration, method="GET")
+
 
 class GCPAlternateBackend(GCPBackend):
     """A backend for GCP Storage that connects to an alternate bucket.
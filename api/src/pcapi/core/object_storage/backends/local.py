@@ -1,3 +1,4 @@
+import datetime
 import logging
 import os
 import pathlib
@@ -41,3 +42,7 @@ class LocalBackend(BaseBackend):
         except OSError as exc:
             logger.exception("An error has occured while trying to delete file on local file storage: %s", exc)
             raise exc
+
+    def get_signed_url(self, folder: str, object_id: str, expiration: datetime.timedelta) -> str:
+        # Local files are served as static files: there is nothing to sign.
+        return f"{settings.OBJECT_STORAGE_URL}/{folder}/{object_id}"
@@ -0,0 +1,62 @@
+"""In-process latency histograms of object storage uploads.
+
+Histograms are kept per backend and per process. They are logged at
+the end of each batch of uploads (see `store_public_objects()`) and
+can be read with `get_upload_latency_histograms()`.
+"""
+import bisect
+import threading
+
+
+# Upper bounds (in seconds) of the histogram buckets. The last bucket
+# is unbounded.
+UPLOAD_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: tuple[float, ...] = UPLOAD_LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+            return {
+                "buckets": dict(zip(labels, self.counts)),
+                "count": self.count,
+                "sum": round(self.sum, 6),
+            }
+
+
+_histograms: dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def observe_upload_latency(backend: str, value: float) -> None:
+    with _histograms_lock:
+        histogram = _histograms.setdefault(backend, LatencyHistogram())
+    histogram.observe(value)
+
+
+def get_upload_latency_histograms() -> dict[str, dict]:
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {backend: histogram.to_dict() for backend, histogram in histograms.items()}
+
+
+def reset_upload_latency_histograms() -> None:
+    with _histograms_lock:
+        _histograms.clear()
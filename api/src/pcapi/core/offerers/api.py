@@ -1,13 +1,17 @@
 from datetime import date
 from datetime import datetime
 import enum
+import hashlib
+import hmac
 import logging
 import secrets
 import time
 import typing
 
+from flask import current_app
 from flask_sqlalchemy import BaseQuery
 import jwt
+from redis import exceptions as redis_exceptions
 import sqlalchemy as sa
 import sqlalchemy.orm as sa_orm
 
@@ -63,6 +67,7 @@ class T_UNCHANGED(enum.Enum):
 UNCHANGED = T_UNCHANGED.TOKEN
 VENUE_ALGOLIA_INDEXED_FIELDS = ["name", "publicName", "postalCode", "city", "latitude", "longitude", "criteria"]
 API_KEY_SEPARATOR = "_"
+API_KEY_VERIFICATION_CACHE_KEY = "api:api_key:verified:{}"
 APE_TAG_MAPPING = {"84.11Z": "Collectivité"}
 
 
@@ -344,7 +349,64 @@ def find_api_key(key: str) -> models.ApiKey | None:
     if not api_key:
         return None
 
-    return api_key if api_key.check_secret(clear_secret) else None
+    digest = _get_api_key_secret_digest(api_key, clear_secret)
+    if _is_verified_api_key(api_key, digest):
+        return api_key
+    if not api_key.check_secret(clear_secret):
+        return None
+    _cache_verified_api_key(api_key, digest)
+    return api_key
+
+
+# Verifying the secret of an API key (with bcrypt) is slow, on purpose.
+# Once a key has been verified, a keyed hash of its secret is cached
+# in-process and in Redis (indexed by the prefix of the key, so that it
+# can be invalidated), and is checked instead of the hashed secret.
+# Since the key is still fetched from the database, a deleted key is
+# rejected even if an outdated verification is still cached somewhere.
+_verified_api_keys: dict[str, tuple[str, float]] = {}  # prefix -> (digest, expiration time)
+
+
+def _get_api_key_secret_digest(api_key: models.ApiKey, clear_secret: str) -> str:
+    # The hashed secret is part of the message, so that the digest is
+    # bound to this very key.
+    message = api_key.secret + b":" + clear_secret.encode("utf-8")
+    return hmac.new(settings.FLASK_SECRET.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def _is_verified_api_key(api_key: models.ApiKey, digest: str) -> bool:
+    cached = _verified_api_keys.get(api_key.prefix)
+    if cached and cached[1] > time.monotonic():
+        return hmac.compare_digest(cached[0], digest)
+
+    key = API_KEY_VERIFICATION_CACHE_KEY.format(api_key.prefix)
+    try:
+        cached_digest = current_app.redis_client.get(key)  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.warning("Could not get API key verification", extra={"api_key": api_key.id}, exc_info=True)
+        return False
+    if not cached_digest or not hmac.compare_digest(cached_digest, digest):
+        return False
+    _verified_api_keys[api_key.prefix] = (digest, time.monotonic() + settings.API_KEY_VERIFICATION_CACHE_TTL)
+    return True
+
+
+def _cache_verified_api_key(api_key: models.ApiKey, digest: str) -> None:
+    ttl = settings.API_KEY_VERIFICATION_CACHE_TTL
+    _verified_api_keys[api_key.prefix] = (digest, time.monotonic() + ttl)
+    key = API_KEY_VERIFICATION_CACHE_KEY.format(api_key.prefix)
+    try:
+        current_app.redis_client.set(key, digest, ex=ttl)  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.warning("Could not save API key verification", extra={"api_key": api_key.id}, exc_info=True)
+
+
+def _invalidate_verified_api_key(prefix: str) -> None:
+    _verified_api_keys.pop(prefix, None)
+    try:
+        current_app.redis_client.delete(API_KEY_VERIFICATION_CACHE_KEY.format(prefix))  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.warning("Could not invalidate API key verification", extra={"prefix": prefix}, exc_info=True)
 
 
 def _create_prefix(env: str, prefix_identifier: str) -> str:
@@ -358,6 +420,7 @@ def delete_api_key_by_user(user: users_models.User, api_key_prefix: str) -> None
         raise exceptions.ApiKeyDeletionDenied()
 
     db.session.delete(api_key)
+    _invalidate_verified_api_key(api_key_prefix)
 
 
 def _fill_in_offerer(
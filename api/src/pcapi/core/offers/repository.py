@@ -448,6 +448,19 @@ def get_offers_map_by_id_at_provider(id_at_provider_list: list[str], venue: Venu
     return offers_map
 
 
+def get_offers_with_last_provider_map_by_id_at_provider(
+    id_at_provider_list: list[str], venue: Venue
+) -> dict[str, tuple[int, int | None]]:
+    return {
+        offer_id_at_provider: (offer_id, last_provider_id)
+        for offer_id, offer_id_at_provider, last_provider_id in (
+            db.session.query(models.Offer.id, models.Offer.idAtProvider, models.Offer.lastProviderId)
+            .filter(models.Offer.idAtProvider.in_(id_at_provider_list), models.Offer.venue == venue)
+            .all()
+        )
+    }
+
+
 def get_offers_map_by_venue_reference(id_at_provider_list: list[str], venue_id: int) -> dict[str, int]:
     offers_map = {}
     for offer_id, offer_id_at_provider in (
@@ -467,6 +480,8 @@ def get_stocks_by_id_at_providers(id_at_providers: list[str]) -> dict:
         models.Stock.dnBookedQuantity,
         models.Stock.quantity,
         models.Stock.price,
+        models.Stock.rawProviderQuantity,
+        models.Stock.lastProviderId,
     )
     return {
         stock.idAtProviders: {
@@ -474,6 +489,8 @@ def get_stocks_by_id_at_providers(id_at_providers: list[str]) -> dict:
             "booking_quantity": stock.dnBookedQuantity,
             "quantity": stock.quantity,
             "price": stock.price,
+            "raw_provider_quantity": stock.rawProviderQuantity,
+            "last_provider_id": stock.lastProviderId,
         }
         for stock in stocks
     }
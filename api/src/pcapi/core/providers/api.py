@@ -4,6 +4,8 @@ import decimal
 import logging
 from typing import Iterable
 
+import sqlalchemy as sa
+
 from pcapi.core import search
 from pcapi.core.logging import log_elapsed
 from pcapi.core.mails.transactional import send_venue_provider_deleted_email
@@ -271,29 +273,42 @@ def synchronize_stocks(
     # here offers.id_at_providers is the "ref" field that provider api gives use.
     with log_elapsed(
         logger,
-        "get_offers_map_by_id_at_provider",
+        "get_offers_with_last_provider_map_by_id_at_provider",
         extra={
             "venue": venue.id,
             "ref_count": len(offers_provider_references),
         },
     ):
-        offers_by_provider_reference = offers_repository.get_offers_map_by_id_at_provider(
+        existing_offers = offers_repository.get_offers_with_last_provider_map_by_id_at_provider(
             offers_provider_references, venue
         )
-
-    products_references = [stock_detail.products_provider_reference for stock_detail in stock_details]
-    with log_elapsed(
-        logger,
-        "get_offers_map_by_venue_reference",
-        extra={
-            "venue": venue.id,
-            "ref_count": len(products_references),
-        },
-    ):
-        offers_by_venue_reference = offers_repository.get_offers_map_by_venue_reference(products_references, venue.id)
+    offers_by_provider_reference = {reference: offer_id for reference, (offer_id, _) in existing_offers.items()}
+
+    # The venue reference is only checked before creating an offer:
+    # there is no need to look for it when all offers already exist.
+    products_references = [
+        stock_detail.products_provider_reference
+        for stock_detail in stock_details
+        if stock_detail.offers_provider_reference not in offers_by_provider_reference
+    ]
+    offers_by_venue_reference: dict[str, int] = {}
+    if products_references:
+        with log_elapsed(
+            logger,
+            "get_offers_map_by_venue_reference",
+            extra={
+                "venue": venue.id,
+                "ref_count": len(products_references),
+            },
+        ):
+            offers_by_venue_reference = offers_repository.get_offers_map_by_venue_reference(
+                products_references, venue.id
+            )
 
     offers_update_mapping = [
-        {"id": offer_id, "lastProviderId": provider_id} for offer_id in offers_by_provider_reference.values()
+        {"id": offer_id, "lastProviderId": provider_id}
+        for offer_id, last_provider_id in existing_offers.values()
+        if last_provider_id != provider_id
     ]
     db.session.bulk_update_mappings(offers_models.Offer, offers_update_mapping)
 
@@ -309,8 +324,11 @@ def synchronize_stocks(
 
     db.session.bulk_save_objects(new_offers)
 
-    new_offers_by_provider_reference = offers_repository.get_offers_map_by_id_at_provider(new_offers_references, venue)
-    offers_by_provider_reference = {**offers_by_provider_reference, **new_offers_by_provider_reference}
+    if new_offers_references:
+        new_offers_by_provider_reference = offers_repository.get_offers_map_by_id_at_provider(
+            new_offers_references, venue
+        )
+        offers_by_provider_reference = {**offers_by_provider_reference, **new_offers_by_provider_reference}
 
     stocks_provider_references = [stock.stocks_provider_reference for stock in stock_details]
     stocks_by_provider_reference = offers_repository.get_stocks_by_id_at_providers(stocks_provider_references)
@@ -321,15 +339,64 @@ def synchronize_stocks(
         products_by_provider_reference,
         provider_id,
     )
+    existing_stocks_count = sum(
+        1 for stock_detail in stock_details if stock_detail.stocks_provider_reference in stocks_by_provider_reference
+    )
 
     db.session.bulk_save_objects(new_stocks)
-    db.session.bulk_update_mappings(offers_models.Stock, update_stock_mapping)
+    _update_stocks(update_stock_mapping)
 
     db.session.commit()
 
-    search.async_index_offer_ids(offer_ids)
-
-    return {"new_offers": len(new_offers), "new_stocks": len(new_stocks), "updated_stocks": len(update_stock_mapping)}
+    if offer_ids:
+        search.async_index_offer_ids(offer_ids)
+
+    return {
+        "new_offers": len(new_offers),
+        "new_stocks": len(new_stocks),
+        "updated_stocks": len(update_stock_mapping),
+        "unchanged_stocks": existing_stocks_count - len(update_stock_mapping),
+        "updated_offers": len(offers_update_mapping),
+    }
+
+
+def _update_stocks(update_stock_mapping: list[dict]) -> None:
+    """Update stocks with a single `UPDATE ... FROM (VALUES ...)`
+    statement.
+    """
+    if not update_stock_mapping:
+        return
+    new_values = sa.values(
+        sa.column("id", sa.BigInteger),
+        sa.column("quantity", sa.Integer),
+        sa.column("rawProviderQuantity", sa.Integer),
+        sa.column("price", sa.Numeric),
+        sa.column("lastProviderId", sa.BigInteger),
+        name="new_values",
+    ).data(
+        [
+            (
+                mapping["id"],
+                mapping["quantity"],
+                mapping["rawProviderQuantity"],
+                decimal.Decimal(str(mapping["price"])),
+                mapping["lastProviderId"],
+            )
+            for mapping in update_stock_mapping
+        ]
+    )
+    db.session.execute(
+        sa.update(offers_models.Stock)
+        .where(offers_models.Stock.id == new_values.c.id)
+        .values(
+            quantity=new_values.c.quantity,
+            rawProviderQuantity=new_values.c.rawProviderQuantity,
+            price=new_values.c.price,
+            # Cast, in case all values are NULL (i.e. of unknown type).
+            lastProviderId=sa.cast(new_values.c.lastProviderId, sa.BigInteger),
+        )
+        .execution_options(synchronize_session=False)
+    )
 
 
 def _build_new_offers_from_stock_details(
@@ -410,15 +477,16 @@ def _get_stocks_to_upsert(
                     },
                 )
 
-            update_stock_mapping.append(
-                {
-                    "id": stock["id"],
-                    "quantity": stock_detail.available_quantity + stock["booking_quantity"],
-                    "rawProviderQuantity": stock_detail.available_quantity,
-                    "price": book_price,
-                    "lastProviderId": provider_id,
-                }
-            )
+            new_values = {
+                "id": stock["id"],
+                "quantity": stock_detail.available_quantity + stock["booking_quantity"],
+                "rawProviderQuantity": stock_detail.available_quantity,
+                "price": book_price,
+                "lastProviderId": provider_id,
+            }
+            if _is_stock_unchanged(stock, new_values):
+                continue
+            update_stock_mapping.append(new_values)
             if _should_reindex_offer(stock_detail.available_quantity, book_price, stock):
                 offer_ids.add(offers_by_provider_reference[stock_detail.offers_provider_reference])
 
@@ -495,6 +563,18 @@ def _build_new_offer(
     )
 
 
+def _is_stock_unchanged(existing_stock: dict, new_values: dict) -> bool:
+    return (
+        existing_stock["quantity"] == new_values["quantity"]
+        and existing_stock.get("raw_provider_quantity") == new_values["rawProviderQuantity"]
+        and existing_stock.get("last_provider_id") == new_values["lastProviderId"]
+        # The price column has 2 decimal places, like the price of a
+        # stock detail, but the product price may have more.
+        and decimal.Decimal(existing_stock["price"])
+        == decimal.Decimal(str(new_values["price"])).quantize(decimal.Decimal("0.01"), decimal.ROUND_HALF_UP)
+    )
+
+
 def _should_reindex_offer(new_quantity: int, new_price: float, existing_stock: dict) -> bool:
     if existing_stock["price"] != new_price:
         return True
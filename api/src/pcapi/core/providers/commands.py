@@ -89,6 +89,7 @@ def update_providables(provider_name: str, venue_provider_id: int, limit: int):
 @click.option(
     "-l", "--limit", help="Limit update to n items per venue provider" + " (for test purposes)", type=int, default=None
 )
-def update_providables_by_provider_id(provider_id: int, limit: int | None) -> None:
+@click.option("-w", "--workers", help="Number of venue providers synchronized concurrently", type=int, default=None)
+def update_providables_by_provider_id(provider_id: int, limit: int | None, workers: int | None) -> None:
     venue_providers = providers_repository.get_active_venue_providers_by_provider(provider_id)
-    provider_manager.synchronize_venue_providers(venue_providers, limit)
+    provider_manager.synchronize_venue_providers(venue_providers, limit, workers=workers)
@@ -261,6 +261,12 @@ class StockDetail:
     price: float | None
 
 
+class StocksImportStatus(enum.Enum):
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class AllocinePivot(PcObject, Base, Model):
     venueId: int = Column(BigInteger, ForeignKey("venue.id"), index=False, nullable=False, unique=True)
 
@@ -0,0 +1,193 @@
+"""Asynchronous imports of the stocks sent to the books stocks API.
+
+Stocks are split into chunks that are stored (compressed) in Redis and
+synchronized by independent jobs, each in its own transaction. The
+progress of each import is kept in Redis, along with the id of the last
+import of each venue.
+"""
+import base64
+from datetime import datetime
+import decimal
+import json
+import logging
+import typing
+import uuid
+import zlib
+
+from flask import current_app
+
+from pcapi import settings
+from pcapi.core.offerers.repository import find_venue_by_id
+from pcapi.core.providers import api
+from pcapi.core.providers import constants
+from pcapi.core.providers.models import StockDetail
+from pcapi.core.providers.models import StocksImportStatus
+from pcapi.core.providers.repository import get_provider_by_local_class
+from pcapi.models import db
+from pcapi.utils.chunks import get_chunks
+
+
+logger = logging.getLogger(__name__)
+
+IMPORT_KEY = "api:stocks_import:{import_id}"
+CHUNK_KEY = "api:stocks_import:{import_id}:chunk:{index}"
+CHUNK_CLAIM_KEY = "api:stocks_import:{import_id}:chunk:{index}:claim"
+DONE_CHUNKS_KEY = "api:stocks_import:{import_id}:done"
+FAILED_CHUNKS_KEY = "api:stocks_import:{import_id}:failed"
+VENUE_LAST_IMPORT_KEY = "api:stocks_import:venue:{venue_id}"
+# A chunk is claimed by the job that imports it, for at most the
+# timeout of jobs (see `pcapi.workers.worker.low_queue`).
+CHUNK_CLAIM_TTL = 60 * 60
+
+
+class StockToImport(typing.NamedTuple):
+    ref: str
+    available: int
+    price: decimal.Decimal
+
+
+def _encode_chunk(stocks: list[StockToImport]) -> str:
+    data = json.dumps([[stock.ref, stock.available, str(stock.price)] for stock in stocks])
+    return base64.b64encode(zlib.compress(data.encode())).decode()
+
+
+def _decode_chunk(encoded: str) -> list[StockToImport]:
+    data = json.loads(zlib.decompress(base64.b64decode(encoded)))
+    return [StockToImport(ref, available, decimal.Decimal(price)) for ref, available, price in data]
+
+
+def create_import(venue_id: int, stocks: list[StockToImport]) -> tuple[str, int]:
+    """Store stocks to import by chunks, and return the id of the import
+    and its number of chunks.
+    """
+    import_id = uuid.uuid4().hex
+    ttl = settings.STOCKS_IMPORT_TTL
+    redis_client = current_app.redis_client  # type: ignore [attr-defined]
+
+    pipeline = redis_client.pipeline()
+    chunks_count = 0
+    for index, chunk in enumerate(get_chunks(stocks, settings.STOCKS_IMPORT_CHUNK_SIZE)):
+        pipeline.set(CHUNK_KEY.format(import_id=import_id, index=index), _encode_chunk(chunk), ex=ttl)
+        chunks_count += 1
+    import_key = IMPORT_KEY.format(import_id=import_id)
+    pipeline.hset(
+        import_key,
+        mapping={
+            "venue_id": venue_id,
+            "chunks_count": chunks_count,
+            "stocks_count": len(stocks),
+            "date_created": datetime.utcnow().isoformat(),
+        },
+    )
+    pipeline.expire(import_key, ttl)
+    pipeline.set(VENUE_LAST_IMPORT_KEY.format(venue_id=venue_id), import_id, ex=ttl)
+    pipeline.execute()
+
+    logger.info(
+        "Created stocks import",
+        extra={"venue": venue_id, "import_id": import_id, "stocks": len(stocks), "chunks": chunks_count},
+    )
+    return import_id, chunks_count
+
+
+def import_chunk(import_id: str, index: int) -> None:
+    """Synchronize the stocks of a chunk. A chunk that has already been
+    imported, or that is being imported by another job, is not imported
+    again. A chunk that could not be imported is kept, so that it can be
+    imported by a new attempt.
+    """
+    redis_client = current_app.redis_client  # type: ignore [attr-defined]
+    done_chunks_key = DONE_CHUNKS_KEY.format(import_id=import_id)
+    failed_chunks_key = FAILED_CHUNKS_KEY.format(import_id=import_id)
+    chunk_key = CHUNK_KEY.format(import_id=import_id, index=index)
+    claim_key = CHUNK_CLAIM_KEY.format(import_id=import_id, index=index)
+    extra = {"import_id": import_id, "chunk": index}
+
+    # Claim the chunk atomically, so that concurrent jobs cannot both
+    # import it.
+    if not redis_client.set(claim_key, 1, nx=True, ex=CHUNK_CLAIM_TTL):
+        logger.info("Skipped stocks chunk that is being imported by another job", extra=extra)
+        return
+    if redis_client.sismember(done_chunks_key, index):
+        redis_client.delete(claim_key)
+        logger.info("Skipped already imported stocks chunk", extra=extra)
+        return
+    venue_id = redis_client.hget(IMPORT_KEY.format(import_id=import_id), "venue_id")
+    encoded_chunk = redis_client.get(chunk_key)
+    if venue_id is None or encoded_chunk is None:
+        redis_client.delete(claim_key)
+        logger.error("Could not find stocks chunk to import, it may have expired", extra=extra)
+        return
+    venue_id = int(venue_id)
+    try:
+        stocks_count, operations = _synchronize_chunk(venue_id, encoded_chunk)
+    except Exception:
+        db.session.rollback()
+        pipeline = redis_client.pipeline()
+        pipeline.sadd(failed_chunks_key, index)
+        pipeline.expire(failed_chunks_key, settings.STOCKS_IMPORT_TTL)
+        # Release the chunk, so that a new attempt can import it.
+        pipeline.delete(claim_key)
+        pipeline.execute()
+        raise
+
+    pipeline = redis_client.pipeline()
+    pipeline.sadd(done_chunks_key, index)
+    pipeline.expire(done_chunks_key, settings.STOCKS_IMPORT_TTL)
+    pipeline.srem(failed_chunks_key, index)
+    pipeline.delete(chunk_key, claim_key)
+    pipeline.execute()
+    logger.info(
+        "Processed stocks synchronization",
+        extra={"venue": venue_id, "stocks": stocks_count, **extra, **operations},
+    )
+
+
+def _synchronize_chunk(venue_id: int, encoded_chunk: str) -> tuple[int, dict]:
+    venue = find_venue_by_id(venue_id)
+    if not venue:  # unlikely, since `venue_id` comes from us
+        raise ValueError(f"Could not find venue {venue_id}")
+
+    stock_details = [
+        StockDetail(
+            products_provider_reference=stock.ref,
+            offers_provider_reference=stock.ref,
+            stocks_provider_reference=f"{stock.ref}@{venue_id}",
+            venue_reference=f"{stock.ref}@{venue_id}",
+            available_quantity=stock.available,
+            price=stock.price,  # type: ignore [arg-type]
+        )
+        for stock in _decode_chunk(encoded_chunk)
+    ]
+    pc_provider = get_provider_by_local_class(constants.PASS_CULTURE_STOCKS_FAKE_CLASS_NAME)
+    operations = api.synchronize_stocks(stock_details, venue, provider_id=pc_provider.id)
+    return len(stock_details), operations
+
+
+def get_last_import_status(venue_id: int) -> dict | None:
+    redis_client = current_app.redis_client  # type: ignore [attr-defined]
+    import_id = redis_client.get(VENUE_LAST_IMPORT_KEY.format(venue_id=venue_id))
+    if not import_id:
+        return None
+    info = redis_client.hgetall(IMPORT_KEY.format(import_id=import_id))
+    if not info:
+        return None
+
+    chunks_count = int(info["chunks_count"])
+    done_chunks_count = redis_client.scard(DONE_CHUNKS_KEY.format(import_id=import_id))
+    failed_chunks_count = redis_client.scard(FAILED_CHUNKS_KEY.format(import_id=import_id))
+    if done_chunks_count == chunks_count:
+        status = StocksImportStatus.DONE
+    elif done_chunks_count + failed_chunks_count == chunks_count:
+        status = StocksImportStatus.FAILED
+    else:
+        status = StocksImportStatus.PENDING
+    return {
+        "id": import_id,
+        "status": status,
+        "date_created": datetime.fromisoformat(info["date_created"]),
+        "stocks_count": int(info["stocks_count"]),
+        "chunks_count": chunks_count,
+        "done_chunks_count": done_chunks_count,
+        "failed_chunks_count": failed_chunks_count,
+    }
@@ -1,6 +1,10 @@
 from collections.abc import Collection
+import dataclasses
 import datetime
 import logging
+import queue
+import threading
+import time
 from typing import Iterable
 
 from flask_sqlalchemy import BaseQuery
@@ -12,6 +16,7 @@ from pcapi.core.educational import models as educational_models
 from pcapi.core.offerers import models as offerers_models
 from pcapi.core.offers import models as offers_models
 import pcapi.core.offers.repository as offers_repository
+from pcapi.core.search import last_30_days_bookings as last_30_days_bookings_counter
 from pcapi.core.search.backends import base
 from pcapi.models import db
 from pcapi.models.feature import FeatureToggle
@@ -175,6 +180,195 @@ def index_offers_in_queue(stop_only_when_empty: bool = False, from_error_queue:
             break
 
 
+@dataclasses.dataclass
+class _OffersBatch:
+    objects_to_index: list[dict]
+    offer_ids_to_unindex: list[int]
+
+
+@dataclasses.dataclass
+class _PushStats:
+    """Counters of the thread that pushes batches. They are only
+    written by that thread, and must be read once it has been joined,
+    except ``failed`` that tells the producer to stop.
+    """
+
+    batches: int = 0
+    indexed: int = 0
+    unindexed: int = 0
+    errors: int = 0
+    push_duration: float = 0.0
+    fatal_error: Exception | None = None
+    failed: threading.Event = dataclasses.field(default_factory=threading.Event)
+
+
+def index_offers_in_queue_pipelined(
+    stop_only_when_empty: bool = False,
+    from_error_queue: bool = False,
+    max_in_flight_batches: int | None = None,
+) -> None:
+    """Pop offers from indexation queue and reindex them, like
+    ``index_offers_in_queue()``, but overlap database work and calls
+    to the indexation service.
+
+    The current thread pops offer ids from the queue, loads offers
+    from the database and serializes them. Serialized batches are put
+    in a bounded queue, from which another thread pushes them to the
+    indexation service. Hence the database is not idle while we wait
+    for the indexation service, and vice-versa. At most
+    ``max_in_flight_batches`` batches wait in the queue: when the
+    indexation service is slower than the database, the current
+    thread blocks instead of accumulating serialized offers in memory.
+
+    As in ``reindex_offer_ids()``, offers that could not be pushed are
+    added to the error queue.
+    """
+    if max_in_flight_batches is None:
+        max_in_flight_batches = settings.ALGOLIA_MAX_IN_FLIGHT_OFFER_BATCHES
+    backend = _get_backend()
+    stats = _PushStats()
+    fetch_duration = 0.0
+    batches: queue.Queue[_OffersBatch | None] = queue.Queue(maxsize=max_in_flight_batches)
+    pusher = threading.Thread(target=_push_offers_batches, args=(backend, batches, stats), daemon=True)
+    pusher.start()
+
+    start = time.perf_counter()
+    try:
+        while True:
+            if stats.failed.is_set():  # batches would not be pushed anyway
+                break
+            offer_ids = backend.pop_offer_ids_from_queue(
+                count=settings.REDIS_OFFER_IDS_CHUNK_SIZE, from_error_queue=from_error_queue
+            )
+            if not offer_ids:
+                break
+
+            fetch_start = time.perf_counter()
+            try:
+                to_add, to_delete_ids, last_30_days_bookings = _get_offers_to_reindex(backend, offer_ids)
+                objects = [backend.serialize_offer(offer, last_30_days_bookings.get(offer.id) or 0) for offer in to_add]
+                # some offers changes might make some venue ineligible for search
+                _reindex_venues_from_offers(offer_ids)
+            except Exception as exc:  # pylint: disable=broad-except
+                if settings.IS_RUNNING_TESTS:
+                    raise
+                logger.exception(
+                    "Exception while reindexing offers, must fix manually",
+                    extra={"exc": str(exc), "offers": offer_ids},
+                )
+            else:
+                batches.put(_OffersBatch(objects_to_index=objects, offer_ids_to_unindex=to_delete_ids))
+            fetch_duration += time.perf_counter() - fetch_start
+
+            left_to_process = backend.count_offers_to_index_from_queue(from_error_queue=from_error_queue)
+            if not stop_only_when_empty and left_to_process < settings.REDIS_OFFER_IDS_CHUNK_SIZE:
+                break
+    finally:
+        batches.put(None)
+        pusher.join()
+
+    if stats.fatal_error:
+        raise stats.fatal_error
+
+    duration = time.perf_counter() - start
+    logger.info(
+        "Reindexed offers from queue (pipelined)",
+        extra={
+            "from_error_queue": from_error_queue,
+            "batches": stats.batches,
+            "indexed": stats.indexed,
+            "unindexed": stats.unindexed,
+            "errors": stats.errors,
+            "duration": round(duration, 3),
+            "fetch_duration": round(fetch_duration, 3),
+            "push_duration": round(stats.push_duration, 3),
+            "offers_per_second": round((stats.indexed + stats.unindexed) / duration, 1) if duration else None,
+        },
+    )
+
+
+def _push_offers_batches(
+    backend: base.SearchBackend,
+    batches: "queue.Queue[_OffersBatch | None]",
+    stats: _PushStats,
+) -> None:
+    """Push batches to the indexation service until ``None`` is
+    received. Run in a separate thread: it must not use the database.
+
+    If an unexpected error occurs (e.g. if Redis is down and offers
+    cannot be added to the error queue), it is stored in ``stats`` and
+    the following batches are not pushed, but the queue is still
+    drained until ``None`` is received, so that the producer never
+    blocks. Offers of these batches have already been popped from the
+    queue: they are put in the error queue (or logged, if that fails
+    too).
+    """
+    while True:
+        batch = batches.get()
+        if batch is None:
+            return
+        if stats.fatal_error:
+            _drop_offers_batch(backend, batch)
+            continue
+        try:
+            _push_offers_batch(backend, batch, stats)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception(
+                "Unexpected error while pushing offers, stopping reindexation",
+                extra={"exc": str(exc), "offers": _get_batch_offer_ids(batch)},
+            )
+            stats.fatal_error = exc
+            stats.failed.set()
+            _drop_offers_batch(backend, batch)
+
+
+def _get_batch_offer_ids(batch: _OffersBatch) -> list[int]:
+    return [obj["objectID"] for obj in batch.objects_to_index] + batch.offer_ids_to_unindex
+
+
+def _drop_offers_batch(backend: base.SearchBackend, batch: _OffersBatch) -> None:
+    offer_ids = _get_batch_offer_ids(batch)
+    try:
+        backend.enqueue_offer_ids_in_error(offer_ids)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.error(
+            "Could not put offers back in the error queue, must reindex manually",
+            extra={"exc": str(exc), "offers": offer_ids},
+        )
+
+
+def _push_offers_batch(backend: base.SearchBackend, batch: _OffersBatch, stats: _PushStats) -> None:
+    push_start = time.perf_counter()
+    indexed_ids = [obj["objectID"] for obj in batch.objects_to_index]
+    try:
+        backend.index_serialized_offers(batch.objects_to_index)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning(
+            "Could not reindex offers, will automatically retry",
+            extra={"exc": str(exc), "offers": indexed_ids},
+            exc_info=True,
+        )
+        backend.enqueue_offer_ids_in_error(indexed_ids)
+        stats.errors += len(indexed_ids)
+    else:
+        stats.indexed += len(indexed_ids)
+
+    try:
+        backend.unindex_offer_ids(batch.offer_ids_to_unindex)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning(
+            "Could not unindex offers, will automatically retry",
+            extra={"exc": str(exc), "offers": batch.offer_ids_to_unindex},
+            exc_info=True,
+        )
+        backend.enqueue_offer_ids_in_error(batch.offer_ids_to_unindex)
+        stats.errors += len(batch.offer_ids_to_unindex)
+    else:
+        stats.unindexed += len(batch.offer_ids_to_unindex)
+    stats.batches += 1
+    stats.push_duration += time.perf_counter() - push_start
+
+
 def index_collective_offers_in_queue(from_error_queue: bool = False) -> None:
     """Pop collective offers from indexation queue and reindex them."""
     backend = _get_backend()
@@ -397,7 +591,8 @@ def get_base_query_for_offer_indexation() -> BaseQuery:
     )
 
 
-def get_base_query_for_last_30_days_bookings() -> BaseQuery:
+def get_base_query_for_last_30_days_bookings(since: datetime.datetime | None = None) -> BaseQuery:
+    since = since or datetime.datetime.utcnow() - datetime.timedelta(days=30)
     return (
         sa.select(
             offers_models.Offer.id.label("offer_id"), sa.func.count(bookings_models.Booking.id).label("bookings_number")
@@ -406,55 +601,43 @@ def get_base_query_for_last_30_days_bookings() -> BaseQuery:
         .join(offers_models.Offer.stocks)
         .join(offers_models.Stock.bookings)
         .where(
-            bookings_models.Booking.dateCreated >= datetime.datetime.utcnow() - datetime.timedelta(days=30),
+            bookings_models.Booking.dateCreated >= since,
             bookings_models.Booking.status != bookings_models.BookingStatus.CANCELLED,
         )
         .group_by(offers_models.Offer.id)
     )
 
 
-def reindex_offer_ids(offer_ids: Iterable[int]) -> None:
+def get_last_30_days_bookings(offer_ids: Iterable[int]) -> dict[int, int]:
+    """Return the number of bookings of the last 30 days of each
+    requested offer (if the computation is enabled).
+    """
+    if not FeatureToggle.ALGOLIA_BOOKINGS_NUMBER_COMPUTATION.is_active():
+        return {}
+    if FeatureToggle.ENABLE_ALGOLIA_BOOKINGS_NUMBER_COUNTER.is_active():
+        return last_30_days_bookings_counter.get_counts(offer_ids)
+    query = get_base_query_for_last_30_days_bookings().filter(offers_models.Offer.id.in_(offer_ids))
+    return {row.offer_id: row.bookings_number for row in db.session.execute(query).all()}
+
+
+def reindex_offer_ids(offer_ids: Iterable[int], force: bool = False) -> None:
     """Given a list of `Offer.id`, reindex or unindex each offer
     (i.e. request the external indexation service an update or a
     removal).
 
+    Offers that have not changed since they were last indexed are
+    not sent again, unless ``force`` is set.
+
     This function calls the external indexation service and may thus
     be slow. It should not be called by usual code. You should rather
     call `async_index_offer_ids()` instead to return quickly.
     """
     backend = _get_backend()
-
-    to_add = []
-    to_delete_ids = []
-    offers = get_base_query_for_offer_indexation().filter(offers_models.Offer.id.in_(offer_ids))
-
-    last_30_days_bookings_query = get_base_query_for_last_30_days_bookings().filter(
-        offers_models.Offer.id.in_(offer_ids)
-    )
-    if FeatureToggle.ALGOLIA_BOOKINGS_NUMBER_COMPUTATION.is_active():
-        last_30_days_bookings = {
-            row.offer_id: row.bookings_number for row in db.session.execute(last_30_days_bookings_query).all()
-        }
-    else:
-        last_30_days_bookings = {}
-
-    for offer in offers:
-        if offer and offer.is_eligible_for_search:
-            to_add.append(offer)
-        elif backend.check_offer_is_indexed(offer):
-            to_delete_ids.append(offer.id)
-        else:
-            # FIXME (dbaty, 2021-06-24). I think we could safely do
-            # without the hashmap in Redis. Check the logs and see if
-            # I am right!
-            logger.info(
-                "Redis 'indexed_offers' set avoided unnecessary request to indexation service",
-                extra={"source": "reindex_offer_ids", "offer": offer.id},
-            )
+    to_add, to_delete_ids, last_30_days_bookings = _get_offers_to_reindex(backend, offer_ids)
 
     # Handle new or updated available offers
     try:
-        backend.index_offers(to_add, last_30_days_bookings)
+        backend.index_offers(to_add, last_30_days_bookings, force=force)
     except Exception as exc:  # pylint: disable=broad-except
         if settings.IS_RUNNING_TESTS:
             raise
@@ -482,6 +665,37 @@ def reindex_offer_ids(offer_ids: Iterable[int]) -> None:
     _reindex_venues_from_offers(offer_ids)
 
 
+def _get_offers_to_reindex(
+    backend: base.SearchBackend,
+    offer_ids: Iterable[int],
+) -> tuple[list[offers_models.Offer], list[int], dict[int, int]]:
+    """Return offers that should be (re)indexed, ids of offers that
+    should be unindexed and the number of bookings of the last 30
+    days of each offer.
+    """
+    to_add = []
+    to_delete_ids = []
+    offers = get_base_query_for_offer_indexation().filter(offers_models.Offer.id.in_(offer_ids))
+
+    last_30_days_bookings = get_last_30_days_bookings(offer_ids)
+
+    for offer in offers:
+        if offer and offer.is_eligible_for_search:
+            to_add.append(offer)
+        elif backend.check_offer_is_indexed(offer):
+            to_delete_ids.append(offer.id)
+        else:
+            # FIXME (dbaty, 2021-06-24). I think we could safely do
+            # without the hashmap in Redis. Check the logs and see if
+            # I am right!
+            logger.info(
+                "Redis 'indexed_offers' set avoided unnecessary request to indexation service",
+                extra={"source": "reindex_offer_ids", "offer": offer.id},
+            )
+
+    return to_add, to_delete_ids, last_30_days_bookings
+
+
 def unindex_offer_ids(offer_ids: Iterable[int]) -> None:
     backend = _get_backend()
     try:
@@ -1,6 +1,11 @@
+import decimal
 import enum
+import hashlib
+import json
 import logging
 import re
+import time
+import typing
 from typing import Iterable
 import urllib.parse
 
@@ -10,10 +15,13 @@ import redis
 import sqlalchemy as sa
 
 from pcapi import settings
+from pcapi.core.categories import subcategories
+from pcapi.core.categories import subcategories_v2
 import pcapi.core.educational.models as educational_models
 import pcapi.core.offerers.api as offerers_api
 import pcapi.core.offerers.models as offerers_models
 import pcapi.core.offers.models as offers_models
+from pcapi.core.search import offer_rows
 from pcapi.core.search.backends import base
 from pcapi.domain.music_types import MUSIC_TYPES_LABEL_BY_CODE
 from pcapi.domain.show_types import SHOW_TYPES_LABEL_BY_CODE
@@ -35,6 +43,7 @@ REDIS_COLLECTIVE_OFFER_IDS_TO_INDEX = "search:algolia:collective-offer-ids-to-in
 REDIS_COLLECTIVE_OFFER_TEMPLATE_IDS_TO_INDEX = "search:algolia:collective-offer-template-ids-to-index"
 REDIS_COLLECTIVE_OFFER_IDS_IN_ERROR_TO_INDEX = "search:algolia:collective-offer-ids-in-error-to-index"
 REDIS_COLLECTIVE_OFFER_TEMPLATE_IDS_IN_ERROR_TO_INDEX = "search:algolia:collective-offer-template-ids-in-error-to-index"
+# Offer id -> digest of the last document sent to Algolia
 REDIS_HASHMAP_INDEXED_OFFERS_NAME = "indexed_offers"
 
 
@@ -43,6 +52,8 @@ DEFAULT_LATITUDE = 47.158459
 
 WORD_SPLITTER = re.compile(r"\W+")
 
+BOOK_MACRO_SECTIONS_CACHE_TTL = 60 * 60  # seconds
+
 
 class Last30DaysBookingsRange(enum.Enum):
     VERY_LOW = "very-low"
@@ -93,6 +104,14 @@ def url_path(url: str) -> str | None:
     return path
 
 
+def get_document_digest(document: dict) -> str:
+    """Return a short digest of a serialized document, used to detect
+    whether it has changed since it was last indexed.
+    """
+    serialized = json.dumps(document, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(serialized, digest_size=8).hexdigest()
+
+
 def remove_stopwords(s: str) -> str:
     """Remove French stopwords from the given string and return what's
     left, lowercased.
@@ -107,6 +126,53 @@ def remove_stopwords(s: str) -> str:
     return " ".join(words)
 
 
+class BookMacroSectionCache:
+    """A process-wide map of book sections (lowercased) to their macro
+    section.
+
+    ``BookMacroSection`` is a small reference table that is almost
+    never modified. Instead of querying it for each book offer that we
+    serialize, we load it once and reload it when it gets older than
+    ``ttl`` seconds, or when a row is modified in this process (see
+    ``_invalidate_book_macro_sections_cache`` below).
+    """
+
+    def __init__(self, ttl: int = BOOK_MACRO_SECTIONS_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._macro_sections: dict[str, str] | None = None
+        self._loaded_at = 0.0
+
+    def get(self, section: str) -> str | None:
+        """Return the macro section of the given section, or None if
+        it is unknown. ``section`` must already be lowercased.
+        """
+        if self._macro_sections is None or time.monotonic() - self._loaded_at > self.ttl:
+            self._load()
+        return self._macro_sections.get(section)  # type: ignore [union-attr]
+
+    def invalidate(self) -> None:
+        self._macro_sections = None
+
+    def _load(self) -> None:
+        rows = offers_models.BookMacroSection.query.with_entities(
+            offers_models.BookMacroSection.section,
+            offers_models.BookMacroSection.macroSection,
+        ).all()
+        # Some macro sections have trailing whitespaces in the database.
+        self._macro_sections = {row.section.lower(): row.macroSection.strip() for row in rows}
+        self._loaded_at = time.monotonic()
+
+
+book_macro_sections_cache = BookMacroSectionCache()
+
+
+@sa.event.listens_for(offers_models.BookMacroSection, "after_insert")
+@sa.event.listens_for(offers_models.BookMacroSection, "after_update")
+@sa.event.listens_for(offers_models.BookMacroSection, "after_delete")
+def _invalidate_book_macro_sections_cache(*args: typing.Any) -> None:
+    book_macro_sections_cache.invalidate()
+
+
 class AlgoliaBackend(base.SearchBackend):
     def __init__(self) -> None:
         super().__init__()
@@ -245,28 +311,82 @@ class AlgoliaBackend(base.SearchBackend):
             # cache so that we do perform a request to Algolia.
             return True
 
-    def index_offers(self, offers: Iterable[offers_models.Offer], last_30_days_bookings: dict[int, int]) -> None:
+    def index_offers(
+        self,
+        offers: Iterable[offers_models.Offer],
+        last_30_days_bookings: dict[int, int],
+        force: bool = False,
+    ) -> None:
         if not offers:
             return
         objects = [self.serialize_offer(offer, last_30_days_bookings.get(offer.id) or 0) for offer in offers]
-        self.algolia_offers_client.save_objects(objects)
+        self.index_serialized_offers(objects, force=force)
+
+    def index_offer_rows(
+        self,
+        rows: Iterable[offer_rows.OfferRow],
+        last_30_days_bookings: dict[int, int],
+        force: bool = False,
+    ) -> None:
+        if not rows:
+            return
+        objects = [self.serialize_offer_row(row, last_30_days_bookings.get(row.id) or 0) for row in rows]
+        self.index_serialized_offers(objects, force=force)
+
+    def index_serialized_offers(self, objects: list[dict], force: bool = False) -> None:
+        """Send already serialized offers to Algolia.
+
+        This is split from ``index_offers`` so that serialization
+        (which needs the database) and the network call to Algolia
+        can be done in different threads (see
+        ``pcapi.core.search.index_offers_in_queue_pipelined``).
+
+        Offers whose serialized document has not changed since the
+        last time they were sent are not sent again. To do so, we
+        store a digest of each indexed document in Redis. Use ``force``
+        to send all offers anyway (e.g. when the Algolia index may
+        have lost some of them).
+        """
+        if not objects:
+            return
+
+        digests = {obj["objectID"]: get_document_digest(obj) for obj in objects}
+        offer_ids = list(digests)
+        if force:
+            indexed_digests = [None] * len(offer_ids)
+        else:
+            try:
+                indexed_digests = self.redis_client.hmget(REDIS_HASHMAP_INDEXED_OFFERS_NAME, offer_ids)
+            except redis.exceptions.RedisError:
+                if settings.IS_RUNNING_TESTS:
+                    raise
+                logger.exception("Could not get digests of indexed offers", extra={"offers": offer_ids})
+                indexed_digests = [None] * len(offer_ids)
+        unchanged_offer_ids = {
+            offer_id
+            for offer_id, indexed_digest in zip(offer_ids, indexed_digests)
+            if indexed_digest == digests[offer_id]
+        }
+        to_push = [obj for obj in objects if obj["objectID"] not in unchanged_offer_ids]
+
+        logger.info(
+            "Skipped unchanged offers before indexation",
+            extra={"pushed": len(to_push), "skipped": len(unchanged_offer_ids)},
+        )
+        if not to_push:
+            return
+
+        self.algolia_offers_client.save_objects(to_push)
 
         try:
-            # We used to store a summary of each offer, which is why
-            # we used hashmap and not a set. But since we don't need
-            # the value anymore, we can store the lightest object
-            # possible to make Redis use less memory. In the future,
-            # we may even remove the hashmap if it's not proven useful
-            # (see log in reindex_offer_ids)
-            offer_ids = [offer.id for offer in offers]
-            pipeline = self.redis_client.pipeline(transaction=True)
-            for offer_id in offer_ids:
-                pipeline.hset(REDIS_HASHMAP_INDEXED_OFFERS_NAME, offer_id, "")
-            pipeline.execute()
-        except Exception:  # pylint: disable=broad-except
+            self.redis_client.hset(
+                REDIS_HASHMAP_INDEXED_OFFERS_NAME,
+                mapping={obj["objectID"]: digests[obj["objectID"]] for obj in to_push},
+            )
+        except redis.exceptions.RedisError:
+            if settings.IS_RUNNING_TESTS:
+                raise
             logger.exception("Could not add to list of indexed offers", extra={"offers": offer_ids})
-        finally:
-            pipeline.reset()
 
     def index_collective_offers(
         self,
@@ -353,20 +473,27 @@ class AlgoliaBackend(base.SearchBackend):
 
     @classmethod
     def serialize_offer(cls, offer: offers_models.Offer, last_30_days_bookings: int) -> dict:
-        venue = offer.venue
-        offerer = venue.managingOfferer
-        prices = map(lambda stock: stock.price, offer.bookableStocks)
-        prices_sorted = sorted(prices, key=float)
+        return cls.serialize_offer_row(offer_rows.OfferRow.from_offer(offer), last_30_days_bookings)
+
+    @classmethod
+    def serialize_offer_row(cls, offer: offer_rows.OfferRow, last_30_days_bookings: int) -> dict:
+        subcategory = subcategories.ALL_SUBCATEGORIES_DICT[offer.subcategoryId]
+        subcategory_v2 = subcategories_v2.ALL_SUBCATEGORIES_DICT[offer.subcategoryId]
         dates = []
         times = []
-        if offer.isEvent:
-            dates = [stock.beginningDatetime.timestamp() for stock in offer.bookableStocks]  # type: ignore[union-attr]
+        if subcategory.is_event:
+            dates = [beginning_datetime.timestamp() for beginning_datetime in offer.beginningDatetimes]
             times = [
-                date_utils.get_time_in_seconds_from_datetime(stock.beginningDatetime) for stock in offer.bookableStocks  # type: ignore[arg-type]
+                date_utils.get_time_in_seconds_from_datetime(beginning_datetime)
+                for beginning_datetime in offer.beginningDatetimes
             ]
         date_created = offer.dateCreated.timestamp()
-        stocks_date_created = [stock.dateCreated.timestamp() for stock in offer.bookableStocks]
-        tags = [criterion.name for criterion in offer.criteria]
+        stocks_date_created = [stock_date_created.timestamp() for stock_date_created in offer.stocksDateCreated]
+        is_forbidden_to_underage = all(
+            (price > 0 and not subcategory.is_bookable_by_underage_when_not_free)
+            or (price == 0 and not subcategory.is_bookable_by_underage_when_free)
+            for price in offer.prices
+        )
         extra_data = offer.extraData or {}
         artist = " ".join(extra_data.get(key, "") for key in ("author", "performer", "speaker", "stageDirector"))  # type: ignore[misc]
 
@@ -394,16 +521,7 @@ class AlgoliaBackend(base.SearchBackend):
         macro_section = None
         section = (extra_data.get("rayon") or "").strip().lower()
         if section:
-            try:
-                macro_section = (
-                    offers_models.BookMacroSection.query.filter(
-                        sa.func.lower(offers_models.BookMacroSection.section) == section
-                    )
-                    .with_entities(offers_models.BookMacroSection.macroSection)
-                    .scalar()
-                ).strip()
-            except AttributeError:
-                macro_section = None
+            macro_section = book_macro_sections_cache.get(section)
 
         object_to_index = {
             "distinct": distinct,
@@ -417,40 +535,40 @@ class AlgoliaBackend(base.SearchBackend):
                 "isDigital": offer.isDigital,
                 "isDuo": offer.isDuo,
                 "isEducational": False,
-                "isEvent": offer.isEvent,
-                "isForbiddenToUnderage": offer.is_forbidden_to_underage,
-                "isThing": offer.isThing,
+                "isEvent": subcategory.is_event,
+                "isForbiddenToUnderage": is_forbidden_to_underage,
+                "isThing": not subcategory.is_event,
                 "last30DaysBookings": last_30_days_bookings,
                 "last30DaysBookingsRange": get_last_30_days_bookings_range(last_30_days_bookings),
                 "movieGenres": extra_data.get("genres"),
                 "musicType": music_type_label,
                 "name": offer.name,
-                "nativeCategoryId": offer.subcategory.native_category_id,
-                "prices": prices_sorted,
+                "nativeCategoryId": subcategory.native_category_id,
+                "prices": offer.prices,
                 # TODO(jeremieb): keep searchGroupNamev2 and remove
                 # remove searchGroupName once the search group name &
                 # home page label migration is over.
                 "rankingWeight": offer.rankingWeight,
-                "searchGroupName": offer.subcategory.search_group_name,
-                "searchGroupNamev2": offer.subcategory_v2.search_group_name,
+                "searchGroupName": subcategory.search_group_name,
+                "searchGroupNamev2": subcategory_v2.search_group_name,
                 "showType": show_type_label,
                 "stocksDateCreated": sorted(stocks_date_created),
                 "students": extra_data.get("students") or [],
-                "subcategoryId": offer.subcategory.id,
+                "subcategoryId": subcategory.id,
                 "thumbUrl": url_path(offer.thumbUrl),
-                "tags": tags,
+                "tags": offer.tags,
                 "times": list(set(times)),
             },
             "offerer": {
-                "name": offerer.name,
+                "name": offer.offererName,
             },
             "venue": {
-                "departmentCode": venue.departementCode,
-                "id": venue.id,
-                "name": venue.name,
-                "publicName": venue.publicName,
+                "departmentCode": offer.venueDepartementCode,
+                "id": offer.venueId,
+                "name": offer.venueName,
+                "publicName": offer.venuePublicName,
             },
-            "_geoloc": position(venue),
+            "_geoloc": _position(offer.venueLatitude, offer.venueLongitude),
         }
 
         return object_to_index
@@ -502,9 +620,9 @@ class AlgoliaBackend(base.SearchBackend):
                 "students": [student.value for student in collective_offer.students],
                 "subcategoryId": collective_offer.subcategoryId,
                 "domains": [domain.id for domain in collective_offer.domains],
-                "educationalInstitutionUAICode": collective_offer.institution.institutionId
-                if collective_offer.institution
-                else "all",
+                "educationalInstitutionUAICode": (
+                    collective_offer.institution.institutionId if collective_offer.institution else "all"
+                ),
                 "interventionArea": collective_offer.interventionArea,
                 "eventAddressType": collective_offer.offerVenue.get("addressType"),
                 "beginningDatetime": beginning_datetime,
@@ -556,8 +674,12 @@ class AlgoliaBackend(base.SearchBackend):
 
 
 def position(venue: offerers_models.Venue) -> dict[str, float]:
-    latitude = venue.latitude or DEFAULT_LATITUDE
-    longitude = venue.longitude or DEFAULT_LONGITUDE
+    return _position(venue.latitude, venue.longitude)
+
+
+def _position(latitude: decimal.Decimal | None, longitude: decimal.Decimal | None) -> dict[str, float]:
+    latitude = latitude or DEFAULT_LATITUDE
+    longitude = longitude or DEFAULT_LONGITUDE
     return {"lat": float(latitude), "lng": float(longitude)}
 
 
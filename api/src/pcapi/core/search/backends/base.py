@@ -6,6 +6,7 @@ if typing.TYPE_CHECKING:
     import pcapi.core.educational.models as educational_models
     import pcapi.core.offerers.models as offerers_models
     import pcapi.core.offers.models as offers_models
+    from pcapi.core.search import offer_rows
 
 
 class SearchBackend:
@@ -51,7 +52,23 @@ class SearchBackend:
     def check_offer_is_indexed(self, offer: "offers_models.Offer") -> bool:
         raise NotImplementedError()
 
-    def index_offers(self, offers: "Iterable[offers_models.Offer]", last_30_days_bookings: dict[int, int]) -> None:
+    def index_offers(
+        self,
+        offers: "Iterable[offers_models.Offer]",
+        last_30_days_bookings: dict[int, int],
+        force: bool = False,
+    ) -> None:
+        raise NotImplementedError()
+
+    def index_offer_rows(
+        self,
+        rows: "Iterable[offer_rows.OfferRow]",
+        last_30_days_bookings: dict[int, int],
+        force: bool = False,
+    ) -> None:
+        raise NotImplementedError()
+
+    def index_serialized_offers(self, objects: list[dict], force: bool = False) -> None:
         raise NotImplementedError()
 
     def index_collective_offers(self, collective_offers: "Iterable[educational_models.CollectiveOffer]") -> None:
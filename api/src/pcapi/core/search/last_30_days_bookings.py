@@ -0,0 +1,231 @@
+"""Maintain a per-offer counter of the bookings of the last 30 days.
+
+The number of bookings of an offer is sent to the search backend,
+where it is used for ranking. Computing it while indexing offers
+requires a join-and-count over recent bookings for each batch.
+Instead, we maintain the counter in Redis:
+
+- each day has its own hash (offer id -> number of bookings created
+  that day and not cancelled);
+- a "total" hash holds the sum of the buckets of the window, so that
+  reading the counter of an offer is a single lookup.
+
+Bookings creation and cancellation update both the bucket of the
+booking creation day and the total. Once a day, buckets that fall
+out of the window are subtracted from the total and deleted (see
+``expire_buckets()``).
+
+The window is made of the current day and the 29 previous days (in
+UTC). This is slightly different from the "now - 30 days" filter of
+``get_base_query_for_last_30_days_bookings()``, which is not a
+problem for ranking.
+"""
+
+import datetime
+import logging
+from typing import Iterable
+
+from flask import current_app
+import redis
+import sqlalchemy as sa
+
+from pcapi import settings
+from pcapi.core.bookings import models as bookings_models
+from pcapi.core.offers import models as offers_models
+from pcapi.models import db
+
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = 30
+REDIS_BUCKET_PREFIX = "search:algolia:last-30-days-bookings:day:"
+REDIS_TOTAL_NAME = "search:algolia:last-30-days-bookings:total"
+BACKFILL_SUFFIX = ":backfill"
+BACKFILL_CHUNK_SIZE = 10_000
+
+
+def _get_redis() -> redis.Redis:
+    return current_app.redis_client  # type: ignore [attr-defined]
+
+
+def _get_bucket_name(day: datetime.date) -> str:
+    return f"{REDIS_BUCKET_PREFIX}{day.isoformat()}"
+
+
+def get_window_start(now: datetime.datetime | None = None) -> datetime.datetime:
+    """Return the (inclusive) start of the window, i.e. midnight of the
+    oldest day of the window.
+    """
+    now = now or datetime.datetime.utcnow()
+    first_day = now.date() - datetime.timedelta(days=WINDOW_DAYS - 1)
+    return datetime.datetime.combine(first_day, datetime.time.min)
+
+
+def _update(bookings: Iterable[tuple[int, datetime.datetime]], increment: int) -> None:
+    window_start = get_window_start()
+    bookings = [(offer_id, date_created) for offer_id, date_created in bookings if date_created >= window_start]
+    if not bookings:
+        return
+    try:
+        pipeline = _get_redis().pipeline(transaction=True)
+        for offer_id, date_created in bookings:
+            pipeline.hincrby(_get_bucket_name(date_created.date()), offer_id, increment)
+            pipeline.hincrby(REDIS_TOTAL_NAME, offer_id, increment)
+        pipeline.execute()
+    except redis.exceptions.RedisError:
+        if settings.IS_RUNNING_TESTS:
+            raise
+        logger.exception(
+            "Could not update last 30 days bookings counter",
+            extra={"offers": [offer_id for offer_id, _ in bookings], "increment": increment},
+        )
+
+
+def add_bookings(bookings: Iterable[tuple[int, datetime.datetime]]) -> None:
+    """Count new (or uncancelled) bookings, given as
+    ``(offer_id, booking_date_created)`` tuples.
+    """
+    _update(bookings, 1)
+
+
+def remove_bookings(bookings: Iterable[tuple[int, datetime.datetime]]) -> None:
+    """Discount cancelled bookings, given as
+    ``(offer_id, booking_date_created)`` tuples.
+    """
+    _update(bookings, -1)
+
+
+def get_counts(offer_ids: Iterable[int]) -> dict[int, int]:
+    """Return the number of bookings of the last 30 days of the
+    requested offers. Offers without any booking are omitted.
+    """
+    offer_ids = list(offer_ids)
+    if not offer_ids:
+        return {}
+    counts = _get_redis().hmget(REDIS_TOTAL_NAME, offer_ids)
+    return {offer_id: int(count) for offer_id, count in zip(offer_ids, counts) if count and int(count) > 0}
+
+
+def expire_buckets(now: datetime.datetime | None = None) -> int:
+    """Subtract buckets that are out of the window from the total and
+    delete them. Return the number of expired buckets.
+
+    This function should be called daily, shortly after midnight (UTC).
+    """
+    redis_client = _get_redis()
+    window_start_day = get_window_start(now).date()
+    expired = 0
+    for bucket_name in redis_client.scan_iter(match=f"{REDIS_BUCKET_PREFIX}*"):
+        if bucket_name.endswith(BACKFILL_SUFFIX):
+            continue
+        day = datetime.date.fromisoformat(bucket_name[len(REDIS_BUCKET_PREFIX) :])
+        if day >= window_start_day:
+            continue
+
+        def expire(pipeline: redis.client.Pipeline, bucket_name: str = bucket_name) -> None:
+            counts = pipeline.hgetall(bucket_name)
+            pipeline.multi()
+            for offer_id, count in counts.items():
+                pipeline.hincrby(REDIS_TOTAL_NAME, offer_id, -int(count))
+            pipeline.delete(bucket_name)
+
+        # Watch the bucket, in case a booking of that day is cancelled
+        # at the same time.
+        redis_client.transaction(expire, bucket_name)
+        expired += 1
+    logger.info("Expired last 30 days bookings buckets", extra={"buckets": expired})
+    return expired
+
+
+def _get_bookings_count_by_offer_and_day_query(window_start: datetime.datetime) -> sa.sql.Select:
+    day = sa.cast(bookings_models.Booking.dateCreated, sa.Date)
+    return (
+        sa.select(
+            offers_models.Stock.offerId.label("offer_id"),
+            day.label("day"),
+            sa.func.count(bookings_models.Booking.id).label("bookings_number"),
+        )
+        .select_from(bookings_models.Booking)
+        .join(bookings_models.Booking.stock)
+        .where(
+            bookings_models.Booking.dateCreated >= window_start,
+            bookings_models.Booking.status != bookings_models.BookingStatus.CANCELLED,
+        )
+        .group_by(offers_models.Stock.offerId, day)
+    )
+
+
+def backfill() -> None:
+    """(Re)build all counters from the database.
+
+    Counters are built under temporary names and then renamed, so
+    that indexation never sees partial counters. Bookings that are
+    created or cancelled while the database is read may be missed:
+    ``check_consistency()`` tells whether it has been the case.
+    """
+    redis_client = _get_redis()
+    window_start = get_window_start()
+    rows = db.session.execute(
+        _get_bookings_count_by_offer_and_day_query(window_start), execution_options={"stream_results": True}
+    )
+
+    def backfill_name(name: str) -> str:
+        return f"{name}{BACKFILL_SUFFIX}"
+
+    temporary_names = {backfill_name(REDIS_TOTAL_NAME)}
+    redis_client.delete(backfill_name(REDIS_TOTAL_NAME))
+    for partition in rows.partitions(BACKFILL_CHUNK_SIZE):
+        pipeline = redis_client.pipeline(transaction=False)
+        for row in partition:
+            bucket_name = backfill_name(_get_bucket_name(row.day))
+            if bucket_name not in temporary_names:
+                pipeline.delete(bucket_name)
+                temporary_names.add(bucket_name)
+            pipeline.hset(bucket_name, row.offer_id, row.bookings_number)
+            pipeline.hincrby(backfill_name(REDIS_TOTAL_NAME), row.offer_id, row.bookings_number)
+        pipeline.execute()
+
+    pipeline = redis_client.pipeline(transaction=True)
+    existing = [name for name in redis_client.scan_iter(match=f"{REDIS_BUCKET_PREFIX}*") if name not in temporary_names]
+    existing.append(REDIS_TOTAL_NAME)
+    pipeline.delete(*existing)
+    for name in temporary_names:
+        if redis_client.exists(name):  # the total does not exist if there is no booking
+            pipeline.rename(name, name[: -len(BACKFILL_SUFFIX)])
+    pipeline.execute()
+    logger.info("Backfilled last 30 days bookings counters", extra={"buckets": len(temporary_names) - 1})
+
+
+def check_consistency(offer_ids: Iterable[int] | None = None) -> dict[int, tuple[int, int]]:
+    """Compare counters with the SQL aggregate over the same window.
+
+    Return a dictionary of inconsistent offers, with the expected
+    number of bookings (from the database) and the counted one (from
+    Redis). If ``offer_ids`` is not given, all offers that have a
+    counter or a booking in the window are checked.
+    """
+    from pcapi.core import search  # avoid circular import
+
+    query = search.get_base_query_for_last_30_days_bookings(since=get_window_start())
+    if offer_ids is not None:
+        offer_ids = list(offer_ids)
+        query = query.where(offers_models.Offer.id.in_(offer_ids))
+        counted = get_counts(offer_ids)
+    else:
+        counted = {
+            int(offer_id): int(count)
+            for offer_id, count in _get_redis().hgetall(REDIS_TOTAL_NAME).items()
+            if int(count) > 0
+        }
+    expected = {row.offer_id: row.bookings_number for row in db.session.execute(query)}
+
+    inconsistencies = {}
+    for offer_id in expected.keys() | counted.keys():
+        if expected.get(offer_id, 0) != counted.get(offer_id, 0):
+            inconsistencies[offer_id] = (expected.get(offer_id, 0), counted.get(offer_id, 0))
+    if inconsistencies:
+        logger.warning(
+            "Found inconsistent last 30 days bookings counters",
+            extra={"count": len(inconsistencies), "offers": sorted(inconsistencies)[:100]},
+        )
+    return inconsistencies
@@ -0,0 +1,220 @@
+"""A lightweight, projection-only representation of offers, to be
+indexed by the search backend.
+
+``get_base_query_for_offer_indexation()`` hydrates full ORM graphs
+(offer, venue, offerer, product, mediations, criteria and stocks),
+with joined loads that multiply rows (stocks x mediations x criteria).
+Here we only select the columns that the serializer needs, and let
+the database aggregate bookable stocks.
+"""
+
+import dataclasses
+import datetime
+import decimal
+from typing import Iterable
+
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as sa_psql
+
+from pcapi import settings
+import pcapi.core.criteria.models as criteria_models
+import pcapi.core.offerers.models as offerers_models
+import pcapi.core.offers.models as offers_models
+from pcapi.models import db
+from pcapi.models.has_thumb_mixin import get_thumb_storage_id_suffix
+from pcapi.utils.human_ids import humanize
+
+
+@dataclasses.dataclass
+class OfferRow:
+    id: int
+    name: str
+    description: str | None
+    dateCreated: datetime.datetime
+    extraData: dict | None
+    isDuo: bool
+    isDigital: bool
+    isReleased: bool
+    subcategoryId: str
+    rankingWeight: int | None
+    thumbUrl: str | None
+    tags: list[str]
+    offererName: str
+    venueId: int
+    venueName: str
+    venuePublicName: str | None
+    venueDepartementCode: str | None
+    venueLatitude: decimal.Decimal | None
+    venueLongitude: decimal.Decimal | None
+    # The following lists only contain data about bookable stocks.
+    # Prices are sorted, other lists are sorted by stock id.
+    prices: list[decimal.Decimal]
+    beginningDatetimes: list[datetime.datetime]
+    stocksDateCreated: list[datetime.datetime]
+
+    @property
+    def is_eligible_for_search(self) -> bool:
+        return self.isReleased and bool(self.prices)
+
+    @classmethod
+    def from_offer(cls, offer: offers_models.Offer) -> "OfferRow":
+        venue = offer.venue
+        bookable_stocks = sorted(offer.bookableStocks, key=lambda stock: stock.id)
+        return cls(
+            id=offer.id,
+            name=offer.name,
+            description=offer.description,
+            dateCreated=offer.dateCreated,
+            extraData=offer.extraData,
+            isDuo=offer.isDuo,
+            isDigital=offer.isDigital,
+            isReleased=offer.isReleased,
+            subcategoryId=offer.subcategoryId,
+            rankingWeight=offer.rankingWeight,
+            thumbUrl=offer.thumbUrl,
+            tags=[criterion.name for criterion in sorted(offer.criteria, key=lambda criterion: criterion.id)],
+            offererName=venue.managingOfferer.name,
+            venueId=venue.id,
+            venueName=venue.name,
+            venuePublicName=venue.publicName,
+            venueDepartementCode=venue.departementCode,
+            venueLatitude=venue.latitude,
+            venueLongitude=venue.longitude,
+            prices=sorted((stock.price for stock in bookable_stocks), key=float),
+            beginningDatetimes=[stock.beginningDatetime for stock in bookable_stocks if stock.beginningDatetime],
+            stocksDateCreated=[stock.dateCreated for stock in bookable_stocks],
+        )
+
+
+def _build_thumb_url(path_component: str, object_id: int | None, thumb_count: int | None) -> str | None:
+    # Same as `HasThumbMixin.thumbUrl`, without an ORM object.
+    if not object_id or not thumb_count:
+        return None
+    suffix = get_thumb_storage_id_suffix(thumb_count)
+    return f"{settings.OBJECT_STORAGE_URL}/thumbs/{path_component}/{humanize(object_id)}{suffix}"
+
+
+def get_offer_rows(offer_ids: Iterable[int]) -> list[OfferRow]:
+    """Return an ``OfferRow`` for each requested offer that exists.
+
+    This function runs 4 flat queries, whatever the number of offers,
+    stocks, mediations and criteria.
+    """
+    offer_ids = list(offer_ids)
+    if not offer_ids:
+        return []
+
+    Offer = offers_models.Offer
+    Stock = offers_models.Stock
+    Mediation = offers_models.Mediation
+
+    offers = db.session.execute(
+        sa.select(
+            Offer.id,
+            Offer.name,
+            Offer.description,
+            Offer.dateCreated,
+            Offer.extraData,
+            Offer.isDuo,
+            Offer.url,
+            Offer.subcategoryId,
+            Offer.rankingWeight,
+            sa.and_(Offer._released, offerers_models.Offerer.isActive, offerers_models.Offerer.isValidated).label(
+                "isReleased"
+            ),
+            offers_models.Product.id.label("productId"),
+            offers_models.Product.thumbCount.label("productThumbCount"),
+            offerers_models.Offerer.name.label("offererName"),
+            offerers_models.Venue.id.label("venueId"),
+            offerers_models.Venue.name.label("venueName"),
+            offerers_models.Venue.publicName.label("venuePublicName"),
+            offerers_models.Venue.departementCode.label("venueDepartementCode"),
+            offerers_models.Venue.latitude.label("venueLatitude"),
+            offerers_models.Venue.longitude.label("venueLongitude"),
+        )
+        .select_from(Offer)
+        .join(offerers_models.Venue, Offer.venueId == offerers_models.Venue.id)
+        .join(offerers_models.Offerer, offerers_models.Venue.managingOffererId == offerers_models.Offerer.id)
+        .outerjoin(offers_models.Product, Offer.productId == offers_models.Product.id)
+        .where(Offer.id.in_(offer_ids))
+    ).all()
+
+    stocks = {
+        row.offerId: row
+        for row in db.session.execute(
+            sa.select(
+                Stock.offerId,
+                sa.func.array_agg(sa_psql.aggregate_order_by(Stock.price, Stock.price)).label("prices"),
+                sa.func.array_agg(sa_psql.aggregate_order_by(Stock.beginningDatetime, Stock.id)).label(
+                    "beginningDatetimes"
+                ),
+                sa.func.array_agg(sa_psql.aggregate_order_by(Stock.dateCreated, Stock.id)).label("stocksDateCreated"),
+            )
+            .where(Stock.offerId.in_(offer_ids), Stock._bookable)
+            .group_by(Stock.offerId)
+        )
+    }
+
+    tags = dict(
+        db.session.execute(
+            sa.select(
+                criteria_models.OfferCriterion.offerId,
+                sa.func.array_agg(
+                    sa_psql.aggregate_order_by(criteria_models.Criterion.name, criteria_models.Criterion.id)
+                ),
+            )
+            .join(criteria_models.Criterion, criteria_models.OfferCriterion.criterionId == criteria_models.Criterion.id)
+            .where(criteria_models.OfferCriterion.offerId.in_(offer_ids))
+            .group_by(criteria_models.OfferCriterion.offerId)
+        ).all()
+    )
+
+    # The "active mediation" of an offer is its most recent active mediation.
+    active_mediations = {
+        row.offerId: row
+        for row in db.session.execute(
+            sa.select(Mediation.offerId, Mediation.id, Mediation.thumbCount)
+            .distinct(Mediation.offerId)
+            .where(Mediation.offerId.in_(offer_ids), Mediation.isActive.is_(True))
+            .order_by(Mediation.offerId, Mediation.dateCreated.desc())
+        )
+    }
+
+    rows = []
+    for offer in offers:
+        mediation = active_mediations.get(offer.id)
+        thumb_url = None
+        if mediation:
+            thumb_url = _build_thumb_url(Mediation.thumb_path_component, mediation.id, mediation.thumbCount)
+        if not thumb_url:
+            thumb_url = _build_thumb_url(
+                offers_models.Product.thumb_path_component, offer.productId, offer.productThumbCount
+            )
+        stock = stocks.get(offer.id)
+        rows.append(
+            OfferRow(
+                id=offer.id,
+                name=offer.name,
+                description=offer.description,
+                dateCreated=offer.dateCreated,
+                extraData=offer.extraData,
+                isDuo=offer.isDuo,
+                isDigital=offer.url is not None and offer.url != "",
+                isReleased=offer.isReleased,
+                subcategoryId=offer.subcategoryId,
+                rankingWeight=offer.rankingWeight,
+                thumbUrl=thumb_url,
+                tags=tags.get(offer.id, []),
+                offererName=offer.offererName,
+                venueId=offer.venueId,
+                venueName=offer.venueName,
+                venuePublicName=offer.venuePublicName,
+                venueDepartementCode=offer.venueDepartementCode,
+                venueLatitude=offer.venueLatitude,
+                venueLongitude=offer.venueLongitude,
+                prices=stock.prices if stock else [],
+                beginningDatetimes=[dt for dt in stock.beginningDatetimes if dt] if stock else [],
+                stocksDateCreated=stock.stocksDateCreated if stock else [],
+            )
+        )
+    return rows
@@ -19,6 +19,7 @@ import sqlalchemy.orm
 
 from pcapi import settings
 from pcapi.models import db
+from pcapi.models import feature as feature_module
 from pcapi.models.feature import Feature
 
 
@@ -314,6 +315,8 @@ class override_features(TestContextDecorator):
                 self.apply_to_revert[name] = not status
                 Feature.query.filter_by(name=name).update({"isActive": status})
                 db.session.commit()
+        if self.apply_to_revert:
+            feature_module.bump_version()
         # Clear the feature cache on request if any
         if flask.has_request_context():
             if hasattr(flask.request, "_cached_features"):
@@ -323,6 +326,8 @@ class override_features(TestContextDecorator):
         for name, status in self.apply_to_revert.items():
             Feature.query.filter_by(name=name).update({"isActive": status})
             db.session.commit()
+        if self.apply_to_revert:
+            feature_module.bump_version()
         # Clear the feature cache on request if any
         if flask.has_request_context():
             if hasattr(flask.request, "_cached_features"):
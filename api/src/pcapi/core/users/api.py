@@ -930,17 +930,15 @@ def _filter_user_accounts(accounts: BaseQuery, search_term: str, order_by: list[
     if email_utils.is_valid_email(sanitized_term):
         term_filters.append(models.User.email == sanitized_term)
     elif email_utils.is_valid_email_domain(sanitized_term):
-        # search for all emails @domain.ext
-        term_filters.append(models.User.email.like(f"%{sanitized_term}"))
+        # search for all emails @domain.ext, as a prefix search on the
+        # reversed email, which is indexed
+        term_filters.append(sa.func.reverse(models.User.email).like(f"{sanitized_term[::-1]}%"))
 
     if not term_filters:
-        name_term = search_term
+        # `searchName` is unaccented and lowercased, and has a trigram index
+        name_term = clean_accents(search_term).lower()
         for name in name_term.split():
-            term_filters.append(
-                sa.func.unaccent(sa.func.concat(models.User.firstName, " ", models.User.lastName)).ilike(
-                    f"%{clean_accents(name)}%"
-                )
-            )
+            term_filters.append(models.User.searchName.like(f"%{name}%"))
         filters.append(sa.and_(*term_filters) if len(term_filters) > 1 else term_filters[0])
 
     else:
@@ -956,12 +954,7 @@ def _filter_user_accounts(accounts: BaseQuery, search_term: str, order_by: list[
             raise ApiErrors({"sorting": str(err)})
 
     if name_term:
-        name_term = name_term.lower()
-        accounts = accounts.order_by(
-            sa.func.levenshtein(
-                sa.func.lower(sa.func.concat(models.User.firstName, " ", models.User.lastName)), name_term
-            )
-        )
+        accounts = accounts.order_by(sa.func.similarity(models.User.searchName, name_term).desc())
 
     if not order_by:
         accounts = accounts.order_by(models.User.id)
@@ -185,6 +185,12 @@ class User(PcObject, Base, Model, NeedsValidationMixin, DeactivableMixin):
     dateOfBirth = sa.Column(sa.DateTime, nullable=True)  # declared at signup
     departementCode = sa.Column(sa.String(3), nullable=True)
     email: str = sa.Column(sa.String(120), nullable=False, unique=True)
+    # Allows searching by email domain (i.e. by suffix) with a prefix search.
+    sa.Index(
+        "ix_user_reversed_email",
+        func.reverse(email).label("reversed_email"),
+        postgresql_ops={"reversed_email": "text_pattern_ops"},
+    )
     externalIds = sa.Column(postgresql.json.JSONB, nullable=True, default={}, server_default="{}")
     extraData: dict = sa.Column(
         MutableDict.as_mutable(postgresql.json.JSONB), nullable=True, default={}, server_default="{}"
@@ -218,6 +224,12 @@ class User(PcObject, Base, Model, NeedsValidationMixin, DeactivableMixin):
         server_default="{}",
     )
     schoolType = sa.Column(sa.Enum(SchoolTypeEnum, create_constraint=False), nullable=True)
+    # Unaccented and lowercased full name, maintained by the
+    # `user_search_name` trigger and used by backoffice searches.
+    searchName = sa.Column(sa.Text, nullable=True)
+    sa.Index(
+        "idx_user_trgm_search_name", searchName, postgresql_using="gin", postgresql_ops={"searchName": "gin_trgm_ops"}
+    )
     validatedBirthDate = sa.Column(sa.Date, nullable=True)  # validated by an Identity Provider
     backoffice_profile = orm.relationship("BackOfficeUserProfile", uselist=False, back_populates="user")  # type: ignore [misc]
     sa.Index("ix_user_validatedBirthDate", validatedBirthDate)
@@ -590,6 +602,27 @@ class User(PcObject, Base, Model, NeedsValidationMixin, DeactivableMixin):
         return cls.roles.contains([UserRole.TEST])
 
 
+User.trig_search_name_ddl = """
+    CREATE OR REPLACE FUNCTION update_user_search_name()
+    RETURNS TRIGGER AS $$
+    BEGIN
+      NEW."searchName" := lower(unaccent(concat_ws(' ', NEW."firstName", NEW."lastName")));
+      RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS user_search_name ON "user";
+
+    CREATE TRIGGER user_search_name
+    BEFORE INSERT OR UPDATE OF "firstName", "lastName"
+    ON "user"
+    FOR EACH ROW
+    EXECUTE PROCEDURE update_user_search_name()
+    """
+
+sa.event.listen(User.__table__, "after_create", sa.DDL(User.trig_search_name_ddl))
+
+
 class ExpenseDomain(enum.Enum):
     ALL = "all"
     DIGITAL = "digital"
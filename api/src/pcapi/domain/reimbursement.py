@@ -1,6 +1,9 @@
+import bisect
+from collections import defaultdict
 from dataclasses import dataclass
 import datetime
 from decimal import Decimal
+import typing
 
 from pcapi.core.bookings.models import Booking
 from pcapi.core.categories import subcategories
@@ -198,6 +201,37 @@ assert [r.description for r in REGULAR_RULES] == [
 ]
 
 
+# Regular rules that may be relevant, depending on the reimbursement
+# rule of the subcategory of the offer (see `is_relevant()` of each
+# rule). Rules are in the same order as in `REGULAR_RULES`.
+_REGULAR_RULES_BY_SUBCATEGORY_RULE = {
+    subcategories.ReimbursementRuleChoices.NOT_REIMBURSED.value: [
+        rule for rule in REGULAR_RULES if isinstance(rule, DigitalThingsReimbursement)
+    ],
+    subcategories.ReimbursementRuleChoices.STANDARD.value: [
+        rule
+        for rule in REGULAR_RULES
+        if isinstance(
+            rule,
+            (
+                PhysicalOffersReimbursement,
+                LegacyPreSeptember2021ReimbursementRateByVenueBetween20000And40000,
+                LegacyPreSeptember2021ReimbursementRateByVenueBetween40000And150000,
+                LegacyPreSeptember2021ReimbursementRateByVenueAbove150000,
+                ReimbursementRateByVenueBetween20000And40000,
+                ReimbursementRateByVenueBetween40000And150000,
+                ReimbursementRateByVenueAbove150000,
+            ),
+        )
+    ],
+    subcategories.ReimbursementRuleChoices.BOOK.value: [
+        rule
+        for rule in REGULAR_RULES
+        if isinstance(rule, (ReimbursementRateForBookBelow20000, ReimbursementRateForBookAbove20000))
+    ],
+}
+
+
 @dataclass
 class BookingReimbursement:
     booking: Booking
@@ -205,27 +239,106 @@ class BookingReimbursement:
     reimbursed_amount: Decimal
 
 
+class _RuleTimeline:
+    """Custom rules of the same offer (or the same offerer and
+    subcategory), sorted by start date.
+
+    These rules cannot overlap (see
+    `finance.validation._check_reimbursement_rule_conflicts()`), so
+    the rule that applies at a given date, if any, is the last rule
+    that starts before this date.
+    """
+
+    def __init__(self, rules: list[finance_models.CustomReimbursementRule]) -> None:
+        self.rules = sorted(rules, key=lambda rule: rule.timespan.lower)
+        self.starts = [rule.timespan.lower for rule in self.rules]
+
+    def _get_active_rule(self, index: int, date: datetime.datetime) -> finance_models.CustomReimbursementRule | None:
+        if index < 0:
+            return None
+        rule = self.rules[index]
+        if rule.timespan.upper is not None and date >= rule.timespan.upper:
+            return None
+        return rule
+
+    def find(self, date: datetime.datetime) -> finance_models.CustomReimbursementRule | None:
+        return self._get_active_rule(bisect.bisect_right(self.starts, date) - 1, date)
+
+    def find_all(self, dates: list[datetime.datetime]) -> list[finance_models.CustomReimbursementRule | None]:
+        """Same as ``find()`` for a list of dates, which must be sorted."""
+        found = []
+        index = -1
+        for date in dates:
+            while index + 1 < len(self.starts) and self.starts[index + 1] <= date:
+                index += 1
+            found.append(self._get_active_rule(index, date))
+        return found
+
+
 class CustomRuleFinder:
-    def __init__(self) -> None:
-        self.rules = finance_models.CustomReimbursementRule.query.all()
-        self.rules_by_offer = self._partition_by_field("offerId")
-        self.rules_by_offerer = self._partition_by_field("offererId")
+    """Find the custom rule that applies to a booking, if any.
 
-    def _partition_by_field(self, field: str) -> dict:
-        cache: dict[int, list[finance_models.CustomReimbursementRule]] = {}
-        for rule in self.rules:
-            cache.setdefault(getattr(rule, field), []).append(rule)
-        return cache
+    All rules are loaded and indexed once: the same instance should
+    be used to price all bookings of a pricing run.
+    """
+
+    def __init__(self) -> None:
+        rules_by_offer = defaultdict(list)
+        # Rules that apply on all subcategories are indexed with a
+        # `None` subcategory.
+        rules_by_offerer_and_subcategory = defaultdict(list)
+        for rule in finance_models.CustomReimbursementRule.query.all():
+            if rule.offerId:
+                rules_by_offer[rule.offerId].append(rule)
+            else:
+                for subcategory_id in rule.subcategories or [None]:
+                    rules_by_offerer_and_subcategory[(rule.offererId, subcategory_id)].append(rule)
+        self.rules_by_offer = {key: _RuleTimeline(rules) for key, rules in rules_by_offer.items()}
+        self.rules_by_offerer_and_subcategory = {
+            key: _RuleTimeline(rules) for key, rules in rules_by_offerer_and_subcategory.items()
+        }
+        self._prefetched: dict[int, finance_models.CustomReimbursementRule | None] = {}
+
+    def _get_timelines(self, booking: Booking) -> list[_RuleTimeline]:
+        # Rules on the offer have priority over rules on the offerer.
+        keys = (
+            (self.rules_by_offer, booking.stock.offerId),
+            (self.rules_by_offerer_and_subcategory, (booking.offererId, booking.stock.offer.subcategoryId)),
+            (self.rules_by_offerer_and_subcategory, (booking.offererId, None)),
+        )
+        return [index[key] for index, key in keys if key in index]  # type: ignore [index, operator]
 
     def get_rule(self, booking: Booking) -> finance_models.CustomReimbursementRule | None:
-        for rule in self.rules_by_offer.get(booking.stock.offerId, ()):
-            if rule.matches(booking, cumulative_revenue=0):  # cumulative revenue is ignored
-                return rule
-        for rule in self.rules_by_offerer.get(booking.offererId, ()):
-            if rule.matches(booking, cumulative_revenue=0):  # cumulative revenue is ignored
+        if booking.id in self._prefetched:
+            return self._prefetched.pop(booking.id)
+        for timeline in self._get_timelines(booking):
+            rule = timeline.find(booking.dateUsed)
+            if rule:
                 return rule
         return None
 
+    def prefetch(self, bookings: typing.Iterable[Booking]) -> None:
+        """Find rules of a batch of bookings at once, so that
+        subsequent calls to ``get_rule()`` on these bookings are
+        simple lookups.
+
+        Bookings are grouped by timelines and each timeline is walked
+        once, in date order.
+        """
+        bookings_by_timelines = defaultdict(list)
+        for booking in bookings:
+            timelines = tuple(self._get_timelines(booking))
+            if not timelines:
+                self._prefetched[booking.id] = None
+                continue
+            bookings_by_timelines[timelines].append(booking)
+        for timelines, timelines_bookings in bookings_by_timelines.items():
+            timelines_bookings.sort(key=lambda booking: booking.dateUsed)
+            dates = [booking.dateUsed for booking in timelines_bookings]
+            found = [timeline.find_all(dates) for timeline in timelines]
+            for booking, rules in zip(timelines_bookings, zip(*found)):
+                self._prefetched[booking.id] = next((rule for rule in rules if rule), None)
+
 
 def get_reimbursement_rule(
     booking: Booking | CollectiveBooking, custom_rule_finder: CustomRuleFinder, cumulative_revenue: Decimal
@@ -238,14 +351,19 @@ def get_reimbursement_rule(
         return custom_rule
 
     candidates = []
-    for rule in REGULAR_RULES:
+    for rule in _REGULAR_RULES_BY_SUBCATEGORY_RULE[booking.stock.offer.subcategory.reimbursement_rule]:
         if not rule.matches(booking, cumulative_revenue):
             continue
         if isinstance(rule, ReimbursementRateForBookAbove20000):
             return rule
         candidates.append(rule)
 
-    return min(candidates, key=lambda r: r.apply(booking))
+    # Candidates apply a rate on the same amount, so the cheapest
+    # candidate is the one with the lowest rate. If the amount is
+    # zero, all candidates are equally cheap: keep the first one.
+    if not booking.total_amount:
+        return candidates[0]
+    return min(candidates, key=lambda r: r.rate)  # type: ignore [attr-defined]
 
 
 def is_relevant_for_standard_reimbursement_rule(offer: Offer) -> bool:
@@ -4,7 +4,7 @@ from datetime import datetime
 import logging
 import typing
 
-from pcapi.connectors.thumb_storage import create_thumb
+from pcapi.connectors.thumb_storage import ThumbPipeline
 from pcapi.core import search
 import pcapi.core.offers.models as offers_models
 import pcapi.core.providers.models as providers_models
@@ -39,6 +39,7 @@ class LocalProvider(Iterator):
         self.checkedThumbs = 0
         self.erroredThumbs = 0
         self.provider = get_provider_by_local_class(self.__class__.__name__)
+        self.thumb_pipeline = ThumbPipeline()
 
     @property
     @abstractmethod
@@ -90,13 +91,19 @@ class LocalProvider(Iterator):
         if not new_thumb:
             return
 
-        _upload_thumb(
-            pc_object=pc_object,
-            image_as_bytes=new_thumb,
-            keep_poster_ratio=self.get_keep_poster_ratio(),
-        )
+        # The thumb is processed and uploaded in the background, see `_flush_thumbs()`.
+        if self.thumb_pipeline.add(pc_object, new_thumb, keep_ratio=self.get_keep_poster_ratio()):
+            self.createdThumbs += 1
 
-        self.createdThumbs += 1
+    def _flush_thumbs(self) -> None:
+        """Wait for pending thumbs to be uploaded. Objects whose thumb
+        could not be uploaded get their previous `thumbCount` back.
+        """
+        failed_objects = self.thumb_pipeline.flush()
+        if failed_objects:
+            self.log_provider_event(providers_models.LocalProviderEventType.SyncError, "ThumbUploadError")
+            self.erroredThumbs += len(failed_objects)
+            self.createdThumbs -= len(failed_objects)
 
     def _create_object(self, providable_info: ProvidableInfo) -> Model:
         pc_object = providable_info.type()
@@ -180,71 +187,80 @@ class LocalProvider(Iterator):
         chunk_to_insert = {}
         chunk_to_update = {}
 
-        for providable_infos in self:
-            objects_limit_reached = limit and self.checkedObjects >= limit
-            if objects_limit_reached:
-                break
-
-            has_no_providables_info = len(providable_infos) == 0
-            if has_no_providables_info:
-                self.checkedObjects += 1
-                continue
-
-            for providable_info in providable_infos:
-                chunk_key = providable_info.id_at_providers + "|" + str(providable_info.type.__name__)
-                pc_object = get_existing_pc_obj(providable_info, chunk_to_insert, chunk_to_update)
-
-                if pc_object is None:
-                    if not self.can_create:
-                        continue
-
-                    try:
-                        pc_object = self._create_object(providable_info)
-                        chunk_to_insert[chunk_key] = pc_object
-                    except ApiErrors:
-                        continue
-                else:
-                    last_update_for_current_provider = get_last_update_for_provider(self.provider.id, pc_object)
-                    object_need_update = (
-                        last_update_for_current_provider is None
-                        or last_update_for_current_provider < providable_info.date_modified_at_provider
-                    )
-
-                    if object_need_update:
-                        try:
-                            self._handle_update(pc_object, providable_info)
-                            if chunk_key in chunk_to_insert:
-                                chunk_to_insert[chunk_key] = pc_object
-                            else:
-                                chunk_to_update[chunk_key] = pc_object
-                        except ApiErrors:
-                            continue
+        try:
+            for providable_infos in self:
+                objects_limit_reached = limit and self.checkedObjects >= limit
+                if objects_limit_reached:
+                    break
 
-                if isinstance(pc_object, HasThumbMixin):
-                    initial_thumb_count = pc_object.thumbCount
-                    try:
-                        self._handle_thumb(pc_object)
-                    except Exception as e:  # pylint: disable=broad-except
-                        self.log_provider_event(providers_models.LocalProviderEventType.SyncError, e.__class__.__name__)
-                        self.erroredThumbs += 1
-                        logger.info("ERROR during handle thumb: %s", e, exc_info=True)
-                    pc_object_has_new_thumbs = pc_object.thumbCount != initial_thumb_count
-                    if pc_object_has_new_thumbs:
-                        errors = entity_validator.validate(pc_object)
-                        if errors and len(errors.errors) > 0:
-                            self.log_provider_event(providers_models.LocalProviderEventType.SyncError, "ApiErrors")
-                            continue
-
-                        chunk_to_update[chunk_key] = pc_object
+                has_no_providables_info = len(providable_infos) == 0
+                if has_no_providables_info:
+                    self.checkedObjects += 1
+                    continue
 
-                self.checkedObjects += 1
+                for providable_info in providable_infos:
+                    chunk_key = providable_info.id_at_providers + "|" + str(providable_info.type.__name__)
+                    pc_object = get_existing_pc_obj(providable_info, chunk_to_insert, chunk_to_update)
 
-                if len(chunk_to_insert) + len(chunk_to_update) >= CHUNK_MAX_SIZE:
-                    save_chunks(chunk_to_insert, chunk_to_update)
-                    _reindex_offers(list(chunk_to_insert.values()) + list(chunk_to_update.values()))
-                    chunk_to_insert = {}
-                    chunk_to_update = {}
+                    if pc_object is None:
+                        if not self.can_create:
+                            continue
 
+                        try:
+                            pc_object = self._create_object(providable_info)
+                            chunk_to_insert[chunk_key] = pc_object
+                        except ApiErrors:
+                            continue
+                    else:
+                        last_update_for_current_provider = get_last_update_for_provider(self.provider.id, pc_object)
+                        object_need_update = (
+                            last_update_for_current_provider is None
+                            or last_update_for_current_provider < providable_info.date_modified_at_provider
+                        )
+
+                        if object_need_update:
+                            try:
+                                self._handle_update(pc_object, providable_info)
+                                if chunk_key in chunk_to_insert:
+                                    chunk_to_insert[chunk_key] = pc_object
+                                else:
+                                    chunk_to_update[chunk_key] = pc_object
+                            except ApiErrors:
+                                continue
+
+                    if isinstance(pc_object, HasThumbMixin):
+                        initial_thumb_count = pc_object.thumbCount
+                        try:
+                            self._handle_thumb(pc_object)
+                        except Exception as e:  # pylint: disable=broad-except
+                            self.log_provider_event(
+                                providers_models.LocalProviderEventType.SyncError, e.__class__.__name__
+                            )
+                            self.erroredThumbs += 1
+                            logger.info("ERROR during handle thumb: %s", e, exc_info=True)
+                        pc_object_has_new_thumbs = pc_object.thumbCount != initial_thumb_count
+                        if pc_object_has_new_thumbs:
+                            errors = entity_validator.validate(pc_object)
+                            if errors and len(errors.errors) > 0:
+                                self.log_provider_event(providers_models.LocalProviderEventType.SyncError, "ApiErrors")
+                                continue
+
+                            chunk_to_update[chunk_key] = pc_object
+
+                    self.checkedObjects += 1
+
+                    if len(chunk_to_insert) + len(chunk_to_update) >= CHUNK_MAX_SIZE:
+                        self._flush_thumbs()
+                        save_chunks(chunk_to_insert, chunk_to_update)
+                        _reindex_offers(list(chunk_to_insert.values()) + list(chunk_to_update.values()))
+                        chunk_to_insert = {}
+                        chunk_to_update = {}
+
+            self._flush_thumbs()
+        finally:
+            # Stop the worker processes of the pipeline, even if the
+            # synchronization fails.
+            self.thumb_pipeline.close()
         if len(chunk_to_insert) + len(chunk_to_update) > 0:
             save_chunks(chunk_to_insert, chunk_to_update)
             _reindex_offers(list(chunk_to_insert.values()) + list(chunk_to_update.values()))
@@ -257,22 +273,6 @@ class LocalProvider(Iterator):
             repository.save(self.venue_provider)
 
 
-def _upload_thumb(
-    pc_object: HasThumbMixin,
-    image_as_bytes: bytes,
-    keep_poster_ratio: bool = False,
-) -> None:
-    if pc_object.thumbCount is None:
-        pc_object.thumbCount = 0
-
-    create_thumb(
-        model_with_thumb=pc_object,
-        image_as_bytes=image_as_bytes,
-        storage_id_suffix_str="",
-        keep_ratio=keep_poster_ratio,
-    )
-
-
 def _reindex_offers(created_or_updated_objects):  # type: ignore [no-untyped-def]
     offer_ids = set()
     for obj in created_or_updated_objects:
@@ -1,3 +1,4 @@
+from concurrent import futures
 from datetime import datetime
 from decimal import Decimal
 import logging
@@ -5,6 +6,9 @@ import time
 from typing import Counter
 from typing import Generator
 
+from flask import current_app
+from redis import exceptions as redis_exceptions
+
 from pcapi.core.providers.api import synchronize_stocks
 from pcapi.core.providers.models import Provider
 from pcapi.core.providers.models import StockDetail
@@ -16,11 +20,27 @@ from pcapi.utils.custom_keys import compute_venue_reference
 
 logger = logging.getLogger(__name__)
 
+# Progress of an ongoing synchronization, so that an interrupted run
+# resumes after the last page that has been written.
+REDIS_SYNC_PROGRESS_KEY_TEMPLATE = "providers:sync:venue_provider:{venue_provider_id}"
+REDIS_SYNC_PROGRESS_TTL = 60 * 60 * 24  # seconds
+
 
 def synchronize_venue_provider(venue_provider: VenueProvider) -> None:
     venue = venue_provider.venue
     provider = venue_provider.provider
     start_sync_date = datetime.utcnow()
+    last_processed_reference = ""
+
+    progress = _get_sync_progress(venue_provider)
+    if progress:
+        start_sync_date, last_processed_reference = progress
+        logger.info(
+            "Resuming synchronization of venue=%s provider=%s",
+            venue.id,
+            provider.name,
+            extra={"venue": venue.id, "provider": provider.name, "last_processed_reference": last_processed_reference},
+        )
 
     start = time.perf_counter()
     logger.info("Starting synchronization of venue=%s provider=%s", venue.id, provider.name)
@@ -28,16 +48,22 @@ def synchronize_venue_provider(venue_provider: VenueProvider) -> None:
 
     stats: Counter = Counter()
     for raw_stocks in _get_stocks_by_batch(
-        venue_provider.venueIdAtOfferProvider, provider_api, venue_provider.lastSyncDate
+        venue_provider.venueIdAtOfferProvider, provider_api, venue_provider.lastSyncDate, last_processed_reference
     ):
         stock_details = _build_stock_details_from_raw_stocks(
             raw_stocks, venue_provider.venueIdAtOfferProvider, provider, venue.id
         )
         operations = synchronize_stocks(stock_details, venue, provider_id=provider.id)
         stats += Counter(operations)
+        stats["stocks"] += len(raw_stocks)
+        # `synchronize_stocks` has committed the page: it won't be
+        # fetched again if the synchronization is interrupted.
+        _save_sync_progress(venue_provider, start_sync_date, raw_stocks[-1]["ref"])
 
     venue_provider.lastSyncDate = start_sync_date
     repository.save(venue_provider)
+    _clear_sync_progress(venue_provider)
+    duration = time.perf_counter() - start
     logger.info(
         "Ended synchronization of venue=%s provider=%s",
         venue.id,
@@ -45,29 +71,83 @@ def synchronize_venue_provider(venue_provider: VenueProvider) -> None:
         extra={
             "venue": venue.id,
             "provider": provider.name,
-            "duration": time.perf_counter() - start,
+            "duration": duration,
+            "rows_per_second": round(stats["stocks"] / duration, 2) if duration else None,
             **stats,
         },
     )
 
 
-def _get_stocks_by_batch(siret: str, provider_api: ProviderAPI, modified_since: datetime | None) -> Generator:
-    last_processed_provider_reference = ""
+def _get_stocks_by_batch(
+    siret: str,
+    provider_api: ProviderAPI,
+    modified_since: datetime | None,
+    last_processed_reference: str = "",
+) -> Generator:
+    """Yield pages of stocks from the provider API.
 
-    while True:
-        response = provider_api.validated_stocks(
+    The next page is fetched in the background while the caller
+    processes the current one.
+    """
+
+    def fetch_page(reference: str) -> dict:
+        return provider_api.validated_stocks(
             siret=siret,
-            last_processed_reference=last_processed_provider_reference,
+            last_processed_reference=reference,
             modified_since=modified_since.strftime("%Y-%m-%dT%H:%M:%SZ") if modified_since else "",
         )
-        raw_stocks = response.get("stocks", [])
 
-        if not raw_stocks:
-            break
+    with futures.ThreadPoolExecutor(max_workers=1) as executor:
+        next_page = executor.submit(fetch_page, last_processed_reference)
+        while True:
+            raw_stocks = next_page.result().get("stocks", [])
+
+            if not raw_stocks:
+                break
+
+            next_page = executor.submit(fetch_page, raw_stocks[-1]["ref"])
+            yield raw_stocks
+
+
+def _get_sync_progress_key(venue_provider: VenueProvider) -> str:
+    return REDIS_SYNC_PROGRESS_KEY_TEMPLATE.format(venue_provider_id=venue_provider.id)
+
+
+def _get_sync_progress(venue_provider: VenueProvider) -> tuple[datetime, str] | None:
+    try:
+        progress = current_app.redis_client.hgetall(_get_sync_progress_key(venue_provider))  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.exception("Could not get synchronization progress", extra={"venue_provider": venue_provider.id})
+        return None
+    if not progress:
+        return None
+    return datetime.fromisoformat(progress["start_sync_date"]), progress["last_processed_reference"]
+
+
+def _save_sync_progress(
+    venue_provider: VenueProvider, start_sync_date: datetime, last_processed_reference: str
+) -> None:
+    key = _get_sync_progress_key(venue_provider)
+    try:
+        pipeline = current_app.redis_client.pipeline()  # type: ignore [attr-defined]
+        pipeline.hset(
+            key,
+            mapping={
+                "start_sync_date": start_sync_date.isoformat(),
+                "last_processed_reference": last_processed_reference,
+            },
+        )
+        pipeline.expire(key, REDIS_SYNC_PROGRESS_TTL)
+        pipeline.execute()
+    except redis_exceptions.RedisError:
+        logger.exception("Could not save synchronization progress", extra={"venue_provider": venue_provider.id})
 
-        yield raw_stocks
 
-        last_processed_provider_reference = raw_stocks[-1]["ref"]
+def _clear_sync_progress(venue_provider: VenueProvider) -> None:
+    try:
+        current_app.redis_client.delete(_get_sync_progress_key(venue_provider))  # type: ignore [attr-defined]
+    except redis_exceptions.RedisError:
+        logger.exception("Could not clear synchronization progress", extra={"venue_provider": venue_provider.id})
 
 
 def _build_stock_details_from_raw_stocks(
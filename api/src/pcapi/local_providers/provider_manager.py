@@ -1,13 +1,20 @@
+from collections import Counter
+from collections import deque
+from concurrent import futures
 import logging
+import time
 from typing import Callable
 
+import flask
 from urllib3 import exceptions as urllib3_exceptions
 
+from pcapi import settings
 import pcapi.connectors.notion as notion_connector
 from pcapi.core.providers.models import VenueProvider
 from pcapi.infrastructure.repository.stock_provider import provider_api
 import pcapi.local_providers
 from pcapi.local_providers.provider_api import synchronize_provider_api
+from pcapi.models import db
 from pcapi.repository import transaction
 from pcapi.scheduled_tasks.logger import CronStatus
 from pcapi.scheduled_tasks.logger import build_cron_log_message
@@ -26,27 +33,95 @@ def synchronize_data_for_provider(provider_name: str, limit: int | None = None)
         logger.exception(build_cron_log_message(name=provider_name, status=CronStatus.FAILED))
 
 
-def synchronize_venue_providers(venue_providers: list[VenueProvider], limit: int | None = None) -> None:
-    for venue_provider in venue_providers:
-        log_data = {
-            "venue_provider": venue_provider.id,
-            "venue": venue_provider.venueId,
-            "provider": venue_provider.providerId,
-        }
+def synchronize_venue_providers(
+    venue_providers: list[VenueProvider], limit: int | None = None, workers: int | None = None
+) -> None:
+    workers = workers or settings.PROVIDERS_SYNC_WORKERS
+    if workers <= 1:
+        for venue_provider in venue_providers:
+            _synchronize_venue_provider_safely(venue_provider, limit)
+        return
+
+    _synchronize_venue_providers_concurrently(
+        [(venue_provider.id, venue_provider.providerId) for venue_provider in venue_providers], limit, workers
+    )
+
+
+def _synchronize_venue_providers_concurrently(
+    venue_provider_and_provider_ids: list[tuple[int, int]], limit: int | None, workers: int
+) -> None:
+    """Synchronize venue providers in a pool of threads, running at most
+    `PROVIDERS_SYNC_MAX_WORKERS_PER_PROVIDER` synchronizations of the
+    same provider at the same time.
+    """
+    app = flask.current_app._get_current_object()  # type: ignore [attr-defined]
+    pending = deque(venue_provider_and_provider_ids)
+    running: dict[futures.Future, int] = {}
+    running_by_provider: Counter = Counter()
+
+    def _submit_next(executor: futures.ThreadPoolExecutor) -> bool:
+        for _ in range(len(pending)):
+            venue_provider_id, provider_id = pending.popleft()
+            if running_by_provider[provider_id] < settings.PROVIDERS_SYNC_MAX_WORKERS_PER_PROVIDER:
+                future = executor.submit(_synchronize_venue_provider_in_thread, app, venue_provider_id, limit)
+                running[future] = provider_id
+                running_by_provider[provider_id] += 1
+                return True
+            pending.append((venue_provider_id, provider_id))
+        return False
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            while len(running) < workers and _submit_next(executor):
+                pass
+            done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                running_by_provider[running.pop(future)] -= 1
+                future.result()
+
+
+def _synchronize_venue_provider_in_thread(app: flask.Flask, venue_provider_id: int, limit: int | None) -> None:
+    with app.app_context():
         try:
-            with transaction():
-                synchronize_venue_provider(venue_provider, limit)
-        except (urllib3_exceptions.HTTPError, requests.exceptions.RequestException) as exception:
-            logger.error("Connexion error while synchronizing venue_provider", extra=log_data | {"exc": exception})
-        except provider_api.ProviderAPIException as exception:
-            notion_connector.add_to_synchronization_error_database(exception, venue_provider)
-            logger.error(  # pylint: disable=logging-fstring-interpolation
-                f"ProviderAPIException with code {exception.status_code} while synchronizing venue_provider",
-                extra=log_data | {"exc": exception},
-            )
-        except Exception as exception:  # pylint: disable=broad-except
-            notion_connector.add_to_synchronization_error_database(exception, venue_provider)
-            logger.exception("Unexpected error while synchronizing venue provider", extra=log_data)
+            venue_provider = VenueProvider.query.get(venue_provider_id)
+            _synchronize_venue_provider_safely(venue_provider, limit)
+        finally:
+            db.session.remove()
+
+
+def _synchronize_venue_provider_safely(venue_provider: VenueProvider, limit: int | None = None) -> None:
+    log_data = {
+        "venue_provider": venue_provider.id,
+        "venue": venue_provider.venueId,
+        "provider": venue_provider.providerId,
+    }
+    start = time.perf_counter()
+    try:
+        with transaction():
+            synchronize_venue_provider(venue_provider, limit)
+    except (urllib3_exceptions.HTTPError, requests.exceptions.RequestException) as exception:
+        logger.error(
+            "Connexion error while synchronizing venue_provider",
+            extra=log_data | {"exc": exception, "duration": time.perf_counter() - start},
+        )
+    except provider_api.ProviderAPIException as exception:
+        notion_connector.add_to_synchronization_error_database(exception, venue_provider)
+        logger.error(  # pylint: disable=logging-fstring-interpolation
+            f"ProviderAPIException with code {exception.status_code} while synchronizing venue_provider",
+            extra=log_data | {"exc": exception, "duration": time.perf_counter() - start},
+        )
+    except Exception as exception:  # pylint: disable=broad-except
+        notion_connector.add_to_synchronization_error_database(exception, venue_provider)
+        logger.exception(
+            "Unexpected error while synchronizing venue provider",
+            extra=log_data | {"duration": time.perf_counter() - start},
+        )
+    else:
+        logger.info(
+            "Synchronized venue_provider=%s",
+            venue_provider.id,
+            extra=log_data | {"duration": time.perf_counter() - start},
+        )
 
 
 def get_local_provider_class_by_name(class_name: str) -> Callable:
@@ -3,8 +3,13 @@ from io import TextIOWrapper
 import logging
 import re
 
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
 from pcapi.connectors.ftp_titelive import connect_to_titelive_ftp
 from pcapi.connectors.ftp_titelive import get_files_to_process_from_titelive_ftp
+from pcapi.core import search
+import pcapi.core.bookings.models as bookings_models
 from pcapi.core.categories import subcategories
 import pcapi.core.offers.api as offers_api
 from pcapi.core.offers.api import deactivate_permanently_unavailable_products
@@ -12,11 +17,16 @@ import pcapi.core.offers.exceptions as offers_exceptions
 import pcapi.core.offers.models as offers_models
 import pcapi.core.providers.models as providers_models
 import pcapi.core.providers.repository as providers_repository
+import pcapi.core.users.models as users_models
 from pcapi.domain.titelive import get_date_from_filename
 from pcapi.domain.titelive import read_things_date
 from pcapi.local_providers.local_provider import LocalProvider
 from pcapi.local_providers.providable_info import ProvidableInfo
+from pcapi.models import db
+from pcapi.models.feature import FeatureToggle
+from pcapi.utils.chunks import get_chunks
 from pcapi.utils.string_processing import trim_with_elipsis
+from pcapi.validation.models import entity_validator
 
 
 logger = logging.getLogger(__name__)
@@ -25,6 +35,7 @@ logger = logging.getLogger(__name__)
 DATE_REGEXP = re.compile(r"([a-zA-Z]+)(\d+).tit")
 THINGS_FOLDER_NAME_TITELIVE = "livre3_11"
 NUMBER_OF_ELEMENTS_PER_LINE = 46  # (45 elements from line + \n)
+BULK_IMPORT_CHUNK_SIZE = 1000
 PAPER_PRESS_TVA = "2,10"
 PAPER_PRESS_SUPPORT_CODE = "R"
 SCHOOL_RELATED_CSR_CODE = [
@@ -107,12 +118,7 @@ class TiteLiveThings(LocalProvider):
             self.log_provider_event(providers_models.LocalProviderEventType.SyncError, "number of elements mismatch")
             return []
 
-        self.product_infos = get_infos_from_data_line(elements)
-
-        (
-            self.product_subcategory_id,
-            self.product_extra_data["bookFormat"],
-        ) = get_subcategory_and_extra_data_from_titelive_type(self.product_infos["code_support"])
+        self.read_data_line(elements)
         book_unique_identifier = self.product_infos["ean13"]
 
         ineligibility_reason = self.get_ineligibility_reason()
@@ -150,6 +156,193 @@ class TiteLiveThings(LocalProvider):
         )
         return [providable_info]
 
+    def read_data_line(self, elements: list[str]) -> None:
+        self.product_infos = get_infos_from_data_line(elements)
+
+        (
+            self.product_subcategory_id,
+            self.product_extra_data["bookFormat"],
+        ) = get_subcategory_and_extra_data_from_titelive_type(self.product_infos["code_support"])
+
+    def updateObjects(self, limit: int | None = None) -> None:
+        if FeatureToggle.ENABLE_TITELIVE_THINGS_BULK_IMPORT.is_active():
+            self.bulk_update_objects(limit)
+        else:
+            super().updateObjects(limit)
+
+    def bulk_update_objects(self, limit: int | None = None) -> None:
+        """Import files by chunks of lines, instead of line by line.
+
+        Lines of a file are read and classified in memory by chunks.
+        For each chunk, existing products are fetched with a single
+        query, each kind of change is applied with set-based statements
+        and everything is committed at once.
+        """
+        if not self.provider.isActive:
+            logger.info("Provider %s is inactive", self.__class__.__name__)
+            return
+
+        self.log_provider_event(providers_models.LocalProviderEventType.SyncStart)
+
+        for products_file in self.thing_files:
+            if limit and self.checkedObjects >= limit:
+                break
+            self.products_file = products_file
+            file_date = get_date_from_filename(products_file, DATE_REGEXP)
+            self.log_provider_event(providers_models.LocalProviderEventType.SyncPartStart, file_date)
+
+            data_lines = list(get_lines_from_thing_file(str(products_file)))
+            is_partial_import = bool(limit) and len(data_lines) > limit - self.checkedObjects  # type: ignore [operator]
+            if is_partial_import:
+                data_lines = data_lines[: limit - self.checkedObjects]  # type: ignore [operator]
+            for chunk in get_chunks(data_lines, BULK_IMPORT_CHUNK_SIZE):
+                self._bulk_import_data_lines(chunk)
+
+            # The file will be imported again by the next run if it has
+            # only been partially imported.
+            if not is_partial_import:
+                self.log_provider_event(providers_models.LocalProviderEventType.SyncPartEnd, file_date)
+
+        self._print_objects_summary()
+        self.log_provider_event(providers_models.LocalProviderEventType.SyncEnd)
+
+    def _bulk_import_data_lines(self, data_lines: list[str]) -> None:
+        lines_to_upsert: dict[str, list[str]] = {}
+        isbns_to_deactivate: set[str] = set()
+        isbns_to_delete: set[str] = set()
+
+        for data_line in data_lines:
+            self.checkedObjects += 1
+            elements = data_line.split("~")
+            if len(elements) != NUMBER_OF_ELEMENTS_PER_LINE:
+                self._add_provider_event(
+                    providers_models.LocalProviderEventType.SyncError, "number of elements mismatch"
+                )
+                continue
+
+            self.read_data_line(elements)
+            isbn = self.product_infos["ean13"]
+            # A line overrides any previous line about the same book.
+            lines_to_upsert.pop(isbn, None)
+            isbns_to_deactivate.discard(isbn)
+            isbns_to_delete.discard(isbn)
+
+            if self.get_ineligibility_reason():
+                isbns_to_delete.add(isbn)
+            elif is_unreleased_book(self.product_infos):
+                isbns_to_deactivate.add(isbn)
+            else:
+                lines_to_upsert[isbn] = elements
+
+        isbns = isbns_to_deactivate | isbns_to_delete
+        products_by_isbn = {
+            product.idAtProviders: product
+            for product in offers_models.Product.query.filter(offers_models.Product.idAtProviders.in_(isbns))
+        }
+
+        deleted_offer_ids, undeletable_isbns = _bulk_delete_unwanted_products(
+            [products_by_isbn[isbn] for isbn in isbns_to_delete if isbn in products_by_isbn]
+        )
+        deactivated_offer_ids = _bulk_deactivate_permanently_unavailable_products(
+            [products_by_isbn[isbn] for isbn in isbns_to_deactivate if isbn in products_by_isbn]
+        )
+        created_count, updated_count = self._bulk_upsert_products(lines_to_upsert)
+        for isbn in undeletable_isbns:
+            self._add_provider_event(
+                providers_models.LocalProviderEventType.SyncError, f"Error deleting product with ISBN: {isbn}"
+            )
+        db.session.commit()
+
+        self.createdObjects += created_count
+        self.updatedObjects += updated_count
+        logger.info(
+            "Imported Titelive products file chunk",
+            extra={
+                "file": self.products_file,
+                "lines": len(data_lines),
+                "created": created_count,
+                "updated": updated_count,
+                "deleted": len(isbns_to_delete),
+                "deactivated": len(isbns_to_deactivate),
+            },
+        )
+        search.async_index_offer_ids(deleted_offer_ids | deactivated_offer_ids)
+
+    def _bulk_upsert_products(self, lines_to_upsert: dict[str, list[str]]) -> tuple[int, int]:
+        """Create or update products with a single
+        `INSERT ... ON CONFLICT DO UPDATE` statement. Products that have
+        been modified more recently by the provider are left untouched.
+
+        Return the number of created and updated products.
+        """
+        values = []
+        for isbn, elements in lines_to_upsert.items():
+            self.read_data_line(elements)
+            # This product is only used to fill and validate values, it
+            # is not added to the session.
+            product = offers_models.Product(
+                idAtProviders=isbn,
+                lastProviderId=self.provider.id,
+                dateModifiedAtLastProvider=read_things_date(self.product_infos["date_updated"]),
+            )
+            self.fill_object_attributes(product)
+            errors = entity_validator.validate(product)
+            if errors.errors:
+                self._add_provider_event(providers_models.LocalProviderEventType.SyncError, "ApiErrors")
+                self.erroredObjects += 1
+                continue
+            values.append(
+                {
+                    "idAtProviders": product.idAtProviders,
+                    "lastProviderId": product.lastProviderId,
+                    "dateModifiedAtLastProvider": product.dateModifiedAtLastProvider,
+                    "name": product.name,
+                    "subcategoryId": product.subcategoryId,
+                    "jsonData": product.extraData,
+                    # The column default only applies to ORM inserts.
+                    "mediaUrls": product.mediaUrls or [],
+                }
+            )
+        if not values:
+            return 0, 0
+
+        insert = postgresql.insert(offers_models.Product).values(values)
+        statement = insert.on_conflict_do_update(
+            index_elements=[offers_models.Product.idAtProviders],
+            set_={
+                offers_models.Product.name: insert.excluded.name,
+                offers_models.Product.subcategoryId: insert.excluded.subcategoryId,
+                offers_models.Product.extraData: insert.excluded.jsonData,
+                # As in `fill_object_attributes()`, the extract URL is added
+                # to existing media URLs.
+                offers_models.Product.mediaUrls: sa.func.array_cat(
+                    offers_models.Product.mediaUrls, insert.excluded.mediaUrls
+                ),
+                offers_models.Product.lastProviderId: insert.excluded.lastProviderId,
+                offers_models.Product.dateModifiedAtLastProvider: insert.excluded.dateModifiedAtLastProvider,
+            },
+            # Same condition as `get_last_update_for_provider()`.
+            where=sa.or_(
+                offers_models.Product.lastProviderId.is_distinct_from(insert.excluded.lastProviderId),
+                offers_models.Product.dateModifiedAtLastProvider.is_(None),
+                offers_models.Product.dateModifiedAtLastProvider < insert.excluded.dateModifiedAtLastProvider,
+            ),
+        ).returning(sa.literal_column("xmax = 0").label("created"))
+        created = [row.created for row in db.session.execute(statement)]
+        created_count = sum(created)
+        return created_count, len(created) - created_count
+
+    def _add_provider_event(
+        self, event_type: providers_models.LocalProviderEventType, event_payload: str | None = None
+    ) -> None:
+        # Unlike `log_provider_event()`, do not commit: the event is
+        # committed along with the chunk of products being imported.
+        local_provider_event = providers_models.LocalProviderEvent()
+        local_provider_event.type = event_type
+        local_provider_event.payload = str(event_payload)
+        local_provider_event.provider = self.provider
+        db.session.add(local_provider_event)
+
     def get_ineligibility_reason(self) -> str | None:
         if self.product_infos["is_scolaire"] == "1" or self.product_infos["code_csr"] in SCHOOL_RELATED_CSR_CODE:
             return "school"
@@ -201,6 +394,92 @@ class TiteLiveThings(LocalProvider):
         return iter([])
 
 
+def _bulk_delete_unwanted_products(products: list[offers_models.Product]) -> tuple[set[int], list[str]]:
+    """Delete products that are not eligible anymore, along with their
+    offers, unless they have been booked: these are deactivated instead.
+
+    Return the ids of offers that have been deleted or deactivated, and
+    the ISBN of products that could not be deleted.
+    """
+    products = [
+        product
+        for product in products
+        if product.can_be_synchronized and product.subcategoryId == subcategories.LIVRE_PAPIER.id
+    ]
+    if not products:
+        return set(), []
+
+    product_ids = [product.id for product in products]
+    booked_product_ids = {
+        product_id
+        for product_id, in db.session.query(offers_models.Offer.productId)
+        .filter(offers_models.Offer.productId.in_(product_ids))
+        .join(offers_models.Stock)
+        .join(bookings_models.Booking)
+        .distinct()
+    }
+    deletable_product_ids = [product_id for product_id in product_ids if product_id not in booked_product_ids]
+
+    offer_ids = {
+        offer_id
+        for offer_id, in offers_models.Offer.query.filter(offers_models.Offer.productId.in_(product_ids)).with_entities(
+            offers_models.Offer.id
+        )
+    }
+
+    if booked_product_ids:
+        offers_models.Offer.query.filter(offers_models.Offer.productId.in_(booked_product_ids)).update(
+            {"isActive": False}, synchronize_session=False
+        )
+        offers_models.Product.query.filter(offers_models.Product.id.in_(booked_product_ids)).update(
+            {"isGcuCompatible": False, "isSynchronizationCompatible": False}, synchronize_session=False
+        )
+
+    if deletable_product_ids:
+        deletable_offer_ids = sa.select(offers_models.Offer.id).where(
+            offers_models.Offer.productId.in_(deletable_product_ids)
+        )
+        users_models.Favorite.query.filter(users_models.Favorite.offerId.in_(deletable_offer_ids)).delete(
+            synchronize_session=False
+        )
+        offers_models.Mediation.query.filter(offers_models.Mediation.offerId.in_(deletable_offer_ids)).delete(
+            synchronize_session=False
+        )
+        offers_models.Stock.query.filter(offers_models.Stock.offerId.in_(deletable_offer_ids)).delete(
+            synchronize_session=False
+        )
+        offers_models.Offer.query.filter(offers_models.Offer.productId.in_(deletable_product_ids)).delete(
+            synchronize_session=False
+        )
+        offers_models.Product.query.filter(offers_models.Product.id.in_(deletable_product_ids)).delete(
+            synchronize_session=False
+        )
+
+    return offer_ids, [product.idAtProviders for product in products if product.id in booked_product_ids]
+
+
+def _bulk_deactivate_permanently_unavailable_products(products: list[offers_models.Product]) -> set[int]:
+    if not products:
+        return set()
+
+    product_ids = [product.id for product in products]
+    offers = offers_models.Offer.query.filter(
+        offers_models.Offer.productId.in_(product_ids), offers_models.Offer.isActive.is_(True)
+    )
+    offer_ids = {offer_id for offer_id, in offers.with_entities(offers_models.Offer.id)}
+    offers.update(
+        {"isActive": False, "name": offers_models.UNRELEASED_OR_UNAVAILABLE_BOOK_MARKER}, synchronize_session=False
+    )
+    offers_models.Product.query.filter(offers_models.Product.id.in_(product_ids)).update(
+        {"name": offers_models.UNRELEASED_OR_UNAVAILABLE_BOOK_MARKER}, synchronize_session=False
+    )
+    logger.info(
+        "Deactivated permanently unavailable products",
+        extra={"products": product_ids, "offers": list(offer_ids)},
+    )
+    return offer_ids
+
+
 def get_lines_from_thing_file(thing_file: str):  # type: ignore [no-untyped-def]
     data_file = BytesIO()
     data_wrapper = TextIOWrapper(
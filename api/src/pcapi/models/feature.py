@@ -1,8 +1,12 @@
 import enum
 import logging
+import math
+import threading
+import time
 
 from alembic import op
 import flask
+import redis
 from sqlalchemy import Column
 from sqlalchemy import String
 from sqlalchemy import Text
@@ -18,6 +22,8 @@ from pcapi.models.pc_object import PcObject
 
 logger = logging.getLogger(__name__)
 
+REDIS_VERSION_KEY = "feature-toggles:version"
+
 
 class DisabledFeatureError(Exception):
     pass
@@ -40,6 +46,9 @@ class FeatureToggle(enum.Enum):
     DISABLE_ENTERPRISE_API = "Désactiver les appels à l'API entreprise"
     DISABLE_USER_NAME_AND_FIRST_NAME_VALIDATION_IN_TESTING_AND_STAGING = "Désactiver la validation des noms et prénoms"
     DISPLAY_DMS_REDIRECTION = "Affiche une redirection vers DMS si ID Check est KO"
+    ENABLE_ALGOLIA_BOOKINGS_NUMBER_COUNTER = (
+        "Utilise le compteur Redis des réservations des 30 derniers jours lors de l'indexation des offres sur Algolia"
+    )
     ENABLE_AUTO_VALIDATION_FOR_EXTERNAL_BOOKING = (
         "Valide automatiquement après 48h les offres issues de l'api billeterie cinéma"
     )
@@ -54,6 +63,9 @@ class FeatureToggle(enum.Enum):
     )
     ENABLE_DUPLICATE_USER_RULE_WITHOUT_BIRTHDATE = "Utiliser la nouvelle règle de détection d'utilisateur en doublon"
     ENABLE_EDUCONNECT_AUTHENTICATION = "Active l'authentification via educonnect sur l'app native"
+    ENABLE_EXTERNAL_USER_UPDATES_QUEUE = (
+        "Regroupe les mises à jour des attributs des utilisateurs dans Batch et Sendinblue (file d'attente Redis)"
+    )
     ENABLE_FRONT_IMAGE_RESIZING = "Active le redimensionnement sur demande des images par l'app et le web"
     ENABLE_IDCHECK_FRAUD_CONTROLS = "Active les contrôles de sécurité en sortie du process ID Check"
     ENABLE_IOS_OFFERS_LINK_WITH_REDIRECTION = "Active l'utilisation du lien avec redirection pour les offres (nécessaires pour contourner des restrictions d'iOS)"
@@ -71,6 +83,7 @@ class FeatureToggle(enum.Enum):
     ENABLE_PHONE_VALIDATION = "Active la validation du numéro de téléphone"
     ENABLE_PRO_ACCOUNT_CREATION = "Permettre l'inscription des comptes professionels"
     ENABLE_PRO_BOOKINGS_V2 = "Activer l'affichage de la page booking avec la nouvelle architecture."
+    ENABLE_TITELIVE_THINGS_BULK_IMPORT = "Importer les fichiers du référentiel des livres Titelive en une fois"
     ENABLE_UBBLE = "Active la vérification d'identité par Ubble"
     ENABLE_UBBLE_SUBSCRIPTION_LIMITATION = "Active la limitation en fonction de l'âge lors de pic d'inscription"
     ENABLE_USER_PROFILING = "Active l'étape USER_PROFILING dans le parcours d'inscription des jeunes de 18 ans"
@@ -121,7 +134,10 @@ class FeatureToggle(enum.Enum):
             cached_value = flask.request._cached_features.get(self.name)  # type: ignore [attr-defined]
             if cached_value is not None:
                 return cached_value
+        elif settings.FEATURE_TOGGLES_CACHE_TTL:
+            return _snapshot.get(self)
 
+        _db_hits.increment()
         value = Feature.query.filter_by(name=self.name).one().isActive
 
         if flask.has_request_context():
@@ -139,20 +155,133 @@ class Feature(PcObject, Base, Model, DeactivableMixin):
         return str(self.name).replace("FeatureToggle.", "")
 
 
+class _DbHitsCounter:
+    """Count SQL queries made to read feature toggles in this process."""
+
+    def __init__(self) -> None:
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def increment(self) -> None:
+        with self._lock:
+            self.value += 1
+
+
+_db_hits = _DbHitsCounter()
+
+
+def get_db_hits_count() -> int:
+    """Return the number of SQL queries made to read feature toggles
+    since this process started.
+    """
+    return _db_hits.value
+
+
+class _FeatureToggleSnapshot:
+    """An in-memory copy of all feature toggles, shared by all threads
+    of the process and used outside of HTTP requests (in workers, cron
+    jobs, etc.).
+
+    The snapshot is reloaded from the database when it is older than
+    ``settings.FEATURE_TOGGLES_CACHE_TTL``, or when the version stored
+    in Redis has changed (see `bump_version()`), which is checked at
+    most once every ``VERSION_CHECK_INTERVAL`` seconds.
+    """
+
+    VERSION_CHECK_INTERVAL = 1  # seconds
+
+    def __init__(self) -> None:
+        self.values: dict[str, bool] = {}
+        self.version: str | None = None
+        self.loaded_at = -math.inf
+        self.version_checked_at = -math.inf
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, bool]:
+        version = _get_version()
+        _db_hits.increment()
+        values = dict(Feature.query.with_entities(Feature.name, Feature.isActive).all())
+        with self._lock:
+            self.values = values
+            self.version = version
+            self.loaded_at = self.version_checked_at = time.monotonic()
+        logger.debug("Loaded feature toggles", extra={"version": version, "db_hits": get_db_hits_count()})
+        return values
+
+    def _is_stale(self) -> bool:
+        now = time.monotonic()
+        if now - self.loaded_at >= settings.FEATURE_TOGGLES_CACHE_TTL:
+            return True
+        if now - self.version_checked_at >= self.VERSION_CHECK_INTERVAL:
+            self.version_checked_at = now
+            return _get_version() != self.version
+        return False
+
+    def get(self, feature: FeatureToggle) -> bool:
+        values = self.values
+        if self._is_stale() or feature.name not in values:
+            values = self.load()
+        return values[feature.name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.values = {}
+            self.loaded_at = -math.inf
+
+
+_snapshot = _FeatureToggleSnapshot()
+
+
+def _get_version() -> str | None:
+    try:
+        return flask.current_app.redis_client.get(REDIS_VERSION_KEY)  # type: ignore [attr-defined]
+    except redis.exceptions.RedisError:
+        logger.warning("Could not get version of feature toggles", exc_info=True)
+        return None
+
+
+def load_feature_toggles() -> dict[FeatureToggle, bool]:
+    """Load all feature toggles at once in the in-memory snapshot of
+    this process, and return them.
+
+    This is meant to be called when a long-running process (e.g. a
+    worker) starts.
+    """
+    values = _snapshot.load()
+    return {feature: values[feature.name] for feature in FeatureToggle if feature.name in values}
+
+
+def bump_version() -> None:
+    """Tell all processes that feature toggles have changed, so that
+    they reload their in-memory snapshot.
+
+    This must be called after feature toggles have been changed (and
+    committed).
+    """
+    _snapshot.clear()
+    try:
+        flask.current_app.redis_client.incr(REDIS_VERSION_KEY)  # type: ignore [attr-defined]
+    except redis.exceptions.RedisError:
+        logger.exception("Could not bump version of feature toggles")
+
+
 FEATURES_DISABLED_BY_DEFAULT: tuple[FeatureToggle, ...] = (
     FeatureToggle.ALLOW_IDCHECK_REGISTRATION_FOR_EDUCONNECT_ELIGIBLE,
     FeatureToggle.DISABLE_ENTERPRISE_API,
+    FeatureToggle.ENABLE_ALGOLIA_BOOKINGS_NUMBER_COUNTER,
     FeatureToggle.ENABLE_AUTO_VALIDATION_FOR_EXTERNAL_BOOKING,
     FeatureToggle.ENABLE_BACKOFFICE_API,
     FeatureToggle.ENABLE_CULTURAL_SURVEY,
     FeatureToggle.ENABLE_DMS_LINK_ON_MAINTENANCE_PAGE_FOR_UNDERAGE,
     FeatureToggle.ENABLE_DUPLICATE_USER_RULE_WITHOUT_BIRTHDATE,
+    FeatureToggle.ENABLE_EXTERNAL_USER_UPDATES_QUEUE,
     FeatureToggle.ENABLE_FRONT_IMAGE_RESIZING,
     FeatureToggle.ENABLE_IOS_OFFERS_LINK_WITH_REDIRECTION,
     FeatureToggle.ENABLE_ISBN_REQUIRED_IN_LIVRE_EDITION_OFFER_CREATION,
     FeatureToggle.ENABLE_NATIVE_ID_CHECK_VERBOSE_DEBUGGING,
     FeatureToggle.ENABLE_NEW_VENUE_PAGES,
     FeatureToggle.ENABLE_PRO_BOOKINGS_V2,
+    FeatureToggle.ENABLE_TITELIVE_THINGS_BULK_IMPORT,
     FeatureToggle.ENABLE_UBBLE_SUBSCRIPTION_LIMITATION,
     FeatureToggle.ENABLE_USER_PROFILING,
     FeatureToggle.GENERATE_CASHFLOWS_BY_CRON,
@@ -244,6 +373,8 @@ def install_feature_flags() -> None:
         )
 
     db.session.commit()
+    if to_install_flags:
+        bump_version()
 
     if to_remove_flags:
         logger.error("The following feature flags are present in database but not present in code: %s", to_remove_flags)
@@ -7,6 +7,19 @@ from pcapi import settings
 from pcapi.utils.human_ids import humanize
 
 
+def get_thumb_storage_id_suffix(thumb_count: int, ignore_thumb_count: bool = False) -> str:
+    """
+    To keep compatibility with all the already uploaded assets, we use "" instead of "_0" for the first thumb
+    """
+    if ignore_thumb_count or thumb_count == 1:
+        return ""
+
+    if thumb_count < 1:
+        raise ValueError("This object has no thumb")
+
+    return f"_{thumb_count - 1}"
+
+
 @declarative_mixin
 class HasThumbMixin:
     # Let mypy know that classes that use this mixin have an id
@@ -44,16 +57,7 @@ class HasThumbMixin:
         return f"{self.thumb_path_component}/{humanize(self.id)}{self.get_thumb_storage_id_suffix(ignore_thumb_count)}"
 
     def get_thumb_storage_id_suffix(self, ignore_thumb_count: bool = False) -> str:
-        """
-        To keep compatibility with all the already uploaded assets, we use "" instead of "_0" for the first thumb
-        """
-        if ignore_thumb_count or self.thumbCount == 1:
-            return ""
-
-        if self.thumbCount < 1:
-            raise ValueError("This object has no thumb")
-
-        return f"_{self.thumbCount - 1}"
+        return get_thumb_storage_id_suffix(self.thumbCount, ignore_thumb_count)
 
     @property
     def thumb_base_url(self) -> str:
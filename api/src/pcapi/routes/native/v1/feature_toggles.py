@@ -2,6 +2,7 @@ import logging
 
 from pcapi import settings
 from pcapi.models import db
+from pcapi.models import feature as feature_module
 from pcapi.models.api_errors import ApiErrors
 from pcapi.models.feature import Feature
 from pcapi.serialization.decorator import spectree_serialize
@@ -24,3 +25,4 @@ def set_feature(body: serializers.FeaturesToggleRequest) -> None:
     for feature in body.features:
         Feature.query.filter_by(name=feature.name).update({"isActive": feature.isActive})
         db.session.commit()
+    feature_module.bump_version()
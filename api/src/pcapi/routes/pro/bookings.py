@@ -2,16 +2,20 @@ from datetime import datetime
 from typing import cast
 
 from dateutil import parser
+import flask
 from flask_login import current_user
 from flask_login import login_required
 
+from pcapi import settings
 from pcapi.core.bookings.models import BookingExportType
 import pcapi.core.bookings.repository as booking_repository
+from pcapi.models.api_errors import ApiErrors
 from pcapi.routes.serialization.bookings_recap_serialize import ListBookingsQueryModel
 from pcapi.routes.serialization.bookings_recap_serialize import ListBookingsResponseModel
 from pcapi.routes.serialization.bookings_recap_serialize import UserHasBookingResponse
 from pcapi.routes.serialization.bookings_recap_serialize import _serialize_booking_recap
 from pcapi.serialization.decorator import spectree_serialize
+from pcapi.workers.export_bookings_job import export_bookings_excel_job
 
 from . import blueprint
 
@@ -73,8 +77,14 @@ def get_user_has_bookings() -> UserHasBookingResponse:
         "Content-Disposition": "attachment; filename=reservations_pass_culture.csv",
     },
 )
-def get_bookings_csv(query: ListBookingsQueryModel) -> bytes:
-    return _create_booking_export_file(query, BookingExportType.CSV)
+def get_bookings_csv(query: ListBookingsQueryModel) -> flask.Response:
+    # The export is streamed, so that large exports are neither held
+    # in memory nor blocked behind a single huge response body.
+    filters = _get_booking_export_filters(query)
+    return flask.Response(
+        flask.stream_with_context(booking_repository.stream_csv_export(**filters)),
+        mimetype="text/csv",
+    )
 
 
 @blueprint.pro_private_api.route("/bookings/excel", methods=["GET"])
@@ -87,31 +97,40 @@ def get_bookings_csv(query: ListBookingsQueryModel) -> bytes:
     },
 )
 def get_bookings_excel(query: ListBookingsQueryModel) -> bytes:
-    return _create_booking_export_file(query, BookingExportType.EXCEL)
+    filters = _get_booking_export_filters(query)
+    if booking_repository.get_export_bookings_count(**filters) > settings.BOOKINGS_EXCEL_EXPORT_MAX_SYNC_BOOKINGS:
+        raise ApiErrors(
+            {
+                "global": [
+                    "Cet export contient trop de réservations pour être téléchargé directement. "
+                    "Veuillez demander son envoi par e-mail."
+                ]
+            }
+        )
+    return cast(bytes, booking_repository.get_export(**filters, export_type=BookingExportType.EXCEL))
 
 
-def _create_booking_export_file(query: ListBookingsQueryModel, export_type: BookingExportType) -> bytes:
-    venue_id = query.venue_id
-    event_date = parser.parse(query.event_date) if query.event_date else None
+@blueprint.pro_private_api.route("/bookings/excel/background", methods=["POST"])
+@login_required
+@spectree_serialize(on_success_status=204, api=blueprint.pro_private_schema)
+def export_bookings_excel_in_background(query: ListBookingsQueryModel) -> None:
+    filters = _get_booking_export_filters(query)
+    del filters["user"]
+    export_bookings_excel_job.delay(current_user.id, filters)
+
+
+def _get_booking_export_filters(query: ListBookingsQueryModel) -> dict:
     booking_period = None
     if query.booking_period_beginning_date and query.booking_period_ending_date:
         booking_period = (
             datetime.fromisoformat(query.booking_period_beginning_date).date(),
             datetime.fromisoformat(query.booking_period_ending_date).date(),
         )
-    booking_status = query.booking_status_filter
-    offer_type = query.offer_type
-
-    export_data = booking_repository.get_export(
-        user=current_user._get_current_object(),  # for tests to succeed, because current_user is actually a LocalProxy
-        booking_period=booking_period,
-        status_filter=booking_status,
-        event_date=event_date,
-        venue_id=venue_id,
-        offer_type=offer_type,
-        export_type=export_type,
-    )
-
-    if export_type == BookingExportType.CSV:
-        return cast(str, export_data).encode("utf-8-sig")
-    return cast(bytes, export_data)
+    return {
+        "user": current_user._get_current_object(),  # for tests to succeed, because current_user is actually a LocalProxy
+        "booking_period": booking_period,
+        "status_filter": query.booking_status_filter,
+        "event_date": parser.parse(query.event_date) if query.event_date else None,
+        "venue_id": query.venue_id,
+        "offer_type": query.offer_type,
+    }
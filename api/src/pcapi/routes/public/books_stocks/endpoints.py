@@ -2,11 +2,13 @@ import logging
 
 from pcapi.core.offerers.models import Offerer
 from pcapi.core.offerers.models import Venue
+from pcapi.core.providers import stocks_import
+from pcapi.models import api_errors
 from pcapi.routes.public import blueprints
 from pcapi.serialization.decorator import spectree_serialize
 from pcapi.validation.routes.users_authentifications import api_key_required
 from pcapi.validation.routes.users_authentifications import current_api_key
-from pcapi.workers.synchronize_stocks_job import synchronize_stocks_job
+from pcapi.workers.synchronize_stocks_job import import_stocks_chunk_job
 
 from . import serialization
 
@@ -35,23 +37,50 @@ def update_stocks(venue_id: int, body: serialization.UpdateVenueStocksBodyModel)
     Le champ "price" correspond au prix en euros.
 
     Le paramètre {venue_id} correspond à un lieu qui doit être attaché à la structure à laquelle la clé d'API utilisée est reliée.
+
+    Les stocks sont importés de manière asynchrone, par lots. L'avancement du dernier import peut être suivi avec la route GET /v2/venue/{venue_id}/stocks/import.
     """
-    offerer_id = current_api_key.offererId  # type: ignore [attr-defined]
-    venue = Venue.query.join(Offerer).filter(Venue.id == venue_id, Offerer.id == offerer_id).first_or_404()
+    venue = _get_venue_or_404(venue_id)
+
+    stocks = _build_stocks_to_import_from_body(body.stocks)
+    import_id, chunks_count = stocks_import.create_import(venue.id, stocks)
+    for chunk_index in range(chunks_count):
+        import_stocks_chunk_job.delay(import_id, chunk_index)
 
-    stock_details = _build_stock_details_from_body(body.stocks, venue.id)
-    synchronize_stocks_job.delay(stock_details, venue.id)
+
+@blueprints.v2_prefixed_public_api.route("/venue/<int:venue_id>/stocks/import", methods=["GET"])
+@spectree_serialize(
+    response_model=serialization.StocksImportResponseModel,
+    on_error_statuses=[401, 404],
+    api=blueprints.v2_prefixed_public_api_schema,
+    tags=["API Stocks"],
+)
+@api_key_required
+def get_stocks_import(venue_id: int) -> serialization.StocksImportResponseModel:
+    # in French, to be used by Swagger for the API documentation
+    """Avancement du dernier import de stocks d'un lieu.
+
+    Le statut vaut "pending" tant que tous les lots de stocks n'ont pas été traités, "done" si tous les lots ont été
+    importés et "failed" si l'import d'au moins un lot a échoué.
+    """
+    venue = _get_venue_or_404(venue_id)
+
+    status = stocks_import.get_last_import_status(venue.id)
+    if not status:
+        raise api_errors.ApiErrors({"global": ["Aucun import de stocks récent pour ce lieu"]}, status_code=404)
+    return serialization.StocksImportResponseModel(**status)
+
+
+def _get_venue_or_404(venue_id: int) -> Venue:
+    offerer_id = current_api_key.offererId  # type: ignore [attr-defined]
+    return Venue.query.join(Offerer).filter(Venue.id == venue_id, Offerer.id == offerer_id).first_or_404()
 
 
-def _build_stock_details_from_body(raw_stocks: list[serialization.UpdateVenueStockBodyModel], venue_id: int) -> list:
-    stock_details = {}
+def _build_stocks_to_import_from_body(
+    raw_stocks: list[serialization.UpdateVenueStockBodyModel],
+) -> list[stocks_import.StockToImport]:
+    # The last stock of a given reference wins.
+    stocks = {}
     for stock in raw_stocks:
-        stock_details[stock.ref] = {
-            "products_provider_reference": stock.ref,
-            "offers_provider_reference": stock.ref,
-            "stocks_provider_reference": f"{stock.ref}@{str(venue_id)}",
-            "available_quantity": stock.available,
-            "price": stock.price,
-        }
-
-    return list(stock_details.values())
+        stocks[stock.ref] = stocks_import.StockToImport(ref=stock.ref, available=stock.available, price=stock.price)
+    return list(stocks.values())
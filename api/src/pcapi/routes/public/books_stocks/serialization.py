@@ -9,6 +9,7 @@ from pydantic.types import NonNegativeInt
 
 from pcapi.core.offers.models import ActivationCode
 from pcapi.core.offers.models import Stock
+from pcapi.core.providers.models import StocksImportStatus
 from pcapi.routes.serialization import BaseModel
 from pcapi.serialization.utils import humanize_field
 from pcapi.serialization.utils import to_camel
@@ -148,3 +149,19 @@ class UpdateVenueStocksBodyModel(BaseModel):
 
     class Config:
         title = "Venue's stocks update body"
+
+
+class StocksImportResponseModel(BaseModel):
+    id: str
+    status: StocksImportStatus
+    date_created: datetime
+    stocks_count: int
+    chunks_count: int
+    done_chunks_count: int
+    failed_chunks_count: int
+
+    class Config:
+        alias_generator = to_camel
+        allow_population_by_field_name = True
+        json_encoders = {datetime: format_into_utc_date}
+        title = "Venue's stocks import"
@@ -1,7 +1,10 @@
+import base64
+import binascii
 import copy
 import logging
 
 import flask
+import sqlalchemy as sa
 from sqlalchemy import orm as sqla_orm
 
 from pcapi import repository
@@ -19,6 +22,7 @@ from pcapi.models import db
 from pcapi.routes.public import utils as public_utils
 from pcapi.serialization.decorator import spectree_serialize
 from pcapi.utils import image_conversion
+from pcapi.utils.cache import get_from_cache
 from pcapi.validation.routes.users_authentifications import api_key_required
 from pcapi.validation.routes.users_authentifications import current_api_key
 
@@ -129,18 +133,114 @@ def _check_venue_id_is_tied_to_api_key(venue_id: int | None) -> None:
         raise api_errors.ApiErrors({"venue_id": ["The venue could not be found"]}, status_code=404)
 
 
-def _retrieve_offer_ids(is_event: bool, filtered_venue_id: int | None) -> list[int]:
-    offer_ids_query = (
+def _retrieve_offers_query(is_event: bool, filtered_venue_id: int | None) -> sqla_orm.Query:
+    offers_query = (
         offers_models.Offer.query.join(offerers_models.Venue)
         .filter(offerers_models.Venue.managingOffererId == current_api_key.offererId)  # type: ignore [attr-defined]
         .filter(offers_models.Offer.isEvent == is_event)
-        .with_entities(offers_models.Offer.id)
-        .order_by(offers_models.Offer.id)
     )
     if filtered_venue_id is not None:
-        offer_ids_query = offer_ids_query.filter(offers_models.Offer.venueId == filtered_venue_id)
+        offers_query = offers_query.filter(offers_models.Offer.venueId == filtered_venue_id)
+    return offers_query
+
+
+def _count_offers(offers_query: sqla_orm.Query) -> int:
+    return offers_query.with_entities(sa.func.count(offers_models.Offer.id)).scalar()
+
+
+def _count_offers_with_cache(offers_query: sqla_orm.Query, is_event: bool, filtered_venue_id: int | None) -> int:
+    count = get_from_cache(
+        retriever=lambda: str(_count_offers(offers_query)),
+        key_template="api:public:offers_count:%(offerer_id)s:%(offer_type)s:%(venue_id)s",
+        key_args={
+            "offerer_id": current_api_key.offererId,  # type: ignore [attr-defined]
+            "offer_type": "event" if is_event else "product",
+            "venue_id": filtered_venue_id if filtered_venue_id is not None else "all",
+        },
+        expire=settings.PUBLIC_API_OFFERS_COUNT_CACHE_TTL,
+    )
+    return int(count)  # type: ignore [arg-type]
+
+
+def _encode_cursor(offer_id: int) -> str:
+    return base64.urlsafe_b64encode(str(offer_id).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        offer_id = int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        offer_id = None
+    # Ids are compared with a bigint column: the query would fail with
+    # out-of-range values.
+    if offer_id is None or not 0 < offer_id < 2**63:
+        raise api_errors.ApiErrors({"cursor": ["The cursor is invalid."]}, status_code=400)
+    return offer_id
+
+
+def _retrieve_offers_page(
+    query: serialization.GetOffersQueryParams, is_event: bool, base_url: str
+) -> tuple[list[offers_models.Offer], serialization.OffersPagination | serialization.CursorPagination]:
+    """Return the requested page of offers, and its pagination.
+
+    Pages are either requested by number (which requires to count all
+    offers and to skip those of previous pages) or, much faster, by
+    cursor (the id of the last offer of the previous page).
+    """
+    _check_venue_id_is_tied_to_api_key(query.venue_id)
+    offers_query = _retrieve_offers_query(is_event, query.venue_id)
+    offer_ids_query = offers_query.with_entities(offers_models.Offer.id).order_by(offers_models.Offer.id)
+
+    if query.cursor is None:
+        items_total = _count_offers(offers_query)
+        offset = query.limit * (query.page - 1)
+        if offset > items_total:
+            raise api_errors.ApiErrors(
+                {
+                    "page": f"The page you requested does not exist. The maximum page for the specified limit is {items_total//query.limit+1}"
+                },
+                status_code=404,
+            )
+        offer_ids = [offer_id for offer_id, in offer_ids_query.offset(offset).limit(query.limit)]
+        has_next_page = offset + len(offer_ids) < items_total
+    else:
+        last_offer_id = _decode_cursor(query.cursor)
+        offer_ids = [
+            offer_id
+            for offer_id, in offer_ids_query.filter(offers_models.Offer.id > last_offer_id).limit(query.limit + 1)
+        ]
+        has_next_page = len(offer_ids) > query.limit
+        offer_ids = offer_ids[: query.limit]
 
-    return [offer_id for offer_id, in offer_ids_query.all()]
+    offers = (
+        _retrieve_offer_relations_query(offers_models.Offer.query.filter(offers_models.Offer.id.in_(offer_ids)))
+        .order_by(offers_models.Offer.id)
+        .all()
+    )
+    next_cursor = _encode_cursor(offer_ids[-1]) if has_next_page else None
+
+    pagination: serialization.OffersPagination | serialization.CursorPagination
+    if query.cursor is None:
+        pagination = serialization.OffersPagination.build_pagination(
+            base_url,
+            query.page,
+            len(offers),
+            items_total,
+            query.limit,
+            query.venue_id,
+        )
+        pagination.next_cursor = next_cursor
+    else:
+        url_start = f"{base_url}?venueId={query.venue_id}&" if query.venue_id is not None else f"{base_url}?"
+        url_end = "&withTotal=true" if query.with_total else ""
+        pagination = serialization.CursorPagination(
+            items_count=len(offers),
+            items_total=_count_offers_with_cache(offers_query, is_event, query.venue_id) if query.with_total else None,
+            limit_per_page=query.limit,
+            next_cursor=next_cursor,
+            next=f"{url_start}cursor={next_cursor}&limit={query.limit}{url_end}" if next_cursor else None,
+        )
+    return offers, pagination
 
 
 def _save_image(image_body: serialization.ImageBody, offer: offers_models.Offer) -> None:
@@ -406,36 +506,12 @@ def get_products(query: serialization.GetOffersQueryParams) -> serialization.Pro
     """
     Get products. Results are paginated.
     """
-    _check_venue_id_is_tied_to_api_key(query.venue_id)
-    total_offer_ids = _retrieve_offer_ids(is_event=False, filtered_venue_id=query.venue_id)
-    offset = query.limit * (query.page - 1)
-
-    if offset > len(total_offer_ids):
-        raise api_errors.ApiErrors(
-            {
-                "page": f"The page you requested does not exist. The maximum page for the specified limit is {len(total_offer_ids)//query.limit+1}"
-            },
-            status_code=404,
-        )
-
-    offers = (
-        _retrieve_offer_relations_query(
-            offers_models.Offer.query.filter(offers_models.Offer.id.in_(total_offer_ids[offset : offset + query.limit]))
-        )
-        .order_by(offers_models.Offer.id)
-        .all()
+    offers, pagination = _retrieve_offers_page(
+        query, is_event=False, base_url=flask.url_for(".get_products", _external=True)
     )
-
     return serialization.ProductOffersResponse(
         products=[serialization.ProductOfferResponse.build_product_offer(offer) for offer in offers],
-        pagination=serialization.Pagination.build_pagination(
-            flask.url_for(".get_products", _external=True),
-            query.page,
-            len(offers),
-            len(total_offer_ids),
-            query.limit,
-            query.venue_id,
-        ),
+        pagination=pagination,
     )
 
 
@@ -512,36 +588,12 @@ def get_events(query: serialization.GetOffersQueryParams) -> serialization.Event
     """
     Get events. Results are paginated.
     """
-    _check_venue_id_is_tied_to_api_key(query.venue_id)
-    total_offer_ids = _retrieve_offer_ids(is_event=True, filtered_venue_id=query.venue_id)
-    offset = query.limit * (query.page - 1)
-
-    if offset > len(total_offer_ids):
-        raise api_errors.ApiErrors(
-            {
-                "page": f"The page you requested does not exist. The maximum page for the specified limit is {len(total_offer_ids)//query.limit+1}"
-            },
-            status_code=404,
-        )
-
-    offers = (
-        _retrieve_offer_relations_query(
-            offers_models.Offer.query.filter(offers_models.Offer.id.in_(total_offer_ids[offset : offset + query.limit]))
-        )
-        .order_by(offers_models.Offer.id)
-        .all()
+    offers, pagination = _retrieve_offers_page(
+        query, is_event=True, base_url=flask.url_for(".get_events", _external=True)
     )
-
     return serialization.EventOffersResponse(
         events=[serialization.EventOfferResponse.build_event_offer(offer) for offer in offers],
-        pagination=serialization.Pagination.build_pagination(
-            flask.url_for(".get_events", _external=True),
-            query.page,
-            len(offers),
-            len(total_offer_ids),
-            query.limit,
-            query.venue_id,
-        ),
+        pagination=pagination,
     )
 
 
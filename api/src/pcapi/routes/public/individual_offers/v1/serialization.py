@@ -713,6 +713,17 @@ class PaginationQueryParams(serialization.ConfiguredBaseModel):
 
 class GetOffersQueryParams(PaginationQueryParams):
     venue_id: int | None = pydantic.Field(None, description="Venue id to filter offers on. Optional.")
+    cursor: str | None = pydantic.Field(
+        None,
+        description="Cursor returned as `nextCursor` in the pagination of the previous page. "
+        "When set, the items following the cursor are returned and `page` is ignored. "
+        "This is much faster than `page` for offerers with many offers.",
+    )
+    with_total: bool = pydantic.Field(
+        False,
+        description="Only used with `cursor`: whether to return the total number of items. "
+        "This number is refreshed every few minutes.",
+    )
 
 
 class GetDatesQueryParams(PaginationQueryParams):
@@ -795,14 +806,36 @@ class Pagination(serialization.ConfiguredBaseModel):
         )
 
 
+class OffersPagination(Pagination):
+    next_cursor: str | None = pydantic.Field(
+        None, description="Cursor to get the next page with the `cursor` parameter.", example="MTIzNDU"
+    )
+
+
+class CursorPagination(serialization.ConfiguredBaseModel):
+    items_count: int = pydantic.Field(..., description="Number of items returned.", example=50)
+    items_total: int | None = pydantic.Field(
+        None, description="Total number of items (only if requested, refreshed every few minutes).", example=120
+    )
+    limit_per_page: int = pydantic.Field(..., description="Maximum number of items per page.", example=50)
+    next_cursor: str | None = pydantic.Field(
+        None, description="Cursor to get the next page with the `cursor` parameter.", example="MTIzNDU"
+    )
+    next: str | None = pydantic.Field(
+        None,
+        description="URL of the next page.",
+        example=f"{settings.API_URL}/public/offers/v1/products?cursor=MTIzNDU&limit=50",
+    )
+
+
 class ProductOffersResponse(serialization.ConfiguredBaseModel):
     products: typing.List[ProductOfferResponse]
-    pagination: Pagination
+    pagination: OffersPagination | CursorPagination
 
 
 class EventOffersResponse(serialization.ConfiguredBaseModel):
     events: typing.List[EventOfferResponse]
-    pagination: Pagination
+    pagination: OffersPagination | CursorPagination
 
 
 class GetDatesResponse(serialization.ConfiguredBaseModel):
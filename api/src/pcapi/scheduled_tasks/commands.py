@@ -12,6 +12,7 @@ from pcapi.core.bookings.external import booking_notifications
 from pcapi.core.bookings.external.booking_notifications import notify_users_bookings_not_retrieved
 from pcapi.core.bookings.external.booking_notifications import send_today_events_notifications_metropolitan_france
 import pcapi.core.bookings.repository as bookings_repository
+from pcapi.core.external.attributes import api as external_attributes_api
 from pcapi.core.external.automations import user as user_automations
 from pcapi.core.external.automations import venue as venue_automations
 import pcapi.core.fraud.api as fraud_api
@@ -306,6 +307,15 @@ def clean_past_draft_offers() -> None:
     delete_past_draft_collective_offers()
 
 
+@blueprint.cli.command("update_external_users_in_queue")
+@log_cron_with_transaction
+def update_external_users_in_queue() -> None:
+    """Pop users from the external attributes update queue and update
+    them in Batch and Sendinblue, in bulk.
+    This command is meant to be called every minute."""
+    external_attributes_api.update_external_users_in_queue()
+
+
 @blueprint.cli.command("recredit_underage_users")
 @log_cron_with_transaction
 def recredit_underage_users() -> None:
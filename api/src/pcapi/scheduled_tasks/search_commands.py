@@ -36,6 +36,14 @@ def index_collective_offer_templates():  # type: ignore [no-untyped-def]
     search.index_collective_offers_templates_in_queue()
 
 
+@blueprint.cli.command("expire_last_30_days_bookings_counter")
+@log_cron_with_transaction
+def expire_last_30_days_bookings_counter():  # type: ignore [no-untyped-def]
+    """Remove bookings that are older than 30 days from the counters
+    used to index offers. It must run daily, shortly after midnight (UTC)."""
+    search.last_30_days_bookings_counter.expire_buckets()
+
+
 @blueprint.cli.command("delete_expired_offers_in_algolia")
 @log_cron_with_transaction
 def delete_expired_offers_in_algolia():  # type: ignore [no-untyped-def]
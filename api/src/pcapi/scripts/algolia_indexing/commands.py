@@ -14,8 +14,31 @@ blueprint = Blueprint(__name__, __name__)
 
 
 @blueprint.cli.command("process_offers")
-def process_offers():  # type: ignore [no-untyped-def]
-    search.index_offers_in_queue(stop_only_when_empty=True)
+@click.option(
+    "--pipelined",
+    help="Load offers from the database while the previous batch is sent to Algolia",
+    is_flag=True,
+    default=False,
+)
+def process_offers(pipelined: bool):  # type: ignore [no-untyped-def]
+    if pipelined:
+        search.index_offers_in_queue_pipelined(stop_only_when_empty=True)
+    else:
+        search.index_offers_in_queue(stop_only_when_empty=True)
+
+
+@blueprint.cli.command("backfill_last_30_days_bookings_counter")
+def backfill_last_30_days_bookings_counter():  # type: ignore [no-untyped-def]
+    search.last_30_days_bookings_counter.backfill()
+
+
+@blueprint.cli.command("check_last_30_days_bookings_counter")
+@click.option("--offer-id", "offer_ids", help="Offer to check (all offers by default)", type=int, multiple=True)
+def check_last_30_days_bookings_counter(offer_ids: tuple[int, ...]):  # type: ignore [no-untyped-def]
+    inconsistencies = search.last_30_days_bookings_counter.check_consistency(offer_ids or None)
+    for offer_id, (expected, counted) in sorted(inconsistencies.items()):
+        print(f"Offer {offer_id}: {expected} bookings in database, {counted} in counter")
+    print(f"{len(inconsistencies)} inconsistent counter(s)")
 
 
 @blueprint.cli.command("process_offers_by_venue")
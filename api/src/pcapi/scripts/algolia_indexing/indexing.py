@@ -21,7 +21,7 @@ def batch_indexing_offers_in_algolia_from_database(
         offer_ids = offers_repository.get_paginated_active_offer_ids(limit=limit, page=page)
         if not offer_ids:
             break
-        search.reindex_offer_ids(offer_ids)
+        search.reindex_offer_ids(offer_ids, force=True)
         logger.info("[ALGOLIA] Processed %d offers from page %d", len(offer_ids), page)
         page += 1
 
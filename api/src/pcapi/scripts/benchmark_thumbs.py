@@ -0,0 +1,88 @@
+import concurrent.futures
+import hashlib
+import logging
+import multiprocessing
+import pathlib
+import time
+
+import click
+
+import pcapi.sandboxes
+from pcapi.utils import image_conversion
+from pcapi.utils.blueprint import Blueprint
+
+
+blueprint = Blueprint(__name__, __name__)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = pathlib.Path(pcapi.sandboxes.__path__[0]) / "thumbs"
+
+
+def _process_without_draft(content: bytes) -> bytes:
+    # Same as `image_conversion.process_original_image()`, but the
+    # image is fully decoded before being shrunk.
+    image = image_conversion._pre_process_image(content)
+    image = image_conversion._shrink_image(image)
+    return image_conversion._post_process_image(image)
+
+
+def _process_with_draft(content: bytes) -> bytes:
+    return image_conversion.process_thumb(content, keep_ratio=True)
+
+
+@blueprint.cli.command("benchmark_thumbs")
+@click.option(
+    "--corpus",
+    type=click.Path(exists=True, file_okay=False, path_type=pathlib.Path),
+    default=DEFAULT_CORPUS,
+    help="Directory of sample images (searched recursively)",
+)
+@click.option("--repeat", type=int, default=5, help="Number of times each image is processed")
+@click.option("--workers", type=int, default=multiprocessing.cpu_count(), help="Size of the process pool")
+def benchmark_thumbs(corpus: pathlib.Path, repeat: int, workers: int) -> None:
+    """Benchmark thumb processing (without upload) over a corpus of
+    sample images, as done by `ThumbPipeline`.
+    """
+    images = [
+        path.read_bytes() for path in sorted(corpus.rglob("*")) if path.suffix.lower() in (".jpg", ".jpeg", ".png")
+    ]
+    if not images:
+        raise click.ClickException(f"No image found in {corpus}")
+    contents = images * repeat
+    unique_count = len({hashlib.sha256(content).digest() for content in contents})
+    logger.info(
+        "Benchmarking thumb processing",
+        extra={"images": len(contents), "unique_sources": unique_count, "corpus": str(corpus)},
+    )
+
+    def report(label: str, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "Thumb processing benchmark: %s",
+            label,
+            extra={"elapsed": round(elapsed, 2), "images_per_second": round(len(contents) / elapsed, 1)},
+        )
+
+    start = time.perf_counter()
+    for content in contents:
+        _process_without_draft(content)
+    report("sequential, full decoding", start)
+
+    start = time.perf_counter()
+    for content in contents:
+        _process_with_draft(content)
+    report("sequential, draft decoding", start)
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        # Start the workers before measuring.
+        list(executor.map(_process_with_draft, images[:workers]))
+        start = time.perf_counter()
+        list(executor.map(_process_with_draft, contents, chunksize=4))
+        report(f"{workers} processes, draft decoding", start)
+
+        start = time.perf_counter()
+        unique_contents = {hashlib.sha256(content).digest(): content for content in contents}
+        list(executor.map(_process_with_draft, unique_contents.values(), chunksize=4))
+        report(f"{workers} processes, draft decoding, dedup", start)
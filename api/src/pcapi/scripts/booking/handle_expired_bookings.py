@@ -6,6 +6,7 @@ from operator import attrgetter
 from flask_sqlalchemy import BaseQuery
 
 from pcapi import settings
+from pcapi.core import search
 from pcapi.core.bookings.api import recompute_dnBookedQuantity
 from pcapi.core.bookings.models import Booking
 from pcapi.core.bookings.models import BookingCancellationReasons
@@ -16,6 +17,7 @@ from pcapi.core.educational.models import CollectiveBookingCancellationReasons
 from pcapi.core.educational.models import CollectiveBookingStatus
 import pcapi.core.educational.repository as educational_repository
 import pcapi.core.mails.transactional as transactional_mails
+import pcapi.core.offers.models as offers_models
 from pcapi.core.users.models import User
 from pcapi.models import db
 
@@ -95,6 +97,16 @@ def cancel_expired_bookings(query: BaseQuery, batch_size: int = 500) -> None:
         recompute_dnBookedQuantity(stocks_to_recompute)
         db.session.commit()
 
+        search.last_30_days_bookings_counter.remove_bookings(
+            db.session.query(offers_models.Stock.offerId, Booking.dateCreated)
+            .join(Booking.stock)
+            .filter(
+                Booking.id.in_(booking_ids_to_update),
+                Booking.dateCreated >= search.last_30_days_bookings_counter.get_window_start(),
+            )
+            .all()
+        )
+
         updated_total += updated
 
         logger.info(
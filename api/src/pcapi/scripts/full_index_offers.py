@@ -8,9 +8,8 @@ import pytz
 
 from pcapi.core import search
 import pcapi.core.offers.models as offers_models
+from pcapi.core.search import offer_rows
 from pcapi.core.search.backends import algolia
-from pcapi.models import db
-from pcapi.models.feature import FeatureToggle
 from pcapi.utils.blueprint import Blueprint
 
 
@@ -33,7 +32,13 @@ def _get_eta(end, current, elapsed_per_batch):  # type: ignore [no-untyped-def]
 @blueprint.cli.command("full_index_offers")
 @click.argument("start", type=int, required=True)
 @click.argument("end", type=int, required=True)
-def full_index_offers(start, end):  # type: ignore [no-untyped-def]
+@click.option(
+    "--use-offer-rows",
+    help="Load offers with projection-only queries instead of full ORM objects",
+    is_flag=True,
+    default=False,
+)
+def full_index_offers(start, end, use_offer_rows=False):  # type: ignore [no-untyped-def]
     """Reindex all bookable offers.
 
     The script iterates over all active offers. For each offer, it
@@ -68,7 +73,7 @@ def full_index_offers(start, end):  # type: ignore [no-untyped-def]
 
     def enqueue_or_index(
         q: list,
-        offer: offers_models.Offer | None,
+        offer: offers_models.Offer | offer_rows.OfferRow | None,
         last_30_days_bookings: dict[int, int] | None,
         force_index: bool = False,
     ) -> None:
@@ -76,7 +81,14 @@ def full_index_offers(start, end):  # type: ignore [no-untyped-def]
             q.append((offer, last_30_days_bookings.get(offer.id) or 0))
         if force_index or len(q) > BATCH_SIZE:
             try:
-                backend.index_offers([offer for offer, _ in q], {offer.id: n_bookings for offer, n_bookings in q})
+                if use_offer_rows:
+                    backend.index_offer_rows(
+                        [row for row, _ in q], {row.id: n_bookings for row, n_bookings in q}, force=True
+                    )
+                else:
+                    backend.index_offers(
+                        [offer for offer, _ in q], {offer.id: n_bookings for offer, n_bookings in q}, force=True
+                    )
             except Exception as exc:  # pylint: disable=broad-except
                 logger.exception(
                     "Full offer reindexation: error while reindexing from %d to %d: %s", q[0][0].id, q[-1][0].id, exc
@@ -88,26 +100,26 @@ def full_index_offers(start, end):  # type: ignore [no-untyped-def]
 
     while start <= end:
         start_time = time.perf_counter()
-        offers = (
-            search.get_base_query_for_offer_indexation()
-            .filter(
-                offers_models.Offer.isActive.is_(True),
-                offers_models.Offer.id.between(start, min(start + BATCH_SIZE, end)),
-            )
-            .order_by(offers_models.Offer.id)
-        )
-        if FeatureToggle.ALGOLIA_BOOKINGS_NUMBER_COMPUTATION.is_active():
-            last_30_days_bookings = {
-                row.offer_id: row.bookings_number
-                for row in db.session.execute(
-                    search.get_base_query_for_last_30_days_bookings().filter(
-                        offers_models.Offer.isActive.is_(True),
-                        offers_models.Offer.id.between(start, min(start + BATCH_SIZE, end)),
-                    )
-                ).all()
-            }
+        if use_offer_rows:
+            offer_ids = [
+                offer_id
+                for offer_id, in offers_models.Offer.query.filter(
+                    offers_models.Offer.isActive.is_(True),
+                    offers_models.Offer.id.between(start, min(start + BATCH_SIZE, end)),
+                ).with_entities(offers_models.Offer.id)
+            ]
+            offers = offer_rows.get_offer_rows(offer_ids)
         else:
-            last_30_days_bookings = {}
+            offers = (
+                search.get_base_query_for_offer_indexation()
+                .filter(
+                    offers_models.Offer.isActive.is_(True),
+                    offers_models.Offer.id.between(start, min(start + BATCH_SIZE, end)),
+                )
+                .order_by(offers_models.Offer.id)
+            )
+        offers = list(offers)
+        last_30_days_bookings = search.get_last_30_days_bookings([offer.id for offer in offers])
 
         for offer in offers:
             if offer.is_eligible_for_search:
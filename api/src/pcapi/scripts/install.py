@@ -16,6 +16,7 @@ def install_commands(app: flask.Flask) -> None:
         "pcapi.scheduled_tasks.search_commands",
         "pcapi.scheduled_tasks.titelive_commands",
         "pcapi.scripts.algolia_indexing.commands",
+        "pcapi.scripts.benchmark_thumbs",
         "pcapi.scripts.beneficiary.import_test_users",
         "pcapi.scripts.booking.commands",
         "pcapi.scripts.clean_database",
@@ -129,6 +129,12 @@ REDIS_COLLECTIVE_OFFER_TEMPLATE_IDS_CHUNK_SIZE = int(
 REDIS_VENUE_IDS_FOR_OFFERS_CHUNK_SIZE = int(os.environ.get("REDIS_VENUE_IDS_FOR_OFFERS_CHUNK_SIZE", 1000))
 REDIS_VENUE_IDS_CHUNK_SIZE = int(os.environ.get("REDIS_VENUE_IDS_CHUNK_SIZE", 1000))
 
+# FEATURE TOGGLES
+# Outside of HTTP requests, feature toggles are cached in memory for
+# this number of seconds (see `pcapi.models.feature`). 0 disables the
+# cache.
+FEATURE_TOGGLES_CACHE_TTL = int(os.environ.get("FEATURE_TOGGLES_CACHE_TTL", 0 if IS_RUNNING_TESTS else 30))
+
 
 # SENTRY
 SENTRY_DSN = secrets_utils.get("SENTRY_DSN", "")
@@ -138,6 +144,12 @@ SENTRY_SAMPLE_RATE = float(os.environ.get("SENTRY_SAMPLE_RATE", 0))
 # USERS
 MAX_FAVORITES = int(os.environ.get("MAX_FAVORITES", 100))  # 0 is unlimited
 MAX_API_KEY_PER_OFFERER = int(os.environ.get("MAX_API_KEY_PER_OFFERER", 5))
+# Duration (in seconds) during which a successfully verified API key is
+# not checked again against its (slow to verify) hashed secret.
+API_KEY_VERIFICATION_CACHE_TTL = int(os.environ.get("API_KEY_VERIFICATION_CACHE_TTL", 15 * 60))
+# Duration (in seconds) during which the total number of offers returned
+# by the cursor-paginated listings of the public API is cached.
+PUBLIC_API_OFFERS_COUNT_CACHE_TTL = int(os.environ.get("PUBLIC_API_OFFERS_COUNT_CACHE_TTL", 5 * 60))
 
 
 # MAIL
@@ -180,6 +192,7 @@ ALGOLIA_DELETING_COLLECTIVE_OFFERS_CHUNK_SIZE = int(
     os.environ.get("ALGOLIA_DELETING_COLLECTIVE_OFFERS_CHUNK_SIZE", 10000)
 )
 ALGOLIA_OFFERS_BY_VENUE_CHUNK_SIZE = int(os.environ.get("ALGOLIA_OFFERS_BY_VENUE_CHUNK_SIZE", 10000))
+ALGOLIA_MAX_IN_FLIGHT_OFFER_BATCHES = int(os.environ.get("ALGOLIA_MAX_IN_FLIGHT_OFFER_BATCHES", 2))
 ALGOLIA_LAST_30_DAYS_BOOKINGS_RANGE_THRESHOLDS = [
     int(value) for value in secrets_utils.get("ALGOLIA_LAST_30_DAYS_BOOKINGS_RANGE_THRESHOLDS", "1,2,3,4").split(",")
 ]
@@ -250,6 +263,25 @@ CDS_API_URL = secrets_utils.get("CDS_API_URL")
 CGR_API_USER = secrets_utils.get("CGR_API_USER")
 CGR_API_PASSWORD = secrets_utils.get("CGR_API_PASSWORD")
 CGR_API_URL = secrets_utils.get("CGR_API_URL")
+# Number of venue providers synchronized at the same time, and at most
+# for a given provider (to avoid hammering a single provider API).
+PROVIDERS_SYNC_WORKERS = int(os.environ.get("PROVIDERS_SYNC_WORKERS", 1))
+PROVIDERS_SYNC_MAX_WORKERS_PER_PROVIDER = int(os.environ.get("PROVIDERS_SYNC_MAX_WORKERS_PER_PROVIDER", 2))
+# Stocks sent to the books stocks API are imported by chunks of this
+# size, each in its own job. Chunks and import progress are kept in
+# Redis for STOCKS_IMPORT_TTL seconds.
+STOCKS_IMPORT_CHUNK_SIZE = int(os.environ.get("STOCKS_IMPORT_CHUNK_SIZE", 1000))
+STOCKS_IMPORT_TTL = int(os.environ.get("STOCKS_IMPORT_TTL", 24 * 60 * 60))
+# Remaining places of cinema shows are cached for a few seconds, so
+# that users viewing the same offers share a single request to the
+# cinema provider API.
+EXTERNAL_BOOKINGS_REMAINING_PLACES_CACHE_TTL = int(os.environ.get("EXTERNAL_BOOKINGS_REMAINING_PLACES_CACHE_TTL", 5))
+# Maximum time (in seconds) spent waiting for another request to fetch
+# remaining places, before fetching them ourselves.
+EXTERNAL_BOOKINGS_REMAINING_PLACES_LOCK_TIMEOUT = int(
+    os.environ.get("EXTERNAL_BOOKINGS_REMAINING_PLACES_LOCK_TIMEOUT", 10)
+)
+CDS_INTERNET_SALE_GAUGE_CACHE_TTL = int(os.environ.get("CDS_INTERNET_SALE_GAUGE_CACHE_TTL", 60 * 60))
 
 
 # DEMARCHES SIMPLIFIEES
@@ -272,9 +304,19 @@ DMS_INSTRUCTOR_ID = secrets_utils.get("DEMARCHES_SIMPLIFIEES_INSTRUCTOR_ID", "")
 OBJECT_STORAGE_URL = os.environ.get("OBJECT_STORAGE_URL", "")
 OBJECT_STORAGE_PROVIDER = os.environ.get("OBJECT_STORAGE_PROVIDER", _default_object_storage_provider)
 LOCAL_STORAGE_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "static" / "object_store_data"
+# Number of concurrent uploads in `object_storage.store_public_objects()`
+OBJECT_STORAGE_MAX_WORKERS = int(os.environ.get("OBJECT_STORAGE_MAX_WORKERS", 8))
 
 # THUMBS
 THUMBS_FOLDER_NAME = os.environ.get("THUMBS_FOLDER_NAME", "thumbs")
+# Number of processes that standardize images in `ThumbPipeline`. If 0,
+# images are standardized in the calling process.
+THUMBS_PROCESSING_WORKERS = int(os.environ.get("THUMBS_PROCESSING_WORKERS", 0 if IS_RUNNING_TESTS else 2))
+# Number of processed thumbs that `ThumbPipeline` holds before uploading them.
+THUMBS_UPLOAD_BATCH_SIZE = int(os.environ.get("THUMBS_UPLOAD_BATCH_SIZE", 100))
+# How long the hash of the source image of a thumb is remembered, to
+# avoid uploading the same thumb again.
+THUMBS_SOURCE_HASH_TTL = int(os.environ.get("THUMBS_SOURCE_HASH_TTL", 7 * 24 * 60 * 60))
 
 # GOOGLE
 GCP_BUCKET_CREDENTIALS = json.loads(base64.b64decode(secrets_utils.get("GCP_BUCKET_CREDENTIALS", "")) or "{}")
@@ -296,6 +338,7 @@ GCP_SENDINBLUE_TRANSACTIONAL_EMAILS_SECONDARY_QUEUE_NAME = os.environ.get(
 GCP_BATCH_CUSTOM_DATA_QUEUE_NAME = os.environ.get("GCP_BATCH_CUSTOM_DATA_QUEUE_NAME")
 GCP_BATCH_CUSTOM_DATA_ANDROID_QUEUE_NAME = os.environ.get("GCP_BATCH_CUSTOM_DATA_ANDROID_QUEUE_NAME")
 GCP_BATCH_CUSTOM_DATA_IOS_QUEUE_NAME = os.environ.get("GCP_BATCH_CUSTOM_DATA_IOS_QUEUE_NAME")
+GCP_BOOKINGS_EXPORTS_QUEUE_NAME = os.environ.get("GCP_BOOKINGS_EXPORTS_QUEUE_NAME")
 GCP_SYNCHRONIZE_VENUE_PROVIDERS_QUEUE_NAME = os.environ.get("GCP_SYNCHRONIZE_VENUE_PROVIDERS_QUEUE_NAME")
 GCP_UBBLE_ARCHIVE_ID_PICTURES_QUEUE_NAME = os.environ.get("GCP_UBBLE_ARCHIVE_ID_PICTURES_QUEUE_NAME")
 GCP_ZENDESK_ATTRIBUTES_QUEUE_NAME = os.environ.get("GCP_ZENDESK_ATTRIBUTES_QUEUE_NAME")
@@ -377,6 +420,17 @@ EMAIL_UPDATE_ATTEMPTS_TTL = int(os.environ.get("EMAIL_UPDATE_ATTEMPTS_TTL", 24 *
 SOON_EXPIRING_BOOKINGS_DAYS_BEFORE_EXPIRATION = int(os.environ.get("SOON_EXPIRING_BOOKINGS_DAYS_BEFORE_EXPIRATION", 3))
 
 
+# BOOKINGS EXPORT
+# Above this number of bookings, Excel exports must be generated in the
+# background and sent by email.
+BOOKINGS_EXCEL_EXPORT_MAX_SYNC_BOOKINGS = int(os.environ.get("BOOKINGS_EXCEL_EXPORT_MAX_SYNC_BOOKINGS", 20_000))
+# Exports sent by email contain personal data. They are stored in a
+# private bucket, shared through signed URLs and deleted after this
+# delay (in seconds).
+BOOKINGS_EXCEL_EXPORT_TTL = int(os.environ.get("BOOKINGS_EXCEL_EXPORT_TTL", 24 * 60 * 60))
+GCP_BOOKINGS_EXPORTS_BUCKET_NAME = os.environ.get("GCP_BOOKINGS_EXPORTS_BUCKET_NAME", "")
+
+
 # SLACK
 SLACK_BOT_TOKEN = secrets_utils.get("SLACK_BOT_TOKEN", None)
 SLACK_CHANGE_FEATURE_FLIP_CHANNEL = os.environ.get("SLACK_CHANGE_FEATURE_FLIP_CHANNEL", "feature-flip-ehp")
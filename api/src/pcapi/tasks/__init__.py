@@ -3,6 +3,7 @@ from flask import Flask
 
 def install_handlers(app: Flask) -> None:
     # pylint: disable=unused-import
+    import pcapi.core.bookings.tasks
     import pcapi.core.providers.tasks
 
     from . import batch_tasks
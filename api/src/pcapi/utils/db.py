@@ -1,9 +1,12 @@
+import concurrent.futures
 import datetime
 import enum
 import hashlib
 import json
+import multiprocessing
 import typing
 
+import flask
 import psycopg2.extras
 import pytz
 import sqlalchemy as sqla
@@ -223,3 +226,28 @@ def acquire_lock(name: str) -> None:
     lock_bytestring = name.encode()
     lock_id = int(hashlib.sha256(lock_bytestring).hexdigest()[:14], 16)
     db.session.execute(sqla.select([sqla.func.pg_advisory_xact_lock(lock_id)]))
+
+
+def get_process_pool_executor(max_workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """Return a pool of processes that can use the current app and the
+    database.
+
+    Child processes are forked, so that they inherit the configured
+    app. They must not use the database connection of this process,
+    which is closed first.
+    """
+    db.session.close()
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_process_pool_worker,
+        initargs=(flask.current_app._get_current_object(),),  # type: ignore [attr-defined]
+    )
+
+
+def _init_process_pool_worker(app: flask.Flask) -> None:
+    app.app_context().push()
+    # Connections of the pool have been inherited from the parent
+    # process: forget them without closing them, since the parent
+    # process may still use them.
+    db.engine.dispose(close=False)
@@ -106,15 +106,39 @@ def process_original_image(content: bytes, resize: bool = True) -> PIL.Image:
         * convert to RGB mode
         * shrink image if necessary (keep the original ratio)
         * convert to jpeg using predefined values
+
+    When the image is shrunk, large JPEG images are decoded at a
+    reduced scale (see `PIL.Image.Image.draft`), which is much faster
+    than decoding the full image and resizing it afterwards.
     """
-    image = _pre_process_image(content)
+    image = _pre_process_image(content, min_size=MAX_THUMB_WIDTH if resize else None)
     if resize:
         image = _shrink_image(image)
     return _post_process_image(image)
 
 
-def _pre_process_image(content: bytes) -> PIL.Image:
+def process_thumb(
+    content: bytes,
+    crop_params: CropParams | None = None,
+    ratio: ImageRatio = ImageRatio.PORTRAIT,
+    keep_ratio: bool = False,
+) -> bytes:
+    """Process an image to be used as a thumb.
+
+    This function is self-contained so that it can be run in a pool of
+    processes (see `pcapi.connectors.thumb_storage.ThumbPipeline`).
+    """
+    if keep_ratio:
+        return process_original_image(content)
+    return standardize_image(content, ratio=ratio, crop_params=crop_params)
+
+
+def _pre_process_image(content: bytes, min_size: int | None = None) -> PIL.Image:
     raw_image = PIL.Image.open(io.BytesIO(content))
+    if min_size and raw_image.format == "JPEG":
+        # Both dimensions are kept above `min_size`, since the image
+        # may be rotated by `_transpose_image()`.
+        raw_image.draft(raw_image.mode, (min_size, min_size))
 
     # Remove exif orientation so that it doesnt rotate after upload
     transposed_image = _transpose_image(raw_image)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 import json
+import os
 import pathlib
 import shutil
 import tempfile
@@ -63,13 +64,22 @@ class CachingUrlFetcher:
             # File objects cannot be serialized, we serialize their
             # content instead.
             result["string"] = result.pop("file_obj").read()  # type: ignore[attr-defined]
-        with content_path.open("bx") as fp:
-            fp.write(result["string"])  # despite the name, it's bytes
+        # The cache may be shared by forked processes (see
+        # `finance.api.generate_invoices()`): write files under a
+        # temporary name and then rename them, so that other processes
+        # never read a partially-written file. Metadata must be written
+        # first, since the existence of the content file is what tells
+        # whether the URL is in the cache.
         metadata = {key: value for key, value in result.items() if key != "string"}
-        with metadata_path.open("tx", encoding="utf-8") as fp:
-            fp.write(json.dumps(metadata))
+        self._write_atomically(metadata_path, json.dumps(metadata).encode("utf-8"))
+        self._write_atomically(content_path, result["string"])  # despite the name, it's bytes
         return result
 
+    def _write_atomically(self, path: pathlib.Path, content: bytes) -> None:
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(content)
+        tmp_path.replace(path)
+
 
 url_cache = CachingUrlFetcher()
 
@@ -5,6 +5,7 @@ import time
 import typing
 
 from flask import current_app
+from rq.job import Retry
 from rq.job import get_current_job
 from rq.queue import Queue
 
@@ -15,7 +16,7 @@ from pcapi.workers.logger import job_extra_description
 logger = logging.getLogger(__name__)
 
 
-def job(queue: Queue) -> typing.Callable:
+def job(queue: Queue, retry: Retry | None = None) -> typing.Callable:
     def decorator(func: typing.Callable) -> typing.Callable:
         @wraps(func)
         def job_func(*args: typing.Any, **kwargs: typing.Any) -> None:
@@ -53,7 +54,7 @@ def job(queue: Queue) -> typing.Callable:
 
         @wraps(job_func)
         def delay(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
-            current_job = queue.enqueue(job_func, *args, **kwargs)
+            current_job = queue.enqueue(job_func, *args, retry=retry, **kwargs)
             logger.info(
                 "Enqueue job %s",
                 func.__name__,
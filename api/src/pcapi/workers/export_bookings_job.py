@@ -0,0 +1,17 @@
+import pcapi.core.bookings.api as bookings_api
+import pcapi.core.users.models as users_models
+from pcapi.workers import worker
+from pcapi.workers.decorators import job
+
+
+@job(worker.low_queue)
+def export_bookings_excel_job(user_id: int, filters: dict) -> None:
+    user = users_models.User.query.get(user_id)
+    bookings_api.send_excel_export(
+        user,
+        booking_period=filters["booking_period"],
+        status_filter=filters["status_filter"],
+        event_date=filters["event_date"],
+        venue_id=filters["venue_id"],
+        offer_type=filters["offer_type"],
+    )
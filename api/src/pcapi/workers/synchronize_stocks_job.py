@@ -1,8 +1,11 @@
 import logging
 
+from rq.job import Retry
+
 from pcapi.core.offerers.repository import find_venue_by_id
 from pcapi.core.providers import api
 from pcapi.core.providers import constants
+from pcapi.core.providers import stocks_import
 from pcapi.core.providers.models import StockDetail
 from pcapi.core.providers.repository import get_provider_by_local_class
 from pcapi.workers import worker
@@ -12,6 +15,8 @@ from pcapi.workers.decorators import job
 logger = logging.getLogger(__name__)
 
 
+# FIXME (agent, 2026-10-18): remove once jobs enqueued before stocks were imported by
+# chunks (see `import_stocks_chunk_job()`) have been processed.
 @job(worker.low_queue)
 def synchronize_stocks_job(serialized_stock_details: list[dict], venue_id: int) -> None:
     pc_provider = get_provider_by_local_class(constants.PASS_CULTURE_STOCKS_FAKE_CLASS_NAME)
@@ -40,3 +45,10 @@ def synchronize_stocks_job(serialized_stock_details: list[dict], venue_id: int)
             **operations,
         },
     )
+
+
+# Failed chunks are retried. Workers run without scheduler, so a failed
+# job is enqueued again right away.
+@job(worker.low_queue, retry=Retry(max=3))
+def import_stocks_chunk_job(import_id: str, chunk_index: int) -> None:
+    stocks_import.import_chunk(import_id, chunk_index)
@@ -14,6 +14,7 @@ import sentry_sdk
 
 from pcapi import settings
 from pcapi.models import db
+from pcapi.models.feature import load_feature_toggles
 from pcapi.utils.blueprint import Blueprint
 from pcapi.utils.health_checker import check_database_connection
 from pcapi.workers.logger import job_extra_description
@@ -71,6 +72,8 @@ def run_worker(queues: Iterable = ()) -> None:
 
     log_redis_connection_status()
     with app.app_context():
+        # Forked children (that run jobs) inherit feature toggles.
+        load_feature_toggles()
         log_database_connection_status()
 
     while True:
@@ -0,0 +1,106 @@
+import pathlib
+from unittest import mock
+
+import pytest
+
+from pcapi.connectors import thumb_storage
+import pcapi.core.offers.factories as offers_factories
+from pcapi.utils.human_ids import humanize
+
+import tests
+
+
+IMAGES_DIR = pathlib.Path(tests.__path__[0]) / "files"
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+
+@mock.patch("pcapi.core.object_storage.store_public_objects")
+class ThumbPipelineTest:
+    def _capture_uploads(self, mocked_store_public_objects):
+        stored_objects = []
+        mocked_store_public_objects.side_effect = stored_objects.extend
+        return stored_objects
+
+    def test_identical_images_are_processed_once(self, mocked_store_public_objects):
+        stored_objects = self._capture_uploads(mocked_store_public_objects)
+        products = offers_factories.ProductFactory.create_batch(2, thumbCount=0)
+        image = (IMAGES_DIR / "mouette_portrait.jpg").read_bytes()
+
+        with mock.patch("pcapi.connectors.thumb_storage.process_thumb", return_value=b"thumb") as mocked_process:
+            with thumb_storage.ThumbPipeline() as pipeline:
+                for product in products:
+                    assert pipeline.add(product, image, keep_ratio=True)
+                assert not stored_objects
+                assert pipeline.flush() == []
+
+        mocked_process.assert_called_once()
+        assert [(obj.object_id, obj.blob) for obj in stored_objects] == [
+            (f"products/{humanize(products[0].id)}", b"thumb"),
+            (f"products/{humanize(products[1].id)}", b"thumb"),
+        ]
+        assert [product.thumbCount for product in products] == [1, 1]
+
+    def test_upload_by_batch(self, mocked_store_public_objects):
+        stored_objects = self._capture_uploads(mocked_store_public_objects)
+        products = offers_factories.ProductFactory.create_batch(3, thumbCount=0)
+        image = (IMAGES_DIR / "mouette_portrait.jpg").read_bytes()
+
+        with thumb_storage.ThumbPipeline(batch_size=2) as pipeline:
+            for product in products:
+                pipeline.add(product, image, keep_ratio=True)
+            assert mocked_store_public_objects.call_count == 1
+            assert len(stored_objects) == 2
+            pipeline.flush()
+
+        assert mocked_store_public_objects.call_count == 2
+        assert len(stored_objects) == 3
+
+    def test_skip_unchanged_thumb(self, mocked_store_public_objects):
+        stored_objects = self._capture_uploads(mocked_store_public_objects)
+        product = offers_factories.ProductFactory(thumbCount=0)
+        image = (IMAGES_DIR / "mouette_portrait.jpg").read_bytes()
+        with thumb_storage.ThumbPipeline() as pipeline:
+            pipeline.add(product, image, keep_ratio=True)
+            pipeline.flush()
+        assert len(stored_objects) == 1
+
+        # Some providers reset the thumb count before adding the thumb again.
+        product.thumbCount = 0
+        with thumb_storage.ThumbPipeline() as pipeline:
+            assert not pipeline.add(product, image, keep_ratio=True)
+            pipeline.flush()
+
+        assert len(stored_objects) == 1
+        assert product.thumbCount == 1
+
+    @mock.patch("pcapi.core.object_storage.delete_public_object")
+    def test_upload_again_removed_thumb(self, mocked_delete_public_object, mocked_store_public_objects):
+        stored_objects = self._capture_uploads(mocked_store_public_objects)
+        product = offers_factories.ProductFactory(thumbCount=0)
+        image = (IMAGES_DIR / "mouette_portrait.jpg").read_bytes()
+        with thumb_storage.ThumbPipeline() as pipeline:
+            pipeline.add(product, image, keep_ratio=True)
+            pipeline.flush()
+
+        thumb_storage.remove_thumb(product, storage_id_suffix="")
+        product.thumbCount = 0
+        with thumb_storage.ThumbPipeline() as pipeline:
+            assert pipeline.add(product, image, keep_ratio=True)
+            pipeline.flush()
+
+        mocked_delete_public_object.assert_called_once_with(
+            folder="thumbs", object_id=f"products/{humanize(product.id)}"
+        )
+        assert len(stored_objects) == 2
+
+    def test_invalid_image(self, mocked_store_public_objects):
+        stored_objects = self._capture_uploads(mocked_store_public_objects)
+        product = offers_factories.ProductFactory(thumbCount=1)
+
+        with thumb_storage.ThumbPipeline() as pipeline:
+            pipeline.add(product, b"not an image")
+            assert pipeline.flush() == [product]
+
+        assert not stored_objects
+        assert product.thumbCount == 1
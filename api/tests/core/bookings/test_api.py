@@ -1,12 +1,14 @@
 import dataclasses
 from datetime import datetime
 from datetime import timedelta
+from io import BytesIO
 import logging
 from unittest import mock
 from unittest.mock import patch
 
 from dateutil.relativedelta import relativedelta
 from freezegun import freeze_time
+import openpyxl
 import pytest
 from sqlalchemy import create_engine
 import sqlalchemy.exc
@@ -30,12 +32,14 @@ import pcapi.core.finance.factories as finance_factories
 import pcapi.core.finance.models as finance_models
 import pcapi.core.mails.testing as mails_testing
 from pcapi.core.mails.transactional.sendinblue_template_ids import TransactionalEmail
+import pcapi.core.offerers.factories as offerers_factories
 import pcapi.core.offers.factories as offers_factories
 import pcapi.core.offers.models as offers_models
 import pcapi.core.providers.factories as providers_factories
 from pcapi.core.providers.repository import get_provider_by_local_class
 from pcapi.core.testing import assert_no_duplicated_queries
 from pcapi.core.testing import override_features
+from pcapi.core.testing import override_settings
 import pcapi.core.users.factories as users_factories
 from pcapi.models import api_errors
 from pcapi.models import db
@@ -1084,3 +1088,54 @@ class ArchiveOldActivationCodeBookingsTest:
         db_session.refresh(old_booking)
         assert not recent_booking.displayAsEnded
         assert old_booking.displayAsEnded
+
+
+class SendExcelExportTest:
+    def _create_booking(self):
+        pro = users_factories.ProFactory()
+        offerer = offerers_factories.OffererFactory()
+        offerers_factories.UserOffererFactory(user=pro, offerer=offerer)
+        booking = bookings_factories.UsedBookingFactory(stock__offer__venue__managingOfferer=offerer)
+        booking_date = booking.dateCreated.date()
+        booking_period = (booking_date - timedelta(days=1), booking_date + timedelta(days=1))
+        return pro, booking, booking_period
+
+    @patch("pcapi.core.bookings.tasks.delete_excel_export_task.delay")
+    def test_send_excel_export(self, mocked_delete_task, tmp_path, db_session):
+        pro, booking, booking_period = self._create_booking()
+
+        with override_settings(OBJECT_STORAGE_URL="http://localhost/storage", LOCAL_STORAGE_DIR=tmp_path):
+            api.send_excel_export(pro, booking_period=booking_period, status_filter=None)
+
+        [export_path] = (tmp_path / "bookings_exports").glob("*.xlsx")
+        sheet = openpyxl.load_workbook(export_path).active
+        assert sheet.max_row == 2
+        assert sheet.cell(row=2, column=10).value == booking.token
+        mocked_delete_task.assert_called_once()
+        assert mocked_delete_task.call_args.args[0].object_id == export_path.name
+        assert len(mails_testing.outbox) == 1
+        assert mails_testing.outbox[0].sent_data["To"] == pro.email
+        assert (
+            f"http://localhost/storage/bookings_exports/{export_path.name}"
+            in mails_testing.outbox[0].sent_data["html_content"]
+        )
+
+    def test_excel_export_is_deleted(self, tmp_path, db_session):
+        pro, _, booking_period = self._create_booking()
+
+        # Tasks are run synchronously in tests, so the (delayed)
+        # deletion happens right away.
+        with override_settings(LOCAL_STORAGE_DIR=tmp_path):
+            api.send_excel_export(pro, booking_period=booking_period, status_filter=None)
+
+        assert not list((tmp_path / "bookings_exports").iterdir())
+        assert len(mails_testing.outbox) == 1
+
+    @override_settings(OBJECT_STORAGE_PROVIDER="GCP", GCP_BOOKINGS_EXPORTS_BUCKET_NAME="")
+    def test_refuse_to_store_excel_export_in_public_bucket(self, db_session):
+        pro, _, booking_period = self._create_booking()
+
+        with pytest.raises(RuntimeError):
+            api.send_excel_export(pro, booking_period=booking_period, status_filter=None)
+
+        assert not mails_testing.outbox
@@ -14,6 +14,7 @@ import pcapi.core.users.factories as users_factories
 from pcapi.models import db
 from pcapi.models.api_errors import ApiErrors
 from pcapi.repository import repository
+from pcapi.utils import token as token_utils
 
 
 pytestmark = pytest.mark.usefixtures("db_session")
@@ -46,6 +47,16 @@ def test_save_cancellation_date_postgresql_function():
     assert booking.cancellationDate is None
 
 
+def test_generate_booking_token_postgresql_function():
+    bookings = factories.BookingFactory.create_batch(3, token=None)
+
+    tokens = {booking.token for booking in bookings}
+    assert len(tokens) == 3
+    for token in tokens:
+        assert len(token) == 6
+        assert set(token) <= set(token_utils.ALPHABET)
+
+
 def test_booking_completed_url_gets_normalized():
     booking = factories.BookingFactory(
         token="ABCDEF",
@@ -1,3 +1,4 @@
+import codecs
 import csv
 from datetime import date
 from datetime import datetime
@@ -1985,6 +1986,23 @@ class GetExcelReportTest:
         assert sheet.cell(row=2, column=15).value == "offre grand public"
 
 
+class StreamCsvExportTest:
+    def test_stream_csv_export_matches_csv_report(self):
+        pro = users_factories.ProFactory()
+        offerer = offerers_factories.OffererFactory()
+        offerers_factories.UserOffererFactory(user=pro, offerer=offerer)
+        booking_date = datetime(2020, 1, 1, 10, 0, 0)
+        bookings_factories.UsedBookingFactory.create_batch(
+            3, stock__offer__venue__managingOfferer=offerer, dateCreated=booking_date
+        )
+        booking_period = (booking_date - timedelta(days=1), booking_date + timedelta(days=1))
+
+        chunks = list(booking_repository.stream_csv_export(pro, booking_period=booking_period))
+
+        assert chunks[0] == codecs.BOM_UTF8
+        assert b"".join(chunks) == booking_repository.get_export(pro, booking_period=booking_period).encode("utf-8-sig")
+
+
 class FindSoonToBeExpiredBookingsTest:
     def test_should_return_only_soon_to_be_expired_individual_bookings(self, app: fixture):
         # Given
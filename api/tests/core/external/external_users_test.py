@@ -1,5 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
+from unittest.mock import patch
 
 from dateutil.relativedelta import relativedelta
 from freezegun import freeze_time
@@ -11,9 +12,11 @@ from pcapi.core.bookings.models import BookingStatus
 from pcapi.core.categories import subcategories
 from pcapi.core.external.attributes.api import TRACKED_PRODUCT_IDS
 from pcapi.core.external.attributes.api import get_bookings_categories_and_subcategories
+from pcapi.core.external.attributes.api import get_bulk_user_attributes
 from pcapi.core.external.attributes.api import get_user_attributes
 from pcapi.core.external.attributes.api import get_user_bookings
 from pcapi.core.external.attributes.api import update_external_user
+from pcapi.core.external.attributes.api import update_external_users_in_queue
 from pcapi.core.external.attributes.models import BookingsAttributes
 from pcapi.core.external.attributes.models import UserAttributes
 import pcapi.core.finance.conf as finance_conf
@@ -21,8 +24,10 @@ from pcapi.core.fraud import factories as fraud_factories
 from pcapi.core.fraud import models as fraud_models
 from pcapi.core.offers.factories import OfferFactory
 from pcapi.core.testing import assert_no_duplicated_queries
+from pcapi.core.testing import override_features
 from pcapi.core.users import testing as sendinblue_testing
 from pcapi.core.users.factories import BeneficiaryGrant18Factory
+from pcapi.core.users.factories import FavoriteFactory
 from pcapi.core.users.factories import ProFactory
 from pcapi.core.users.factories import UnderageBeneficiaryFactory
 from pcapi.core.users.factories import UserFactory
@@ -56,6 +61,34 @@ def test_update_external_user():
     assert sendinblue_testing.sendinblue_requests[0].get("emailBlacklisted") == True
 
 
+@override_features(ENABLE_EXTERNAL_USER_UPDATES_QUEUE=True)
+@patch("pcapi.core.external.sendinblue.sib_api_v3_sdk.api.contacts_api.ContactsApi.import_contacts")
+def test_update_external_user_with_queue(mock_import_contacts, app):
+    user = BeneficiaryGrant18Factory(notificationSubscriptions={"marketing_push": True, "marketing_email": False})
+    other_user = BeneficiaryGrant18Factory(notificationSubscriptions={"marketing_push": False, "marketing_email": True})
+
+    update_external_user(user)
+    update_external_user(user)
+    update_external_user(other_user)
+
+    assert not batch_testing.requests
+    assert not sendinblue_testing.sendinblue_requests
+    assert app.redis_client.hgetall("external:users:updates:stats") == {"queued": "2", "coalesced": "1"}
+
+    update_external_users_in_queue()  # still in the debounce window
+
+    assert not batch_testing.requests
+    assert app.redis_client.zcard("external:users:updates") == 2
+
+    update_external_users_in_queue(debounce_delay=0)
+
+    assert len(batch_testing.requests) == 1
+    assert [data.user_id for data in batch_testing.requests[0]] == [str(user.id)]
+    assert len(mock_import_contacts.call_args_list) == 2  # subscribed and unsubscribed users
+    assert app.redis_client.zcard("external:users:updates") == 0
+    assert app.redis_client.hget("external:users:updates:stats", "processed") == "2"
+
+
 def test_email_should_not_be_blacklisted_in_sendinblue_by_default():
     user = BeneficiaryGrant18Factory(
         email="jeanne@example.com",
@@ -400,6 +433,28 @@ def test_get_user_attributes_not_beneficiary():
     )
 
 
+def test_get_bulk_user_attributes():
+    beneficiary = BeneficiaryGrant18Factory()
+    BookingFactory(user=beneficiary, stock__offer__subcategoryId=subcategories.LIVRE_PAPIER.id)
+    BookingFactory(user=beneficiary, stock__offer__subcategoryId=subcategories.SEANCE_CINE.id)
+    CancelledBookingFactory(user=beneficiary)
+    FavoriteFactory(user=beneficiary)
+    ex_beneficiary = BeneficiaryGrant18Factory(deposit__expirationDate=datetime.utcnow() - relativedelta(days=1))
+    BookingFactory(user=ex_beneficiary)
+    underage = UnderageBeneficiaryFactory()
+    not_beneficiary = UserFactory(dateOfBirth=datetime.utcnow() - relativedelta(years=18, months=3))
+    fraud_factories.BeneficiaryFraudCheckFactory(
+        user=not_beneficiary, type=fraud_models.FraudCheckType.DMS, status=fraud_models.FraudCheckStatus.PENDING
+    )
+    pro = ProFactory()
+    users = [beneficiary, ex_beneficiary, underage, not_beneficiary, pro]
+
+    with assert_no_duplicated_queries():
+        attributes = get_bulk_user_attributes(users)
+
+    assert attributes == {user.id: get_user_attributes(user) for user in users}
+
+
 def test_get_bookings_categories_and_subcategories():
     user = BeneficiaryGrant18Factory()
     offer = OfferFactory(product__id=list(TRACKED_PRODUCT_IDS.keys())[0])
@@ -361,6 +361,26 @@ class CineDigitalServiceGetShowsRemainingPlacesTest:
         assert shows_remaining_places == {2: 88, 3: 88}
 
 
+class CineDigitalServiceGetInternetSaleGaugeActiveTest:
+    @patch("pcapi.core.external_bookings.cds.client.get_resource")
+    def test_should_cache_internet_sale_gauge_active(self, mocked_get_resource):
+        mocked_get_resource.return_value = [
+            {"id": "cinemaid_test", "internetsalegaugeactive": True},
+            {"id": "other_cinema", "internetsalegaugeactive": False},
+        ]
+        cine_digital_service = CineDigitalServiceAPI(
+            cinema_id="cinemaid_test",
+            account_id="accountid_test",
+            cinema_api_token="token_test",
+            api_url="apiUrl_test/",
+        )
+
+        assert cine_digital_service.get_internet_sale_gauge_active() is True
+        assert cine_digital_service.get_internet_sale_gauge_active() is True
+
+        mocked_get_resource.assert_called_once_with("apiUrl_test/", "accountid_test", "token_test", ResourceCDS.CINEMAS)
+
+
 class CineDigitalServiceGetPaymentTypeTest:
     @patch("pcapi.core.external_bookings.cds.client.get_resource")
     def test_should_return_voucher_payment_type(self, mocked_get_resource):
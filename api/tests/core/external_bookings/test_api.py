@@ -1,10 +1,15 @@
+import json
+from unittest import mock
+
 import pytest
 
+from pcapi.core.external_bookings import api as external_bookings_api
 from pcapi.core.external_bookings.api import _get_external_bookings_client_api
 from pcapi.core.external_bookings.api import get_active_cinema_venue_provider
 from pcapi.core.external_bookings.cds.client import CineDigitalServiceAPI
 import pcapi.core.providers.factories as providers_factories
 from pcapi.core.providers.repository import get_provider_by_local_class
+from pcapi.core.testing import override_settings
 
 
 @pytest.mark.usefixtures("db_session")
@@ -86,3 +91,70 @@ class GetExternalBookingsClientApiTest:
 
         # Then
         assert str(e.value) == "No row was found when one was required"
+
+
+class GetRemainingPlacesSnapshotTest:
+    key = "api:external_bookings:remaining_places:venue:1"
+
+    def test_cache_snapshot(self):
+        fetch = mock.Mock(return_value={1: 10, 2: 0})
+
+        assert external_bookings_api._get_remaining_places_snapshot("venue:1", fetch) == {1: 10, 2: 0}
+        assert external_bookings_api._get_remaining_places_snapshot("venue:1", fetch) == {1: 10, 2: 0}
+
+        fetch.assert_called_once()
+
+    @override_settings(EXTERNAL_BOOKINGS_REMAINING_PLACES_CACHE_TTL=0)
+    def test_cache_disabled(self):
+        fetch = mock.Mock(return_value={1: 10})
+
+        external_bookings_api._get_remaining_places_snapshot("venue:1", fetch)
+        external_bookings_api._get_remaining_places_snapshot("venue:1", fetch)
+
+        assert fetch.call_count == 2
+
+    def test_wait_for_snapshot_fetched_by_another_process(self, app):
+        app.redis_client.set(f"{self.key}:lock", "1")
+        fetch = mock.Mock()
+
+        def store_snapshot(seconds):
+            app.redis_client.set(self.key, json.dumps({"1": 10}))
+
+        with mock.patch("time.sleep", side_effect=store_snapshot):
+            snapshot = external_bookings_api._get_remaining_places_snapshot("venue:1", fetch)
+
+        assert snapshot == {1: 10}
+        fetch.assert_not_called()
+
+    @override_settings(EXTERNAL_BOOKINGS_REMAINING_PLACES_LOCK_TIMEOUT=0)
+    def test_fetch_when_lock_is_not_released(self, app):
+        app.redis_client.set(f"{self.key}:lock", "1")
+        fetch = mock.Mock(return_value={1: 10})
+
+        with mock.patch("time.sleep"):
+            snapshot = external_bookings_api._get_remaining_places_snapshot("venue:1", fetch)
+
+        assert snapshot == {1: 10}
+        fetch.assert_called_once()
+        # The lock of the other process is left untouched.
+        assert app.redis_client.exists(f"{self.key}:lock")
+
+    def test_release_lock_on_error(self, app):
+        fetch = mock.Mock(side_effect=ValueError)
+
+        with pytest.raises(ValueError):
+            external_bookings_api._get_remaining_places_snapshot("venue:1", fetch)
+
+        assert not app.redis_client.exists(f"{self.key}:lock")
+        assert not app.redis_client.exists(self.key)
+
+    @mock.patch("pcapi.core.external_bookings.api._get_external_bookings_client_api")
+    def test_get_shows_stock(self, mocked_get_client):
+        client = mock.Mock(spec=CineDigitalServiceAPI)
+        client.get_all_shows_remaining_places.return_value = {1: 10, 2: 0, 3: 5}
+        mocked_get_client.return_value = client
+
+        assert external_bookings_api.get_shows_stock(1, [1, 2]) == {1: 10, 2: 0}
+        assert external_bookings_api.get_shows_stock(1, [3]) == {3: 5}
+
+        client.get_all_shows_remaining_places.assert_called_once()
@@ -2,7 +2,9 @@ import csv
 import datetime
 from decimal import Decimal
 import io
+import logging
 import pathlib
+import time
 from unittest import mock
 import zipfile
 
@@ -10,6 +12,7 @@ from dateutil.relativedelta import relativedelta
 import freezegun
 import pytest
 import pytz
+import sqlalchemy as sqla
 
 import pcapi.core.bookings.factories as bookings_factories
 import pcapi.core.bookings.models as bookings_models
@@ -39,6 +42,7 @@ from pcapi.core.testing import clean_temporary_files
 from pcapi.core.testing import override_settings
 import pcapi.core.users.factories as users_factories
 import pcapi.core.users.models as users_models
+from pcapi.domain import reimbursement
 from pcapi.models import db
 from pcapi.utils import human_ids
 
@@ -47,6 +51,8 @@ import tests
 
 pytestmark = pytest.mark.usefixtures("db_session")
 
+logger = logging.getLogger(__name__)
+
 
 def create_booking_with_undeletable_dependent(date_used=None, **kwargs):
     if not date_used:
@@ -826,6 +832,188 @@ class PriceBookingsTest:
         assert ordered_bookings == [booking1, booking4, booking3, booking2]
 
 
+def get_pricings_snapshot():
+    pricings = models.Pricing.query.filter(models.Pricing.status != models.PricingStatus.CANCELLED).order_by(
+        models.Pricing.id
+    )
+    return [
+        (
+            pricing.bookingId,
+            pricing.collectiveBookingId,
+            pricing.status,
+            pricing.pricingPointId,
+            pricing.venueId,
+            pricing.valueDate,
+            pricing.amount,
+            pricing.standardRule,
+            pricing.customRuleId,
+            pricing.revenue,
+            sorted((line.category.value, line.amount) for line in pricing.lines),
+        )
+        for pricing in pricings
+    ]
+
+
+def delete_non_cancelled_pricings():
+    pricing_ids = [
+        pricing_id
+        for pricing_id, in models.Pricing.query.filter(
+            models.Pricing.status != models.PricingStatus.CANCELLED
+        ).with_entities(models.Pricing.id)
+    ]
+    models.PricingLine.query.filter(models.PricingLine.pricingId.in_(pricing_ids)).delete(synchronize_session=False)
+    models.Pricing.query.filter(models.Pricing.id.in_(pricing_ids)).delete(synchronize_session=False)
+    db.session.commit()
+    db.session.expire_all()
+
+
+class PriceBookingsByPricingPointTest:
+    few_minutes_ago = datetime.datetime.utcnow() - datetime.timedelta(minutes=5)
+
+    def make_bookings(self):
+        user = create_rich_user()
+        used_dates = datetime_iterator(self.few_minutes_ago - datetime.timedelta(days=60))
+        # Bookings above the 20,000 euros threshold of a venue are not
+        # reimbursed 100%, so that pricings depend on the revenue.
+        for amount in (5_000, 8_000):
+            stock = individual_stock_factory(price=amount)
+            bookings_factories.UsedBookingFactory.create_batch(2, user=user, stock=stock, dateUsed=self.few_minutes_ago)
+            bookings_factories.UsedBookingFactory(
+                user=user,
+                stock=individual_stock_factory(offer__venue=stock.offer.venue, price=amount),
+                dateUsed=self.few_minutes_ago - datetime.timedelta(days=1),
+            )
+        book_venue = offerers_factories.VenueFactory(pricing_point="self", reimbursement_point="self")
+        book_stock = individual_stock_factory(
+            offer__venue=book_venue, offer__subcategoryId=subcategories.LIVRE_PAPIER.id, price=7_000
+        )
+        event_stock = individual_stock_factory(
+            offer__venue=book_venue, beginningDatetime=self.few_minutes_ago - datetime.timedelta(days=2), price=3_000
+        )
+        for stock in (book_stock, event_stock, book_stock, event_stock):
+            bookings_factories.UsedBookingFactory(user=user, stock=stock, dateUsed=next(used_dates))
+        custom_rule_stock = individual_stock_factory(offer__venue=book_venue, price=50)
+        factories.CustomReimbursementRuleFactory(offer=custom_rule_stock.offer, amount=20)
+        bookings_factories.UsedBookingFactory(user=user, stock=custom_rule_stock, dateUsed=self.few_minutes_ago)
+        # already priced, then cancelled
+        unused_then_used_booking = bookings_factories.UsedBookingFactory(
+            user=user, stock=book_stock, dateUsed=self.few_minutes_ago
+        )
+        factories.PricingFactory(booking=unused_then_used_booking, status=models.PricingStatus.CANCELLED)
+        UsedCollectiveBookingFactory.create_batch(
+            2, dateUsed=self.few_minutes_ago, collectiveStock=collective_stock_factory(price=1_000)
+        )
+
+    def test_same_pricings_as_one_at_a_time(self):
+        self.make_bookings()
+        min_date = self.few_minutes_ago - datetime.timedelta(days=100)
+
+        api.price_bookings(min_date=min_date, batch_size=7)
+        expected = get_pricings_snapshot()
+        delete_non_cancelled_pricings()
+        api.price_bookings(min_date=min_date, batch_size=7, by_pricing_point=True)
+
+        assert len(expected) == bookings_models.Booking.query.count() + 2
+        assert get_pricings_snapshot() == expected
+
+    def test_error_on_a_pricing_point_does_not_block_other_pricing_points(self):
+        booking1 = create_booking_with_undeletable_dependent(
+            date_used=self.few_minutes_ago,
+            stock=individual_stock_factory(),
+        )
+        booking2 = bookings_factories.UsedBookingFactory(
+            dateUsed=self.few_minutes_ago,
+            stock=individual_stock_factory(),
+        )
+
+        api.price_bookings(self.few_minutes_ago, by_pricing_point=True)
+
+        assert not booking1.pricings
+        assert len(booking2.pricings) == 1
+
+    def test_num_queries(self):
+        venue = offerers_factories.VenueFactory(pricing_point="self")
+        bookings_factories.UsedBookingFactory.create_batch(
+            3, dateUsed=self.few_minutes_ago, stock=individual_stock_factory(offer__venue=venue)
+        )
+        window = (self.few_minutes_ago, datetime.datetime.utcnow())
+        bookings = api._get_bookings_to_price(bookings_models.Booking, window).all()
+
+        rule_finder = reimbursement.CustomRuleFinder()
+
+        queries = 0
+        queries += 1  # select for update on Venue (lock)
+        queries += 1  # fetch bookings again with multiple joinedload
+        queries += 1  # select existing Pricing (if any)
+        queries += 1  # select dependent pricings
+        queries += 1  # calculate revenue
+        queries += 1  # select pricing ids
+        queries += 1  # insert 3 Pricing
+        queries += 1  # insert 6 PricingLine
+        queries += 1  # commit
+        with assert_num_queries(queries):
+            api._price_bookings_by_pricing_point(bookings, set(), rule_finder)
+        assert models.Pricing.query.count() == 3
+
+    @pytest.mark.skip(reason="Benchmark: run manually with `pytest -o log_cli=true -k PriceBookingsByPricingPoint`")
+    def test_benchmark(self):
+        n_bookings = 100_000
+        n_venues = 50
+        user = create_rich_user()
+        user.deposit.amount = n_bookings
+        db.session.commit()
+        stocks = [individual_stock_factory(price=1) for _ in range(n_venues)]
+        template = bookings_factories.UsedBookingFactory(user=user, stock=stocks[0], dateUsed=self.few_minutes_ago)
+        for i, stock in enumerate(stocks):
+            db.session.execute(
+                sqla.text(
+                    """
+                    INSERT INTO booking (
+                        "dateCreated", "dateUsed", "stockId", quantity, token, amount, status,
+                        "userId", "depositId", "venueId", "offererId", "cancellationLimitDate"
+                    )
+                    SELECT
+                        b."dateCreated", b."dateUsed" - make_interval(secs => n), :stock_id, 1,
+                        lpad(upper(to_hex(:offset + n)), 6, '0'), 1, b.status,
+                        b."userId", b."depositId", :venue_id, :offerer_id, b."cancellationLimitDate"
+                    FROM booking b, generate_series(1, :count) AS n
+                    WHERE b.id = :template_id
+                    """
+                ),
+                {
+                    "stock_id": stock.id,
+                    "venue_id": stock.offer.venueId,
+                    "offerer_id": stock.offer.venue.managingOffererId,
+                    "count": n_bookings // n_venues - (1 if i == 0 else 0),
+                    "offset": i * n_bookings // n_venues,
+                    "template_id": template.id,
+                },
+            )
+        db.session.commit()
+        min_date = self.few_minutes_ago - datetime.timedelta(days=1)
+
+        start = time.perf_counter()
+        api.price_bookings(min_date=min_date, batch_size=1_000, by_pricing_point=True)
+        by_pricing_point_duration = time.perf_counter() - start
+        snapshot = get_pricings_snapshot()
+        delete_non_cancelled_pricings()
+
+        start = time.perf_counter()
+        api.price_bookings(min_date=min_date, batch_size=1_000)
+        one_at_a_time_duration = time.perf_counter() - start
+
+        logger.info(
+            "Pricing benchmark",
+            extra={
+                "bookings": n_bookings,
+                "by_pricing_point_duration": by_pricing_point_duration,
+                "one_at_a_time_duration": one_at_a_time_duration,
+            },
+        )
+        assert len(snapshot) == n_bookings
+        assert get_pricings_snapshot() == snapshot
+
+
 def test_get_next_cashflow_batch_label():
     label = api._get_next_cashflow_batch_label()
     assert label == "VIR1"
@@ -992,6 +1180,27 @@ class GenerateCashflowsTest:
 
         assert models.Cashflow.query.count() == 0
 
+    def test_check_pricing_integrity_skips_only_errored_reimbursement_point(self):
+        venue1 = offerers_factories.VenueFactory(pricing_point="self", reimbursement_point="self")
+        factories.BankInformationFactory(venue=venue1)
+        booking1 = bookings_factories.UsedBookingFactory(stock__offer__venue=venue1)
+        api.price_booking(booking1)
+        venue2 = offerers_factories.VenueFactory(pricing_point="self", reimbursement_point="self")
+        factories.BankInformationFactory(venue=venue2)
+        booking2 = bookings_factories.UsedBookingFactory(stock__offer__venue=venue2)
+        api.price_booking(booking2)
+
+        booking1.amount -= 1
+        db.session.commit()
+
+        api.generate_cashflows(cutoff=datetime.datetime.utcnow())
+
+        cashflow = models.Cashflow.query.one()
+        assert cashflow.reimbursementPoint == venue2
+        assert cashflow.pricings == booking2.pricings
+        assert booking1.pricings[0].status == models.PricingStatus.VALIDATED
+        assert booking2.pricings[0].status == models.PricingStatus.PROCESSED
+
     def test_assert_num_queries(self):
         venue1 = offerers_factories.VenueFactory(reimbursement_point="self")
         factories.BankInformationFactory(venue=venue1)
@@ -1017,18 +1226,9 @@ class GenerateCashflowsTest:
         n_queries += 1  # insert CashflowBatch
         n_queries += 1  # commit
         n_queries += 1  # select CashflowBatch again after commit
-        n_queries += 1  # select business unit and bank account ids to process
-        n_queries += 2 * sum(  # 2 reimbursement points
-            (
-                1,  # check integration of pricings
-                1,  # compute sum of pricings
-                1,  # insert Cashflow
-                1,  # select pricings to...
-                1,  # ... insert CashflowPricing
-                1,  # update Pricing.status
-                1,  # commit
-            )
-        )
+        n_queries += 1  # check integrity of pricings
+        n_queries += 1  # insert Cashflow and CashflowPricing, update Pricing.status
+        n_queries += 1  # commit
         with assert_num_queries(n_queries):
             api.generate_cashflows(cutoff)
 
@@ -1426,6 +1626,42 @@ class GenerateInvoicesTest:
         invoiced_bookings = {inv.cashflows[0].pricings[0].booking for inv in invoices}
         assert invoiced_bookings == {booking1, booking2}
 
+    @mock.patch("pcapi.core.finance.api._generate_invoice_html")
+    @mock.patch("pcapi.core.finance.api._store_invoice_pdf")
+    @clean_temporary_files
+    def test_generate_pdf_after_commit(self, mocked_store_invoice_pdf, _mocked_generate_invoice_html):
+        booking = bookings_factories.UsedBookingFactory(stock=individual_stock_factory())
+        factories.BankInformationFactory(venue=booking.venue)
+        api.price_booking(booking)
+        api.generate_cashflows_and_payment_files(datetime.datetime.utcnow())
+
+        api.generate_invoices(pdf_workers=1)
+
+        invoice = models.Invoice.query.one()
+        assert invoice.pdfStored
+        mocked_store_invoice_pdf.assert_called_once()
+        assert mocked_store_invoice_pdf.call_args.kwargs["invoice_storage_id"] == invoice.storage_object_id
+        assert len(mails_testing.outbox) == 1
+
+
+class StorePendingInvoicePdfsTest:
+    @mock.patch("pcapi.core.finance.api._generate_invoice_html")
+    @mock.patch("pcapi.core.finance.api._store_invoice_pdf")
+    def test_resume(self, mocked_store_invoice_pdf, _mocked_generate_invoice_html):
+        pending = factories.InvoiceFactory(pdfStored=False)
+        factories.InvoiceFactory()  # already stored
+
+        api.store_pending_invoice_pdfs()
+
+        mocked_store_invoice_pdf.assert_called_once()
+        assert mocked_store_invoice_pdf.call_args.kwargs["invoice_storage_id"] == pending.storage_object_id
+        assert pending.pdfStored
+        assert len(mails_testing.outbox) == 1
+
+        # Nothing left to do.
+        api.store_pending_invoice_pdfs()
+        mocked_store_invoice_pdf.assert_called_once()
+
 
 class GenerateInvoiceTest:
     EXPECTED_NUM_QUERIES = (
@@ -2258,3 +2494,42 @@ class CreateDepositTest:
         # Then
         assert models.Deposit.query.filter(models.Deposit.userId == beneficiary.id).count() == 1
         assert error.value.errors["user"] == ['Cet utilisateur a déjà été crédité de la subvention "GRANT_18".']
+
+
+class CheckDepositSpentAmountsTest:
+    def test_spent_amounts_are_maintained(self):
+        user = users_factories.BeneficiaryGrant18Factory()
+        booking = bookings_factories.BookingFactory(user=user, amount=10, quantity=2)
+        bookings_factories.UsedBookingFactory(user=user, amount=5)
+        bookings_factories.CancelledBookingFactory(user=user, amount=7)
+        deposit = user.deposit
+        db.session.refresh(deposit)
+        assert deposit.spentAmount == 25
+        assert deposit.usedSpentAmount == 5
+
+        booking.status = bookings_models.BookingStatus.CANCELLED
+        db.session.flush()
+        db.session.refresh(deposit)
+        assert deposit.spentAmount == 5
+        assert deposit.usedSpentAmount == 5
+        assert user.wallet_balance == deposit.amount - 5
+        assert api.check_deposit_spent_amounts() == []
+
+    def test_check_and_fix(self):
+        user = users_factories.BeneficiaryGrant18Factory()
+        bookings_factories.UsedBookingFactory(user=user, amount=5)
+        other_user = users_factories.BeneficiaryGrant18Factory()
+        bookings_factories.BookingFactory(user=other_user, amount=3)
+        db.session.execute(
+            sqla.update(models.Deposit).where(models.Deposit.id == user.deposit.id).values(spentAmount=12)
+        )
+
+        mismatches = api.check_deposit_spent_amounts()
+        assert [(row.deposit_id, row.spent_amount, row.expected_spent_amount) for row in mismatches] == [
+            (user.deposit.id, 12, 5)
+        ]
+
+        api.check_deposit_spent_amounts(fix=True)
+
+        assert api.check_deposit_spent_amounts() == []
+        assert user.wallet_balance == user.deposit.amount - 5
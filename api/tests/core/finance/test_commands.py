@@ -1,9 +1,12 @@
 import decimal
+from unittest import mock
 
+import pcapi.core.finance.factories as finance_factories
 import pcapi.core.finance.models as finance_models
 import pcapi.core.offerers.factories as offerers_factories
 import pcapi.core.offerers.models as offerers_models
 import pcapi.core.offers.factories as offers_factories
+from pcapi.core.testing import clean_temporary_files
 from pcapi.utils import human_ids
 
 from tests.conftest import clean_database
@@ -109,3 +112,19 @@ def test_move_siret(app):
 
     assert not src_venue.siret
     assert dst_venue.siret == siret
+
+
+class GenerateInvoicesTest:
+    @mock.patch("pcapi.core.finance.api._generate_invoice_html")
+    @mock.patch("pcapi.core.finance.api._store_invoice_pdf")
+    @clean_temporary_files
+    @clean_database
+    def test_pdf_workers(self, _mocked_store_invoice_pdf, _mocked_generate_invoice_html, app):
+        finance_factories.CashflowBatchFactory()
+        invoice_ids = [invoice.id for invoice in finance_factories.InvoiceFactory.create_batch(3, pdfStored=False)]
+
+        run_command(app, "generate_invoices", "--pdf-workers", "2")
+
+        invoices = finance_models.Invoice.query.filter(finance_models.Invoice.id.in_(invoice_ids)).all()
+        assert len(invoices) == 3
+        assert all(invoice.pdfStored for invoice in invoices)
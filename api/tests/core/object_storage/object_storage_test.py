@@ -1,14 +1,21 @@
 from unittest.mock import MagicMock
+from unittest.mock import call
 from unittest.mock import patch
 
 from google.cloud.exceptions import NotFound
 import pytest
 
 from pcapi.core.object_storage import BACKENDS_MAPPING
+from pcapi.core.object_storage import PublicObject
 from pcapi.core.object_storage import _check_backend_setting
 from pcapi.core.object_storage import _check_backends_module_paths
+from pcapi.core.object_storage import _get_backend_instance
+from pcapi.core.object_storage import _get_executor
+from pcapi.core.object_storage import backends
 from pcapi.core.object_storage import delete_public_object
+from pcapi.core.object_storage import metrics
 from pcapi.core.object_storage import store_public_object
+from pcapi.core.object_storage import store_public_objects
 import pcapi.core.offerers.factories as offerers_factories
 import pcapi.core.offers.factories as offers_factories
 from pcapi.core.testing import override_settings
@@ -36,6 +43,70 @@ class StorePublicObjectTest:
         mock_gcp_store_public_object.assert_called_once_with("bucket", "object_id", b"mouette", "image/jpeg")
 
 
+class StorePublicObjectsTest:
+    @override_settings(OBJECT_STORAGE_PROVIDER="local,GCP")
+    @patch("pcapi.core.object_storage.backends.local.LocalBackend.store_public_object")
+    @patch("pcapi.core.object_storage.backends.gcp.GCPBackend.store_public_object")
+    def test_multiple_objects_and_backends(self, mock_gcp_store_public_object, mock_local_store_public_object):
+        metrics.reset_upload_latency_histograms()
+        objects = [PublicObject("bucket", f"object_id_{i}", b"mouette", "image/jpeg") for i in range(20)]
+
+        store_public_objects(iter(objects), max_workers=3)
+
+        expected_calls = [call("bucket", f"object_id_{i}", b"mouette", "image/jpeg") for i in range(20)]
+        mock_local_store_public_object.assert_has_calls(expected_calls, any_order=True)
+        assert mock_local_store_public_object.call_count == 20
+        mock_gcp_store_public_object.assert_has_calls(expected_calls, any_order=True)
+        assert mock_gcp_store_public_object.call_count == 20
+        histograms = metrics.get_upload_latency_histograms()
+        assert histograms["LocalBackend"]["count"] == 20
+        assert histograms["GCPBackend"]["count"] == 20
+
+    @override_settings(OBJECT_STORAGE_PROVIDER="local")
+    @patch("pcapi.core.object_storage.backends.local.LocalBackend.store_public_object")
+    def test_stop_on_error(self, mock_local_store_public_object):
+        mock_local_store_public_object.side_effect = ValueError()
+        objects = (PublicObject("bucket", f"object_id_{i}", b"mouette", "image/jpeg") for i in range(100))
+
+        with pytest.raises(ValueError):
+            store_public_objects(objects, max_workers=2)
+
+        assert mock_local_store_public_object.call_count < 100
+
+
+class BackendInstanceTest:
+    def test_backend_is_reused(self):
+        path = BACKENDS_MAPPING["local"]
+        assert _get_backend_instance(path) is _get_backend_instance(path)
+
+    @patch("pcapi.core.object_storage.backends.gcp.Credentials")
+    @patch("pcapi.core.object_storage.backends.gcp.Client")
+    def test_gcp_client_is_reused(self, mocked_client, mocked_credentials):
+        backend = backends.gcp.GCPBackend(project_id="project", bucket_name="bucket")
+
+        assert backend.get_gcp_storage_client_bucket() is backend.get_gcp_storage_client_bucket()
+        mocked_credentials.from_service_account_info.assert_called_once()
+        mocked_client.assert_called_once()
+
+    def test_executor_is_reused(self):
+        assert _get_executor() is _get_executor()
+
+
+class LatencyHistogramTest:
+    def test_observe(self):
+        histogram = metrics.LatencyHistogram(buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.1)
+        histogram.observe(0.5)
+        histogram.observe(30)
+
+        assert histogram.to_dict() == {
+            "buckets": {"le_0.1": 2, "le_1.0": 1, "le_inf": 1},
+            "count": 4,
+            "sum": 30.65,
+        }
+
+
 class CheckBackendSettingTest:
     @override_settings(OBJECT_STORAGE_PROVIDER="")
     def test_empty_setting(self):
@@ -458,6 +458,42 @@ class ApiKeyTest:
         assert not offerers_api.find_api_key("idonotexist")
         assert not offerers_api.find_api_key("development_prefix_value")
 
+    def test_verified_key_is_cached(self, app):
+        offerer = offerers_factories.OffererFactory()
+        generated_key = offerers_api.generate_and_save_api_key(offerer.id)
+        prefix = generated_key.rsplit("_", 1)[0]
+
+        with patch.object(offerers_models.ApiKey, "check_secret", autospec=True, return_value=True) as mocked_check:
+            assert offerers_api.find_api_key(generated_key).offerer == offerer
+            assert offerers_api.find_api_key(generated_key).offerer == offerer
+            # Verifications are shared between processes through Redis.
+            offerers_api._verified_api_keys.clear()
+            assert offerers_api.find_api_key(generated_key).offerer == offerer
+
+        assert mocked_check.call_count == 1
+        assert app.redis_client.exists(f"api:api_key:verified:{prefix}")
+
+    def test_wrong_secret_with_cached_key(self):
+        offerer = offerers_factories.OffererFactory()
+        generated_key = offerers_api.generate_and_save_api_key(offerer.id)
+        assert offerers_api.find_api_key(generated_key)
+
+        wrong_last_char = "y" if generated_key[-1] == "x" else "x"
+        assert not offerers_api.find_api_key(generated_key[:-1] + wrong_last_char)
+
+    def test_deleted_key_is_not_found(self, app):
+        user_offerer = offerers_factories.UserOffererFactory()
+        offerer, user = user_offerer.offerer, user_offerer.user
+        generated_key = offerers_api.generate_and_save_api_key(offerer.id)
+        prefix = generated_key.rsplit("_", 1)[0]
+        assert offerers_api.find_api_key(generated_key)
+
+        offerers_api.delete_api_key_by_user(user, prefix)
+
+        assert prefix not in offerers_api._verified_api_keys
+        assert not app.redis_client.exists(f"api:api_key:verified:{prefix}")
+        assert not offerers_api.find_api_key(generated_key)
+
 
 class CreateOffererTest:
     @patch("pcapi.domain.admin_emails.maybe_send_offerer_validation_email", return_value=True)
@@ -248,6 +248,40 @@ class SynchronizeStocksTest:
             {stock.offer.id, offer.id, stock_with_booking.offer.id, created_offer.id, second_created_offer.id}
         )
 
+    @pytest.mark.usefixtures("db_session")
+    @mock.patch("pcapi.core.search.async_index_offer_ids")
+    def test_skip_unchanged_stocks(self, mock_async_index_offer_ids):
+        venue = offerers_factories.VenueFactory()
+        provider = providers_factories.ProviderFactory()
+        spec = [{"ref": "3010000101789", "available": 6}, {"ref": "3010000101797", "available": 4}]
+        create_offer(spec[0]["ref"], venue)
+        create_offer(spec[1]["ref"], venue)
+        stock_details = synchronize_provider_api._build_stock_details_from_raw_stocks(
+            spec, venue.siret, provider, venue.id
+        )
+        operations = api.synchronize_stocks(stock_details, venue, provider_id=provider.id)
+        assert operations["new_stocks"] == 2
+        mock_async_index_offer_ids.reset_mock()
+
+        spec[1]["available"] = 5
+        stock_details = synchronize_provider_api._build_stock_details_from_raw_stocks(
+            spec, venue.siret, provider, venue.id
+        )
+        operations = api.synchronize_stocks(stock_details, venue, provider_id=provider.id)
+
+        assert operations == {
+            "new_offers": 0,
+            "new_stocks": 0,
+            "updated_stocks": 1,
+            "unchanged_stocks": 1,
+            "updated_offers": 0,
+        }
+        stock = offers_models.Stock.query.filter_by(idAtProviders=f"{spec[1]['ref']}@{venue.siret}").one()
+        assert stock.quantity == 5
+        assert stock.rawProviderQuantity == 5
+        # The offer is still bookable at the same price: no reindexation.
+        mock_async_index_offer_ids.assert_not_called()
+
     def test_build_new_offers_from_stock_details(self, db_session):
         # Given
         spec = [
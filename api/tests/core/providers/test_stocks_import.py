@@ -0,0 +1,107 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from flask import current_app
+import pytest
+
+import pcapi.core.offerers.factories as offerers_factories
+import pcapi.core.offers.factories as offers_factories
+from pcapi.core.providers import stocks_import
+from pcapi.core.providers.models import StocksImportStatus
+from pcapi.core.testing import override_settings
+
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+
+def _create_book_offer(venue, isbn):
+    return offers_factories.OfferFactory(
+        product__idAtProviders=isbn,
+        product__extraData={"prix_livre": 12.34},
+        product__subcategoryId="LIVRE_PAPIER",
+        idAtProvider=isbn,
+        venue=venue,
+    )
+
+
+class StocksImportTest:
+    @override_settings(STOCKS_IMPORT_CHUNK_SIZE=2)
+    def test_import_by_chunks(self):
+        venue = offerers_factories.VenueFactory()
+        offers = [_create_book_offer(venue, isbn) for isbn in ("1", "2", "3")]
+        stocks = [stocks_import.StockToImport(isbn, 3, Decimal("12.34")) for isbn in ("1", "2", "3")]
+
+        import_id, chunks_count = stocks_import.create_import(venue.id, stocks)
+
+        assert chunks_count == 2
+        status = stocks_import.get_last_import_status(venue.id)
+        assert status["id"] == import_id
+        assert status["status"] == StocksImportStatus.PENDING
+        assert status["stocks_count"] == 3
+        assert status["chunks_count"] == 2
+        assert status["done_chunks_count"] == 0
+        assert isinstance(status["date_created"], datetime.datetime)
+
+        stocks_import.import_chunk(import_id, 0)
+
+        assert [len(offer.stocks) for offer in offers] == [1, 1, 0]
+        assert offers[0].stocks[0].quantity == 3
+        assert offers[0].stocks[0].price == Decimal("12.34")
+        assert stocks_import.get_last_import_status(venue.id)["status"] == StocksImportStatus.PENDING
+
+        stocks_import.import_chunk(import_id, 1)
+
+        assert [len(offer.stocks) for offer in offers] == [1, 1, 1]
+        status = stocks_import.get_last_import_status(venue.id)
+        assert status["status"] == StocksImportStatus.DONE
+        assert status["done_chunks_count"] == 2
+
+    def test_import_chunk_only_once(self):
+        venue = offerers_factories.VenueFactory()
+        stocks = [stocks_import.StockToImport("1", 3, Decimal("12.34"))]
+        import_id, _ = stocks_import.create_import(venue.id, stocks)
+        stocks_import.import_chunk(import_id, 0)
+
+        with mock.patch("pcapi.core.providers.api.synchronize_stocks") as mocked_synchronize_stocks:
+            stocks_import.import_chunk(import_id, 0)
+
+        mocked_synchronize_stocks.assert_not_called()
+
+    def test_skip_chunk_claimed_by_another_job(self):
+        venue = offerers_factories.VenueFactory()
+        stocks = [stocks_import.StockToImport("1", 3, Decimal("12.34"))]
+        import_id, _ = stocks_import.create_import(venue.id, stocks)
+        claim_key = stocks_import.CHUNK_CLAIM_KEY.format(import_id=import_id, index=0)
+        current_app.redis_client.set(claim_key, 1)
+
+        with mock.patch("pcapi.core.providers.api.synchronize_stocks") as mocked_synchronize_stocks:
+            stocks_import.import_chunk(import_id, 0)
+
+        mocked_synchronize_stocks.assert_not_called()
+        assert stocks_import.get_last_import_status(venue.id)["status"] == StocksImportStatus.PENDING
+
+    def test_failed_chunk(self):
+        venue = offerers_factories.VenueFactory()
+        stocks = [stocks_import.StockToImport("1", 3, Decimal("12.34"))]
+        import_id, _ = stocks_import.create_import(venue.id, stocks)
+
+        with mock.patch("pcapi.core.providers.api.synchronize_stocks", side_effect=ValueError):
+            with pytest.raises(ValueError):
+                stocks_import.import_chunk(import_id, 0)
+
+        status = stocks_import.get_last_import_status(venue.id)
+        assert status["status"] == StocksImportStatus.FAILED
+        assert status["failed_chunks_count"] == 1
+
+        # The chunk is kept and released, so that the job can be retried.
+        stocks_import.import_chunk(import_id, 0)
+
+        status = stocks_import.get_last_import_status(venue.id)
+        assert status["status"] == StocksImportStatus.DONE
+        assert status["failed_chunks_count"] == 0
+
+    def test_no_import(self):
+        venue = offerers_factories.VenueFactory()
+
+        assert stocks_import.get_last_import_status(venue.id) is None
@@ -188,6 +188,13 @@ class ReindexOfferIdsTest:
             == algolia.Last30DaysBookingsRange.MEDIUM.value
         )
 
+    @override_features(ALGOLIA_BOOKINGS_NUMBER_COMPUTATION=True, ENABLE_ALGOLIA_BOOKINGS_NUMBER_COUNTER=True)
+    def test_index_last_30_days_bookings_from_counter(self, app):
+        offer = make_bookable_offer()
+        search.last_30_days_bookings_counter.add_bookings([(offer.id, datetime.datetime.utcnow())] * 4)
+        search.reindex_offer_ids([offer.id])
+        assert search_testing.search_store["offers"][offer.id]["offer"]["last30DaysBookings"] == 4
+
     @override_features(ALGOLIA_BOOKINGS_NUMBER_COMPUTATION=False)
     @override_settings(ALGOLIA_LAST_30_DAYS_BOOKINGS_RANGE_THRESHOLDS=[3, 6, 9, 12])
     def test_last_30_days_bookings_computation_feature_toggle(self, app):
@@ -273,6 +280,83 @@ class IndexOffersInQueueTest:
         assert app.redis_client.scard("search:algolia:offer_ids") == 0
 
 
+@override_settings(REDIS_OFFER_IDS_CHUNK_SIZE=3)
+class IndexOffersInQueuePipelinedTest:
+    def test_index_and_unindex_offers(self, app):
+        offers = [make_bookable_offer() for _ in range(5)]
+        unbookable_offer = make_unbookable_offer()
+        search_testing.search_store["offers"][unbookable_offer.id] = "dummy"
+        app.redis_client.hset("indexed_offers", unbookable_offer.id, "")
+        offer_ids = [offer.id for offer in offers] + [unbookable_offer.id]
+        app.redis_client.sadd("search:algolia:offer_ids", *offer_ids)
+
+        search.index_offers_in_queue_pipelined(stop_only_when_empty=True, max_in_flight_batches=1)
+
+        assert search_testing.search_store["offers"].keys() == {offer.id for offer in offers}
+        assert app.redis_client.scard("search:algolia:offer_ids") == 0
+        assert app.redis_client.scard("search:algolia:offer_ids_in_error") == 0
+
+    def test_cron_behaviour(self, app):
+        offer_ids = [make_bookable_offer().id for _ in range(8)]
+        app.redis_client.sadd("search:algolia:offer_ids", *offer_ids)
+
+        search.index_offers_in_queue_pipelined()
+
+        # Same as `index_offers_in_queue()`: stop when there are less
+        # than REDIS_OFFER_IDS_CHUNK_SIZE items left in the queue.
+        assert len(search_testing.search_store["offers"]) == 6
+        assert app.redis_client.scard("search:algolia:offer_ids") == 2
+
+    @mock.patch("pcapi.core.search.backends.testing.FakeClient.save_objects", fail)
+    def test_handle_indexation_error(self, app):
+        offer_ids = [make_bookable_offer().id for _ in range(4)]
+        app.redis_client.sadd("search:algolia:offer_ids", *offer_ids)
+
+        search.index_offers_in_queue_pipelined(stop_only_when_empty=True)
+
+        assert search_testing.search_store["offers"] == {}
+        assert app.redis_client.smembers("search:algolia:offer_ids_in_error") == {
+            str(offer_id) for offer_id in offer_ids
+        }
+
+    @mock.patch("pcapi.core.search.backends.testing.FakeClient.save_objects", fail)
+    @mock.patch("pcapi.core.search.backends.algolia.AlgoliaBackend.enqueue_offer_ids_in_error", fail)
+    def test_stop_on_unexpected_push_error(self, app, caplog):
+        offer_ids = [make_bookable_offer().id for _ in range(9)]
+        app.redis_client.sadd("search:algolia:offer_ids", *offer_ids)
+
+        # The pusher fails on the first batch, but still drains the
+        # queue: the producer must not block and the error is raised.
+        with pytest.raises(ValueError):
+            search.index_offers_in_queue_pipelined(stop_only_when_empty=True, max_in_flight_batches=1)
+
+        assert search_testing.search_store["offers"] == {}
+        # Offers that could not be put back in the error queue are logged.
+        popped_ids = set(offer_ids) - {int(id_) for id_ in app.redis_client.smembers("search:algolia:offer_ids")}
+        lost_ids = {
+            offer_id
+            for record in caplog.records
+            if record.message == "Could not put offers back in the error queue, must reindex manually"
+            for offer_id in record.extra["offers"]
+        }
+        assert lost_ids == popped_ids
+
+    @mock.patch("pcapi.core.search._push_offers_batch", fail)
+    def test_put_back_dropped_batches_in_error_queue(self, app):
+        offer_ids = [make_bookable_offer().id for _ in range(9)]
+        app.redis_client.sadd("search:algolia:offer_ids", *offer_ids)
+
+        with pytest.raises(ValueError):
+            search.index_offers_in_queue_pipelined(stop_only_when_empty=True, max_in_flight_batches=1)
+
+        # Offers popped from the queue are either in the error queue or
+        # still in the queue: none is lost.
+        remaining_ids = app.redis_client.smembers("search:algolia:offer_ids")
+        in_error_ids = app.redis_client.smembers("search:algolia:offer_ids_in_error")
+        assert in_error_ids
+        assert {int(id_) for id_ in remaining_ids | in_error_ids} == set(offer_ids)
+
+
 @override_features(ENABLE_VENUE_STRICT_SEARCH=True)
 def test_unindex_offer_ids(app):
     offer1 = make_bookable_offer()
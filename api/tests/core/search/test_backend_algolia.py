@@ -1,5 +1,7 @@
 import dataclasses
+import logging
 
+import algoliasearch.exceptions
 import pytest
 import requests_mock
 
@@ -319,6 +321,65 @@ def test_index_offers(app):
     assert backend.check_offer_is_indexed(offer)
 
 
+def test_index_offers_skips_unchanged_offers(app, caplog):
+    backend = get_backend()
+    offer1 = offers_factories.StockFactory().offer
+    offer2 = offers_factories.StockFactory().offer
+    with requests_mock.Mocker() as mock:
+        posted = mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", json={})
+
+        backend.index_offers([offer1, offer2], {})
+        assert posted.call_count == 1
+        assert len(posted.last_request.json()["requests"]) == 2
+
+        # Nothing has changed: nothing is sent.
+        caplog.clear()
+        with caplog.at_level(logging.INFO):
+            backend.index_offers([offer1, offer2], {})
+        assert posted.call_count == 1
+        [record] = [r for r in caplog.records if r.message == "Skipped unchanged offers before indexation"]
+        assert record.extra == {"pushed": 0, "skipped": 2}
+
+        # Only changed offers are sent.
+        offer2.name = "Nouveau nom"
+        backend.index_offers([offer1, offer2], {offer1.id: 10})
+        assert posted.call_count == 2
+        assert len(posted.last_request.json()["requests"]) == 2
+
+        offer2.name = "Autre nom"
+        backend.index_offers([offer1, offer2], {offer1.id: 10})
+        assert posted.call_count == 3
+        requests = posted.last_request.json()["requests"]
+        assert [request["body"]["objectID"] for request in requests] == [offer2.id]
+
+    assert app.redis_client.hget("indexed_offers", offer2.id) == algolia.get_document_digest(
+        backend.serialize_offer(offer2, 0)
+    )
+
+
+def test_index_offers_force(app):
+    backend = get_backend()
+    offer = offers_factories.StockFactory().offer
+    with requests_mock.Mocker() as mock:
+        posted = mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", json={})
+
+        backend.index_offers([offer], {})
+        backend.index_offers([offer], {}, force=True)
+
+    assert posted.call_count == 2
+
+
+def test_index_offers_does_not_store_digest_on_error(app):
+    backend = get_backend()
+    offer = offers_factories.StockFactory().offer
+    with requests_mock.Mocker() as mock:
+        mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", status_code=400, json={})
+        with pytest.raises(algoliasearch.exceptions.RequestException):
+            backend.index_offers([offer], {})
+
+    assert not backend.check_offer_is_indexed(offer)
+
+
 def test_unindex_offer_ids(app):
     backend = get_backend()
     app.redis_client.hset("indexed_offers", "1", "")
@@ -0,0 +1,88 @@
+import datetime
+
+import pytest
+
+from pcapi.core.bookings import factories as bookings_factories
+import pcapi.core.bookings.api as bookings_api
+import pcapi.core.offers.factories as offers_factories
+from pcapi.core.search import last_30_days_bookings
+import pcapi.core.users.factories as users_factories
+
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+
+def days_ago(days: int) -> datetime.datetime:
+    return datetime.datetime.utcnow() - datetime.timedelta(days=days)
+
+
+class UpdateTest:
+    def test_add_and_remove_bookings(self):
+        last_30_days_bookings.add_bookings([(1, days_ago(0)), (1, days_ago(10)), (2, days_ago(29))])
+        last_30_days_bookings.remove_bookings([(1, days_ago(10))])
+
+        assert last_30_days_bookings.get_counts([1, 2, 3]) == {1: 1, 2: 1}
+
+    def test_ignore_bookings_out_of_window(self):
+        last_30_days_bookings.add_bookings([(1, days_ago(30))])
+        last_30_days_bookings.remove_bookings([(2, days_ago(31))])
+
+        assert last_30_days_bookings.get_counts([1, 2]) == {}
+
+    def test_book_and_cancel(self):
+        stock = offers_factories.StockFactory(price=10)
+        beneficiary = users_factories.BeneficiaryGrant18Factory()
+
+        booking = bookings_api.book_offer(beneficiary, stock.id, quantity=1)
+        assert last_30_days_bookings.get_counts([stock.offerId]) == {stock.offerId: 1}
+
+        bookings_api.cancel_booking_by_beneficiary(beneficiary, booking)
+        assert last_30_days_bookings.get_counts([stock.offerId]) == {}
+
+        bookings_api.mark_as_used_with_uncancelling(booking)
+        assert last_30_days_bookings.get_counts([stock.offerId]) == {stock.offerId: 1}
+
+
+class ExpireBucketsTest:
+    def test_expire_buckets(self):
+        last_30_days_bookings.add_bookings([(1, days_ago(0)), (1, days_ago(28)), (2, days_ago(29))])
+
+        expired = last_30_days_bookings.expire_buckets(now=datetime.datetime.utcnow() + datetime.timedelta(days=1))
+
+        assert expired == 1
+        assert last_30_days_bookings.get_counts([1, 2]) == {1: 2}
+        # running it again is a no-op
+        assert last_30_days_bookings.expire_buckets(now=datetime.datetime.utcnow() + datetime.timedelta(days=1)) == 0
+        assert last_30_days_bookings.get_counts([1, 2]) == {1: 2}
+
+
+class BackfillTest:
+    def test_backfill(self):
+        offer = offers_factories.StockFactory().offer
+        other_offer = offers_factories.StockFactory().offer
+        bookings_factories.BookingFactory.create_batch(2, stock=offer.stocks[0], dateCreated=days_ago(0))
+        bookings_factories.BookingFactory(stock=offer.stocks[0], dateCreated=days_ago(5))
+        bookings_factories.BookingFactory(stock=offer.stocks[0], dateCreated=days_ago(31))
+        bookings_factories.CancelledBookingFactory(stock=offer.stocks[0], dateCreated=days_ago(1))
+        bookings_factories.BookingFactory(stock=other_offer.stocks[0], dateCreated=days_ago(29))
+        # stale counters are replaced
+        last_30_days_bookings.add_bookings([(offer.id, days_ago(3)), (1, days_ago(3))])
+
+        last_30_days_bookings.backfill()
+
+        assert last_30_days_bookings.get_counts([offer.id, other_offer.id, 1]) == {offer.id: 3, other_offer.id: 1}
+        assert last_30_days_bookings.check_consistency() == {}
+
+        # buckets have been rebuilt too
+        last_30_days_bookings.expire_buckets(now=datetime.datetime.utcnow() + datetime.timedelta(days=1))
+        assert last_30_days_bookings.get_counts([offer.id, other_offer.id]) == {offer.id: 3}
+
+
+class CheckConsistencyTest:
+    def test_check_consistency(self):
+        offer = offers_factories.StockFactory().offer
+        bookings_factories.BookingFactory(stock=offer.stocks[0], dateCreated=days_ago(0))
+        last_30_days_bookings.add_bookings([(offer.id, days_ago(0)), (offer.id, days_ago(1)), (1, days_ago(1))])
+
+        assert last_30_days_bookings.check_consistency() == {offer.id: (1, 2), 1: (0, 1)}
+        assert last_30_days_bookings.check_consistency([offer.id]) == {offer.id: (1, 2)}
@@ -0,0 +1,128 @@
+import datetime
+import json
+import logging
+import time
+
+import pytest
+
+from pcapi.core import search
+from pcapi.core.categories import subcategories
+import pcapi.core.criteria.factories as criteria_factories
+import pcapi.core.offerers.factories as offerers_factories
+from pcapi.core.offers import models as offers_models
+import pcapi.core.offers.factories as offers_factories
+from pcapi.core.search import offer_rows
+from pcapi.core.search.backends import algolia
+from pcapi.core.testing import assert_num_queries
+
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(autouse=True)
+def clear_book_macro_sections_cache():
+    # The cache is global: it must not leak from a test to another one.
+    algolia.book_macro_sections_cache.invalidate()
+    yield
+    algolia.book_macro_sections_cache.invalidate()
+
+
+def make_offers() -> list[offers_models.Offer]:
+    in_ten_days = datetime.datetime.utcnow() + datetime.timedelta(days=10)
+    criteria = [criteria_factories.CriterionFactory(name=name) for name in ("b", "a", "c")]
+
+    event = offers_factories.EventOfferFactory(
+        criteria=criteria,
+        extraData={"showType": "100", "performer": "Performer"},
+        venue__latitude=None,
+        venue__longitude=None,
+    )
+    offers_factories.EventStockFactory(offer=event, price=20, beginningDatetime=in_ten_days)
+    offers_factories.EventStockFactory(
+        offer=event, price=0, beginningDatetime=in_ten_days + datetime.timedelta(hours=2)
+    )
+    offers_factories.EventStockFactory(offer=event, price=5, beginningDatetime=in_ten_days, isSoftDeleted=True)
+    offers_factories.EventStockFactory(offer=event, price=7, beginningDatetime=in_ten_days, quantity=0)
+
+    book = offers_factories.OfferFactory(
+        subcategoryId=subcategories.LIVRE_PAPIER.id,
+        product__thumbCount=3,
+        extraData={"isbn": "9782070612758", "rayon": "petits prix", "author": "Author"},
+    )
+    offers_factories.StockFactory(offer=book, price=12.5)
+    offers_factories.StockFactory(offer=book, price=8)
+
+    with_mediation = offers_factories.ThingOfferFactory(criteria=criteria[:1], url="https://example.com")
+    offers_factories.MediationFactory(offer=with_mediation, thumbCount=2)
+    offers_factories.MediationFactory(
+        offer=with_mediation, isActive=False, dateCreated=datetime.datetime.utcnow() + datetime.timedelta(days=1)
+    )
+    offers_factories.StockFactory(offer=with_mediation, price=0)
+
+    unbookable = offers_factories.OfferFactory()
+    offers_factories.StockFactory(offer=unbookable, quantity=0)
+
+    inactive_offerer = offers_factories.OfferFactory(venue__managingOfferer__isActive=False)
+    offers_factories.StockFactory(offer=inactive_offerer)
+
+    return [event, book, with_mediation, unbookable, inactive_offerer]
+
+
+def test_offer_rows_match_orm_offers():
+    offer_ids = [offer.id for offer in make_offers()]
+
+    orm_offers = search.get_base_query_for_offer_indexation().filter(offers_models.Offer.id.in_(offer_ids)).all()
+    rows = offer_rows.get_offer_rows(offer_ids)
+
+    orm_by_id = {offer.id: offer for offer in orm_offers}
+    assert {row.id for row in rows} == set(offer_ids)
+    for row in rows:
+        orm_offer = orm_by_id[row.id]
+        assert row.is_eligible_for_search == orm_offer.is_eligible_for_search
+        assert row == offer_rows.OfferRow.from_offer(orm_offer)
+        if not row.is_eligible_for_search:
+            continue
+        from_orm = algolia.AlgoliaBackend.serialize_offer(orm_offer, 3)
+        from_row = algolia.AlgoliaBackend.serialize_offer_row(row, 3)
+        assert json.dumps(from_row, default=str) == json.dumps(from_orm, default=str)
+
+
+def test_offer_rows_query_count():
+    offer_ids = [offer.id for offer in make_offers()]
+
+    # offers, stocks, criteria and mediations
+    with assert_num_queries(4):
+        offer_rows.get_offer_rows(offer_ids)
+
+
+def test_offer_rows_throughput():
+    # Not a strict benchmark: it logs timings of both loaders on the
+    # same data set, to be compared when running tests locally with
+    # `pytest -o log_cli=true`.
+    venue = offerers_factories.VenueFactory()
+    criterion = criteria_factories.CriterionFactory()
+    offer_ids = []
+    for _ in range(100):
+        offer = offers_factories.OfferFactory(venue=venue, criteria=[criterion])
+        offers_factories.StockFactory.create_batch(3, offer=offer)
+        offers_factories.MediationFactory.create_batch(2, offer=offer)
+        offer_ids.append(offer.id)
+    algolia.book_macro_sections_cache.get("")  # warm up the cache
+
+    start = time.perf_counter()
+    orm_offers = search.get_base_query_for_offer_indexation().filter(offers_models.Offer.id.in_(offer_ids)).all()
+    orm_objects = [algolia.AlgoliaBackend.serialize_offer(offer, 0) for offer in orm_offers]
+    orm_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rows = offer_rows.get_offer_rows(offer_ids)
+    row_objects = [algolia.AlgoliaBackend.serialize_offer_row(row, 0) for row in rows]
+    rows_duration = time.perf_counter() - start
+
+    logger.info(
+        "Offer loaders benchmark",
+        extra={"offers": len(offer_ids), "orm_duration": orm_duration, "rows_duration": rows_duration},
+    )
+    assert len(orm_objects) == len(row_objects) == 100
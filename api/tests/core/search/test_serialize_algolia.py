@@ -3,6 +3,7 @@ import decimal
 
 import pytest
 
+from pcapi.core import search
 from pcapi.core.categories import subcategories
 import pcapi.core.criteria.factories as criteria_factories
 import pcapi.core.educational.factories as educational_factories
@@ -12,7 +13,9 @@ import pcapi.core.offerers.models as offerers_models
 import pcapi.core.offers.factories as offers_factories
 import pcapi.core.offers.models as offers_models
 from pcapi.core.search.backends import algolia
+from pcapi.core.testing import assert_num_queries
 from pcapi.core.testing import override_settings
+from pcapi.models import db
 from pcapi.routes.adage_iframe.serialization.offers import OfferAddressType
 from pcapi.utils.human_ids import humanize
 
@@ -20,6 +23,14 @@ from pcapi.utils.human_ids import humanize
 pytestmark = pytest.mark.usefixtures("db_session")
 
 
+@pytest.fixture(autouse=True)
+def clear_book_macro_sections_cache():
+    # The cache is global: it must not leak from a test to another one.
+    algolia.book_macro_sections_cache.invalidate()
+    yield
+    algolia.book_macro_sections_cache.invalidate()
+
+
 @override_settings(ALGOLIA_LAST_30_DAYS_BOOKINGS_RANGE_THRESHOLDS=[1, 2, 3, 4])
 def test_serialize_offer():
     rayon = "Policier / Thriller format poche"  # fetched from provider
@@ -138,6 +149,38 @@ def test_serialize_offer_extra_data(
     assert serialized["offer"]["bookMacroSection"] == expected_macro_section
 
 
+def test_serialize_offers_loads_book_macro_sections_once():
+    sections = ["documentaire jeunesse histoire", "petits prix", "Policier / Thriller format poche"]
+    offers = [offers_factories.StockFactory(offer__extraData={"rayon": section}).offer for section in sections * 10]
+    offers = search.get_base_query_for_offer_indexation().filter(
+        offers_models.Offer.id.in_([offer.id for offer in offers])
+    )
+    offers = offers.all()
+
+    # We used to make 1 query per book offer (i.e. 30 queries for
+    # this chunk). We now load the whole table only once.
+    with assert_num_queries(1):
+        serialized = [algolia.AlgoliaBackend().serialize_offer(offer, 0) for offer in offers]
+    with assert_num_queries(0):
+        algolia.AlgoliaBackend().serialize_offer(offers[0], 0)
+
+    assert {item["offer"]["bookMacroSection"] for item in serialized} == {
+        "Jeunesse",
+        "Littérature française",
+        "Policier",
+    }
+
+
+def test_book_macro_sections_cache_is_invalidated_on_change():
+    offer = offers_factories.OfferFactory(extraData={"rayon": "Nouveau rayon"})
+    assert algolia.AlgoliaBackend().serialize_offer(offer, 0)["offer"]["bookMacroSection"] is None
+
+    db.session.add(offers_models.BookMacroSection(section="nouveau rayon", macroSection="Nouvelle section "))
+    db.session.flush()
+
+    assert algolia.AlgoliaBackend().serialize_offer(offer, 0)["offer"]["bookMacroSection"] == "Nouvelle section"
+
+
 @override_settings(ALGOLIA_LAST_30_DAYS_BOOKINGS_RANGE_THRESHOLDS=[1, 2, 3, 4])
 @pytest.mark.parametrize(
     "bookings_number, expected_range",
@@ -1292,3 +1292,44 @@ class PublicAccountHistoryTest:
         assert len(history) == 9
         datetimes = [item["datetime"] for item in history]
         assert datetimes == sorted(datetimes, reverse=True)
+
+
+class SearchAccountTest:
+    def test_search_name_is_maintained(self):
+        user = users_factories.UserFactory(firstName="Gérard", lastName="Dépardieu")
+        db.session.refresh(user)
+        assert user.searchName == "gerard depardieu"
+
+        user.lastName = "Lanvin"
+        db.session.commit()
+        db.session.refresh(user)
+        assert user.searchName == "gerard lanvin"
+
+    def test_search_by_email_domain(self):
+        user = users_factories.UserFactory(email="jeune@example.com")
+        users_factories.UserFactory(email="jeune@example.com.org")
+        users_factories.UserFactory(email="jeune@sub-example.com")
+
+        accounts = users_api._filter_user_accounts(users_models.User.query, "@example.com").all()
+
+        assert accounts == [user]
+
+    @pytest.mark.parametrize(
+        "search_term,index_name",
+        [
+            ("Gérard Dépardieu", "idx_user_trgm_search_name"),
+            ("@example.com", "ix_user_reversed_email"),
+        ],
+    )
+    def test_search_uses_index(self, search_term, index_name):
+        # Tables are too small in tests for the planner to choose an
+        # index over a sequential scan by itself.
+        users_factories.UserFactory.create_batch(3)
+        query = users_api._filter_user_accounts(users_models.User.query, search_term)
+        statement = query.statement.compile(dialect=db.engine.dialect)
+
+        db.session.execute("SET LOCAL enable_seqscan = off")
+        rows = db.session.connection().exec_driver_sql(f"EXPLAIN ANALYZE {statement}", statement.params)
+        plan = "\n".join(row[0] for row in rows)
+
+        assert index_name in plan
@@ -431,6 +431,33 @@ class CustomRuleFinderTest:
         assert finder.get_rule(ancient_booking) is None  # outside `rule.timespan`
         assert finder.get_rule(another_booking) is None  # no rule for this offer
 
+    def test_successive_rules(self):
+        now = datetime.utcnow()
+        booking = bookings_factories.UsedBookingFactory(
+            stock__offer__subcategoryId=subcategories.FESTIVAL_CINE.id, dateUsed=now - timedelta(days=15)
+        )
+        offerer = booking.offerer
+        old_booking = bookings_factories.UsedBookingFactory(stock=booking.stock, dateUsed=now - timedelta(days=25))
+        recent_booking = bookings_factories.UsedBookingFactory(stock=booking.stock, dateUsed=now - timedelta(days=1))
+        between_booking = bookings_factories.UsedBookingFactory(stock=booking.stock, dateUsed=now - timedelta(days=8))
+        subcategory_rule = finance_factories.CustomReimbursementRuleFactory(
+            offerer=offerer,
+            subcategories=[subcategories.FESTIVAL_CINE.id],
+            timespan=(now - timedelta(days=20), now - timedelta(days=10)),
+        )
+        offerer_rule = finance_factories.CustomReimbursementRuleFactory(
+            offerer=offerer, timespan=(now - timedelta(days=5), None)
+        )
+        bookings = [recent_booking, old_booking, booking, between_booking]
+        expected = [offerer_rule, None, subcategory_rule, None]
+
+        finder = reimbursement.CustomRuleFinder()
+        assert [finder.get_rule(b) for b in bookings] == expected
+
+        finder = reimbursement.CustomRuleFinder()
+        finder.prefetch(bookings)
+        assert [finder.get_rule(b) for b in bookings] == expected
+
 
 def assert_total_reimbursement(booking_reimbursement, rule, booking):
     assert booking_reimbursement.booking == booking
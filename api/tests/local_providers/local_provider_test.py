@@ -8,7 +8,6 @@ import pcapi.core.offers.factories as offers_factories
 import pcapi.core.offers.models as offers_models
 import pcapi.core.providers.factories as providers_factories
 import pcapi.core.providers.models as providers_models
-from pcapi.local_providers.local_provider import _upload_thumb
 from pcapi.local_providers.providable_info import ProvidableInfo
 from pcapi.models.api_errors import ApiErrors
 from pcapi.repository import repository
@@ -289,18 +288,20 @@ class UploadThumbTest:
             thumbCount=0,
         )
         local_provider = provider_test_utils.TestLocalProviderWithThumb()
-        thumb = local_provider.get_object_thumb()
 
         # When
-        _upload_thumb(product, thumb)
+        local_provider._handle_thumb(product)
+        local_provider._flush_thumbs()
         repository.save(product)
 
         # Then
         assert product.thumbCount == 1
         assert product.thumbUrl == f"http://localhost/storage/thumbs/products/{humanize(product.id)}"
 
-    @patch("pcapi.core.object_storage.store_public_object")
-    def test_fifth_thumb(self, mock_store_public_object):
+    @patch("pcapi.core.object_storage.store_public_objects")
+    def test_fifth_thumb(self, mock_store_public_objects):
+        stored_objects = []
+        mock_store_public_objects.side_effect = stored_objects.extend
         provider = providers_factories.AllocineProviderFactory(localClass="TestLocalProviderWithThumb")
         providable_info = ProvidableInfo()
         product = offers_factories.ThingProductFactory(
@@ -309,16 +310,31 @@ class UploadThumbTest:
             thumbCount=4,
         )
         local_provider = provider_test_utils.TestLocalProviderWithThumb()
-        thumb = local_provider.get_object_thumb()
 
         # When
-        _upload_thumb(product, thumb)
+        local_provider._handle_thumb(product)
+        local_provider._flush_thumbs()
         repository.save(product)
 
         # Then
         assert product.thumbCount == 5
         assert product.thumbUrl == f"http://localhost/storage/thumbs/products/{humanize(product.id)}_4"
-        mock_store_public_object.assert_called_once()
-        assert mock_store_public_object.call_args.kwargs["folder"] == "thumbs"
-        assert mock_store_public_object.call_args.kwargs["object_id"] == f"products/{humanize(product.id)}_4"
-        assert mock_store_public_object.call_args.kwargs["content_type"] == "image/jpeg"
+        mock_store_public_objects.assert_called_once()
+        [stored_object] = stored_objects
+        assert stored_object.folder == "thumbs"
+        assert stored_object.object_id == f"products/{humanize(product.id)}_4"
+        assert stored_object.content_type == "image/jpeg"
+
+    @patch("pcapi.core.object_storage.store_public_objects", side_effect=Exception)
+    def test_upload_error(self, mock_store_public_objects):
+        provider = providers_factories.AllocineProviderFactory(localClass="TestLocalProviderWithThumb")
+        product = offers_factories.ThingProductFactory(lastProvider=provider, thumbCount=1)
+        local_provider = provider_test_utils.TestLocalProviderWithThumb()
+
+        local_provider._handle_thumb(product)
+        assert product.thumbCount == 2
+        local_provider._flush_thumbs()
+
+        assert product.thumbCount == 1
+        assert local_provider.createdThumbs == 0
+        assert local_provider.erroredThumbs == 1
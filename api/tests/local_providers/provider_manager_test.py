@@ -1,4 +1,8 @@
+from collections import Counter
 from decimal import Decimal
+import threading
+import time
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
@@ -10,6 +14,7 @@ from pcapi.core.categories import subcategories
 import pcapi.core.offers.factories as offers_factories
 from pcapi.core.offers.models import Offer
 import pcapi.core.providers.factories as providers_factories
+from pcapi.core.testing import override_settings
 from pcapi.local_providers.provider_manager import synchronize_data_for_provider
 from pcapi.local_providers.provider_manager import synchronize_venue_provider
 from pcapi.local_providers.provider_manager import synchronize_venue_providers
@@ -181,6 +186,46 @@ class SynchronizeVenueProvidersTest:
         assert mock_synchronize_venue_provider.call_count == 2
         assert mock_add_to_synchronization_error_db.call_count == 2
 
+    @pytest.mark.usefixtures("db_session")
+    @patch("pcapi.local_providers.provider_manager.synchronize_venue_provider")
+    @patch("pcapi.connectors.notion.add_to_synchronization_error_database")
+    def test_do_not_log_success_on_error(self, _mock_add_to_db, mock_synchronize_venue_provider, caplog):
+        venue_provider = providers_factories.VenueProviderFactory()
+        mock_synchronize_venue_provider.side_effect = ValueError()
+
+        synchronize_venue_providers([venue_provider], 10)
+
+        messages = [record.message for record in caplog.records]
+        assert "Unexpected error while synchronizing venue provider" in messages
+        assert f"Synchronized venue_provider={venue_provider.id}" not in messages
+
+    @override_settings(PROVIDERS_SYNC_MAX_WORKERS_PER_PROVIDER=2)
+    def test_limit_concurrent_synchronizations_by_provider(self, app):
+        venue_providers = [SimpleNamespace(id=index, providerId=1) for index in range(6)] + [
+            SimpleNamespace(id=index, providerId=2) for index in range(6, 8)
+        ]
+        provider_ids = {venue_provider.id: venue_provider.providerId for venue_provider in venue_providers}
+        lock = threading.Lock()
+        running = Counter()
+        max_running = Counter()
+        synchronized = []
+
+        def synchronize(_app, venue_provider_id, _limit):
+            provider_id = provider_ids[venue_provider_id]
+            with lock:
+                running[provider_id] += 1
+                max_running[provider_id] = max(max_running[provider_id], running[provider_id])
+            time.sleep(0.05)
+            with lock:
+                running[provider_id] -= 1
+                synchronized.append(venue_provider_id)
+
+        with patch("pcapi.local_providers.provider_manager._synchronize_venue_provider_in_thread", synchronize):
+            synchronize_venue_providers(venue_providers, limit=None, workers=4)
+
+        assert sorted(synchronized) == list(range(8))
+        assert max_running == {1: 2, 2: 2}
+
 
 class SynchronizeDataForProviderTest:
     @patch("pcapi.local_providers.local_provider.LocalProvider.updateObjects")
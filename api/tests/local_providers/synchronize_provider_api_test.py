@@ -188,6 +188,58 @@ class ProviderAPICronTest:
             )
             synchronize_provider_api.synchronize_venue_provider(venue_provider)
 
+    @pytest.mark.usefixtures("db_session")
+    @freeze_time("2020-10-15 09:00:00")
+    @mock.patch("pcapi.core.search.async_index_offer_ids")
+    def test_resume_interrupted_synchronization(self, mocked_async_index_offer_ids, app):
+        provider = providers_factories.APIProviderFactory(apiUrl="https://provider_url", authToken="fake_token")
+        venue_provider = providers_factories.VenueProviderFactory(provider=provider)
+        siret = venue_provider.venue.siret
+        create_product(ISBNs[0], product_price="5.01")
+        create_product(ISBNs[4], product_price="10.02")
+
+        # The first page has been written, then the synchronization was interrupted.
+        with requests_mock.Mocker() as request_mock:
+            request_mock.get(
+                f"https://provider_url/{siret}?limit=1000",
+                json=provider_responses[0],
+                headers={"content-type": "application/json"},
+            )
+            request_mock.get(
+                f"https://provider_url/{siret}?limit=1000&after={ISBNs[3]}",
+                exc=ConnectionError,
+            )
+            with pytest.raises(ConnectionError):
+                synchronize_provider_api.synchronize_venue_provider(venue_provider)
+
+        assert Offer.query.filter_by(idAtProvider=ISBNs[0]).count() == 1
+        assert venue_provider.lastSyncDate is None
+        progress_key = f"providers:sync:venue_provider:{venue_provider.id}"
+        assert app.redis_client.hgetall(progress_key) == {
+            "start_sync_date": "2020-10-15T09:00:00",
+            "last_processed_reference": ISBNs[3],
+        }
+
+        with freeze_time("2020-10-15 10:00:00"):
+            with requests_mock.Mocker() as request_mock:
+                request_mock.get(
+                    f"https://provider_url/{siret}?limit=1000&after={ISBNs[3]}",
+                    json=provider_responses[1],
+                    headers={"content-type": "application/json"},
+                )
+                request_mock.get(
+                    f"https://provider_url/{siret}?limit=1000&after={ISBNs[6]}",
+                    json=provider_responses[2],
+                    headers={"content-type": "application/json"},
+                )
+                synchronize_provider_api.synchronize_venue_provider(venue_provider)
+
+        # The first page is not fetched again.
+        assert request_mock.call_count == 2
+        assert Offer.query.filter_by(idAtProvider=ISBNs[4]).count() == 1
+        assert venue_provider.lastSyncDate == datetime(2020, 10, 15, 9, 0)
+        assert not app.redis_client.exists(progress_key)
+
     @pytest.mark.usefixtures("db_session")
     class BuildStocksDetailsTest:
         def test_build_stock_details_from_raw_stocks(self):
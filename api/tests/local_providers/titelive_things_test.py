@@ -14,6 +14,7 @@ import pcapi.core.offers.models as offers_models
 import pcapi.core.providers.factories as providers_factories
 import pcapi.core.providers.models as providers_models
 from pcapi.core.providers.repository import get_provider_by_local_class
+from pcapi.core.testing import override_features
 from pcapi.local_providers import TiteLiveThings
 
 
@@ -503,3 +504,131 @@ class TiteliveThingsTest:
         assert refreshed_product.name == "xxx"
         assert refreshed_offer.isActive == False
         assert refreshed_offer.name == "xxx"
+
+
+def build_data_line(isbn, overrides=None):
+    data_line_parts = BASE_DATA_LINE_PARTS[:]
+    data_line_parts[0] = isbn
+    for index, value in (overrides or {}).items():
+        data_line_parts[index] = value
+    return "~".join(data_line_parts)
+
+
+class TiteliveThingsBulkImportTest:
+    @pytest.mark.usefixtures("db_session")
+    @override_features(ENABLE_TITELIVE_THINGS_BULK_IMPORT=True)
+    @patch("pcapi.core.search.async_index_offer_ids")
+    @patch("pcapi.local_providers.titelive_things.titelive_things.get_files_to_process_from_titelive_ftp")
+    @patch("pcapi.local_providers.titelive_things.titelive_things.get_lines_from_thing_file")
+    def test_import_file(
+        self, get_lines_from_thing_file, get_files_to_process_from_titelive_ftp, mocked_async_index_offer_ids
+    ):
+        get_files_to_process_from_titelive_ftp.return_value = ["Quotidien30.tit"]
+        provider = get_provider_by_local_class("TiteLiveThings")
+        product_to_update = offers_factories.ProductFactory(
+            name="Old name",
+            idAtProviders="9782895026311",
+            dateModifiedAtLastProvider=datetime(2001, 1, 1),
+            lastProviderId=provider.id,
+        )
+        stock_to_delete = ThingStockFactory(
+            offer__product__idAtProviders="9782895026312",
+            offer__product__subcategoryId=subcategories.LIVRE_PAPIER.id,
+        )
+        booking = bookings_factories.BookingFactory(
+            stock__offer__product__idAtProviders="9782895026313",
+            stock__offer__product__subcategoryId=subcategories.LIVRE_PAPIER.id,
+        )
+        offer_to_deactivate = ThingOfferFactory(
+            product__idAtProviders="9782895026314",
+            product__subcategoryId=subcategories.LIVRE_PAPIER.id,
+        )
+        deleted_offer_id = stock_to_delete.offerId
+        get_lines_from_thing_file.return_value = iter(
+            [
+                build_data_line("9782895026310"),
+                build_data_line("9782895026311", {2: "New name"}),
+                build_data_line("9782895026312", {39: "1"}),  # school book
+                build_data_line("9782895026313", {13: "O"}),  # not a book anymore
+                build_data_line("9782895026314", {2: "xxx", 23: "Xxx"}),  # unreleased
+                "wrong~line",
+            ]
+        )
+
+        TiteLiveThings().updateObjects()
+
+        created_product = offers_models.Product.query.filter_by(idAtProviders="9782895026310").one()
+        assert created_product.name == "nouvelles du Chili"
+        assert created_product.extraData["bookFormat"] == offers_models.BookFormat.BEAUX_LIVRES.value
+        assert created_product.lastProviderId == provider.id
+        assert product_to_update.name == "New name"
+        assert offers_models.Product.query.filter_by(idAtProviders="9782895026312").count() == 0
+        assert offers_models.Offer.query.filter_by(id=deleted_offer_id).count() == 0
+        booked_product = booking.stock.offer.product
+        assert not booked_product.isGcuCompatible
+        assert not booked_product.isSynchronizationCompatible
+        assert not booking.stock.offer.isActive
+        assert offer_to_deactivate.product.name == "xxx"
+        assert not offer_to_deactivate.isActive
+        assert offer_to_deactivate.name == "xxx"
+
+        errors = providers_models.LocalProviderEvent.query.filter_by(
+            type=providers_models.LocalProviderEventType.SyncError
+        ).all()
+        assert {error.payload for error in errors} == {
+            "number of elements mismatch",
+            "Error deleting product with ISBN: 9782895026313",
+        }
+        assert (
+            providers_models.LocalProviderEvent.query.filter_by(
+                type=providers_models.LocalProviderEventType.SyncPartEnd
+            )
+            .one()
+            .payload
+            == "30"
+        )
+        mocked_async_index_offer_ids.assert_called_once_with(
+            {deleted_offer_id, booking.stock.offerId, offer_to_deactivate.id}
+        )
+
+    @pytest.mark.usefixtures("db_session")
+    @override_features(ENABLE_TITELIVE_THINGS_BULK_IMPORT=True)
+    @patch("pcapi.local_providers.titelive_things.titelive_things.BULK_IMPORT_CHUNK_SIZE", 2)
+    @patch("pcapi.local_providers.titelive_things.titelive_things.get_files_to_process_from_titelive_ftp")
+    @patch("pcapi.local_providers.titelive_things.titelive_things.get_lines_from_thing_file")
+    def test_import_file_by_chunks(self, get_lines_from_thing_file, get_files_to_process_from_titelive_ftp):
+        get_files_to_process_from_titelive_ftp.return_value = ["Quotidien30.tit"]
+        provider = get_provider_by_local_class("TiteLiveThings")
+        # Already modified by the provider after the date of the line (2018-03-02).
+        up_to_date_product = offers_factories.ProductFactory(
+            name="Up to date",
+            idAtProviders="9782895026311",
+            dateModifiedAtLastProvider=datetime(2020, 1, 1),
+            lastProviderId=provider.id,
+        )
+        # Modified by another provider: always updated.
+        other_provider_product = offers_factories.ProductFactory(
+            name="Other provider",
+            idAtProviders="9782895026312",
+            dateModifiedAtLastProvider=datetime(2020, 1, 1),
+        )
+        get_lines_from_thing_file.return_value = iter(
+            [
+                build_data_line("9782895026310"),
+                build_data_line("9782895026311", {2: "New name"}),
+                build_data_line("9782895026312", {2: "New name"}),
+            ]
+        )
+
+        titelive_things = TiteLiveThings()
+        titelive_things.updateObjects()
+
+        created_product = offers_models.Product.query.filter_by(idAtProviders="9782895026310").one()
+        assert created_product.lastProviderId == provider.id
+        assert created_product.mediaUrls == []
+        assert up_to_date_product.name == "Up to date"
+        assert other_provider_product.name == "New name"
+        assert other_provider_product.lastProviderId == provider.id
+        assert titelive_things.checkedObjects == 3
+        assert titelive_things.createdObjects == 1
+        assert titelive_things.updatedObjects == 1
@@ -5,7 +5,9 @@ import flask
 import pytest
 
 from pcapi.core.testing import assert_num_queries
+from pcapi.core.testing import override_settings
 from pcapi.models import db
+from pcapi.models import feature as feature_module
 from pcapi.models.feature import FEATURES_DISABLED_BY_DEFAULT
 from pcapi.models.feature import Feature
 from pcapi.models.feature import FeatureToggle
@@ -67,6 +69,43 @@ class FeatureToggleTest:
         finally:
             flask._request_ctx_stack.push(context)
 
+    @override_settings(FEATURE_TOGGLES_CACHE_TTL=60)
+    def test_is_active_cache_outside_request_context(self, app):
+        feature = Feature.query.filter_by(name=FeatureToggle.SYNCHRONIZE_ALLOCINE.name).first()
+        feature.isActive = True
+        repository.save(feature)
+        feature_module.bump_version()
+        context = flask._request_ctx_stack.pop()
+
+        try:
+            db_hits = feature_module.get_db_hits_count()
+            with assert_num_queries(1):
+                assert FeatureToggle.SYNCHRONIZE_ALLOCINE.is_active()
+                assert FeatureToggle.SYNCHRONIZE_ALLOCINE.is_active()
+                assert FeatureToggle.API_SIRENE_AVAILABLE.is_active()
+            assert feature_module.get_db_hits_count() == db_hits + 1
+
+            # Changes are seen once the version has been bumped.
+            feature.isActive = False
+            repository.save(feature)
+            assert FeatureToggle.SYNCHRONIZE_ALLOCINE.is_active()
+            feature_module.bump_version()
+            assert not FeatureToggle.SYNCHRONIZE_ALLOCINE.is_active()
+        finally:
+            flask._request_ctx_stack.push(context)
+            feature_module.bump_version()
+
+    def test_load_feature_toggles(self):
+        feature = Feature.query.filter_by(name=FeatureToggle.SYNCHRONIZE_ALLOCINE.name).first()
+        feature.isActive = False
+        repository.save(feature)
+
+        with assert_num_queries(1):
+            toggles = feature_module.load_feature_toggles()
+
+        assert set(toggles) == set(FeatureToggle)
+        assert toggles[FeatureToggle.SYNCHRONIZE_ALLOCINE] is False
+
 
 @pytest.mark.usefixtures("db_session")
 class FeatureTest:
@@ -0,0 +1,47 @@
+from io import BytesIO
+
+import openpyxl
+import pytest
+
+import pcapi.core.bookings.factories as bookings_factories
+import pcapi.core.offerers.factories as offerers_factories
+from pcapi.core.testing import override_settings
+
+from tests.conftest import TestClient
+
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+URL = "/bookings/excel?bookingPeriodBeginningDate=2000-01-01&bookingPeriodEndingDate=2030-01-01"
+
+
+@override_settings(BOOKINGS_EXCEL_EXPORT_MAX_SYNC_BOOKINGS=2)
+class Returns200Test:
+    def test_export_up_to_the_limit(self, app):
+        user_offerer = offerers_factories.UserOffererFactory()
+        bookings_factories.UsedBookingFactory.create_batch(2, stock__offer__venue__managingOfferer=user_offerer.offerer)
+
+        client = TestClient(app.test_client()).with_session_auth(user_offerer.user.email)
+        response = client.get(URL)
+
+        assert response.status_code == 200
+        sheet = openpyxl.load_workbook(BytesIO(response.data)).active
+        assert sheet.max_row == 3
+
+
+@override_settings(BOOKINGS_EXCEL_EXPORT_MAX_SYNC_BOOKINGS=2)
+class Returns400Test:
+    def test_too_many_bookings(self, app):
+        user_offerer = offerers_factories.UserOffererFactory()
+        bookings_factories.UsedBookingFactory.create_batch(3, stock__offer__venue__managingOfferer=user_offerer.offerer)
+
+        client = TestClient(app.test_client()).with_session_auth(user_offerer.user.email)
+        response = client.get(URL)
+
+        assert response.status_code == 400
+        assert response.json == {
+            "global": [
+                "Cet export contient trop de réservations pour être téléchargé directement. "
+                "Veuillez demander son envoi par e-mail."
+            ]
+        }
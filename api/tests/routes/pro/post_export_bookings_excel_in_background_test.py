@@ -0,0 +1,55 @@
+from unittest.mock import patch
+
+import pytest
+
+import pcapi.core.bookings.factories as bookings_factories
+import pcapi.core.mails.testing as mails_testing
+import pcapi.core.offerers.factories as offerers_factories
+from pcapi.core.testing import override_settings
+
+from tests.conftest import TestClient
+
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+URL = "/bookings/excel/background?bookingPeriodBeginningDate=2000-01-01&bookingPeriodEndingDate=2030-01-01"
+
+
+class Returns204Test:
+    @patch("pcapi.core.bookings.tasks.delete_excel_export_task.delay")
+    def test_export_is_sent_by_email(self, mocked_delete_task, app, tmp_path):
+        user_offerer = offerers_factories.UserOffererFactory()
+        bookings_factories.UsedBookingFactory(stock__offer__venue__managingOfferer=user_offerer.offerer)
+
+        client = TestClient(app.test_client()).with_session_auth(user_offerer.user.email)
+        with override_settings(LOCAL_STORAGE_DIR=tmp_path):
+            response = client.post(URL)
+
+        assert response.status_code == 204
+        [export_path] = (tmp_path / "bookings_exports").glob("*.xlsx")
+        mocked_delete_task.assert_called_once()
+        assert len(mails_testing.outbox) == 1
+        assert mails_testing.outbox[0].sent_data["To"] == user_offerer.user.email
+        assert export_path.name in mails_testing.outbox[0].sent_data["html_content"]
+
+    @patch("pcapi.routes.pro.bookings.export_bookings_excel_job.delay")
+    def test_export_is_generated_in_background(self, mocked_job, app):
+        user_offerer = offerers_factories.UserOffererFactory()
+
+        client = TestClient(app.test_client()).with_session_auth(user_offerer.user.email)
+        response = client.post(URL + "&bookingStatusFilter=validated")
+
+        assert response.status_code == 204
+        mocked_job.assert_called_once()
+        user_id, filters = mocked_job.call_args.args
+        assert user_id == user_offerer.user.id
+        assert "user" not in filters
+        assert filters["status_filter"].value == "validated"
+
+
+class Returns401Test:
+    def test_anonymous_user(self, client):
+        response = client.post(URL)
+
+        assert response.status_code == 401
+        assert not mails_testing.outbox
@@ -497,6 +497,33 @@ def test_public_api(client, app):
                     "title": "PostCollectiveOfferBodyModel",
                     "type": "object",
                 },
+                "StocksImportResponseModel": {
+                    "properties": {
+                        "chunksCount": {"title": "Chunkscount", "type": "integer"},
+                        "dateCreated": {"format": "date-time", "title": "Datecreated", "type": "string"},
+                        "doneChunksCount": {"title": "Donechunkscount", "type": "integer"},
+                        "failedChunksCount": {"title": "Failedchunkscount", "type": "integer"},
+                        "id": {"title": "Id", "type": "string"},
+                        "status": {"$ref": "#/components/schemas/StocksImportStatus"},
+                        "stocksCount": {"title": "Stockscount", "type": "integer"},
+                    },
+                    "required": [
+                        "id",
+                        "status",
+                        "dateCreated",
+                        "stocksCount",
+                        "chunksCount",
+                        "doneChunksCount",
+                        "failedChunksCount",
+                    ],
+                    "title": "Venue's stocks import",
+                    "type": "object",
+                },
+                "StocksImportStatus": {
+                    "description": "An enumeration.",
+                    "enum": ["pending", "done", "failed"],
+                    "title": "StocksImportStatus",
+                },
                 "UpdateVenueStockBodyModel": {
                     "description": "Available stock quantity for a book",
                     "properties": {
@@ -1182,7 +1209,7 @@ def test_public_api(client, app):
             },
             "/v2/venue/{venue_id}/stocks": {
                 "post": {
-                    "description": 'Seuls les livres, préalablement présents dans le catalogue du pass Culture seront pris en compte, tous les autres stocks seront filtrés. Les stocks sont référencés par leur isbn au format EAN13. Le champ "available" représente la quantité de stocks disponible en librairie. Le champ "price" correspond au prix en euros. Le paramètre {venue_id} correspond à un lieu qui doit être attaché à la structure à laquelle la clé d\'API utilisée est reliée.',
+                    "description": 'Seuls les livres, préalablement présents dans le catalogue du pass Culture seront pris en compte, tous les autres stocks seront filtrés. Les stocks sont référencés par leur isbn au format EAN13. Le champ "available" représente la quantité de stocks disponible en librairie. Le champ "price" correspond au prix en euros. Le paramètre {venue_id} correspond à un lieu qui doit être attaché à la structure à laquelle la clé d\'API utilisée est reliée. Les stocks sont importés de manière asynchrone, par lots. L\'avancement du dernier import peut être suivi avec la route GET /v2/venue/{venue_id}/stocks/import.',
                     "operationId": "UpdateStocks",
                     "parameters": [
                         {
@@ -1215,6 +1242,43 @@ def test_public_api(client, app):
                     "tags": ["API Stocks"],
                 }
             },
+            "/v2/venue/{venue_id}/stocks/import": {
+                "get": {
+                    "description": 'Le statut vaut "pending" tant que tous les lots de stocks n\'ont pas été traités, "done" si tous les lots ont été importés et "failed" si l\'import d\'au moins un lot a échoué.',
+                    "operationId": "GetStocksImport",
+                    "parameters": [
+                        {
+                            "description": "",
+                            "in": "path",
+                            "name": "venue_id",
+                            "required": True,
+                            "schema": {"format": "int32", "type": "integer"},
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/StocksImportResponseModel"}
+                                }
+                            },
+                            "description": "OK",
+                        },
+                        "401": {"description": "Unauthorized"},
+                        "403": {"description": "Forbidden"},
+                        "404": {"description": "Not Found"},
+                        "422": {
+                            "content": {
+                                "application/json": {"schema": {"$ref": "#/components/schemas/ValidationError"}}
+                            },
+                            "description": "Unprocessable Entity",
+                        },
+                    },
+                    "security": [{"ApiKeyAuth": []}],
+                    "summary": "Avancement du dernier import de stocks d'un lieu.",
+                    "tags": ["API Stocks"],
+                }
+            },
         },
         "security": [],
         "servers": [{"url": settings.API_URL}],
@@ -6,6 +6,7 @@ import pytest
 import pcapi.core.offerers.factories as offerers_factories
 import pcapi.core.offers.factories as offers_factories
 import pcapi.core.offers.models as offers_models
+from pcapi.core.testing import override_settings
 
 
 pytestmark = pytest.mark.usefixtures("db_session")
@@ -41,6 +42,45 @@ def test_basics(client):
     assert offer.stocks[0].price == 30
 
 
+@override_settings(STOCKS_IMPORT_CHUNK_SIZE=1)
+def test_import_status(client):
+    venue = offerers_factories.VenueFactory()
+    offers = [
+        offers_factories.OfferFactory(
+            product__idAtProviders=isbn,
+            product__extraData={"prix_livre": 12.34},
+            product__subcategoryId="LIVRE_PAPIER",
+            idAtProvider=isbn,
+            venue=venue,
+        )
+        for isbn in ("123456789", "987654321")
+    ]
+    offerers_factories.ApiKeyFactory(offerer=venue.managingOfferer)
+    client = client.with_explicit_token(offerers_factories.DEFAULT_CLEAR_API_KEY)
+
+    response = client.get(f"/v2/venue/{venue.id}/stocks/import")
+    assert response.status_code == 404
+
+    data = {
+        "stocks": [
+            {"ref": "123456789", "available": 4, "price": 30},
+            {"ref": "987654321", "available": 0, "price": 10},
+            {"ref": "987654321", "available": 2, "price": 10},  # the last one wins
+        ]
+    }
+    response = client.post(f"/v2/venue/{venue.id}/stocks", json=data)
+    assert response.status_code == 204
+
+    assert [offer.stocks[0].quantity for offer in offers] == [4, 2]
+    response = client.get(f"/v2/venue/{venue.id}/stocks/import")
+    assert response.status_code == 200
+    assert response.json["status"] == "done"
+    assert response.json["stocksCount"] == 2
+    assert response.json["chunksCount"] == 2
+    assert response.json["doneChunksCount"] == 2
+    assert response.json["failedChunksCount"] == 0
+
+
 @pytest.mark.parametrize(
     "price,error",
     [
@@ -17,6 +17,7 @@ from pcapi.core.offerers import models as offerers_models
 from pcapi.core.offers import factories as offers_factories
 from pcapi.core.offers import models as offers_models
 from pcapi.models import offer_mixin
+from pcapi.routes.public.individual_offers.v1 import endpoints
 from pcapi.utils import human_ids
 
 import tests
@@ -1623,6 +1624,7 @@ class GetProductsTest:
             "itemsTotal": 12,
             "lastPage": 3,
             "limitPerPage": 5,
+            "nextCursor": endpoints._encode_cursor(offers[4].id),
             "pagesLinks": {
                 "current": f"{self.ENDPOINT_URL}?page=1&limit=5",
                 "first": f"{self.ENDPOINT_URL}?page=1&limit=5",
@@ -1649,6 +1651,7 @@ class GetProductsTest:
             "itemsTotal": 12,
             "lastPage": 3,
             "limitPerPage": 5,
+            "nextCursor": None,
             "pagesLinks": {
                 "current": f"{self.ENDPOINT_URL}?page=3&limit=5",
                 "first": f"{self.ENDPOINT_URL}?page=1&limit=5",
@@ -1688,6 +1691,7 @@ class GetProductsTest:
                 "itemsTotal": 0,
                 "limitPerPage": 5,
                 "lastPage": 1,
+                "nextCursor": None,
                 "pagesLinks": {
                     "current": f"{self.ENDPOINT_URL}?page=1&limit=5",
                     "first": f"{self.ENDPOINT_URL}?page=1&limit=5",
@@ -1728,6 +1732,7 @@ class GetProductsTest:
             "itemsTotal": 1,
             "lastPage": 1,
             "limitPerPage": 50,
+            "nextCursor": None,
             "pagesLinks": {
                 "current": f"http://localhost/public/offers/v1/products?venueId={venue.id}&page=1&limit=50",
                 "first": f"http://localhost/public/offers/v1/products?venueId={venue.id}&page=1&limit=50",
@@ -1748,6 +1753,55 @@ class GetProductsTest:
 
         assert response.status_code == 404
 
+    def test_get_pages_by_cursor(self, client):
+        api_key = offerers_factories.ApiKeyFactory()
+        offers = offers_factories.ThingOfferFactory.create_batch(7, venue__managingOfferer=api_key.offerer)
+        cursor = endpoints._encode_cursor(offers[1].id)
+
+        with testing.assert_no_duplicated_queries():
+            response = client.with_explicit_token(offerers_factories.DEFAULT_CLEAR_API_KEY).get(
+                f"/public/offers/v1/products?limit=3&cursor={cursor}"
+            )
+
+        assert response.status_code == 200
+        next_cursor = endpoints._encode_cursor(offers[4].id)
+        assert response.json["pagination"] == {
+            "itemsCount": 3,
+            "itemsTotal": None,
+            "limitPerPage": 3,
+            "nextCursor": next_cursor,
+            "next": f"{self.ENDPOINT_URL}?cursor={next_cursor}&limit=3",
+        }
+        assert [product["id"] for product in response.json["products"]] == [offer.id for offer in offers[2:5]]
+
+        response = client.with_explicit_token(offerers_factories.DEFAULT_CLEAR_API_KEY).get(
+            f"/public/offers/v1/products?limit=3&cursor={next_cursor}&withTotal=true"
+        )
+
+        assert response.status_code == 200
+        assert response.json["pagination"] == {
+            "itemsCount": 2,
+            "itemsTotal": 7,
+            "limitPerPage": 3,
+            "nextCursor": None,
+            "next": None,
+        }
+        assert [product["id"] for product in response.json["products"]] == [offer.id for offer in offers[5:7]]
+
+    @pytest.mark.parametrize(
+        "cursor",
+        ["invalid", endpoints._encode_cursor(0), endpoints._encode_cursor(-1), endpoints._encode_cursor(2**63)],
+    )
+    def test_400_when_cursor_is_invalid(self, client, cursor):
+        offerers_factories.ApiKeyFactory()
+
+        response = client.with_explicit_token(offerers_factories.DEFAULT_CLEAR_API_KEY).get(
+            f"/public/offers/v1/products?cursor={cursor}"
+        )
+
+        assert response.status_code == 400
+        assert response.json == {"cursor": ["The cursor is invalid."]}
+
 
 @pytest.mark.usefixtures("db_session")
 class GetEventsTest:
@@ -1770,6 +1824,7 @@ class GetEventsTest:
             "itemsTotal": 12,
             "lastPage": 3,
             "limitPerPage": 5,
+            "nextCursor": endpoints._encode_cursor(offers[4].id),
             "pagesLinks": {
                 "current": f"{self.ENDPOINT_URL}?page=1&limit=5",
                 "first": f"{self.ENDPOINT_URL}?page=1&limit=5",
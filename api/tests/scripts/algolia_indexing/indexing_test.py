@@ -25,7 +25,7 @@ class BatchIndexingOffersInAlgoliaFromDatabaseTest:
 
         # Then
         assert mock_get_paginated_active_offer_ids.call_count == 2
-        mock_reindex_offer_ids.assert_called_once_with([1])
+        mock_reindex_offer_ids.assert_called_once_with([1], force=True)
 
     @mock.patch("pcapi.core.offers.repository.get_paginated_active_offer_ids")
     @mock.patch("pcapi.core.search.reindex_offer_ids")
@@ -41,8 +41,8 @@ class BatchIndexingOffersInAlgoliaFromDatabaseTest:
         # Then
         assert mock_get_paginated_active_offer_ids.call_count == 3
         assert mock_reindex_offer_ids.call_args_list == [
-            mock.call([1]),
-            mock.call([2]),
+            mock.call([1], force=True),
+            mock.call([2], force=True),
         ]
 
     @mock.patch("pcapi.core.offers.repository.get_paginated_active_offer_ids")
@@ -57,7 +57,7 @@ class BatchIndexingOffersInAlgoliaFromDatabaseTest:
         batch_indexing_offers_in_algolia_from_database(ending_page=1, limit=1, starting_page=0)
 
         # Then
-        mock_reindex_offer_ids.assert_called_once_with([1])
+        mock_reindex_offer_ids.assert_called_once_with([1], force=True)
 
 
 @pytest.mark.usefixtures("db_session")
@@ -1,10 +1,13 @@
 import itertools
+import os
 import types
 
 import pytest
+import sqlalchemy as sqla
 
 import pcapi.core.users.factories as users_factories
 import pcapi.core.users.models as users_models
+from pcapi.models import db
 import pcapi.utils.db as db_utils
 
 
@@ -27,3 +30,18 @@ class GetBatchesTest:
     def test_empty(self):
         batches = db_utils.get_batches(users_models.User.query, users_models.User.id, 10)
         assert not list(batches)
+
+
+def _get_pid_and_select_one(_value: int) -> tuple[int, int]:
+    return os.getpid(), db.session.execute(sqla.text("SELECT 1")).scalar()
+
+
+class GetProcessPoolExecutorTest:
+    def test_basics(self, app):
+        with db_utils.get_process_pool_executor(2) as executor:
+            results = list(executor.map(_get_pid_and_select_one, range(10)))
+
+        assert {result for _pid, result in results} == {1}
+        assert os.getpid() not in {pid for pid, _result in results}
+        # The database is still usable from the parent process.
+        assert db.session.execute(sqla.text("SELECT 1")).scalar() == 1
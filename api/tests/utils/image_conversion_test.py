@@ -7,6 +7,7 @@ import pytest
 from pcapi.utils.image_conversion import CropParams
 from pcapi.utils.image_conversion import ImageRatio
 from pcapi.utils.image_conversion import ImageRatioError
+from pcapi.utils.image_conversion import MAX_THUMB_WIDTH
 from pcapi.utils.image_conversion import _crop_image
 from pcapi.utils.image_conversion import _resize_image
 from pcapi.utils.image_conversion import _transpose_image
@@ -104,3 +105,17 @@ class ImageConversionTest:
         assert result_image.width < original_image.width
         assert result_image.height < original_image.height
         assert (result_image.width / result_image.height) == pytest.approx(expected_ratio, 0.01)
+
+    def test_image_shrink_with_exif_orientation(self):
+        # The image is decoded at a reduced scale, but must stay large
+        # enough once rotated.
+        image_as_bytes = (IMAGES_DIR / "image_with_exif_orientation.jpeg").read_bytes()
+        original_image = _transpose_image(PIL.Image.open(io.BytesIO(image_as_bytes)))
+
+        standardized_image = process_original_image(image_as_bytes)
+
+        result_image = PIL.Image.open(io.BytesIO(standardized_image))
+        assert result_image.width == MAX_THUMB_WIDTH
+        assert (result_image.width / result_image.height) == pytest.approx(
+            original_image.width / original_image.height, 0.01
+        )